@@ -0,0 +1,250 @@
+"""
+Watchlist summary metrics and comparisons computed over an aligned price panel.
+
+close_panel() lines up every ticker's closes on one date index, and
+watchlist_metrics() derives all metrics for all tickers with array
+operations on that panel, so the cost barely grows with the watchlist.
+
+The comparison functions (normalized performance, rolling covariance,
+correlation and beta) work on the daily returns of such a panel. Rolling
+statistics come from cumulative sums of the return products, so every
+window costs the same regardless of its length, and pairs are computed
+over the days both tickers have a return, like pandas' pairwise rolling
+cov/corr.
+"""
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+DAY_NS = 86_400 * 10**9
+
+# Return horizons as calendar offsets from the latest date. "ytd" is handled separately.
+RETURN_WINDOWS = {
+    "ret_1d": None,
+    "ret_1w": pd.DateOffset(weeks=1),
+    "ret_1m": pd.DateOffset(months=1),
+    "ret_1y": pd.DateOffset(years=1),
+}
+
+METRIC_COLUMNS = ["last_close", "ret_1d", "ret_1w", "ret_1m", "ret_ytd", "ret_1y",
+                  "vol_30d", "from_52w_high", "from_52w_low"]
+
+def close_panel(closes: Dict[str, pd.Series]) -> pd.DataFrame:
+    """
+    Aligns per-ticker close series into a dates x tickers float panel.
+    Indexes are reduced to calendar dates, so series stamped in different
+    timezones (or at different times of day) land on the same row.
+    """
+    tickers, days, prices = [], [], []
+    for ticker, series in closes.items():
+        if series is None or series.empty:
+            continue
+        tickers.append(ticker)
+        days.append(calendar_days(series.index))
+        prices.append(series.to_numpy(dtype=float))
+    if not tickers:
+        return pd.DataFrame(dtype=float)
+
+    # Filling a preallocated matrix by position is much faster than an
+    # outer-join concat of hundreds of Series. Later bars on a day win.
+    dates = np.unique(np.concatenate(days))
+    matrix = np.full((len(dates), len(tickers)), np.nan)
+    for col, (day, price) in enumerate(zip(days, prices)):
+        matrix[np.searchsorted(dates, day), col] = price
+    return pd.DataFrame(matrix, index=pd.DatetimeIndex(dates.view("datetime64[ns]")), columns=tickers)
+
+def calendar_days(index) -> np.ndarray:
+    """The calendar dates of a (possibly timezone-aware) index as int64 nanoseconds at midnight."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ns").asi8 // DAY_NS * DAY_NS
+
+def watchlist_metrics(panel: pd.DataFrame, asof: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Per-ticker metrics indexed by ticker: last close, 1D/1W/1M/YTD/1Y returns,
+    annualized 30-day realized volatility and the distance of the last close
+    from the 52-week high/low. Returns are fractions (0.05 = +5%).
+    Tickers without a bar on a horizon's base date use their last earlier close.
+    """
+    if panel.empty:
+        return pd.DataFrame(columns=METRIC_COLUMNS, dtype=float)
+    if asof is not None:
+        panel = panel.loc[:pd.Timestamp(asof)]
+    dates = panel.index
+    values = panel.to_numpy(dtype=float)
+    filled = panel.ffill().to_numpy(dtype=float)
+    last = filled[-1]
+
+    result = {"last_close": last}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name, offset in RETURN_WINDOWS.items():
+            base = _base_row(filled, dates, dates[-1] - offset) if offset is not None else _previous_close(values)
+            result[name] = last / base - 1
+        # YTD is measured from the last close of the previous year
+        year_start = pd.Timestamp(year=dates[-1].year, month=1, day=1)
+        result["ret_ytd"] = last / _base_row(filled, dates, year_start - pd.Timedelta(days=1)) - 1
+
+        # Realized volatility from the last 30 daily log returns, bars missing for a ticker are skipped
+        log_returns = np.diff(np.log(values[-31:]), axis=0)
+        counts = np.sum(~np.isnan(log_returns), axis=0)
+        mean = np.nansum(log_returns, axis=0) / counts
+        var = np.nansum((log_returns - mean) ** 2, axis=0) / (counts - 1)
+        result["vol_30d"] = np.where(counts > 1, np.sqrt(var * TRADING_DAYS), np.nan)
+
+        window = values[dates > dates[-1] - pd.DateOffset(weeks=52)]
+        high = _nan_reduce(np.nanmax, window)
+        low = _nan_reduce(np.nanmin, window)
+        result["from_52w_high"] = last / high - 1
+        result["from_52w_low"] = last / low - 1
+
+    return pd.DataFrame(result, index=panel.columns)[METRIC_COLUMNS]
+
+def _base_row(filled: np.ndarray, dates: pd.DatetimeIndex, when: pd.Timestamp) -> np.ndarray:
+    """Forward-filled closes as of `when`, NaN for every ticker if the panel starts later."""
+    pos = dates.searchsorted(when, side="right") - 1
+    if pos < 0:
+        return np.full(filled.shape[1], np.nan)
+    return filled[pos]
+
+def _previous_close(values: np.ndarray) -> np.ndarray:
+    """Each ticker's second-to-last actual close."""
+    valid = ~np.isnan(values)
+    # Position of the last and second-to-last valid row per column
+    ranks = np.cumsum(valid[::-1], axis=0)[::-1]
+    rows = np.where(valid & (ranks == 2), np.arange(len(values))[:, None], -1).max(axis=0)
+    prev = values[np.maximum(rows, 0), np.arange(values.shape[1])]
+    return np.where(rows >= 0, prev, np.nan)
+
+def _nan_reduce(func, window: np.ndarray) -> np.ndarray:
+    """nanmax/nanmin over rows without the all-NaN warning, NaN where a column has no data."""
+    if len(window) == 0:
+        return np.full(window.shape[1], np.nan)
+    has_data = ~np.all(np.isnan(window), axis=0)
+    out = np.full(window.shape[1], np.nan)
+    out[has_data] = func(window[:, has_data], axis=0)
+    return out
+
+def daily_returns(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Simple daily returns of a close panel. A ticker without a bar on some
+    date (e.g. an exchange holiday) has a zero return there, and NaN before
+    its first close.
+    """
+    return panel.ffill().pct_change(fill_method=None)
+
+def normalized_performance(panel: pd.DataFrame, base: float = 100.0) -> pd.DataFrame:
+    """Each ticker's closes rebased to `base` at its first close in the panel, carried forward over gaps."""
+    filled = panel.ffill().to_numpy(dtype=float)
+    if not len(filled):
+        return panel.copy()
+    valid = ~np.isnan(filled)
+    first = filled[valid.argmax(axis=0), np.arange(filled.shape[1])]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.DataFrame(filled / first * base, index=panel.index, columns=panel.columns)
+
+def rolling_covariance(returns: pd.DataFrame, window: Optional[int] = None,
+                       min_periods: Optional[int] = None) -> np.ndarray:
+    """
+    Covariance matrices of the returns over the trailing `window` rows, as a
+    dates x tickers x tickers array (window None: everything up to each date).
+    Entries with fewer than min_periods (default: window, or 2) common
+    returns are NaN.
+    """
+    pairs, n, sx, sy, sxy, _, _ = _pairwise_sums(returns, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (sxy - sx * sy / n) / (n - 1)
+    cov = np.where(n >= _min_periods(window, min_periods), cov, np.nan)
+    return _square(pairs, cov, len(returns.columns))
+
+def rolling_correlation(returns: pd.DataFrame, window: Optional[int] = None,
+                        min_periods: Optional[int] = None) -> np.ndarray:
+    """Correlation matrices of the returns, shaped and windowed like rolling_covariance()."""
+    pairs, *sums = _pairwise_sums(returns, window)
+    return _square(pairs, _correlation(*sums, _min_periods(window, min_periods)), len(returns.columns))
+
+def correlation_matrix(returns: pd.DataFrame, min_periods: int = 2) -> pd.DataFrame:
+    """Correlations over the whole period (pairwise complete), tickers x tickers."""
+    values = returns.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    m = valid.astype(float)
+    sx, sxx = x.T @ m, (x * x).T @ m
+    corr = _correlation(m.T @ m, sx, sx.T, x.T @ x, sxx, sxx.T, max(min_periods, 2))
+    return pd.DataFrame(corr, index=returns.columns, columns=returns.columns)
+
+def rolling_beta(returns: pd.DataFrame, benchmark: str, window: Optional[int] = None,
+                 min_periods: Optional[int] = None) -> pd.DataFrame:
+    """
+    Beta of every ticker against the benchmark column over the trailing
+    `window` rows (window None: everything up to each date), dates x tickers.
+    """
+    values = returns.to_numpy(dtype=float).T
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    position = returns.columns.get_loc(benchmark)
+    b = x[position]
+    both = valid & valid[position]
+    n = _window_sums(both.astype(float), window)
+    sx = _window_sums(np.where(both, x, 0.0), window)
+    sb = _window_sums(np.where(both, b, 0.0), window)
+    sxb = _window_sums(x * b, window)
+    sbb = _window_sums(np.where(both, b * b, 0.0), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = (sxb - sx * sb / n) / (sbb - sb * sb / n)
+    beta = np.where(n >= _min_periods(window, min_periods), beta, np.nan)
+    return pd.DataFrame(beta.T, index=returns.index, columns=returns.columns)
+
+def _correlation(n, sx, sy, sxy, sxx, syy, min_periods: int) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (sxy - sx * sy / n) / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+    return np.where(n >= min_periods, np.clip(corr, -1.0, 1.0), np.nan)
+
+def _pairwise_sums(returns: pd.DataFrame, window: Optional[int]):
+    """
+    Windowed sums for every pair of tickers (i, j) with i <= j, over the rows
+    where both have a return: count, sum of x_i, sum of x_j, sum of x_i*x_j,
+    sum of x_i^2 and sum of x_j^2, each pairs x dates. The pairs' (i, j)
+    indices come first.
+    """
+    # Tickers x dates, so the running sums go along contiguous memory
+    values = returns.to_numpy(dtype=float).T
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    i, j = np.triu_indices(len(values))
+    if len(values) and (valid == valid[:1]).all():
+        # All tickers have returns on the same rows (the usual case), per-ticker sums are enough
+        n = _window_sums(valid[:1].astype(float), window)
+        sums, squares = _window_sums(x, window), _window_sums(x * x, window)
+        sx, sy, sxx, syy = sums[i], sums[j], squares[i], squares[j]
+    else:
+        m = valid.astype(float)
+        n = _window_sums(m[i] * m[j], window)
+        sx, sy = _window_sums(x[i] * m[j], window), _window_sums(m[i] * x[j], window)
+        sxx, syy = _window_sums(x[i] ** 2 * m[j], window), _window_sums(m[i] * x[j] ** 2, window)
+    sxy = _window_sums(x[i] * x[j], window)
+    return (i, j), n, sx, sy, sxy, sxx, syy
+
+def _square(pairs, values: np.ndarray, tickers: int) -> np.ndarray:
+    """Per-pair (i <= j) values over dates as symmetric dates x tickers x tickers matrices."""
+    i, j = pairs
+    out = np.empty((tickers, tickers, values.shape[-1]))
+    out[i, j] = values
+    out[j, i] = values
+    return np.moveaxis(out, -1, 0)
+
+def _window_sums(values: np.ndarray, window: Optional[int]) -> np.ndarray:
+    """Sums over the trailing `window` entries of the last axis (all earlier ones when None)."""
+    sums = np.cumsum(values, axis=-1)
+    if window is None or window >= sums.shape[-1]:
+        return sums
+    out = np.empty_like(sums)
+    out[..., :window] = sums[..., :window]
+    np.subtract(sums[..., window:], sums[..., :-window], out=out[..., window:])
+    return out
+
+def _min_periods(window: Optional[int], min_periods: Optional[int]) -> int:
+    if min_periods is not None:
+        return max(min_periods, 2)
+    return window if window is not None else 2
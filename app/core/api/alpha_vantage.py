@@ -1,13 +1,22 @@
 import requests
 import pandas as pd
+from datetime import date, datetime
 from typing import Dict, Any, Optional
-from .base import StockDataSource
+from .http import HttpClient
+from .base import DataNotFound, ProviderUnavailable, StockDataSource, period_to_start, request_error
 
 class AlphaVantageSource(StockDataSource):
     BASE_URL = "https://www.alphavantage.co/query"
+    PROVIDER = "alpha_vantage"
+    # outputsize=compact returns the latest 100 trading days (~140 calendar days).
+    # Stay a little below that so we never miss bars at the edge.
+    COMPACT_DAYS = 130
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http: Optional[HttpClient] = None, base_url: Optional[str] = None):
         self.api_key = api_key
+        self.http = http
+        # e.g. a local stand-in server (see app.core.api.standin)
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
 
     def _get_json(self, function: str, symbol: str) -> Dict[str, Any]:
         params = {
@@ -16,26 +25,26 @@ class AlphaVantageSource(StockDataSource):
             "apikey": self.api_key
         }
         try:
-            response = requests.get(self.BASE_URL, params=params)
+            response = self._http_get(self.base_url, params=params)
             response.raise_for_status()
             data = response.json()
             # Alpha Vantage returns "Note" or "Information" keys if limit reached or error
             if "Note" in data:
-                raise ValueError(f"Alpha Vantage API limit reached: {data['Note']}")
+                raise ProviderUnavailable(f"Alpha Vantage API limit reached: {data['Note']}")
             if "Information" in data:
-                raise ValueError(f"Alpha Vantage API Info: {data['Information']}")
+                raise ProviderUnavailable(f"Alpha Vantage API Info: {data['Information']}")
             if "Error Message" in data:
                 raise ValueError(f"Alpha Vantage API Error: {data['Error Message']}")
             return data
         except requests.RequestException as e:
-            raise ValueError(f"Network error fetching data from Alpha Vantage: {e}")
+            raise request_error(f"Network error fetching data from Alpha Vantage: {e}", e)
 
     def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
         data = self._get_json("OVERVIEW", ticker)
 
         # Check if empty (invalid ticker often returns {})
         if not data:
-             raise ValueError(f"No info found for ticker {ticker}")
+             raise DataNotFound(f"No info found for ticker {ticker}")
 
         return {
             "name": data.get("Name"),
@@ -48,28 +57,33 @@ class AlphaVantageSource(StockDataSource):
             "full_info": data
         }
 
-    def get_price_history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
-        # Alpha Vantage TIME_SERIES_DAILY returns default compact (100 days) or full (20+ years)
-        # We will use outputsize=full if we want more than 100 days, but 'period' arg is tricky here.
-        # For simplicity, we'll request full and filter, or just take what we get.
-        # Since the interface asks for 'period', we'll try to support it vaguely,
-        # but AV 'compact' is ~5 months.
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
+        # Alpha Vantage TIME_SERIES_DAILY returns default compact (100 days) or full (20+ years).
+        # Only ask for the full series when the requested window doesn't fit in compact,
+        # it is several MB per call and counts against the same quota.
+        end_date = datetime.now()
+        if start is not None:
+            start_date = pd.Timestamp(start).to_pydatetime()
+        else:
+            start_date = period_to_start(period, end_date)
+
+        compact = start_date is not None and (end_date - start_date).days <= self.COMPACT_DAYS
 
         params = {
             "function": "TIME_SERIES_DAILY",
             "symbol": ticker,
             "apikey": self.api_key,
-            "outputsize": "full" # Get all data to be safe, filter later
+            "outputsize": "compact" if compact else "full"
         }
 
         try:
-            response = requests.get(self.BASE_URL, params=params)
+            response = self._http_get(self.base_url, params=params)
             response.raise_for_status()
             data = response.json()
 
             if "Time Series (Daily)" not in data:
-                 if "Note" in data: raise ValueError(f"Limit reached: {data['Note']}")
-                 raise ValueError(f"No price data found for {ticker}")
+                 if "Note" in data: raise ProviderUnavailable(f"Limit reached: {data['Note']}")
+                 raise DataNotFound(f"No price data found for {ticker}")
 
             ts_data = data["Time Series (Daily)"]
             df = pd.DataFrame.from_dict(ts_data, orient='index')
@@ -84,16 +98,13 @@ class AlphaVantageSource(StockDataSource):
             df = df.astype(float)
             df.sort_index(inplace=True)
 
-            # Simple period filtering (very rough approximation)
-            if period == "1y":
-                start_date = pd.Timestamp.now() - pd.DateOffset(years=1)
-                df = df[df.index >= start_date]
-            # Add more period logic if needed
+            if start_date is not None:
+                df = df[df.index >= pd.Timestamp(start_date).normalize()]
 
             return df
 
         except requests.RequestException as e:
-            raise ValueError(f"Network error: {e}")
+            raise request_error(f"Network error: {e}", e)
 
     def get_financials(self, ticker: str) -> Dict[str, Any]:
         data = {}
@@ -1,19 +1,112 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Dict, Any, Callable, List, Optional, Union
 import pandas as pd
+import requests
+from .http import HttpClient, get_http_client
+from .rate_limit import RateLimiter, get_rate_limiter
+
+class DataNotFound(ValueError):
+    """The provider answered, but has no data for the ticker. Says nothing about the provider's health."""
+
+class ProviderUnavailable(ValueError):
+    """The provider couldn't answer: a network error, rate limiting (429) or a server error (5xx)."""
+
+def request_error(message: str, error: requests.RequestException) -> ValueError:
+    """The error a source raises for a failed request, ProviderUnavailable unless the server refused it (4xx)."""
+    response = getattr(error, "response", None)
+    status = response.status_code if response is not None else None
+    if status is not None and 400 <= status < 500 and status != 429:
+        return ValueError(message)
+    return ProviderUnavailable(message)
+
+def period_to_start(period: str, end: datetime) -> Optional[datetime]:
+    """
+    Translates a yfinance style period ("1mo", "1y", "ytd", ...) into a start date.
+    Returns None for "max" or unknown periods.
+    """
+    offsets = {
+        "1d": pd.DateOffset(days=1),
+        "5d": pd.DateOffset(days=5),
+        "1mo": pd.DateOffset(months=1),
+        "3mo": pd.DateOffset(months=3),
+        "6mo": pd.DateOffset(months=6),
+        "1y": pd.DateOffset(years=1),
+        "2y": pd.DateOffset(years=2),
+        "5y": pd.DateOffset(years=5),
+        "10y": pd.DateOffset(years=10),
+    }
+    if period == "ytd":
+        return datetime(end.year, 1, 1)
+    if period in offsets:
+        return (pd.Timestamp(end) - offsets[period]).to_pydatetime()
+    return None
+
+def parallel_map(fn: Callable[[str], Any], tickers: List[str], max_workers: int = 4) -> Dict[str, Any]:
+    """Calls fn for every ticker on a thread pool. Failures are returned as the exception instead of raised."""
+    def call(ticker):
+        try:
+            return fn(ticker)
+        except Exception as e:
+            return e
+
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as executor:
+        return dict(zip(tickers, executor.map(call, tickers)))
 
 class StockDataSource(ABC):
+    # Key used for per-provider rate limits, None for sources without a quota
+    PROVIDER: Optional[str] = None
+    # Transport and quota scheduler for REST sources. None means the shared, config-driven ones.
+    http: Optional[HttpClient] = None
+    rate_limiter: Optional[RateLimiter] = None
+
+    def _http_get(self, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GET through the pooled, retrying transport layer, waiting for the provider's rate limit first."""
+        before_request = None
+        if self.PROVIDER:
+            limiter = self.rate_limiter or get_rate_limiter()
+            before_request = lambda: limiter.acquire(self.PROVIDER)
+        return (self.http or get_http_client()).get(url, params=params, before_request=before_request)
+
     @abstractmethod
     def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
         """Fetch metadata about the stock (name, sector, etc.)"""
         pass
 
     @abstractmethod
-    def get_price_history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
-        """Fetch historical price data"""
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
+        """
+        Fetch historical price data.
+        If start is given, only bars from that date onwards are requested and
+        period is ignored. An empty DataFrame then means there are no new bars.
+        """
         pass
 
     @abstractmethod
     def get_financials(self, ticker: str) -> Dict[str, Any]:
         """Fetch financial statements/info"""
         pass
+
+    def get_price_history_batch(self, tickers: List[str], period: str = "1y", start: Optional[date] = None,
+                                max_workers: int = 4) -> Dict[str, Union[pd.DataFrame, Exception]]:
+        """
+        Fetch price history for many tickers, with the same period/start semantics as get_price_history.
+        Returns ticker -> DataFrame, or the exception raised for that ticker.
+        Sources with a native multi-symbol endpoint override this; the default runs
+        single-ticker calls in parallel.
+        """
+        return parallel_map(lambda t: self.get_price_history(t, period=period, start=start), tickers, max_workers)
+
+    def get_ticker_info_batch(self, tickers: List[str], max_workers: int = 4) -> Dict[str, Union[Dict[str, Any], Exception]]:
+        """Fetch metadata for many tickers. Returns ticker -> info dict, or the exception raised for that ticker."""
+        return parallel_map(self.get_ticker_info, tickers, max_workers)
+
+    def remaining_quota(self) -> Optional[int]:
+        """Requests left in the provider's daily quota, None if it has none."""
+        if not self.PROVIDER:
+            return None
+        return (self.rate_limiter or get_rate_limiter()).remaining(self.PROVIDER)["day"]
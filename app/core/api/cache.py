@@ -0,0 +1,218 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Union
+import pandas as pd
+from app.core.market_hours import next_market_close, next_quarter_start
+from .base import StockDataSource
+
+class ResponseCache:
+    """
+    On-disk cache of API responses in a small SQLite database, so every
+    Streamlit session and the background refresher share the same entries.
+    Entries expire at a fixed time and the least recently used ones are
+    evicted once the total payload size exceeds max_bytes.
+    """
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = self._clock()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self._count("misses")
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+        finally:
+            conn.close()
+        self._count("hits")
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, expires_at: float):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        now = self._clock()
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT OR REPLACE INTO responses (key, value, size, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, blob, len(blob), expires_at, now))
+            self._evict(conn, now)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._count("evictions", len(victims))
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        finally:
+            conn.close()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+class CachedDataSource(StockDataSource):
+    """
+    Wraps any StockDataSource and serves repeated calls from a ResponseCache.
+
+    Default lifetimes: company profile for info_ttl, financial statements until
+    the next calendar quarter starts, prices until the next market close.
+    Errors are never cached. Other attributes are forwarded to the wrapped source.
+    """
+    def __init__(self, source: StockDataSource, cache: ResponseCache, info_ttl: timedelta = timedelta(days=7)):
+        self.source = source
+        self.cache = cache
+        self.info_ttl = info_ttl
+        self.PROVIDER = source.PROVIDER
+        # Keys are per provider, the wrapped source may be a wrapper itself (e.g. InstrumentedDataSource)
+        self._namespace = _provider_name(source)
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not found on the wrapper itself
+        if name == "source":
+            raise AttributeError(name)
+        return getattr(self.source, name)
+
+    def _now(self) -> pd.Timestamp:
+        return pd.Timestamp(self.cache._clock(), unit="s", tz="UTC")
+
+    def _cached(self, key: str, fetch: Callable[[], Any], expires_at: pd.Timestamp) -> Any:
+        key = f"{self._namespace}:{key}"
+        value = self.cache.get(key)
+        if value is None:
+            value = fetch()
+            self.cache.set(key, value, expires_at.timestamp())
+        return value
+
+    def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
+        return self._cached(f"info:{ticker}", lambda: self.source.get_ticker_info(ticker),
+                            self._now() + self.info_ttl)
+
+    def get_financials(self, ticker: str) -> Dict[str, Any]:
+        return self._cached(f"financials:{ticker}", lambda: self.source.get_financials(ticker),
+                            next_quarter_start(self._now()))
+
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
+        key = f"prices:{ticker}:{period}:{start}"
+        return self._cached(key, lambda: self.source.get_price_history(ticker, period=period, start=start),
+                            next_market_close(self._now()))
+
+    def get_price_history_batch(self, tickers: List[str], period: str = "1y", start: Optional[date] = None,
+                                max_workers: int = 4) -> Dict[str, Union[pd.DataFrame, Exception]]:
+        return self._cached_batch(
+            tickers, lambda t: f"prices:{t}:{period}:{start}",
+            lambda missing: self.source.get_price_history_batch(missing, period=period, start=start, max_workers=max_workers),
+            next_market_close(self._now()))
+
+    def get_ticker_info_batch(self, tickers: List[str], max_workers: int = 4) -> Dict[str, Union[Dict[str, Any], Exception]]:
+        return self._cached_batch(
+            tickers, lambda t: f"info:{t}",
+            lambda missing: self.source.get_ticker_info_batch(missing, max_workers=max_workers),
+            self._now() + self.info_ttl)
+
+    def remaining_quota(self) -> Optional[int]:
+        return self.source.remaining_quota()
+
+    def _cached_batch(self, tickers: List[str], key_for: Callable[[str], str],
+                      fetch_many: Callable[[List[str]], Dict[str, Any]], expires_at: pd.Timestamp) -> Dict[str, Any]:
+        """Serves what it can from the cache and sends a single batch request for the rest."""
+        results = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            value = self.cache.get(f"{self._namespace}:{key_for(ticker)}")
+            if value is None:
+                missing.append(ticker)
+            else:
+                results[ticker] = value
+        if missing:
+            for ticker, value in fetch_many(missing).items():
+                if not isinstance(value, Exception):
+                    self.cache.set(f"{self._namespace}:{key_for(ticker)}", value, expires_at.timestamp())
+                results[ticker] = value
+        return results
+
+def _provider_name(source: StockDataSource) -> str:
+    """The provider's registry name (see registry.create_provider), e.g. "finnhub"."""
+    for attr in ("provider", "provider_name"):
+        name = getattr(source, attr, None)
+        if isinstance(name, str):
+            return name
+    return type(source).__name__
+
+_shared_caches: Dict[str, ResponseCache] = {}
+_shared_lock = threading.Lock()
+
+def get_response_cache(path: str, max_bytes: int = 256 * 1024 * 1024) -> ResponseCache:
+    """One ResponseCache per file per process, so hit/miss counters add up across sessions."""
+    with _shared_lock:
+        cache = _shared_caches.get(path)
+        if cache is None:
+            cache = ResponseCache(path, max_bytes=max_bytes)
+            _shared_caches[path] = cache
+        cache.max_bytes = max_bytes
+        return cache
@@ -1,34 +1,98 @@
+import os
 from typing import Dict, Any
 from app.core.config_manager import ConfigManager
 from .base import StockDataSource
-from .yfinance_source import YFinanceSource
-from .alpha_vantage import AlphaVantageSource
-from .polygon import PolygonSource
-from .finnhub import FinnhubSource
+from .http import configure_http_client
+from .rate_limit import configure_rate_limiter
+from .cache import CachedDataSource, get_response_cache
+from .failover import FailoverDataSource
+from .instrumented import InstrumentedDataSource
+from .registry import create_provider, get_provider_spec
+
+DEFAULT_SOURCE = "yfinance"
 
 def get_stock_data_source(config_manager: ConfigManager) -> StockDataSource:
-    source_name = config_manager.get("api_source", "yfinance")
+    """
+    The configured provider, created through the provider registry so only its
+    module gets imported. Falls back to YFinance if the provider is unknown or
+    its API key is missing. When "api_sources" lists several providers, a
+    failover source over them is returned instead (see get_failover_source).
+    "base_urls" maps provider names to other endpoints, e.g. a local stand-in.
+    """
+    source_name = config_manager.get("api_source", DEFAULT_SOURCE)
     api_keys = config_manager.get("api_keys", {})
+    base_urls = config_manager.get("base_urls", {})
+    configure_http_client(config_manager.get("http", {}))
+    configure_rate_limiter(config_manager.get("rate_limits", {}), rate_limit_state_path(config_manager))
+
+    if len(config_manager.get("api_sources") or []) > 1:
+        return get_failover_source(config_manager)
+
+    try:
+        spec = get_provider_spec(source_name)
+    except ValueError as e:
+        print(f"Warning: {e}. Falling back to YFinance.")
+    else:
+        key = api_keys.get(source_name)
+        if key or not spec.needs_key:
+            return create_provider(source_name, key, base_urls.get(source_name))
+        print(f"Warning: {spec.label} selected but no key found. Falling back to YFinance.")
+
+    return create_provider(DEFAULT_SOURCE)
+
+def get_failover_source(config_manager: ConfigManager) -> StockDataSource:
+    """
+    A FailoverDataSource over the providers listed in "api_sources", in that
+    order. Unknown providers and ones without a key are skipped. Breaker and
+    hedging settings come from "failover": {"failure_threshold": 5,
+    "reset_seconds": 60, "hedge": false, "hedge_min_samples": 20}.
+    """
+    api_keys = config_manager.get("api_keys", {})
+    base_urls = config_manager.get("base_urls", {})
+    settings = config_manager.get("failover", {})
+    sources = []
+    for name in dict.fromkeys(config_manager.get("api_sources")):
+        try:
+            sources.append((name, create_provider(name, api_keys.get(name), base_urls.get(name))))
+        except ValueError as e:
+            print(f"Warning: Skipping data source {name}: {e}.")
+    if not sources:
+        print("Warning: No usable data source in api_sources. Falling back to YFinance.")
+        return create_provider(DEFAULT_SOURCE)
+    if len(sources) == 1:
+        return sources[0][1]
+    return FailoverDataSource(sources,
+                              failure_threshold=int(settings.get("failure_threshold", 5)),
+                              reset_timeout=float(settings.get("reset_seconds", 60)),
+                              hedge=bool(settings.get("hedge", False)),
+                              hedge_min_samples=int(settings.get("hedge_min_samples", 20)))
+
+def build_data_source(config_manager: ConfigManager, cached: bool = True) -> StockDataSource:
+    """
+    The data source the app should use: the configured provider, with its calls
+    recorded in app.core.metrics, wrapped in the response cache unless
+    "cache": {"enabled": false} is set or cached is False (e.g. for the
+    background refresher, whose job is to reach the provider).
+    """
+    source = get_stock_data_source(config_manager)
+    if not isinstance(source, FailoverDataSource):
+        # The failover source records each provider's calls itself
+        source = InstrumentedDataSource(source)
+    return with_cache(source, config_manager) if cached else source
+
+def with_cache(source: StockDataSource, config_manager: ConfigManager) -> StockDataSource:
+    settings = config_manager.get("cache", {})
+    if not settings.get("enabled", True):
+        return source
+    return CachedDataSource(source, get_response_cache_for(config_manager))
+
+def get_response_cache_for(config_manager: ConfigManager):
+    settings = config_manager.get("cache", {})
+    db_path = config_manager.get("db_path", "data/stocks.db")
+    path = os.path.join(os.path.dirname(db_path), "api_cache.db")
+    return get_response_cache(path, max_bytes=int(settings.get("max_mb", 256)) * 1024 * 1024)
 
-    if source_name == "alpha_vantage":
-        key = api_keys.get("alpha_vantage")
-        if key:
-            return AlphaVantageSource(key)
-        else:
-            print("Warning: Alpha Vantage selected but no key found. Falling back to YFinance.")
-
-    elif source_name == "polygon":
-        key = api_keys.get("polygon")
-        if key:
-            return PolygonSource(key)
-        else:
-            print("Warning: Polygon selected but no key found. Falling back to YFinance.")
-
-    elif source_name == "finnhub":
-        key = api_keys.get("finnhub")
-        if key:
-            return FinnhubSource(key)
-        else:
-            print("Warning: Finnhub selected but no key found. Falling back to YFinance.")
-
-    return YFinanceSource()
+def rate_limit_state_path(config_manager: ConfigManager) -> str:
+    """Quota usage, shared by the app and the background refresher, is kept next to the database."""
+    db_path = config_manager.get("db_path", "data/stocks.db")
+    return os.path.join(os.path.dirname(db_path), "rate_limits.db")
@@ -0,0 +1,290 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from .base import DataNotFound, ProviderUnavailable, StockDataSource
+from .instrumented import record_call
+from .rate_limit import RateLimitExceeded
+
+class CircuitBreaker:
+    """
+    Stops sending calls to a provider after failure_threshold consecutive
+    failures. Once reset_timeout seconds have passed a single trial call is let
+    through (half open): success closes the circuit, failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now. In the half open state only one caller gets True."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._clock() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+class ProviderStats:
+    """Call counts and recent latencies (successful calls only) of one provider."""
+    def __init__(self, window: int = 200):
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.hedged = 0
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self.calls += 1
+            if ok:
+                self._latencies.append(seconds)
+            else:
+                self.errors += 1
+
+    def count_hedge(self):
+        with self._lock:
+            self.hedged += 1
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile in seconds, None until min_samples successful calls were seen."""
+        with self._lock:
+            if len(self._latencies) < max(1, min_samples):
+                return None
+            return float(np.percentile(np.fromiter(self._latencies, float), q))
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "error_rate": self.errors / self.calls if self.calls else 0.0,
+                "p50_ms": p50 * 1000 if p50 is not None else None,
+                "p95_ms": p95 * 1000 if p95 is not None else None,
+                "hedged": self.hedged,
+            }
+
+class FailoverDataSource(StockDataSource):
+    """
+    Composite source over an ordered list of (name, source) providers.
+
+    Every call goes to the first provider whose circuit breaker is closed and
+    moves on to the next one when it raises, so a provider that is down or out
+    of quota costs one failed call per breaker period instead of one per
+    ticker. Only outages (see _is_outage) count toward the breaker, and
+    DataNotFound is raised as is: another provider won't know the ticker
+    either. Batch calls re-request only the tickers that failed.
+
+    With hedge=True, a single-ticker call that is still running after the
+    provider's p95 latency is also sent to the next provider, and whichever
+    answers first wins. This trades extra quota for tail latency, so it is
+    off by default.
+    """
+    provider_name = "failover"
+
+    def __init__(self, sources: List[Tuple[str, StockDataSource]], failure_threshold: int = 5,
+                 reset_timeout: float = 60.0, hedge: bool = False, hedge_min_samples: int = 20,
+                 clock: Callable[[], float] = time.monotonic):
+        if not sources:
+            raise ValueError("FailoverDataSource needs at least one provider")
+        self.sources = list(sources)
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self._clock = clock
+        self.breakers = {name: CircuitBreaker(failure_threshold, reset_timeout, clock) for name, _ in self.sources}
+        self.provider_stats = {name: ProviderStats() for name, _ in self.sources}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
+        return self._call("get_ticker_info", lambda s: s.get_ticker_info(ticker))
+
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
+        return self._call("get_price_history", lambda s: s.get_price_history(ticker, period=period, start=start))
+
+    def get_financials(self, ticker: str) -> Dict[str, Any]:
+        return self._call("get_financials", lambda s: s.get_financials(ticker))
+
+    def get_price_history_batch(self, tickers: List[str], period: str = "1y", start: Optional[date] = None,
+                                max_workers: int = 4) -> Dict[str, Union[pd.DataFrame, Exception]]:
+        return self._call_batch(
+            "get_price_history_batch", tickers, lambda s, missing: s.get_price_history_batch(missing, period=period, start=start,
+                                                                   max_workers=max_workers))
+
+    def get_ticker_info_batch(self, tickers: List[str], max_workers: int = 4) -> Dict[str, Union[Dict[str, Any], Exception]]:
+        return self._call_batch("get_ticker_info_batch", tickers, lambda s, missing: s.get_ticker_info_batch(missing, max_workers=max_workers))
+
+    def remaining_quota(self) -> Optional[int]:
+        """Requests left today over the providers whose circuit isn't open, None if one of them has no quota."""
+        total = 0
+        for name, source in self.sources:
+            if self.breakers[name].state == CircuitBreaker.OPEN:
+                continue
+            remaining = source.remaining_quota()
+            if remaining is None:
+                return None
+            total += remaining
+        return total
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per provider: calls, errors, error_rate, p50_ms, p95_ms, hedged and the breaker state."""
+        return {name: dict(self.provider_stats[name].snapshot(), state=self.breakers[name].state)
+                for name, _ in self.sources}
+
+    def _next_allowed(self, candidates: List[Tuple[str, StockDataSource]]) -> Optional[Tuple[str, StockDataSource]]:
+        """
+        Pops providers off candidates until one whose breaker lets a call through.
+        Breakers are asked only right before a call, as a half open one hands out a single trial.
+        """
+        while candidates:
+            name, source = candidates.pop(0)
+            if self.breakers[name].allow():
+                return name, source
+        return None
+
+    def _timed(self, name: str, source: StockDataSource, method: str, fn: Callable[[StockDataSource], Any]) -> Any:
+        start = self._clock()
+        try:
+            result = record_call(name, method, lambda: fn(source))
+        except Exception as e:
+            self.provider_stats[name].record(self._clock() - start, ok=False)
+            if _is_outage(e):
+                self.breakers[name].record_failure()
+            else:
+                # The provider answered, e.g. that it doesn't know the ticker
+                self.breakers[name].record_success()
+            raise
+        self.provider_stats[name].record(self._clock() - start, ok=True)
+        self.breakers[name].record_success()
+        return result
+
+    def _call(self, method: str, fn: Callable[[StockDataSource], Any]) -> Any:
+        candidates = list(self.sources)
+        errors = []
+        while True:
+            provider = self._next_allowed(candidates)
+            if provider is None:
+                break
+            name, source = provider
+            threshold = self.provider_stats[name].percentile(95, self.hedge_min_samples) if self.hedge else None
+            try:
+                if threshold is not None:
+                    return self._hedged(name, source, candidates, method, fn, threshold)
+                return self._timed(name, source, method, fn)
+            except DataNotFound:
+                raise
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+        if not errors:
+            raise ValueError("All data providers are unavailable (circuit open), try again later")
+        raise ValueError("All data providers failed: " + "; ".join(errors))
+
+    def _hedged(self, name: str, source: StockDataSource, candidates: List[Tuple[str, StockDataSource]], method: str,
+                fn: Callable[[StockDataSource], Any], threshold: float) -> Any:
+        """
+        Runs fn on the primary and, if it hasn't answered within threshold seconds,
+        on the next available provider too. Returns the first success. The backup
+        is taken off candidates so the caller doesn't try it again.
+        """
+        executor = self._get_executor()
+        primary = executor.submit(self._timed, name, source, method, fn)
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+        backup = self._next_allowed(candidates)
+        if backup is None:
+            return primary.result()
+
+        self.provider_stats[name].count_hedge()
+        pending = {primary, executor.submit(self._timed, backup[0], backup[1], method, fn)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None or isinstance(future.exception(), DataNotFound):
+                    # The slower call keeps running in the background, its outcome still updates the stats
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _call_batch(self, method: str, tickers: List[str],
+                    fn: Callable[[StockDataSource, List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        missing = list(dict.fromkeys(tickers))
+        candidates = list(self.sources)
+        while missing:
+            provider = self._next_allowed(candidates)
+            if provider is None:
+                break
+            name, source = provider
+            try:
+                batch = self._timed(name, source, method, lambda s: _raise_if_all_failed(fn(s, missing)))
+            except Exception as e:
+                for ticker in missing:
+                    results[ticker] = e
+                continue
+            results.update(batch)
+            missing = [t for t in missing if t not in results or _retryable(results[t])]
+        if missing and not results:
+            error = ValueError("All data providers are unavailable (circuit open), try again later")
+            return {t: error for t in missing}
+        return results
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+            return self._executor
+
+def _is_outage(error: Exception) -> bool:
+    """Network errors, 429 and 5xx answers and spent quotas, the failures that say a provider is down."""
+    return isinstance(error, (ProviderUnavailable, RateLimitExceeded, OSError))
+
+def _retryable(result: Any) -> bool:
+    """Whether a batch result is an error another provider might not run into."""
+    return isinstance(result, Exception) and not isinstance(result, DataNotFound)
+
+def _raise_if_all_failed(results: Dict[str, Any]) -> Dict[str, Any]:
+    """A batch where every ticker failed counts as a provider failure (outage, quota), not a ticker problem."""
+    if results and all(_retryable(v) for v in results.values()):
+        raise next(iter(results.values()))
+    return results
@@ -1,29 +1,35 @@
 import requests
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, Any, Optional
-from .base import StockDataSource
+from .http import HttpClient
+from .base import DataNotFound, ProviderUnavailable, StockDataSource, period_to_start, request_error
 
 class FinnhubSource(StockDataSource):
     BASE_URL = "https://finnhub.io/api/v1"
+    PROVIDER = "finnhub"
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http: Optional[HttpClient] = None, base_url: Optional[str] = None):
         self.api_key = api_key
+        self.http = http
+        # e.g. a local stand-in server (see app.core.api.standin)
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
 
-    def _get_json(self, endpoint: str, params: Dict[str, Any] = {}) -> Dict[str, Any]:
+    def _get_json(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        params = dict(params or {})
         params["token"] = self.api_key
-        url = f"{self.BASE_URL}{endpoint}"
+        url = f"{self.base_url}{endpoint}"
         try:
-            response = requests.get(url, params=params)
+            response = self._http_get(url, params=params)
             if response.status_code == 429:
-                raise ValueError("Finnhub API Rate Limit Exceeded")
+                raise ProviderUnavailable("Finnhub API Rate Limit Exceeded")
             if response.status_code == 403 or response.status_code == 401:
                  raise ValueError("Finnhub API Unauthorized/Forbidden")
 
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
-            raise ValueError(f"Network error fetching data from Finnhub: {e}")
+            raise request_error(f"Network error fetching data from Finnhub: {e}", e)
 
     def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
         endpoint = "/stock/profile2"
@@ -31,7 +37,7 @@ class FinnhubSource(StockDataSource):
         data = self._get_json(endpoint, params)
 
         if not data:
-            raise ValueError(f"No info found for ticker {ticker}")
+            raise DataNotFound(f"No info found for ticker {ticker}")
 
         return {
             "name": data.get("name"),
@@ -44,36 +50,17 @@ class FinnhubSource(StockDataSource):
             "full_info": data
         }
 
-    def get_price_history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
         # /stock/candle?symbol=...&resolution=D&from=...&to=...
         endpoint = "/stock/candle"
 
         end_date = datetime.now()
 
-        # Calculate start_date based on period
-        if period == "1d":
-            start_date = end_date - pd.DateOffset(days=1)
-        elif period == "5d":
-            start_date = end_date - pd.DateOffset(days=5)
-        elif period == "1mo":
-            start_date = end_date - pd.DateOffset(months=1)
-        elif period == "3mo":
-            start_date = end_date - pd.DateOffset(months=3)
-        elif period == "6mo":
-            start_date = end_date - pd.DateOffset(months=6)
-        elif period == "1y":
-            start_date = end_date - pd.DateOffset(years=1)
-        elif period == "2y":
-            start_date = end_date - pd.DateOffset(years=2)
-        elif period == "5y":
-            start_date = end_date - pd.DateOffset(years=5)
-        elif period == "10y":
-            start_date = end_date - pd.DateOffset(years=10)
-        elif period == "ytd":
-            start_date = datetime(end_date.year, 1, 1)
+        if start is not None:
+            start_date = pd.Timestamp(start).to_pydatetime()
         else:
-            # Default to 1y for safety or 'max' (Finnhub 'max' requires knowing IPO date, so just do 20 years)
-            start_date = end_date - pd.DateOffset(years=1)
+            # Default to 1y for 'max' or unknown periods (Finnhub 'max' requires knowing IPO date)
+            start_date = period_to_start(period, end_date) or end_date - pd.DateOffset(years=1)
 
         # timestamps in seconds
         from_ts = int(start_date.timestamp())
@@ -89,7 +76,9 @@ class FinnhubSource(StockDataSource):
         data = self._get_json(endpoint, params)
 
         if data.get("s") == "no_data":
-             raise ValueError(f"No price data found for {ticker}")
+            if start is not None:
+                return pd.DataFrame()
+            raise DataNotFound(f"No price data found for {ticker}")
 
         # c: close, h: high, l: low, o: open, t: time, v: volume
         df = pd.DataFrame(data)
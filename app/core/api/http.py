@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+class HttpClient:
+    """
+    Shared transport for the REST data sources.
+
+    Wraps a pooled requests.Session so connections (and their TLS sessions) are
+    kept alive between calls, applies a default timeout, and retries transient
+    failures (connection errors, timeouts, 429 and 5xx) with jittered
+    exponential backoff. A Retry-After header is honoured as long as it is not
+    longer than max_backoff; beyond that the response is returned as is.
+    """
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, timeout: float = 10.0, max_retries: int = 3, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, pool_size: int = 16):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            before_request: Optional[Callable[[], None]] = None) -> requests.Response:
+        """
+        Performs a GET with retries. before_request is called before every attempt,
+        e.g. to take a rate limiter token.
+        """
+        attempt = 0
+        while True:
+            if before_request:
+                before_request()
+            self._count("_requests")
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    self._count("_failures")
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    if response.status_code >= 400:
+                        self._count("_failures")
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                elif delay > self.max_backoff:
+                    # e.g. a daily quota reset, not worth blocking for
+                    self._count("_failures")
+                    return response
+
+            self._count("_retries")
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, backoff_factor * 2^attempt], capped at max_backoff."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Request, retry and connection reuse counters since the client was created."""
+        pools = self._adapter.poolmanager.pools
+        connections = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+        with self._lock:
+            requests_made, retries, failures = self._requests, self._retries, self._failures
+        return {
+            "requests": requests_made,
+            "retries": retries,
+            "failures": failures,
+            "connections_opened": connections,
+            "connection_reuse": 1 - connections / requests_made if requests_made else 0.0,
+        }
+
+    def close(self):
+        self.session.close()
+
+_shared_client: Optional[HttpClient] = None
+_shared_settings: Optional[Dict[str, Any]] = None
+_shared_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """Returns the process-wide client used by data sources that weren't given their own."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
+
+def configure_http_client(settings: Dict[str, Any]) -> HttpClient:
+    """
+    Replaces the shared client if the settings (the "http" config section) changed.
+    Recognised keys: timeout, max_retries, backoff_factor, max_backoff, pool_size.
+    """
+    global _shared_client, _shared_settings
+    with _shared_lock:
+        if _shared_client is None or _shared_settings != settings:
+            # The old client is left to be garbage collected, requests in flight may still use it
+            _shared_client = HttpClient(**settings)
+            _shared_settings = dict(settings)
+        return _shared_client
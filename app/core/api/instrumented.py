@@ -0,0 +1,60 @@
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Union
+import pandas as pd
+from app.core import metrics
+from .base import StockDataSource
+
+def record_call(provider: str, method: str, call: Callable[[], Any]) -> Any:
+    """Runs call, recording its latency and outcome under the provider and method labels."""
+    start = time.perf_counter()
+    try:
+        result = call()
+    except Exception:
+        metrics.inc("stockhelper_provider_calls_total", provider=provider, method=method, outcome="error")
+        raise
+    finally:
+        metrics.observe("stockhelper_provider_latency_seconds", time.perf_counter() - start,
+                        provider=provider, method=method)
+    metrics.inc("stockhelper_provider_calls_total", provider=provider, method=method, outcome="ok")
+    return result
+
+class InstrumentedDataSource(StockDataSource):
+    """
+    Wraps a StockDataSource and records every call in app.core.metrics, labelled
+    with the provider's registry name. Other attributes are forwarded to the
+    wrapped source.
+    """
+    def __init__(self, source: StockDataSource, provider: Optional[str] = None):
+        self.source = source
+        self.provider = provider or getattr(source, "provider_name", None) or type(source).__name__
+        self.PROVIDER = source.PROVIDER
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not found on the wrapper itself
+        if name == "source":
+            raise AttributeError(name)
+        return getattr(self.source, name)
+
+    def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
+        return record_call(self.provider, "get_ticker_info", lambda: self.source.get_ticker_info(ticker))
+
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
+        return record_call(self.provider, "get_price_history",
+                           lambda: self.source.get_price_history(ticker, period=period, start=start))
+
+    def get_financials(self, ticker: str) -> Dict[str, Any]:
+        return record_call(self.provider, "get_financials", lambda: self.source.get_financials(ticker))
+
+    def get_price_history_batch(self, tickers: List[str], period: str = "1y", start: Optional[date] = None,
+                                max_workers: int = 4) -> Dict[str, Union[pd.DataFrame, Exception]]:
+        return record_call(self.provider, "get_price_history_batch",
+                           lambda: self.source.get_price_history_batch(tickers, period=period, start=start,
+                                                                       max_workers=max_workers))
+
+    def get_ticker_info_batch(self, tickers: List[str], max_workers: int = 4) -> Dict[str, Union[Dict[str, Any], Exception]]:
+        return record_call(self.provider, "get_ticker_info_batch",
+                           lambda: self.source.get_ticker_info_batch(tickers, max_workers=max_workers))
+
+    def remaining_quota(self) -> Optional[int]:
+        return self.source.remaining_quota()
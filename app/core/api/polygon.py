@@ -1,30 +1,36 @@
 import requests
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-from .base import StockDataSource
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Union
+from .http import HttpClient
+from .base import DataNotFound, ProviderUnavailable, StockDataSource, period_to_start, request_error
 
 class PolygonSource(StockDataSource):
     BASE_URL = "https://api.polygon.io"
+    PROVIDER = "polygon"
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http: Optional[HttpClient] = None, base_url: Optional[str] = None):
         self.api_key = api_key
+        self.http = http
+        # e.g. a local stand-in server (see app.core.api.standin)
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
 
-    def _get_json(self, endpoint: str, params: Dict[str, Any] = {}) -> Dict[str, Any]:
+    def _get_json(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        params = dict(params or {})
         params["apiKey"] = self.api_key
-        url = f"{self.BASE_URL}{endpoint}"
+        url = f"{self.base_url}{endpoint}"
         try:
-            response = requests.get(url, params=params)
+            response = self._http_get(url, params=params)
             # Polygon returns 401/403 for unauthorized/plan limits
             if response.status_code == 403 or response.status_code == 401:
                 raise ValueError(f"Polygon API Unauthorized/Forbidden: {response.text}")
             if response.status_code == 429:
-                raise ValueError("Polygon API Rate Limit Exceeded")
+                raise ProviderUnavailable("Polygon API Rate Limit Exceeded")
 
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
-             raise ValueError(f"Network error fetching data from Polygon: {e}")
+             raise request_error(f"Network error fetching data from Polygon: {e}", e)
 
     def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
         endpoint = f"/v3/reference/tickers/{ticker}"
@@ -32,7 +38,7 @@ class PolygonSource(StockDataSource):
 
         results = data.get("results", {})
         if not results:
-            raise ValueError(f"No info found for ticker {ticker}")
+            raise DataNotFound(f"No info found for ticker {ticker}")
 
         return {
             "name": results.get("name"),
@@ -45,13 +51,13 @@ class PolygonSource(StockDataSource):
             "full_info": results
         }
 
-    def get_price_history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
         # Calc dates
         end_date = datetime.now()
-        start_date = end_date - timedelta(days=365) # default 1y
-        if period == "1y":
-            start_date = end_date - timedelta(days=365)
-        # Add other period logic if needed
+        if start is not None:
+            start_date = pd.Timestamp(start).to_pydatetime()
+        else:
+            start_date = period_to_start(period, end_date) or end_date - timedelta(days=365) # default 1y
 
         from_str = start_date.strftime("%Y-%m-%d")
         to_str = end_date.strftime("%Y-%m-%d")
@@ -63,7 +69,9 @@ class PolygonSource(StockDataSource):
 
         results = data.get("results", [])
         if not results:
-             raise ValueError(f"No price data found for {ticker}")
+            if start is not None:
+                return pd.DataFrame()
+            raise DataNotFound(f"No price data found for {ticker}")
 
         df = pd.DataFrame(results)
         # Polygon columns: v, vw, o, c, h, l, t, n
@@ -79,6 +87,65 @@ class PolygonSource(StockDataSource):
         df.set_index("Date", inplace=True)
         return df
 
+    def get_price_history_batch(self, tickers: List[str], period: str = "1y", start: Optional[date] = None,
+                                max_workers: int = 4) -> Dict[str, Union[pd.DataFrame, Exception]]:
+        """
+        Uses the grouped daily endpoint (one call returns every US ticker for one day)
+        when the window has fewer trading days than there are tickers, e.g. a daily
+        incremental refresh of a large watchlist. Otherwise falls back to one call per ticker.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        end_date = datetime.now()
+        if start is not None:
+            start_date = pd.Timestamp(start).to_pydatetime()
+        else:
+            start_date = period_to_start(period, end_date) or end_date - timedelta(days=365)
+
+        days = pd.bdate_range(start_date.date(), self._last_completed_session())
+        if len(days) == 0 or len(days) >= len(tickers):
+            return super().get_price_history_batch(tickers, period=period, start=start, max_workers=max_workers)
+
+        wanted = set(tickers)
+        rows = []
+        try:
+            for day in days:
+                data = self._get_json(f"/v2/aggs/grouped/locale/us/market/stocks/{day.strftime('%Y-%m-%d')}",
+                                      {"adjusted": "true"})
+                # Grouped bars are stamped at the close. Use the session's midnight (New York)
+                # like the per-ticker aggregates, so both kinds of bars merge on the same index.
+                session = day.tz_localize("America/New_York").tz_convert("UTC").tz_localize(None)
+                # Holidays come back without results
+                rows.extend(dict(r, t=session) for r in data.get("results", []) if r.get("T") in wanted)
+        except ValueError as e:
+            return {t: e for t in tickers}
+
+        frame = pd.DataFrame(rows)
+        results: Dict[str, Union[pd.DataFrame, Exception]] = {}
+        for ticker in tickers:
+            if frame.empty:
+                df = pd.DataFrame()
+            else:
+                df = frame[frame["T"] == ticker].drop(columns=["T"])
+            if df.empty:
+                results[ticker] = pd.DataFrame() if start is not None else ValueError(f"No price data found for {ticker}")
+                continue
+            df = df.rename(columns={
+                "o": "Open",
+                "h": "High",
+                "l": "Low",
+                "c": "Close",
+                "v": "Volume",
+                "t": "Date"
+            })
+            results[ticker] = df.set_index("Date").sort_index()
+        return results
+
+    @staticmethod
+    def _last_completed_session() -> date:
+        """Grouped daily data for a day only exists once that session has closed."""
+        ny = pd.Timestamp.now(tz="America/New_York")
+        return ny.date() if ny.hour >= 17 else (ny - pd.Timedelta(days=1)).date()
+
     def get_financials(self, ticker: str) -> Dict[str, Any]:
         # /vX/reference/financials
         endpoint = "/vX/reference/financials"
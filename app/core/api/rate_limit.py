@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Free-tier budgets (see README). None means no limit of that kind.
+DEFAULT_LIMITS: Dict[str, Dict[str, Optional[int]]] = {
+    "alpha_vantage": {"per_minute": 5, "per_day": 25},
+    "polygon": {"per_minute": 5, "per_day": None},
+    "finnhub": {"per_minute": 60, "per_day": None},
+}
+
+class RateLimitExceeded(ValueError):
+    """Raised when a provider's daily quota is used up. Waiting won't help until the next UTC day."""
+    pass
+
+class _QuotaStore:
+    """
+    Daily counts and the start times of recent calls per provider, in a small
+    SQLite database so every process using the same file (the Streamlit app,
+    the background refresher) draws from one budget. Each acquire() runs in a
+    single write transaction, so concurrent callers can't both take the last
+    slot; remaining() only reads. Without a path the store lives in memory,
+    for one limiter only.
+    """
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._memory = None
+        if path is None:
+            self._memory = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            if self._memory is None:
+                # Readers don't wait for a writer, and don't hold one up
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS quota_days "
+                         "(provider TEXT PRIMARY KEY, day TEXT NOT NULL, count INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS quota_slots (provider TEXT NOT NULL, slot REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_quota_slots ON quota_slots (provider, slot)")
+        finally:
+            self._close(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._memory is not None:
+            return self._memory
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _close(self, conn: sqlite3.Connection):
+        if conn is not self._memory:
+            conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """A write transaction: other processes wait until it ends."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            self._close(conn)
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """A read-only connection, for looking without taking the write lock."""
+        if self._memory is not None:
+            yield self._memory
+            return
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def day_count(conn: sqlite3.Connection, provider: str, day: str) -> int:
+        row = conn.execute("SELECT day, count FROM quota_days WHERE provider = ?", (provider,)).fetchone()
+        return row[1] if row is not None and row[0] == day else 0
+
+    @staticmethod
+    def slots(conn: sqlite3.Connection, provider: str, since: float) -> List[float]:
+        """Start times of the provider's calls after `since`, oldest first. Older ones are dropped."""
+        conn.execute("DELETE FROM quota_slots WHERE provider = ? AND slot <= ?", (provider, since))
+        return [r[0] for r in conn.execute("SELECT slot FROM quota_slots WHERE provider = ? ORDER BY slot",
+                                           (provider,))]
+
+    @staticmethod
+    def slots_between(conn: sqlite3.Connection, provider: str, since: float, until: float) -> int:
+        """How many of the provider's calls started after `since` and by `until`."""
+        return conn.execute("SELECT COUNT(*) FROM quota_slots WHERE provider = ? AND slot > ? AND slot <= ?",
+                            (provider, since, until)).fetchone()[0]
+
+class RateLimiter:
+    """
+    Per-provider request scheduler for the free-tier quotas.
+
+    Per-minute budgets are enforced by delaying calls: slots are reserved in
+    order, so concurrent callers queue up behind each other instead of
+    racing for the same one. Per-day budgets are counted per UTC day and
+    raise RateLimitExceeded once spent. Both are kept in `state_path` (see
+    _QuotaStore), so restarts and other processes such as the background
+    refresher share them.
+    """
+    PERIOD = 60.0
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Optional[int]]]] = None,
+                 state_path: Optional[str] = None, safety_margin: float = 0.25,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.limits = {name: dict(l) for name, l in (limits or DEFAULT_LIMITS).items()}
+        self.state_path = state_path
+        self.safety_margin = safety_margin
+        # Wall clock time, call slots are compared across processes
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._store = _QuotaStore(state_path)
+        self.total_wait = 0.0
+        # Per provider: how often and for how long acquire() had to wait
+        self.waits: Dict[str, int] = {}
+        self.wait_seconds: Dict[str, float] = {}
+
+    def acquire(self, provider: str):
+        """Blocks until a request to provider may be sent. Unknown providers are not limited."""
+        limits = self.limits.get(provider)
+        if not limits:
+            return
+        per_day, per_minute = limits.get("per_day"), limits.get("per_minute")
+
+        wait = 0.0
+        with self._lock, self._store.transaction() as conn:
+            if per_day is not None:
+                today = _today()
+                count = self._store.day_count(conn, provider, today)
+                if count >= per_day:
+                    raise RateLimitExceeded(f"{provider} daily quota of {per_day} requests is used up")
+                conn.execute("INSERT OR REPLACE INTO quota_days (provider, day, count) VALUES (?, ?, ?)",
+                             (provider, today, count + 1))
+
+            if per_minute is not None:
+                now = self._clock()
+                slots = self._store.slots(conn, provider, now - self.PERIOD)
+                slot = now if len(slots) < per_minute else max(now, slots[-per_minute] + self.PERIOD)
+                conn.execute("INSERT INTO quota_slots (provider, slot) VALUES (?, ?)", (provider, slot))
+                wait = slot - now
+                if wait > 0:
+                    # Providers count from when they receive the call, leave some slack for latency
+                    wait += self.safety_margin
+                    self.total_wait += wait
+                    self.waits[provider] = self.waits.get(provider, 0) + 1
+                    self.wait_seconds[provider] = self.wait_seconds.get(provider, 0.0) + wait
+
+        if wait > 0:
+            self._sleep(wait)
+
+    def remaining(self, provider: str) -> Dict[str, Optional[int]]:
+        """Requests left in the current minute and UTC day (None when that limit doesn't apply)."""
+        limits = self.limits.get(provider, {})
+        per_day, per_minute = limits.get("per_day"), limits.get("per_minute")
+        with self._lock, self._store.reader() as conn:
+            minute = day = None
+            if per_minute is not None:
+                now = self._clock()
+                minute = max(0, per_minute - self._store.slots_between(conn, provider, now - self.PERIOD, now))
+            if per_day is not None:
+                day = max(0, per_day - self._store.day_count(conn, provider, _today()))
+        return {
+            "minute": minute,
+            "minute_limit": per_minute,
+            "day": day,
+            "day_limit": per_day,
+        }
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_settings: Optional[Dict[str, Any]] = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Returns the process-wide limiter. All sources for a provider must share it to see each other's calls."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
+
+def configure_rate_limiter(overrides: Dict[str, Dict[str, Optional[int]]], state_path: Optional[str]) -> RateLimiter:
+    """
+    Replaces the shared limiter if the settings changed. overrides (the
+    "rate_limits" config section) is merged over DEFAULT_LIMITS per provider,
+    e.g. {"polygon": {"per_minute": 100}} for a paid plan.
+    """
+    global _shared_limiter, _shared_settings
+    settings = {"overrides": overrides, "state_path": state_path}
+    with _shared_lock:
+        if _shared_limiter is None or _shared_settings != settings:
+            limits = {name: dict(l) for name, l in DEFAULT_LIMITS.items()}
+            for name, l in overrides.items():
+                limits.setdefault(name, {}).update(l)
+            _shared_limiter = RateLimiter(limits, state_path=state_path)
+            _shared_settings = settings
+        return _shared_limiter
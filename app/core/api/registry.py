@@ -0,0 +1,112 @@
+"""
+Registry of data source providers.
+
+Providers are registered by name with an import path ("module:Class") and
+their modules are only imported when a source is first created, so starting
+the app with one provider configured never loads the others (yfinance alone
+is a noticeable share of startup time).
+
+Third-party packages can add providers through the "stockhelper.providers"
+entry point group, e.g. in their pyproject.toml:
+
+    [project.entry-points."stockhelper.providers"]
+    my_source = "my_package.source:MySource"
+
+Such a class is created as MySource(api_key) when a key is configured for
+its name under "api_keys", else as MySource().
+"""
+import importlib
+import threading
+from importlib.metadata import entry_points
+from typing import Dict, List, Optional, Type
+from .base import StockDataSource
+
+ENTRY_POINT_GROUP = "stockhelper.providers"
+
+class ProviderSpec:
+    """needs_key: can't be created without an API key. takes_key: gets the configured key if there is one."""
+    def __init__(self, name: str, target: str, label: Optional[str] = None, needs_key: bool = False,
+                 takes_key: Optional[bool] = None):
+        self.name = name
+        self.target = target
+        self.label = label or name
+        self.needs_key = needs_key
+        self.takes_key = needs_key if takes_key is None else takes_key
+
+_providers: Dict[str, ProviderSpec] = {}
+_classes: Dict[str, Type[StockDataSource]] = {}
+_lock = threading.Lock()
+_entry_points_loaded = False
+
+def register_provider(name: str, target: str, label: Optional[str] = None, needs_key: bool = False,
+                      takes_key: Optional[bool] = None):
+    """Registers (or replaces) a provider. target is "package.module:ClassName", imported on first use."""
+    if ":" not in target:
+        raise ValueError(f"Provider target '{target}' must look like 'module:ClassName'")
+    with _lock:
+        _providers[name] = ProviderSpec(name, target, label, needs_key, takes_key)
+        _classes.pop(name, None)
+
+register_provider("yfinance", "app.core.api.yfinance_source:YFinanceSource", "YFinance")
+register_provider("alpha_vantage", "app.core.api.alpha_vantage:AlphaVantageSource", "Alpha Vantage", needs_key=True)
+register_provider("polygon", "app.core.api.polygon:PolygonSource", "Polygon", needs_key=True)
+register_provider("finnhub", "app.core.api.finnhub:FinnhubSource", "Finnhub", needs_key=True)
+
+def _load_entry_points():
+    """Registers providers advertised by installed packages. Reads metadata only, nothing is imported."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        print(f"Warning: Could not read '{ENTRY_POINT_GROUP}' entry points: {e}")
+        return
+    for ep in found:
+        # Built-in providers can't be shadowed by an installed package
+        if ep.name not in _providers:
+            register_provider(ep.name, ep.value, takes_key=True)
+
+def get_provider_spec(name: str) -> ProviderSpec:
+    _load_entry_points()
+    spec = _providers.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown data source '{name}'. Options: {', '.join(available_providers())}")
+    return spec
+
+def available_providers() -> List[str]:
+    """Registered provider names, built-in ones first."""
+    _load_entry_points()
+    return list(_providers)
+
+def load_provider(name: str) -> Type[StockDataSource]:
+    """The provider's class, importing its module if this is the first use."""
+    spec = get_provider_spec(name)
+    with _lock:
+        cls = _classes.get(name)
+    if cls is None:
+        module_name, _, attr = spec.target.partition(":")
+        cls = getattr(importlib.import_module(module_name), attr)
+        with _lock:
+            _classes[name] = cls
+    return cls
+
+def create_provider(name: str, api_key: Optional[str] = None, base_url: Optional[str] = None) -> StockDataSource:
+    """
+    Instantiates a provider. Raises ValueError if it needs an API key and none is given.
+    base_url replaces the provider's API endpoint, for REST sources that have a base_url attribute.
+    """
+    spec = get_provider_spec(name)
+    if spec.needs_key and not api_key:
+        raise ValueError(f"{spec.label} needs an API key")
+    cls = load_provider(name)
+    source = cls(api_key) if api_key and spec.takes_key else cls()
+    # Label for metrics (see app.core.api.instrumented)
+    source.provider_name = name
+    if base_url:
+        if hasattr(source, "base_url"):
+            source.base_url = base_url.rstrip("/")
+        else:
+            print(f"Warning: {spec.label} has no configurable base URL, ignoring {base_url}")
+    return source
@@ -1,33 +1,219 @@
+import csv
+import os
 import re
-from typing import Optional, Tuple
+import string
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+ISIN_PATTERN = re.compile(r'^[A-Z]{2}[A-Z0-9]{9}[0-9]$')
+
+# Column names accepted in a mapping file, compared case-insensitively. Covers
+# OpenFIGI exports (idValue/ID_ISIN, ticker, name, exchCode) and the usual
+# exchange symbol masters (ISIN, Symbol, Security Name).
+COLUMN_ALIASES = {
+    "isin": ["isin", "id_isin", "idvalue", "isin code"],
+    "ticker": ["ticker", "symbol", "ticker symbol"],
+    "name": ["name", "security name", "company name", "security", "description", "issuer"],
+}
+
+# Letters count as two digits (A=10 ... Z=35) in the ISIN check digit
+_LETTER_DIGITS = str.maketrans({c: str(ord(c) - 55) for c in string.ascii_uppercase})
+_DOUBLED = [0, 2, 4, 6, 8, 1, 3, 5, 7, 9]
+_NAME_SUFFIXES = {"INC", "INCORPORATED", "CORP", "CORPORATION", "CO", "COMPANY", "LTD", "LIMITED", "PLC",
+                  "AG", "SA", "SE", "NV", "AB", "ASA", "SPA", "HOLDINGS", "GROUP", "THE", "CLASS", "A", "B",
+                  "COMMON", "STOCK", "SHARES", "ORDINARY"}
+_NON_ALNUM = re.compile(r'[^A-Z0-9 ]+')
+
+def isin_checksum_ok(isin: str) -> bool:
+    """Luhn check over the ISIN with letters expanded to numbers."""
+    digits = isin.translate(_LETTER_DIGITS)
+    if not digits.isdigit():
+        return False
+    # From the right: the check digit as is, then every second digit doubled
+    return (sum(map(int, digits[-1::-2])) + sum(_DOUBLED[int(d)] for d in digits[-2::-2])) % 10 == 0
+
+def valid_isins(isins: List[str]) -> np.ndarray:
+    """Vectorized is_isin() for many upper-case strings: pattern and check digit."""
+    matches = [bool(ISIN_PATTERN.match(isin)) for isin in isins]
+    # Letters expand to two digits, so a valid ISIN has at most 2 * 11 + 1 digits.
+    # Left padding with zeros doesn't change the Luhn sum.
+    expanded = [isin.translate(_LETTER_DIGITS).rjust(24, "0") if ok else "0" * 24
+                for isin, ok in zip(isins, matches)]
+    digits = np.frombuffer("".join(expanded).encode(), dtype=np.uint8).reshape(-1, 24).astype(np.int64) - 48
+    # Rightmost digit has position 0, odd positions from the right (even columns here) are doubled
+    total = digits[:, 1::2].sum(axis=1) + np.asarray(_DOUBLED)[digits[:, 0::2]].sum(axis=1)
+    return np.asarray(matches, dtype=bool) & (total % 10 == 0)
+
+def normalize_name(name: str) -> str:
+    """Upper case, punctuation and legal-form suffixes dropped: "Apple Inc." and "APPLE INC" match."""
+    words = _NON_ALNUM.sub(" ", name.upper()).split()
+    kept = [w for w in words if w not in _NAME_SUFFIXES]
+    return " ".join(kept or words)
+
+class IdentifierIndex:
+    """
+    In-memory ISIN / ticker / company name index built from a mapping file,
+    so resolving needs no network call. Lookups are dict hits. When an ISIN
+    is listed several times (one row per exchange), the first row wins, so
+    put the preferred listings first in the file.
+    """
+    def __init__(self):
+        self.ticker_by_isin: Dict[str, str] = {}
+        self.isin_by_ticker: Dict[str, Optional[str]] = {}
+        self._pending_names: List[Tuple[str, str]] = []
+        self._by_name: Optional[Dict[str, Tuple[str, Optional[str]]]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.isin_by_ticker)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "IdentifierIndex":
+        """Loads a mapping CSV with ISIN, ticker and (optionally) name columns, see COLUMN_ALIASES."""
+        with open(path, encoding="utf-8-sig") as f:
+            first_line = f.readline()
+        sep = max(",;\t|", key=first_line.count)
+        header = [c.strip() for c in next(csv.reader([first_line], delimiter=sep))]
+        lowered = {c.lower(): c for c in header}
+        columns = {field: next((lowered[a] for a in aliases if a in lowered), None)
+                   for field, aliases in COLUMN_ALIASES.items()}
+        if columns["isin"] is None or columns["ticker"] is None:
+            raise ValueError(f"Mapping file {path} needs an ISIN and a ticker column, found: {header}")
+
+        usecols = {c for c in columns.values() if c is not None}
+        df = pd.read_csv(path, usecols=lambda c: c.strip() in usecols, dtype=str, keep_default_na=False,
+                         encoding="utf-8-sig", sep=sep)
+        df.columns = [c.strip() for c in df.columns]
+        index = cls()
+        names = df[columns["name"]].tolist() if columns["name"] else None
+        index.add_many(df[columns["isin"]].tolist(), df[columns["ticker"]].tolist(), names)
+        return index
+
+    def add_many(self, isins: List[str], tickers: List[str], names: Optional[List[str]] = None):
+        tickers = [t.strip().upper() for t in tickers]
+        isins = [i.strip().upper() for i in isins]
+        valid = valid_isins(isins) if isins else []
+        for isin, ticker, ok in zip(isins, tickers, valid):
+            if not ticker:
+                continue
+            isin = isin if ok else None
+            if isin:
+                self.ticker_by_isin.setdefault(isin, ticker)
+            if self.isin_by_ticker.get(ticker) is None:
+                self.isin_by_ticker[ticker] = isin
+        if names is not None:
+            with self._lock:
+                self._pending_names.extend(zip(names, tickers))
+                self._by_name = None
+
+    @property
+    def by_name(self) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Normalized company name -> (ticker, isin). Built on the first name lookup."""
+        with self._lock:
+            if self._by_name is None:
+                by_name: Dict[str, Tuple[str, Optional[str]]] = {}
+                for name, ticker in self._pending_names:
+                    if name and ticker:
+                        by_name.setdefault(normalize_name(name), (ticker, self.isin_by_ticker.get(ticker)))
+                self._by_name = by_name
+            return self._by_name
+
+    def lookup_isin(self, isin: str) -> Optional[str]:
+        return self.ticker_by_isin.get(isin)
+
+    def lookup_ticker(self, ticker: str) -> Optional[str]:
+        """The ISIN of a known ticker (None if the ticker has none in the file)."""
+        return self.isin_by_ticker.get(ticker)
+
+    def lookup_name(self, name: str) -> Optional[Tuple[str, Optional[str]]]:
+        return self.by_name.get(normalize_name(name))
+
+_indexes: Dict[str, Tuple[Tuple[int, int], IdentifierIndex]] = {}
+_indexes_lock = threading.Lock()
+
+def get_identifier_index(path: Optional[str]) -> Optional[IdentifierIndex]:
+    """
+    The index for a mapping file, shared per process and rebuilt only when
+    the file changes. None if there is no file.
+    """
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _indexes_lock:
+        cached = _indexes.get(path)
+        if cached is None or cached[0] != version:
+            cached = (version, IdentifierIndex.from_csv(path))
+            _indexes[path] = cached
+        return cached[1]
 
 class DataResolver:
     """
     Helper class to resolve stock identifiers (ISIN -> Ticker).
+    With a mapping file, ISINs, tickers and company names are resolved from
+    a local IdentifierIndex, which is loaded on first use.
     """
-    def __init__(self):
-        pass
+    def __init__(self, mapping_path: Optional[str] = None):
+        self.mapping_path = mapping_path
+
+    @property
+    def index(self) -> Optional[IdentifierIndex]:
+        try:
+            return get_identifier_index(self.mapping_path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load ISIN mapping {self.mapping_path}: {e}")
+            return None
 
     def is_isin(self, identifier: str) -> bool:
-        """Checks if the identifier looks like an ISIN."""
-        # Simple regex: 2 letters, 9 alphanum, 1 digit.
-        # Real validation would check checksum, but this is enough for skeleton.
-        return bool(re.match(r'^[A-Z]{2}[A-Z0-9]{9}[0-9]$', identifier))
+        """Checks if the identifier is a well-formed ISIN, including its check digit."""
+        return bool(ISIN_PATTERN.match(identifier)) and isin_checksum_ok(identifier)
 
     def resolve(self, identifier: str) -> Tuple[Optional[str], Optional[str]]:
         """
         Returns (Ticker, ISIN).
-        If input is Ticker, ISIN is None (unless we fetch it).
-        If input is ISIN, Ticker is resolved (if possible).
+        If input is Ticker, ISIN is None unless the mapping file lists it.
+        If input is ISIN, Ticker is resolved (if possible), else None so the UI asks for it.
+        A company name found in the mapping file resolves to its ticker and ISIN.
+        Raises ValueError for an ISIN with a wrong check digit.
         """
+        return self._resolve(identifier, self.index)
+
+    def resolve_many(self, identifiers: Iterable[str]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """resolve() for many identifiers, in order. Invalid ISINs give (None, None) instead of raising."""
+        index = self.index
+        results = []
+        for identifier in identifiers:
+            try:
+                results.append(self._resolve(identifier, index))
+            except ValueError:
+                results.append((None, None))
+        return results
+
+    def _resolve(self, identifier: str, index: Optional[IdentifierIndex]) -> Tuple[Optional[str], Optional[str]]:
         identifier = identifier.strip().upper()
 
-        if self.is_isin(identifier):
-            # It's an ISIN.
-            # Try to resolve to Ticker.
-            # Placeholder for future implementation (e.g. OpenFIGI API).
-            # For now, we return (None, identifier) so the UI knows to ask for Ticker.
+        if index is not None:
+            # Known identifiers are valid by construction, no checksum needed
+            ticker = index.ticker_by_isin.get(identifier)
+            if ticker is not None:
+                return ticker, identifier
+            if identifier in index.isin_by_ticker:
+                return identifier, index.isin_by_ticker[identifier]
+
+        if ISIN_PATTERN.match(identifier):
+            if not isin_checksum_ok(identifier):
+                raise ValueError(f"'{identifier}' looks like an ISIN but its check digit is wrong")
+            # Not in the mapping file, the UI asks for the ticker
             return None, identifier
-        else:
-            # Assume it's a Ticker.
-            return identifier, None
+
+        if index is not None:
+            match = index.lookup_name(identifier)
+            if match is not None:
+                return match
+        # Assume it's a Ticker.
+        return identifier, None
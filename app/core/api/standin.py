@@ -0,0 +1,529 @@
+"""
+Local stand-in for the Alpha Vantage, Polygon and Finnhub REST APIs.
+
+Replays recorded responses with configurable latency, injected 429/5xx
+errors and the providers' per-minute quotas, so refreshes can be tested and
+load-tested offline:
+
+    python -m app.core.api.standin record --provider polygon --tickers AAPL,MSFT
+    python -m app.core.api.standin serve --port 8765 --latency-ms 80 --error-rate 0.02
+
+serve prints the "base_urls" config section that points the sources at it.
+
+    python -m app.core.api.standin stream --port 8766 --rate 500
+
+stands in for Finnhub's trade websocket (see app.core.streaming): clients
+subscribe to symbols and get a random walk of trades for them, about
+--rate trades per second in total.
+
+Recordings are JSON lines, one file per provider ({provider}.jsonl in the
+recordings directory), API keys stripped. A request is answered with the
+recording for the same path and parameters; dates in the path and the
+from/to parameters are ignored, so a recorded price history answers any
+date range. Without a recording for the requested symbol, one for another
+symbol of the same endpoint is replayed with the symbol swapped, so a few
+recorded tickers can stand in for a whole watchlist.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+sys.path.append(os.getcwd())
+
+import requests
+
+# Path prefix per provider on the stand-in, and what it replaces in the real base URL
+PROVIDER_PREFIXES = {
+    "alpha_vantage": "/alpha_vantage/query",
+    "polygon": "/polygon",
+    "finnhub": "/finnhub/api/v1",
+}
+SECRET_PARAMS = {"apikey", "apiKey", "token"}
+# Parameters that change on every call (Finnhub candle time range)
+VOLATILE_PARAMS = {"from", "to"}
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_PATH_SYMBOL = re.compile(r"/tickers?/([^/]+)")
+
+def _symbol(path: str, params: Dict[str, str]) -> Optional[str]:
+    if params.get("symbol"):
+        return params["symbol"]
+    if params.get("ticker"):
+        return params["ticker"]
+    match = _PATH_SYMBOL.search(path)
+    return match.group(1) if match else None
+
+def request_key(path: str, params: Dict[str, str], generic: bool = False) -> str:
+    """Lookup key for a request. generic replaces the symbol with a placeholder."""
+    params = {k: v for k, v in params.items() if k not in SECRET_PARAMS and k not in VOLATILE_PARAMS}
+    path = _DATE.sub("{date}", path)
+    symbol = _symbol(path, params)
+    if generic and symbol:
+        path = "/".join("{symbol}" if part == symbol else part for part in path.split("/"))
+        params = {k: "{symbol}" if v == symbol else v for k, v in params.items()}
+    return path + "?" + urlencode(sorted(params.items()))
+
+class Recordings:
+    """Recorded responses per provider, indexed by exact and symbol-generic request key."""
+    def __init__(self):
+        self._exact: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._generic: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    @classmethod
+    def load(cls, directory: str) -> "Recordings":
+        recordings = cls()
+        for provider in PROVIDER_PREFIXES:
+            path = os.path.join(directory, f"{provider}.jsonl")
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        recordings.add(json.loads(line))
+        return recordings
+
+    def add(self, entry: Dict[str, Any]):
+        """entry: {"provider", "path", "params", "status", "body"}. Later entries replace earlier ones."""
+        provider, path, params = entry["provider"], entry["path"], entry.get("params", {})
+        entry = dict(entry, symbol=_symbol(path, params))
+        self._exact[(provider, request_key(path, params))] = entry
+        self._generic[(provider, request_key(path, params, generic=True))] = entry
+
+    def find(self, provider: str, path: str, params: Dict[str, str]) -> Optional[Tuple[int, str]]:
+        """(status, body) to answer the request with, or None if nothing matches."""
+        entry = self._exact.get((provider, request_key(path, params)))
+        if entry is not None:
+            return entry.get("status", 200), entry["body"]
+        entry = self._generic.get((provider, request_key(path, params, generic=True)))
+        if entry is None:
+            return None
+        body = entry["body"]
+        requested = _symbol(path, params)
+        if entry["symbol"] and requested and requested != entry["symbol"]:
+            body = body.replace(f'"{entry["symbol"]}"', f'"{requested}"')
+        return entry.get("status", 200), body
+
+def write_recording(directory: str, provider: str, path: str, params: Dict[str, Any], body: Any,
+                    status: int = 200):
+    """Appends a response to the provider's recordings. body is JSON text, or an object to serialize."""
+    if provider not in PROVIDER_PREFIXES:
+        raise ValueError(f"No stand-in for provider '{provider}'. Options: {', '.join(PROVIDER_PREFIXES)}")
+    os.makedirs(directory, exist_ok=True)
+    params = {k: str(v) for k, v in (params or {}).items() if k not in SECRET_PARAMS}
+    entry = {"provider": provider, "path": path, "params": params, "status": status,
+             "body": body if isinstance(body, str) else json.dumps(body)}
+    with open(os.path.join(directory, f"{provider}.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+class Behavior:
+    """
+    How a provider behaves on the stand-in.
+    Latency is lognormal around median_ms (sigma is the log standard deviation),
+    with outlier_rate of the calls taking outlier_ms instead. error_rate of the
+    calls fail with one of error_statuses (429 comes with Retry-After). Beyond
+    per_minute calls in any 60 seconds, calls are rejected like the provider
+    does it: Alpha Vantage answers 200 with a "Note", the others 429.
+    """
+    def __init__(self, median_ms: float = 50.0, sigma: float = 0.4, outlier_rate: float = 0.0,
+                 outlier_ms: float = 1000.0, error_rate: float = 0.0,
+                 error_statuses: Iterable[int] = (500, 502, 503), per_minute: Optional[int] = None,
+                 retry_after: float = 1.0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.outlier_rate = outlier_rate
+        self.outlier_ms = outlier_ms
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.per_minute = per_minute
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "Behavior":
+        return cls(**settings)
+
+class StandInServer:
+    """
+    The stand-in HTTP server, on a background thread:
+
+        with StandInServer(Recordings.load("data/recordings")) as server:
+            source = PolygonSource("key", base_url=server.base_urls()["polygon"])
+    """
+    def __init__(self, recordings: Recordings, behaviors: Optional[Dict[str, Behavior]] = None,
+                 default: Optional[Behavior] = None, host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.recordings = recordings
+        self.behaviors = behaviors or {}
+        self.default = default or Behavior()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Deque[float]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._clock = time.monotonic
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_urls(self) -> Dict[str, str]:
+        """The "base_urls" config section for this server."""
+        return {provider: self.url + prefix for provider, prefix in PROVIDER_PREFIXES.items()}
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="standin-http", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Responses per provider: "requests" and a count per status ("200", "429", "503", ..., "missing")."""
+        with self._lock:
+            return {provider: dict(counts) for provider, counts in self._stats.items()}
+
+    def behavior(self, provider: str) -> Behavior:
+        return self.behaviors.get(provider, self.default)
+
+    def handle(self, provider: str, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, str], str]:
+        """Decides the response: (status, headers, body). Sleeps for the simulated latency."""
+        behavior = self.behavior(provider)
+        now = self._clock()
+        with self._lock:
+            counts = self._stats.setdefault(provider, {"requests": 0})
+            counts["requests"] += 1
+            over_quota = False
+            if behavior.per_minute is not None:
+                window = self._windows.setdefault(provider, deque())
+                while window and window[0] <= now - 60:
+                    window.popleft()
+                if len(window) >= behavior.per_minute:
+                    over_quota = True
+                    retry_after = max(1, int(window[0] + 60 - now) + 1)
+                else:
+                    window.append(now)
+            error = None if over_quota or self._rng.random() >= behavior.error_rate else \
+                self._rng.choice(behavior.error_statuses)
+            if self._rng.random() < behavior.outlier_rate:
+                latency = behavior.outlier_ms / 1000
+            else:
+                latency = behavior.median_ms / 1000 * self._rng.lognormvariate(0, behavior.sigma)
+
+        if over_quota:
+            return self._count(provider, *_quota_response(provider, retry_after))
+        if error == 429:
+            return self._count(provider, 429, {"Retry-After": str(int(behavior.retry_after))},
+                               json.dumps({"error": "Too many requests (injected)"}))
+        time.sleep(latency)
+        if error is not None:
+            return self._count(provider, error, {}, json.dumps({"error": f"HTTP {error} (injected)"}))
+
+        found = self.recordings.find(provider, path, params)
+        if found is None:
+            self._count_status(provider, "missing")
+            return _missing_response(provider, path)
+        status, body = found
+        return self._count(provider, status, {}, body)
+
+    def _count(self, provider: str, status: int, headers: Dict[str, str], body: str) -> Tuple[int, Dict[str, str], str]:
+        self._count_status(provider, str(status))
+        return status, headers, body
+
+    def _count_status(self, provider: str, status: str):
+        with self._lock:
+            counts = self._stats.setdefault(provider, {"requests": 0})
+            counts[status] = counts.get(status, 0) + 1
+
+def _quota_response(provider: str, retry_after: int) -> Tuple[int, Dict[str, str], str]:
+    if provider == "alpha_vantage":
+        return 200, {}, json.dumps({"Note": "Thank you for using Alpha Vantage! Our standard API call frequency "
+                                            "is 5 calls per minute and 25 calls per day."})
+    return 429, {"Retry-After": str(retry_after)}, json.dumps({"error": "You've exceeded the maximum requests per minute"})
+
+def _missing_response(provider: str, path: str) -> Tuple[int, Dict[str, str], str]:
+    if provider == "alpha_vantage":
+        return 200, {}, json.dumps({"Error Message": "Invalid API call (no recording on the stand-in)"})
+    return 404, {}, json.dumps({"error": f"No recording for {path}"})
+
+def _make_handler(server: StandInServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes, don't let Nagle delay the body
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            params = dict(parse_qsl(parts.query))
+            for provider, prefix in PROVIDER_PREFIXES.items():
+                if parts.path == prefix or parts.path.startswith(prefix + "/"):
+                    status, headers, body = server.handle(provider, parts.path[len(prefix):], params)
+                    break
+            else:
+                status, headers, body = 404, {}, json.dumps({"error": f"Unknown provider path {parts.path}"})
+            data = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+class TradeStreamStandIn:
+    """
+    Local stand-in for Finnhub's trade websocket, on background threads:
+
+        with TradeStreamStandIn(rate=1000) as server:
+            stream = QuoteStream("key", url=server.url).start()
+
+    Clients (un)subscribe like on Finnhub. publish() sends trades to the
+    clients subscribed to their symbols. With a rate, trades for the
+    subscribed symbols are generated too: a random walk from 100, about
+    `rate` trades per second in messages of `batch` trades.
+    drop_connections() closes every connection, to test reconnects.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rate: float = 0.0, batch: int = 10,
+                 seed: int = 0):
+        from websockets.sync.server import serve
+
+        self.rate = rate
+        self.batch = batch
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._clients: Dict[Any, set] = {}
+        self._prices: Dict[str, float] = {}
+        self._stats = {"connections": 0, "messages": 0, "trades": 0}
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.server = serve(self._handle, host, port, compression=None)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.socket.getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    def start(self) -> "TradeStreamStandIn":
+        self._threads = [threading.Thread(target=self.server.serve_forever, name="standin-ws", daemon=True)]
+        if self.rate:
+            self._threads.append(threading.Thread(target=self._generate, name="standin-ws-trades", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self.server.shutdown()
+        for thread in self._threads:
+            thread.join(5)
+
+    def __enter__(self) -> "TradeStreamStandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Connections so far, messages and trades sent."""
+        with self._lock:
+            return dict(self._stats)
+
+    def subscriptions(self) -> set:
+        """Symbols some connected client is subscribed to."""
+        with self._lock:
+            return set().union(*self._clients.values())
+
+    def publish(self, trades: List[Dict[str, Any]]) -> int:
+        """
+        Sends trades ({"s": symbol, "p": price, "t": ms, "v": volume}) in one message
+        to every client subscribed to at least one of their symbols, each only
+        getting its symbols. Returns the number of clients reached.
+        """
+        with self._lock:
+            clients = [(c, [t for t in trades if t["s"] in symbols]) for c, symbols in self._clients.items()]
+        sent = 0
+        for connection, selected in clients:
+            if not selected:
+                continue
+            try:
+                connection.send(json.dumps({"type": "trade", "data": selected}))
+            except Exception:
+                continue  # closed meanwhile, _handle() forgets it
+            sent += 1
+            with self._lock:
+                self._stats["messages"] += 1
+                self._stats["trades"] += len(selected)
+        return sent
+
+    def drop_connections(self):
+        with self._lock:
+            connections = list(self._clients)
+        for connection in connections:
+            connection.close()
+
+    def _handle(self, connection):
+        with self._lock:
+            self._clients[connection] = set()
+            self._stats["connections"] += 1
+        try:
+            for message in connection:
+                try:
+                    request = json.loads(message)
+                    kind, symbol = request["type"], str(request["symbol"]).upper()
+                except (ValueError, KeyError, TypeError):
+                    connection.send(json.dumps({"type": "error", "msg": "Invalid message"}))
+                    continue
+                with self._lock:
+                    if kind == "subscribe":
+                        self._clients[connection].add(symbol)
+                    elif kind == "unsubscribe":
+                        self._clients[connection].discard(symbol)
+        except Exception:
+            pass  # the client went away
+        finally:
+            with self._lock:
+                self._clients.pop(connection, None)
+
+    def _generate(self):
+        interval = self.batch / self.rate
+        next_at = time.monotonic()
+        while not self._stopping.is_set():
+            symbols = sorted(self.subscriptions())
+            if symbols:
+                now_ms = int(time.time() * 1000)
+                trades = []
+                for _ in range(self.batch):
+                    symbol = self._rng.choice(symbols)
+                    price = self._prices.get(symbol, 100.0) * (1 + self._rng.gauss(0, 0.0005))
+                    self._prices[symbol] = price
+                    trades.append({"s": symbol, "p": round(price, 4), "t": now_ms, "v": self._rng.randint(1, 500)})
+                self.publish(trades)
+            next_at += interval
+            self._stopping.wait(max(0.0, next_at - time.monotonic()))
+
+def record(provider: str, tickers: List[str], api_key: str, directory: str, period: str = "10y"):
+    """Calls the real API for each ticker (info, price history, financials) and saves the responses."""
+    from app.core.api.http import HttpClient
+    from app.core.api.registry import create_provider
+
+    source = create_provider(provider, api_key)
+    base = source.base_url
+
+    class RecordingHttp(HttpClient):
+        def get(self, url, params=None, before_request=None):
+            response = super().get(url, params=params, before_request=before_request)
+            if response.status_code < 400 and url.startswith(base):
+                write_recording(directory, provider, url[len(base):], params or {}, response.text,
+                                response.status_code)
+            return response
+
+    source.http = RecordingHttp()
+    for ticker in tickers:
+        for call in (lambda: source.get_ticker_info(ticker), lambda: source.get_price_history(ticker, period=period),
+                     lambda: source.get_financials(ticker)):
+            try:
+                call()
+            except (ValueError, requests.RequestException) as e:
+                print(f"Warning: {provider} {ticker}: {e}")
+    print(f"Recorded {provider} responses for {len(tickers)} ticker(s) in {directory}")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Serve the recordings")
+    serve.add_argument("--recordings", default="data/recordings")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency-ms", type=float, default=50.0, help="Median latency")
+    serve.add_argument("--sigma", type=float, default=0.4, help="Latency spread (lognormal sigma)")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="Share of calls failing with a 5xx")
+    serve.add_argument("--quotas", action="store_true", help="Enforce the free-tier per-minute quotas")
+    serve.add_argument("--behaviors", help='JSON file: {"polygon": {"median_ms": 120, "per_minute": 5}, ...}')
+
+    stream = commands.add_parser("stream", help="Stand in for Finnhub's trade websocket")
+    stream.add_argument("--host", default="127.0.0.1")
+    stream.add_argument("--port", type=int, default=8766)
+    stream.add_argument("--rate", type=float, default=100.0, help="Trades per second over all symbols")
+    stream.add_argument("--batch", type=int, default=10, help="Trades per message")
+
+    rec = commands.add_parser("record", help="Record responses from the real API")
+    rec.add_argument("--provider", required=True, choices=list(PROVIDER_PREFIXES))
+    rec.add_argument("--tickers", required=True, help="Comma separated")
+    rec.add_argument("--recordings", default="data/recordings")
+    rec.add_argument("--period", default="10y")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        from app.core.config_manager import ConfigManager
+        key = ConfigManager().get("api_keys", {}).get(args.provider)
+        if not key:
+            parser.error(f"No API key for {args.provider} in the config")
+        record(args.provider, [t.strip().upper() for t in args.tickers.split(",") if t.strip()], key,
+               args.recordings, args.period)
+        return
+    if args.command == "stream":
+        trades = TradeStreamStandIn(args.host, args.port, rate=args.rate, batch=args.batch).start()
+        print(f"Streaming about {args.rate:g} trades/s on {trades.url}")
+        print(json.dumps({"streaming": {"enabled": True, "url": trades.url}}, indent=4))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            trades.stop()
+        return
+
+    from app.core.api.rate_limit import DEFAULT_LIMITS
+    default = dict(median_ms=args.latency_ms, sigma=args.sigma, error_rate=args.error_rate)
+    behaviors = {}
+    for provider in PROVIDER_PREFIXES:
+        settings = dict(default)
+        if args.quotas:
+            settings["per_minute"] = DEFAULT_LIMITS[provider]["per_minute"]
+        behaviors[provider] = settings
+    if args.behaviors:
+        with open(args.behaviors) as f:
+            for provider, settings in json.load(f).items():
+                behaviors.setdefault(provider, dict(default)).update(settings)
+
+    recordings = Recordings.load(args.recordings)
+    server = StandInServer(recordings, {p: Behavior.from_settings(s) for p, s in behaviors.items()},
+                           host=args.host, port=args.port)
+    print(f"Serving {len(recordings)} recording(s) from {args.recordings} on {server.url}")
+    print(json.dumps({"base_urls": server.base_urls()}, indent=4))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
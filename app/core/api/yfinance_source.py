@@ -1,7 +1,8 @@
 import yfinance as yf
 import pandas as pd
-from typing import Dict, Any
-from .base import StockDataSource
+from datetime import date
+from typing import Dict, Any, List, Optional, Union
+from .base import DataNotFound, StockDataSource
 
 class YFinanceSource(StockDataSource):
     def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
@@ -9,7 +10,7 @@ class YFinanceSource(StockDataSource):
         # yfinance info can be slow or flaky, but it's what we have.
         info = t.info
         if not info:
-             raise ValueError(f"Could not fetch info for ticker {ticker}")
+             raise DataNotFound(f"Could not fetch info for ticker {ticker}")
 
         # Extract relevant fields to keep it clean, or return all
         return {
@@ -24,13 +25,43 @@ class YFinanceSource(StockDataSource):
             "full_info": info
         }
 
-    def get_price_history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
         t = yf.Ticker(ticker)
+        if start is not None:
+            # Incremental fetch: an empty result just means nothing new
+            return t.history(start=pd.Timestamp(start).strftime("%Y-%m-%d"))
         df = t.history(period=period)
         if df.empty:
-            raise ValueError(f"No price data found for {ticker}")
+            raise DataNotFound(f"No price data found for {ticker}")
         return df
 
+    def get_price_history_batch(self, tickers: List[str], period: str = "1y", start: Optional[date] = None,
+                                max_workers: int = 4) -> Dict[str, Union[pd.DataFrame, Exception]]:
+        # yf.download fetches all symbols in one go (threaded internally)
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        kwargs = {"start": pd.Timestamp(start).strftime("%Y-%m-%d")} if start is not None else {"period": period}
+        try:
+            data = yf.download(tickers, group_by="ticker", actions=True, auto_adjust=True, threads=max_workers > 1,
+                               progress=False, multi_level_index=True, **kwargs)
+        except Exception as e:
+            return {t: e for t in tickers}
+
+        results: Dict[str, Union[pd.DataFrame, Exception]] = {}
+        for ticker in tickers:
+            if data is None or ticker not in data.columns.get_level_values(0):
+                df = pd.DataFrame()
+            else:
+                # Symbols are aligned on a shared calendar, drop the dates this one didn't trade
+                df = data[ticker].dropna(subset=["Close"])
+                df.columns.name = None
+            if df.empty and start is None:
+                results[ticker] = ValueError(f"No price data found for {ticker}")
+            else:
+                results[ticker] = df
+        return results
+
     def get_financials(self, ticker: str) -> Dict[str, Any]:
         t = yf.Ticker(ticker)
         # financials, balance_sheet, cashflow are dataframes
@@ -0,0 +1,172 @@
+import json
+import os
+import zipfile
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# info["full_info"] (the provider's raw profile payload) is stored as its own
+# section, so pages that only show the profile don't decode it
+RAW_INFO_SECTION = "full_info"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            # orjson writes NaN as null, which readers already treat as a missing value
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Written by the json fallback, which keeps NaN as a bare token
+            pass
+    return json.loads(raw)
+
+class CompanyStore:
+    """
+    Fundamental company data, one {ticker}_data.zip per ticker.
+
+    Every top-level key of the saved dict ("info", "income_statement",
+    "balance_sheet", "financials_reported", ...) is a separately compressed
+    member, so load(ticker, sections=[...]) only inflates and decodes what
+    the caller asked for. info["full_info"] is split off into a "full_info"
+    section, and a key holding the same payload as an earlier one (Polygon
+    stores its results under two names) is written once and referenced from
+    the manifest.
+
+    Files written before this format ({ticker}_data.json) are still read,
+    and are converted on first load.
+    """
+    COMPRESSION = zipfile.ZIP_DEFLATED
+    COMPRESS_LEVEL = 6
+
+    def __init__(self, storage_path: str):
+        self.storage_path = storage_path
+
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.storage_path, f"{ticker}_data.zip")
+
+    def legacy_path(self, ticker: str) -> str:
+        return os.path.join(self.storage_path, f"{ticker}_data.json")
+
+    def exists(self, ticker: str) -> bool:
+        return os.path.exists(self.path(ticker)) or os.path.exists(self.legacy_path(ticker))
+
+    def version(self, ticker: str) -> Optional[tuple]:
+        """Changes whenever the ticker's file is rewritten, None if there is no data."""
+        for path in (self.path(ticker), self.legacy_path(ticker)):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            return (path, stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def save(self, ticker: str, data: Dict[str, Any]):
+        sections = self._split_info(data)
+        members: Dict[str, str] = {}
+        written: Dict[bytes, str] = {}
+        path = self.path(ticker)
+        tmp_path = f"{path}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", compression=self.COMPRESSION, compresslevel=self.COMPRESS_LEVEL) as zf:
+            for name, value in sections.items():
+                raw = _dumps(value)
+                if raw in written:
+                    members[name] = written[raw]
+                    continue
+                member = f"{len(written)}.json"
+                zf.writestr(member, raw)
+                written[raw] = member
+                members[name] = member
+            zf.writestr(MANIFEST, _dumps({"format": FORMAT_VERSION, "sections": members}))
+        # Readers (other sessions, the refresh scheduler) never see a half written file
+        os.replace(tmp_path, path)
+        if os.path.exists(self.legacy_path(ticker)):
+            os.remove(self.legacy_path(ticker))
+
+    def sections(self, ticker: str) -> List[str]:
+        """Names of the sections stored for the ticker."""
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            data = self._load_legacy(ticker)
+            return list(self._split_info(data)) if data is not None else []
+        with zipfile.ZipFile(path) as zf:
+            return list(_loads(zf.read(MANIFEST))["sections"])
+
+    def load(self, ticker: str, sections: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        The saved dict, or only the given sections of it. "full_info" is put
+        back into "info" when both are loaded. None if nothing is stored.
+        """
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            data = self._load_legacy(ticker)
+            if data is None:
+                return None
+            self.save(ticker, data)
+            if sections is None:
+                return data
+            return self._join_info({k: v for k, v in self._split_info(data).items() if k in set(sections)})
+
+        loaded: Dict[str, Any] = {}
+        with zipfile.ZipFile(path) as zf:
+            members = _loads(zf.read(MANIFEST))["sections"]
+            wanted = list(members) if sections is None else [s for s in sections if s in members]
+            decoded: Dict[str, Any] = {}
+            for name in wanted:
+                member = members[name]
+                if member not in decoded:
+                    decoded[member] = _loads(zf.read(member))
+                    loaded[name] = decoded[member]
+                else:
+                    # Shared payload: decode again so callers don't get aliased objects
+                    loaded[name] = _loads(zf.read(member))
+        return self._join_info(loaded)
+
+    def raw_size(self, ticker: str, sections: Optional[Iterable[str]] = None) -> int:
+        """Uncompressed JSON size in bytes of the given sections (all by default)."""
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return os.path.getsize(self.legacy_path(ticker)) if os.path.exists(self.legacy_path(ticker)) else 0
+        with zipfile.ZipFile(path) as zf:
+            members = _loads(zf.read(MANIFEST))["sections"]
+            wanted = members if sections is None else [s for s in sections if s in members]
+            return sum(zf.getinfo(members[name]).file_size for name in wanted)
+
+    def delete(self, ticker: str):
+        for path in (self.path(ticker), self.legacy_path(ticker)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load_legacy(self, ticker: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.legacy_path(ticker), "rb") as f:
+                return _loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _split_info(data: Dict[str, Any]) -> Dict[str, Any]:
+        info = data.get("info")
+        if not isinstance(info, dict) or RAW_INFO_SECTION not in info:
+            return data
+        split = dict(data)
+        split["info"] = {k: v for k, v in info.items() if k != RAW_INFO_SECTION}
+        split[RAW_INFO_SECTION] = info[RAW_INFO_SECTION]
+        return split
+
+    @staticmethod
+    def _join_info(data: Dict[str, Any]) -> Dict[str, Any]:
+        if RAW_INFO_SECTION in data and isinstance(data.get("info"), dict):
+            data["info"][RAW_INFO_SECTION] = data.pop(RAW_INFO_SECTION)
+        return data
@@ -23,7 +23,8 @@ class ConfigManager:
                 "api_source": "yfinance",
                 "api_keys": {},
                 "storage_path": "data/companies",
-                "db_path": "data/stocks.db"
+                "db_path": "data/stocks.db",
+                "price_storage": "parquet"
             }
 
     def get(self, key: str, default: Any = None) -> Any:
@@ -49,3 +50,12 @@ class ConfigManager:
     @property
     def db_path(self) -> str:
         return self.get("db_path", "data/stocks.db")
+
+    @property
+    def price_storage(self) -> str:
+        return self.get("price_storage", "parquet")
+
+    @property
+    def isin_mapping_path(self) -> str:
+        """ISIN/ticker mapping CSV used to resolve identifiers offline, by default next to the database."""
+        return self.get("isin_mapping_path", os.path.join(os.path.dirname(self.db_path), "isin_mapping.csv"))
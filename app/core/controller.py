@@ -1,42 +1,228 @@
-from typing import Optional, Tuple, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import Optional, Tuple, Dict, Any, List, Iterator, Callable
+import pandas as pd
+from app.core import metrics
+from app.core.analytics import (TRADING_DAYS, close_panel, correlation_matrix, daily_returns,
+                                normalized_performance, rolling_beta, rolling_correlation, watchlist_metrics)
+from app.core.downsample import CHART_POINTS, downsample
+from app.core.indicators import IndicatorEngine
+from app.core.panel import PanelCache
+from app.core.portfolio import PortfolioEngine, Valuation, book_trades
 from app.core.storage_manager import StorageManager
-from app.core.api.factory import get_stock_data_source
+from app.core.streaming import QuoteStream
+from app.core.api.factory import build_data_source, get_response_cache_for
+from app.core.api.http import get_http_client
+from app.core.api.rate_limit import get_rate_limiter
 from app.core.api.resolver import DataResolver
 from app.core.config_manager import ConfigManager
 
 class StockAppController:
-    def __init__(self):
+    def __init__(self, storage: Optional[StorageManager] = None, api=None):
         self.config = ConfigManager()
-        self.storage = StorageManager()
-        self.resolver = DataResolver()
-        self.api = get_stock_data_source(self.config)
+        self.storage = storage or StorageManager()
+        self.resolver = DataResolver(self.config.isin_mapping_path)
+        self.api = api or build_data_source(self.config)
+        self.indicators = IndicatorEngine(self.storage)
+        self.portfolio = PortfolioEngine(self.storage)
+        self.panels = PanelCache(self.storage)
+        # Watchlist summary cache: per-ticker (price version, closes) and the last computed metrics
+        self._summary_lock = threading.Lock()
+        self._closes: Dict[str, Tuple[Optional[int], Optional[pd.Series]]] = {}
+        self._summary: Optional[Tuple[Tuple, pd.DataFrame]] = None
+        # Live quotes, connected on first use (see get_quote_stream)
+        self._stream_lock = threading.Lock()
+        self.stream: Optional[QuoteStream] = None
+        self._register_metrics()
+
+    def _register_metrics(self):
+        """Reports the caches, HTTP client and rate limiter counters through app.core.metrics when exported."""
+        metrics.configure(self.config.get("metrics", {}))
+        metrics.register_collector("memo", lambda: metrics.stats_samples("stockhelper_memo", self.storage.memo.stats()))
+        metrics.register_collector("indicator_memo", lambda: metrics.stats_samples(
+            "stockhelper_indicator_memo", self.indicators.memo.stats()))
+        metrics.register_collector("response_cache", self._response_cache_samples)
+        metrics.register_collector("http", lambda: metrics.stats_samples(
+            "stockhelper_http", get_http_client().stats(), counters=("requests", "retries", "failures")))
+        metrics.register_collector("rate_limit", _rate_limit_samples)
+        metrics.register_collector("circuit_breakers", self._breaker_samples)
+        metrics.register_collector("stream", lambda: metrics.stats_samples(
+            "stockhelper_stream", self.stream.stats(),
+            counters=("connects", "disconnects", "messages", "ticks", "errors", "late")) if self.stream else [])
+
+    def _response_cache_samples(self) -> List[metrics.Sample]:
+        if not self.config.get("cache", {}).get("enabled", True):
+            return []
+        return metrics.stats_samples("stockhelper_response_cache", get_response_cache_for(self.config).stats())
+
+    def _breaker_samples(self) -> List[metrics.Sample]:
+        if not hasattr(self.api, "provider_stats"):
+            return []
+        return [("stockhelper_circuit_open", "gauge", {"provider": name}, float(s["state"] != "closed"))
+                for name, s in self.api.stats().items()]
 
     def reload_api_source(self):
         """Re-initializes the API source based on current config."""
-        self.api = get_stock_data_source(self.config)
+        self.api = build_data_source(self.config)
+
+    def get_quote_stream(self, tickers: Optional[List[str]] = None) -> Optional[QuoteStream]:
+        """
+        The live trade stream (see app.core.streaming), connected on first use and
+        subscribed to the tickers. None unless "streaming": {"enabled": true} is set
+        and there is a Finnhub key; "url" points it elsewhere, e.g. at the stand-in,
+        which needs no key.
+        """
+        settings = self.config.get("streaming", {})
+        if not settings.get("enabled"):
+            return None
+        with self._stream_lock:
+            if self.stream is None:
+                key = self.config.get("api_keys", {}).get("finnhub")
+                if not key and not settings.get("url"):
+                    return None
+                self.stream = QuoteStream(key or "", url=settings.get("url"),
+                                          tick_buffer=int(settings.get("tick_buffer", 1024)),
+                                          bar_buffer=int(settings.get("bar_buffer", 1440))).start()
+            stream = self.stream
+        if tickers:
+            stream.subscribe(tickers)
+        return stream
+
+    def reset_quote_stream(self):
+        """Disconnects the live trade stream, the next get_quote_stream() uses the current config."""
+        with self._stream_lock:
+            stream, self.stream = self.stream, None
+        if stream is not None:
+            stream.stop()
 
     def get_all_stocks(self):
         return self.storage.get_stocks()
 
-    def get_stock_detail(self, ticker: str):
+    def get_stock_detail(self, ticker: str, sections: Optional[List[str]] = None, prices: bool = True):
+        """
+        sections restricts which parts of the company data are loaded (all by default).
+        With prices=False the price history isn't loaded ("prices" is None), e.g. when
+        the chart reads its window through get_price_chart().
+        """
         stock_meta = self.storage.get_stock(ticker)
         if not stock_meta:
             return None
 
-        company_data = self.storage.load_company_data(ticker)
-        prices = self.storage.load_price_data(ticker)
+        company_data = self.storage.load_company_data(ticker, sections)
+        prices = self.storage.load_price_data(ticker) if prices else None
         return {
             "meta": stock_meta,
             "company_data": company_data,
             "prices": prices
         }
 
+    def get_indicators(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Technical indicators for the ticker's stored prices (see app.core.indicators)."""
+        return self.indicators.get(ticker)
+
+    def get_price_chart(self, ticker: str, start=None, end=None, indicators: Optional[List[str]] = None,
+                        points: int = CHART_POINTS) -> Optional[Dict[str, Any]]:
+        """
+        Closes (plus the given indicator columns) between start and end, downsampled
+        to at most `points` rows (see app.core.downsample). Only that window of the
+        history is read. Returns the frame as "data" along with the number of bars
+        in the window ("bars"), or None if there are none.
+        """
+        prices = self.storage.load_price_data(ticker, start=start, end=end, columns=["Close"])
+        if prices is None or prices.empty or "Close" not in prices:
+            return None
+        chart = prices[["Close"]]
+        if indicators:
+            # Computed over the whole history so the window starts warmed up, and cached
+            values = self.indicators.get(ticker)
+            if values is not None:
+                chart = chart.join(values[indicators].reindex(chart.index))
+        return {"data": downsample(chart, points, "Close"), "bars": len(chart)}
+
+    def get_watchlist_summary(self, tickers: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Summary metrics (see analytics.watchlist_metrics) for the watchlist, indexed by ticker.
+        The result is reused until some ticker's stored prices change, and then
+        only the changed tickers' closes are read from disk again.
+        """
+        if tickers is None:
+            tickers = [s["ticker"] for s in self.get_all_stocks()]
+        versions = tuple((t, self.storage.get_price_version(t)) for t in tickers)
+
+        with self._summary_lock:
+            if self._summary is not None and self._summary[0] == versions:
+                return self._summary[1]
+
+            closes = {}
+            for ticker, version in versions:
+                cached = self._closes.get(ticker)
+                if cached is None or cached[0] != version or version is None:
+                    cached = (version, _close_column(self.storage.load_price_data(ticker, columns=["Close"])))
+                closes[ticker] = cached
+            self._closes = closes
+
+            summary = watchlist_metrics(close_panel({t: c[1] for t, c in closes.items()})).reindex(tickers)
+            self._summary = (versions, summary)
+            return summary
+
+    def get_close_panel(self, tickers: List[str], start=None, end=None) -> pd.DataFrame:
+        """Closes of the tickers aligned on one calendar, dates x tickers (see app.core.panel)."""
+        return self.panels.get(tickers, start, end)
+
+    def get_comparison(self, tickers: List[str], benchmark: Optional[str] = None, window: int = 60,
+                       start=None) -> Optional[Dict[str, Any]]:
+        """
+        Compares the tickers since start: "performance" (closes rebased to 100),
+        "correlation" of daily returns over the period and "stats" per ticker
+        (return, annualized volatility, and beta and correlation against the
+        benchmark). With a benchmark, also the `window`-day "rolling_beta" and
+        "rolling_correlation" against it. None if there are no prices.
+        """
+        columns = list(dict.fromkeys(list(tickers) + ([benchmark] if benchmark else [])))
+        panel = self.panels.get(columns, start=start)
+        if panel.empty:
+            return None
+        returns = daily_returns(panel)
+        performance = normalized_performance(panel)
+        stats = pd.DataFrame({"return": performance.ffill().iloc[-1] / 100 - 1,
+                              "volatility": returns.std() * TRADING_DAYS ** 0.5}, index=columns)
+        result = {"performance": performance, "correlation": correlation_matrix(returns), "stats": stats}
+        if benchmark:
+            betas = rolling_beta(returns, benchmark)
+            stats["beta"] = betas.iloc[-1]
+            stats["correlation"] = result["correlation"][benchmark]
+            rolling = rolling_correlation(returns, window)[:, :, columns.index(benchmark)]
+            result["rolling_correlation"] = pd.DataFrame(rolling, index=panel.index, columns=columns)
+            result["rolling_beta"] = rolling_beta(returns, benchmark, window)
+        return result
+
+    def get_portfolio(self, portfolio: str = "default") -> Optional[Valuation]:
+        """Holdings, value and P&L history of a portfolio (see app.core.portfolio), None without trades."""
+        return self.portfolio.get(portfolio)
+
+    def add_transaction(self, ticker: str, date, quantity: float, price: float, fees: float = 0.0,
+                        note: Optional[str] = None, portfolio: str = "default") -> int:
+        """
+        Records a trade (negative quantity to sell) and returns its id. Raises
+        ValueError if it would leave a position short at any later date.
+        """
+        trade = {"ticker": ticker.upper(), "date": pd.Timestamp(date).strftime("%Y-%m-%d"),
+                 "quantity": quantity, "price": price, "fees": fees, "note": note}
+        trades = self.storage.get_transactions(portfolio) + [trade]
+        book_trades(sorted(trades, key=lambda t: (t["date"], t.get("id", float("inf")))))
+        return self.storage.add_transactions([trade], portfolio)[0]
+
     def resolve_identifier(self, identifier: str) -> Tuple[Optional[str], Optional[str]]:
         """
         Returns (ticker, isin).
         """
         return self.resolver.resolve(identifier)
 
+    def resolve_identifiers(self, identifiers: List[str]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """(ticker, isin) for each identifier, from the local mapping file only. Invalid ISINs give (None, None)."""
+        return self.resolver.resolve_many(identifiers)
+
     def add_stock(self, ticker: str, isin: Optional[str] = None) -> bool:
         """
         Adds a stock to the inventory and performs an initial data fetch.
@@ -56,22 +242,171 @@ class StockAppController:
 
         # 3. Initial Data Fetch (Fail-safe, don't crash if fetch fails, just warn)
         try:
-            self.update_stock_data(ticker)
+            self.update_stock_data(ticker, info=info)
         except Exception as e:
             print(f"Warning: Initial data fetch failed for {ticker}: {e}")
 
         return True
 
-    def update_stock_data(self, ticker: str):
-        """Fetches fresh data from API and saves to local storage."""
+    def update_stock_data(self, ticker: str, full: bool = False, info: Optional[Dict[str, Any]] = None):
+        """
+        Fetches fresh data from API and saves to local storage.
+        Prices are fetched incrementally from the last stored bar unless full is True.
+        Pass info if get_ticker_info was already called for this ticker.
+        """
+        fin_data, prices, since = self._fetch_stock_data(ticker, full=full, info=info)
+        self._store_stock_data(ticker, fin_data, prices, since)
+
+    def iter_refresh(self, tickers: Optional[List[str]] = None, max_workers: int = 8, full: bool = False,
+                     prices: bool = True, fundamentals: bool = True) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Refreshes many tickers concurrently, yielding (ticker, error) as each one finishes.
+        error is None on success. prices/fundamentals select which parts are refreshed.
+
+        Only the API calls run on the thread pool. Prices are requested through the
+        source's batch endpoint, one batch per distinct start date, so providers
+        with multi-symbol endpoints need far fewer calls. Results are written from
+        the calling thread, so StorageManager never sees concurrent writers.
+        """
+        if tickers is None:
+            tickers = [s["ticker"] for s in self.get_all_stocks()]
+        if not tickers or not (prices or fundamentals):
+            return
+
+        since = {t: None if full or not prices else self.storage.get_last_price_date(t) for t in tickers}
+        # Parts still outstanding per ticker, and what has come back so far
+        pending = {t: {"prices", "fundamentals"} if prices and fundamentals else {"prices" if prices else "fundamentals"}
+                   for t in tickers}
+        fetched: Dict[str, Dict[str, Any]] = {t: {} for t in tickers}
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers))))
+        try:
+            futures = {}
+            if prices:
+                groups: Dict[Optional[date], List[str]] = {}
+                for t in tickers:
+                    groups.setdefault(since[t].date() if since[t] is not None else None, []).append(t)
+                for start, group in groups.items():
+                    futures[executor.submit(self._fetch_price_batch, group, start)] = ("prices", group)
+            if fundamentals:
+                for t in tickers:
+                    futures[executor.submit(self._fetch_fundamentals, t)] = ("fundamentals", [t])
+
+            for future in as_completed(futures):
+                kind, group = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {t: e for t in group}
+                else:
+                    if kind == "fundamentals":
+                        result = {group[0]: result}
+
+                for ticker in group:
+                    fetched[ticker][kind] = result.get(ticker, ValueError(f"No price data returned for {ticker}"))
+                    pending[ticker].discard(kind)
+                    if not pending[ticker]:
+                        yield ticker, self._store_fetched(ticker, fetched.pop(ticker), since[ticker])
+        finally:
+            # If the caller stops iterating early, don't start the remaining fetches
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _store_fetched(self, ticker: str, parts: Dict[str, Any], since: Optional[pd.Timestamp]) -> Optional[str]:
+        """Writes whatever parts were fetched successfully. Returns the first error, if any."""
+        errors = [str(v) for v in parts.values() if isinstance(v, Exception)]
+        try:
+            fin_data = parts.get("fundamentals")
+            prices = parts.get("prices")
+            self._store_stock_data(ticker,
+                                   None if isinstance(fin_data, Exception) else fin_data,
+                                   None if isinstance(prices, Exception) else prices,
+                                   since)
+        except Exception as e:
+            errors.append(str(e))
+        return errors[0] if errors else None
+
+    def refresh_all(self, tickers: Optional[List[str]] = None, max_workers: int = 8, full: bool = False,
+                    prices: bool = True, fundamentals: bool = True,
+                    progress_callback: Optional[Callable[[str, int, int, Optional[str]], None]] = None) -> Dict[str, Optional[str]]:
+        """
+        Refreshes the whole watchlist (or the given tickers) concurrently.
+        progress_callback(ticker, done, total, error) is called after each ticker.
+        Returns a mapping of ticker -> error message (None on success).
+        """
+        if tickers is None:
+            tickers = [s["ticker"] for s in self.get_all_stocks()]
+
+        results = {}
+        total = len(tickers)
+        for ticker, error in self.iter_refresh(tickers, max_workers=max_workers, full=full,
+                                                prices=prices, fundamentals=fundamentals):
+            results[ticker] = error
+            if error:
+                print(f"Warning: Refresh failed for {ticker}: {error}")
+            if progress_callback:
+                progress_callback(ticker, len(results), total, error)
+        return results
+
+    def _fetch_stock_data(self, ticker: str, full: bool = False,
+                          info: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], pd.DataFrame, Optional[pd.Timestamp]]:
+        """
+        Fetches financials, info and prices for a ticker. Does not touch storage.
+        Returns (financials, prices, since) where since is the start date of an
+        incremental price fetch, or None if the full history was requested.
+        """
+        fin_data = self._fetch_fundamentals(ticker, info)
+
+        # Fetch Prices. Re-request the last stored bar too, it may have been
+        # saved before the close and needs to be replaced by the final value.
+        since = None if full else self.storage.get_last_price_date(ticker)
+        if since is not None:
+            prices = self.api.get_price_history(ticker, start=since.date())
+        else:
+            prices = self.api.get_price_history(ticker, period="1y")
+        return fin_data, prices, since
+
+    def _fetch_fundamentals(self, ticker: str, info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         # Fetch financials
         fin_data = self.api.get_financials(ticker)
         # Fetch generic info to merge
-        info = self.api.get_ticker_info(ticker)
+        if info is None:
+            info = self.api.get_ticker_info(ticker)
         fin_data["info"] = info # Store all info in the json
+        return fin_data
+
+    def _fetch_price_batch(self, tickers: List[str], start: Optional[date]) -> Dict[str, Any]:
+        if start is not None:
+            return self.api.get_price_history_batch(tickers, start=start)
+        return self.api.get_price_history_batch(tickers, period="1y")
+
+    def _store_stock_data(self, ticker: str, fin_data: Optional[Dict[str, Any]], prices: Optional[pd.DataFrame],
+                          since: Optional[pd.Timestamp] = None):
+        """Saves the fetched parts. None means that part wasn't refreshed."""
+        if fin_data is not None:
+            self.storage.save_company_data(ticker, fin_data)
+        if prices is None:
+            return
+        if since is not None:
+            self.storage.append_price_data(ticker, prices)
+        else:
+            self.storage.save_price_data(ticker, prices)
+
+        # Extend the cached indicators now, so opening the chart only reads them
+        try:
+            self.indicators.get(ticker)
+        except Exception as e:
+            print(f"Warning: Indicator update failed for {ticker}: {e}")
 
-        self.storage.save_company_data(ticker, fin_data)
+def _rate_limit_samples() -> List[metrics.Sample]:
+    limiter = get_rate_limiter()
+    samples = []
+    for provider, waits in list(limiter.waits.items()):
+        samples.append(("stockhelper_rate_limit_waits_total", "counter", {"provider": provider}, waits))
+        samples.append(("stockhelper_rate_limit_wait_seconds_total", "counter", {"provider": provider},
+                        limiter.wait_seconds.get(provider, 0.0)))
+    return samples
 
-        # Fetch Prices
-        prices = self.api.get_price_history(ticker, period="1y")
-        self.storage.save_price_data(ticker, prices)
+def _close_column(df: Optional[pd.DataFrame]) -> Optional[pd.Series]:
+    if df is None or df.empty or "Close" not in df:
+        return None
+    return df["Close"]
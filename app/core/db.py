@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence, Tuple
+
+# Applied to every new connection. WAL lets readers (Streamlit sessions) run
+# while the background refresher writes; NORMAL sync is safe under WAL and
+# avoids an fsync per transaction.
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY",
+]
+
+# (version, statements). Versions are applied in order and recorded in PRAGMA user_version.
+Migration = Tuple[int, Sequence[str]]
+
+class Database:
+    """
+    Thread-local SQLite connections for one database file.
+
+    Each thread reuses a single connection instead of connecting per query,
+    which keeps SQLite's page cache warm and avoids re-running the pragmas.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Runs the block in one transaction, committed on success and rolled back on error."""
+        conn = self.connection()
+        with conn:
+            yield conn.cursor()
+
+    def execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """Runs a read-only statement."""
+        return self.connection().execute(sql, params)
+
+    def migrate(self, migrations: List[Migration]):
+        """Applies the migrations newer than the database's user_version, each in its own transaction."""
+        conn = self.connection()
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, statements in sorted(migrations, key=lambda m: m[0]):
+            if version <= current:
+                continue
+            with conn:
+                for statement in statements:
+                    conn.execute(statement)
+                # PRAGMA doesn't take parameters, version is an int from our own list
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+            current = version
+
+    def schema_version(self) -> int:
+        return self.connection().execute("PRAGMA user_version").fetchone()[0]
+
+    def close(self):
+        """Closes the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+# Schema history of the app database, see Database.migrate. Only ever append.
+MIGRATIONS: List[Migration] = [
+    (1, [
+        '''
+        CREATE TABLE IF NOT EXISTS stocks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticker TEXT UNIQUE NOT NULL,
+            isin TEXT,
+            name TEXT,
+            sector TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS refresh_jobs (
+            ticker TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            last_run TIMESTAMP,
+            last_success TIMESTAMP,
+            last_error TEXT,
+            next_due TIMESTAMP,
+            PRIMARY KEY (ticker, kind)
+        )
+        ''',
+    ]),
+    (2, [
+        "CREATE INDEX IF NOT EXISTS idx_stocks_isin ON stocks(isin)",
+        "CREATE INDEX IF NOT EXISTS idx_stocks_sector ON stocks(sector)",
+        "CREATE INDEX IF NOT EXISTS idx_refresh_jobs_due ON refresh_jobs(kind, next_due)",
+    ]),
+    (3, [
+        # OHLCV bars of the "sqlite" price store. Dates are the bar's wall-clock
+        # time in the series' timezone as "YYYY-MM-DD HH:MM:SS", so they sort and
+        # work with SQLite's date functions. WITHOUT ROWID clusters rows by
+        # (ticker, date), making per-ticker range scans a single b-tree walk.
+        '''
+        CREATE TABLE IF NOT EXISTS price_bars (
+            ticker TEXT NOT NULL,
+            date TEXT NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            adj_close REAL,
+            volume INTEGER,
+            dividends REAL,
+            splits REAL,
+            PRIMARY KEY (ticker, date)
+        ) WITHOUT ROWID
+        ''',
+        # Cross-sectional lookups ("every ticker's close on a date") are answered from the index alone
+        "CREATE INDEX IF NOT EXISTS idx_price_bars_date ON price_bars(date, ticker, close)",
+        # Columns and timezone each stored series had, so loads return what was saved
+        '''
+        CREATE TABLE IF NOT EXISTS price_series (
+            ticker TEXT PRIMARY KEY,
+            columns TEXT NOT NULL,
+            tz TEXT
+        )
+        ''',
+        # Fundamentals in long format, one row per reported number
+        '''
+        CREATE TABLE IF NOT EXISTS financial_items (
+            ticker TEXT NOT NULL,
+            statement TEXT NOT NULL,
+            period_type TEXT NOT NULL,
+            period_end TEXT NOT NULL,
+            item TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (ticker, statement, item, period_type, period_end)
+        ) WITHOUT ROWID
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_financial_items_item ON financial_items(item, period_type, period_end, ticker, value)",
+    ]),
+    (4, [
+        # Bumped on every write, so caches can tell when a series changed
+        "ALTER TABLE price_series ADD COLUMN version INTEGER NOT NULL DEFAULT 0",
+    ]),
+    (5, [
+        # Portfolio trades: quantity is positive for buys and negative for sells, date is YYYY-MM-DD.
+        # AUTOINCREMENT never reuses ids, so (count, max id) identifies a portfolio's trade set.
+        '''
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            portfolio TEXT NOT NULL DEFAULT 'default',
+            ticker TEXT NOT NULL,
+            date TEXT NOT NULL,
+            quantity REAL NOT NULL,
+            price REAL NOT NULL,
+            fees REAL NOT NULL DEFAULT 0,
+            note TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_transactions_portfolio ON transactions(portfolio, date, id)",
+    ]),
+]
@@ -0,0 +1,88 @@
+"""
+Downsampling of long price histories for charts.
+
+A chart is a few hundred pixels wide, so sending it every bar of a 20-year
+history only makes the payload bigger. lttb() picks a fixed budget of
+points with Largest-Triangle-Three-Buckets, which keeps the peaks and
+troughs that averaging or striding would flatten, and downsample() applies
+the picked rows to a whole frame so overlays stay aligned with the closes.
+"""
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Points sent to a chart, about one per pixel of a wide chart
+CHART_POINTS = 1000
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Positions of the `points` samples of (x, y) that Largest-Triangle-Three-Buckets
+    keeps, in order. The first and last sample are always kept. x must be
+    increasing and y free of NaN; with no more samples than points all are kept.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # The samples between the first and the last split into points - 2 buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    x_means = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / sizes
+    y_means = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / sizes
+    # Each bucket is weighed against the mean of the next one, the last against the final sample
+    x_next = np.append(x_means[1:], x[-1])
+    y_next = np.append(y_means[1:], y[-1])
+
+    # The doubled area of the triangle (pick a, candidate k, next bucket's mean) is
+    # |x_a * p_k + y_a * q_k + r_k|, only the picks have to be made one after another
+    xs, ys = x[1:n - 1], y[1:n - 1]
+    bucket = np.repeat(np.arange(points - 2), sizes)
+    p = ys - y_next[bucket]
+    q = x_next[bucket] - xs
+    r = xs * y_next[bucket] - x_next[bucket] * ys
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    starts = (edges - 1).tolist()
+    a = 0
+    if sizes.max() > 64:
+        for i in range(points - 2):
+            lo, hi = starts[i], starts[i + 1]
+            a = lo + 1 + int(np.argmax(np.abs(x[a] * p[lo:hi] + y[a] * q[lo:hi] + r[lo:hi])))
+            selected[i + 1] = a
+        return selected
+
+    # Buckets of a few samples (e.g. daily bars over decades) are quicker in plain Python
+    p, q, r, x, y = p.tolist(), q.tolist(), r.tolist(), x.tolist(), y.tolist()
+    for i in range(points - 2):
+        xa, ya = x[a], y[a]
+        best = -1.0
+        for k in range(starts[i], starts[i + 1]):
+            area = abs(xa * p[k] + ya * q[k] + r[k])
+            if area > best:
+                a, best = k + 1, area
+        selected[i + 1] = a
+    return selected
+
+def downsample(df: pd.DataFrame, points: int = CHART_POINTS, column: Optional[str] = None) -> pd.DataFrame:
+    """
+    The rows of a date-indexed frame that lttb() picks on `column` (default: the
+    first one), or the frame itself when it has no more than `points` rows.
+    Rows where that column is NaN are dropped first.
+    """
+    if len(df) <= points:
+        return df
+    values = df[column if column is not None else df.columns[0]].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    positions = np.flatnonzero(valid)
+    if len(positions) <= points:
+        return df.iloc[positions]
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        # Nanoseconds from the first date keep float precision
+        x = (index.asi8[positions] - index.asi8[positions[0]]).astype(float)
+    else:
+        x = positions.astype(float)
+    return df.iloc[positions[lttb(x, values[valid], points)]]
@@ -0,0 +1,74 @@
+"""
+Flattens the financial statements returned by the data sources into line items.
+
+Each provider shapes its statements differently; line_items() turns all of
+them into (statement, period_type, period_end, item, value) rows so they can
+be stored in the long-format financial_items table. Item names are kept as
+the provider reports them (e.g. "Total Revenue" from yfinance, "totalRevenue"
+from Alpha Vantage).
+"""
+import math
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LineItem = Tuple[str, str, str, str, float]
+
+STATEMENTS = ("income_statement", "balance_sheet", "cashflow")
+
+# Polygon and Finnhub section names mapped to ours
+POLYGON_SECTIONS = {
+    "income_statement": "income_statement",
+    "balance_sheet": "balance_sheet",
+    "cash_flow_statement": "cashflow",
+}
+FINNHUB_SECTIONS = {"ic": "income_statement", "bs": "balance_sheet", "cf": "cashflow"}
+
+def line_items(fin_data: Dict[str, Any]) -> List[LineItem]:
+    """All numeric line items found in a get_financials() result. Later duplicates win."""
+    items: Dict[Tuple[str, str, str, str], float] = {}
+    for statement, period_type, period_end, item, value in _iter_items(fin_data):
+        number = _to_float(value)
+        if number is not None and period_end and item:
+            items[(statement, period_type, period_end[:10], item)] = number
+    return [key + (value,) for key, value in items.items()]
+
+def _iter_items(fin_data: Dict[str, Any]) -> Iterator[Tuple[str, str, str, str, Any]]:
+    for statement in STATEMENTS:
+        section = fin_data.get(statement)
+        if not isinstance(section, dict):
+            continue
+        if "annualReports" in section or "quarterlyReports" in section:
+            # Alpha Vantage: lists of reports, every field a string
+            for period_type, key in (("annual", "annualReports"), ("quarterly", "quarterlyReports")):
+                for report in section.get(key) or []:
+                    period_end = report.get("fiscalDateEnding")
+                    for item, value in report.items():
+                        if item not in ("fiscalDateEnding", "reportedCurrency"):
+                            yield statement, period_type, period_end, item, value
+        else:
+            # yfinance: {period_end: {item: value}} of annual statements
+            for period_end, column in section.items():
+                if isinstance(column, dict):
+                    for item, value in column.items():
+                        yield statement, "annual", str(period_end), item, value
+
+    # Polygon: list of filings, each with a section per statement of {item: {"value": ...}}
+    for filing in fin_data.get("full_report") or []:
+        period_type = filing.get("timeframe") or "annual"
+        for section, statement in POLYGON_SECTIONS.items():
+            for item, entry in (filing.get("financials", {}).get(section) or {}).items():
+                if isinstance(entry, dict):
+                    yield statement, period_type, filing.get("end_date"), item, entry.get("value")
+
+    # Finnhub: list of reported filings, quarter 0 is the annual report
+    for filing in fin_data.get("financials_reported") or []:
+        period_type = "annual" if not filing.get("quarter") else "quarterly"
+        for section, statement in FINNHUB_SECTIONS.items():
+            for entry in (filing.get("report", {}).get(section) or []):
+                yield statement, period_type, filing.get("endDate"), entry.get("concept"), entry.get("value")
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) or math.isinf(number) else number
@@ -0,0 +1,220 @@
+"""
+Bulk watchlist import from CSV or Excel files.
+
+    rows = read_import_file("positions.csv")
+    rows = WatchlistImporter(ctrl).run(rows)
+
+Identifiers are resolved in one pass through the local mapping file
+(DataResolver.resolve_many), new tickers are validated with batched
+get_ticker_info calls that respect the provider's quotas, the valid ones
+are inserted with a single transaction, and their initial data fetch is
+queued as due refresh jobs, which the background scheduler (or
+start_background_fetch) then works through.
+"""
+import io
+import threading
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
+import pandas as pd
+from app.core.scheduler import RefreshScheduler
+
+# Header names recognised in an import file, compared case-insensitively
+IMPORT_COLUMNS = {
+    "ticker": ["ticker", "symbol", "ticker symbol"],
+    "isin": ["isin"],
+    "identifier": ["identifier", "id", "security id"],
+    "name": ["name", "security name", "company", "company name", "security", "description"],
+}
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+# get_ticker_info calls per ticker during validation
+VALIDATION_CALLS = 1
+
+def read_import_file(file: Union[str, BinaryIO], filename: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Parses a CSV or Excel file into import rows: {"row", "identifier", "ticker", "isin"}.
+    Recognised columns are listed in IMPORT_COLUMNS; a file without any of them
+    is read as a plain list of identifiers, one per line, in the first column.
+    filename is needed to detect Excel files when file is a buffer (e.g. an upload).
+    """
+    filename = filename or (file if isinstance(file, str) else getattr(file, "name", ""))
+    excel = filename.lower().endswith(EXCEL_EXTENSIONS)
+
+    if not excel:
+        if isinstance(file, str):
+            with open(file, encoding="utf-8-sig") as f:
+                text = f.read()
+        else:
+            text = file.read().decode("utf-8-sig")
+        first_line = text.split("\n", 1)[0]
+        sep = max(",;\t|", key=first_line.count)
+
+    def read(header):
+        if excel:
+            if hasattr(file, "seek"):
+                file.seek(0)
+            try:
+                return pd.read_excel(file, dtype=str, header=header)
+            except ImportError as e:
+                raise ValueError(f"Reading Excel files needs openpyxl ({e}). Save the sheet as CSV instead.")
+        return pd.read_csv(io.StringIO(text), dtype=str, header=header, sep=sep)
+
+    df = read(0)
+    lowered = {str(c).strip().lower(): c for c in df.columns}
+    columns = {field: next((lowered[a] for a in aliases if a in lowered), None)
+               for field, aliases in IMPORT_COLUMNS.items()}
+    headerless = not any(columns.values())
+    if headerless:
+        df = read(None)
+        columns = {"identifier": df.columns[0]}
+
+    rows = []
+    # Row numbers as the user sees them in a spreadsheet
+    first_row = 1 if headerless else 2
+    for offset, record in enumerate(df.to_dict("records")):
+        values = {field: _clean(record.get(col)) for field, col in columns.items() if col is not None}
+        identifier = values.get("ticker") or values.get("isin") or values.get("identifier") or values.get("name")
+        if identifier is None:
+            continue
+        rows.append({"row": first_row + offset, "identifier": identifier,
+                     "ticker": values.get("ticker"), "isin": values.get("isin")})
+    return rows
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    value = str(value).strip()
+    return value or None
+
+class WatchlistImporter:
+    """
+    Runs the import pipeline for rows from read_import_file. Every row gets a
+    "status" ("added", "exists", "duplicate" or "error") and an "error" message,
+    plus "name"/"sector" when validation returned them.
+    """
+    def __init__(self, controller, batch_size: int = 50, max_workers: int = 4, validate: bool = True):
+        self.ctrl = controller
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.validate = validate
+
+    def run(self, rows: List[Dict[str, Any]],
+            progress_callback: Optional[Callable[[str, int, int], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Imports the rows and returns them with their outcome.
+        progress_callback(stage, done, total) is called per stage ("resolve",
+        "validate", "save") and after every validation batch.
+        """
+        report = progress_callback or (lambda stage, done, total: None)
+        rows = [dict(r, status=None, error=None) for r in rows]
+
+        report("resolve", 0, len(rows))
+        to_validate = self._resolve(rows)
+        report("resolve", len(rows), len(rows))
+
+        self._validate(to_validate, report)
+
+        new = [r for r in to_validate if r["status"] is None]
+        report("save", 0, len(new))
+        if new:
+            self.ctrl.storage.add_stocks([{"ticker": r["ticker"], "isin": r["isin"], "name": r.get("name"),
+                                           "sector": r.get("sector")} for r in new])
+            # Due immediately: the scheduler picks these up on its next pass
+            now = pd.Timestamp.now(tz="UTC").strftime("%Y-%m-%dT%H:%M:%S")
+            self.ctrl.storage.schedule_jobs([r["ticker"] for r in new], ["prices", "fundamentals"], now)
+            for r in new:
+                r["status"] = "added"
+        report("save", len(new), len(new))
+        return rows
+
+    def _resolve(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fills in ticker/ISIN and marks errors, existing and duplicate rows. Returns the rows left to validate."""
+        lookups = [r for r in rows if r["ticker"] is None or r["isin"] is None]
+        for r, (ticker, isin) in zip(lookups, self.ctrl.resolve_identifiers([r["identifier"] for r in lookups])):
+            if r["ticker"] is None and ticker is None:
+                r["status"] = "error"
+                r["error"] = (f"ISIN {isin} is not in the ISIN mapping file, add a ticker column" if isin
+                              else f"'{r['identifier']}' is not a valid ISIN")
+                continue
+            r["ticker"] = (r["ticker"] or ticker).upper()
+            r["isin"] = r["isin"] or isin
+
+        existing = {s["ticker"] for s in self.ctrl.storage.get_stocks()}
+        seen = set()
+        pending = []
+        for r in rows:
+            if r["status"] is not None:
+                continue
+            r["ticker"] = r["ticker"].strip().upper()
+            if r["ticker"] in seen:
+                r["status"] = "duplicate"
+            elif r["ticker"] in existing:
+                r["status"] = "exists"
+            else:
+                pending.append(r)
+            seen.add(r["ticker"])
+        return pending
+
+    def _validate(self, rows: List[Dict[str, Any]], report: Callable[[str, int, int], None]):
+        """Checks tickers with the provider in batches, within what's left of its daily quota."""
+        report("validate", 0, len(rows))
+        if not self.validate:
+            report("validate", len(rows), len(rows))
+            return
+
+        budget = self._quota_budget()
+        done = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            if budget is not None:
+                for r in batch[budget:]:
+                    r["status"] = "error"
+                    r["error"] = "Not validated, the provider's daily quota is used up. Import again tomorrow."
+                batch = batch[:budget]
+                budget -= len(batch)
+            if batch:
+                infos = self.ctrl.api.get_ticker_info_batch([r["ticker"] for r in batch], max_workers=self.max_workers)
+                for r in batch:
+                    info = infos.get(r["ticker"], ValueError("no response"))
+                    if isinstance(info, Exception):
+                        r["status"] = "error"
+                        r["error"] = f"Could not validate ticker '{r['ticker']}': {info}"
+                    else:
+                        r["name"] = info.get("name")
+                        r["sector"] = info.get("sector")
+            done += len(rows[start:start + self.batch_size])
+            report("validate", done, len(rows))
+
+    def _quota_budget(self) -> Optional[int]:
+        """Tickers that fit in the providers' remaining daily quota, None if unlimited."""
+        remaining = self.ctrl.api.remaining_quota()
+        return None if remaining is None else remaining // VALIDATION_CALLS
+
+_fetch_lock = threading.Lock()
+_fetch_thread: Optional[threading.Thread] = None
+
+def start_background_fetch(controller) -> bool:
+    """
+    Works through the due refresh jobs (e.g. a fresh import) on a daemon thread,
+    for setups where the scheduler daemon isn't running. Returns False if a
+    fetch started earlier is still running.
+    """
+    global _fetch_thread
+    with _fetch_lock:
+        if _fetch_thread is not None and _fetch_thread.is_alive():
+            return False
+        settings = controller.config.get("scheduler", {})
+        scheduler = RefreshScheduler(controller, batch_size=settings.get("batch_size", 100),
+                                     max_workers=settings.get("max_workers", 4))
+
+        def run():
+            try:
+                scheduler.run_once()
+            except Exception as e:
+                print(f"Warning: Background fetch failed: {e}")
+
+        _fetch_thread = threading.Thread(target=run, name="import-fetch", daemon=True)
+        _fetch_thread.start()
+        return True
+
+def is_background_fetch_running() -> bool:
+    with _fetch_lock:
+        return _fetch_thread is not None and _fetch_thread.is_alive()
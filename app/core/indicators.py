@@ -0,0 +1,187 @@
+"""
+Technical indicators for the details page: SMA, EMA, RSI, MACD, Bollinger
+bands, ATR and a rolling VWAP, all computed with vectorized pandas operations.
+
+compute_indicators() can continue from an earlier result: windowed
+indicators only recompute the last bars (plus their lookback), and the
+recursive ones (EMA, RSI, MACD, ATR) continue from the state stored in the
+earlier result's last row. IndicatorEngine keeps one result per ticker in
+memory and on disk as {ticker}_indicators.parquet next to the price files,
+so a chart rerun costs a cache read and a refresh only adds the new bars.
+"""
+import os
+from typing import Optional
+import numpy as np
+import pandas as pd
+from app.core.memo import VersionedLRU
+from app.core.price_store import ParquetPriceStore
+
+SMA_WINDOWS = (20, 50, 200)
+EMA_SPANS = (20,)
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLLINGER_WINDOW, BOLLINGER_STD = 20, 2.0
+ATR_PERIOD = 14
+VWAP_WINDOW = 20
+
+# Bars a windowed indicator needs before the first bar it computes
+LOOKBACK = max(max(SMA_WINDOWS), BOLLINGER_WINDOW, VWAP_WINDOW)
+
+INDICATOR_COLUMNS = (
+    [f"sma_{n}" for n in SMA_WINDOWS] + [f"ema_{n}" for n in EMA_SPANS] +
+    [f"rsi_{RSI_PERIOD}", "macd", "macd_signal", "macd_hist", "bb_mid", "bb_upper", "bb_lower",
+     f"atr_{ATR_PERIOD}", f"vwap_{VWAP_WINDOW}"]
+)
+# Running values of the recursive indicators, plus the close they were computed from
+STATE_COLUMNS = ["_close", f"_ema_{MACD_FAST}", f"_ema_{MACD_SLOW}", "_avg_gain", "_avg_loss"]
+
+def compute_indicators(prices: pd.DataFrame, previous: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Indicator (and state) columns for every bar of prices, which needs a
+    "Close" column and may have "High", "Low" and "Volume".
+
+    previous is an earlier result for the first len(previous) bars of the
+    same history; only the bars after it are computed and appended.
+    """
+    start = 0 if previous is None else len(previous)
+    if start >= len(prices):
+        return previous.iloc[:len(prices)]
+    state = previous.iloc[-1] if start else None
+
+    # Windowed indicators see the lookback bars before the first new one
+    tail = prices.iloc[max(0, start - LOOKBACK):]
+    offset = start - max(0, start - LOOKBACK)
+    close = tail["Close"].astype(float)
+    high = tail["High"].astype(float) if "High" in tail else close
+    low = tail["Low"].astype(float) if "Low" in tail else close
+    new = {}
+
+    for n in SMA_WINDOWS:
+        new[f"sma_{n}"] = close.rolling(n).mean()
+    mid = close.rolling(BOLLINGER_WINDOW).mean()
+    std = close.rolling(BOLLINGER_WINDOW).std(ddof=0)
+    new["bb_mid"] = mid
+    new["bb_upper"] = mid + BOLLINGER_STD * std
+    new["bb_lower"] = mid - BOLLINGER_STD * std
+    if "Volume" in tail:
+        volume = tail["Volume"].astype(float)
+        typical = (high + low + close) / 3
+        new[f"vwap_{VWAP_WINDOW}"] = ((typical * volume).rolling(VWAP_WINDOW).sum()
+                                      / volume.rolling(VWAP_WINDOW).sum())
+    else:
+        new[f"vwap_{VWAP_WINDOW}"] = pd.Series(np.nan, index=tail.index)
+    new = {name: values.iloc[offset:] for name, values in new.items()}
+
+    # Recursive indicators continue from the previous row's state
+    close = close.iloc[offset:]
+    high, low = high.iloc[offset:], low.iloc[offset:]
+    prev_close = close.shift(1)
+    if state is not None:
+        prev_close.iloc[0] = state["_close"]
+
+    for n in EMA_SPANS:
+        new[f"ema_{n}"] = _ema(close, 2 / (n + 1), _seed(state, f"ema_{n}"))
+    fast = _ema(close, 2 / (MACD_FAST + 1), _seed(state, f"_ema_{MACD_FAST}"))
+    slow = _ema(close, 2 / (MACD_SLOW + 1), _seed(state, f"_ema_{MACD_SLOW}"))
+    macd = fast - slow
+    signal = _ema(macd, 2 / (MACD_SIGNAL + 1), _seed(state, "macd_signal"))
+    new.update({f"_ema_{MACD_FAST}": fast, f"_ema_{MACD_SLOW}": slow,
+                "macd": macd, "macd_signal": signal, "macd_hist": macd - signal})
+
+    # Wilder smoothing, alpha = 1 / period
+    change = close - prev_close
+    avg_gain = _ema(change.clip(lower=0), 1 / RSI_PERIOD, _seed(state, "_avg_gain"))
+    avg_loss = _ema(-change.clip(upper=0), 1 / RSI_PERIOD, _seed(state, "_avg_loss"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        new[f"rsi_{RSI_PERIOD}"] = 100 - 100 / (1 + avg_gain / avg_loss)
+    new["_avg_gain"], new["_avg_loss"] = avg_gain, avg_loss
+
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    new[f"atr_{ATR_PERIOD}"] = _ema(true_range, 1 / ATR_PERIOD, _seed(state, f"atr_{ATR_PERIOD}"))
+    new["_close"] = close
+
+    result = pd.DataFrame(new, index=close.index)[INDICATOR_COLUMNS + STATE_COLUMNS]
+    if previous is None or start == 0:
+        return result
+    return pd.concat([previous, result])
+
+def _seed(state: Optional[pd.Series], column: str) -> Optional[float]:
+    if state is None or pd.isna(state[column]):
+        return None
+    return float(state[column])
+
+def _ema(values: pd.Series, alpha: float, seed: Optional[float]) -> pd.Series:
+    """
+    Exponential moving average y[t] = (1 - alpha) * y[t-1] + alpha * x[t].
+    With a seed, the series continues from it exactly as if the earlier
+    values had been part of the same call.
+    """
+    if seed is None:
+        return values.ewm(alpha=alpha, adjust=False).mean()
+    seeded = pd.concat([pd.Series([seed]), values.reset_index(drop=True)], ignore_index=True)
+    result = seeded.ewm(alpha=alpha, adjust=False).mean().iloc[1:]
+    result.index = values.index
+    return result
+
+def _same_frame(previous: Optional[pd.DataFrame], result: pd.DataFrame) -> bool:
+    """Cheap check whether result only repeats previous, so it needn't be written again."""
+    if previous is None or len(previous) != len(result) or list(previous.columns) != list(result.columns):
+        return False
+    return (previous.index[-1] == result.index[-1] and
+            np.allclose(previous.iloc[-1].to_numpy(dtype=float), result.iloc[-1].to_numpy(dtype=float), equal_nan=True))
+
+class _IndicatorFiles(ParquetPriceStore):
+    """Indicator frames as {ticker}_indicators.parquet, written and read like price histories."""
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.storage_path, f"{ticker}_indicators.parquet")
+
+class IndicatorEngine:
+    """
+    Per-ticker indicator cache for a StorageManager. get() returns the
+    indicators for the ticker's stored prices, computing only the bars
+    added since the cached result. Results are kept in memory up to
+    max_bytes, least recently used first out.
+    """
+    def __init__(self, storage, max_bytes: int = 64 * 1024 * 1024):
+        self.storage = storage
+        self.files = _IndicatorFiles(storage.storage_path)
+        self.memo = VersionedLRU(max_bytes)
+
+    def get(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Indicator columns aligned with the stored prices, None if there are none."""
+        version = self.storage.get_price_version(ticker)
+        if version is not None:
+            cached = self.memo.get(ticker, version)
+            if cached is not None:
+                return cached[INDICATOR_COLUMNS]
+
+        prices = self.storage.load_price_data(ticker)
+        if prices is None or prices.empty or "Close" not in prices:
+            return None
+
+        # The file holds the last result, whatever prices it was computed for
+        previous = self.files.load(ticker)
+        reusable = self._reusable_rows(previous, prices)
+        result = compute_indicators(prices, reusable)
+        if not _same_frame(previous, result):
+            self.files.save(ticker, result)
+
+        self.memo.set(ticker, version, result, int(result.memory_usage(index=True).sum()))
+        return result[INDICATOR_COLUMNS]
+
+    @staticmethod
+    def _reusable_rows(previous: Optional[pd.DataFrame], prices: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        The leading rows of an earlier result that are still valid for prices.
+        The last earlier row is always dropped since its bar may have been
+        revised, and nothing is kept if the history was rewritten (e.g. after
+        a split adjustment) or the stored columns are outdated.
+        """
+        if previous is None or list(previous.columns) != INDICATOR_COLUMNS + STATE_COLUMNS:
+            return None
+        keep = min(len(previous), len(prices)) - 1
+        if keep <= 0 or not previous.index[:keep].equals(prices.index[:keep]):
+            return None
+        if not np.isclose(previous["_close"].iloc[keep - 1], float(prices["Close"].iloc[keep - 1])):
+            return None
+        return previous.iloc[:keep]
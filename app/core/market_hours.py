@@ -0,0 +1,20 @@
+from datetime import timedelta
+import pandas as pd
+
+MARKET_TZ = "America/New_York"
+# End-of-day bars show up at the providers a little after the 16:00 close
+PRICES_READY = timedelta(hours=16, minutes=30)
+
+def next_market_close(now: pd.Timestamp) -> pd.Timestamp:
+    """The next time fresh end-of-day prices are expected (weekdays, 16:30 New York time)."""
+    local = now.tz_convert(MARKET_TZ)
+    candidate = local.normalize() + PRICES_READY
+    while candidate <= local or candidate.weekday() >= 5:
+        # Normalize again after stepping a day, the step may cross a DST change
+        candidate = (candidate.normalize() + pd.Timedelta(days=1, hours=12)).normalize() + PRICES_READY
+    return candidate
+
+def next_quarter_start(now: pd.Timestamp) -> pd.Timestamp:
+    first_month = ((now.month - 1) // 3) * 3 + 1
+    start = pd.Timestamp(year=now.year, month=first_month, day=1, tz=now.tz)
+    return start + pd.DateOffset(months=3)
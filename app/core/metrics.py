@@ -0,0 +1,306 @@
+"""
+In-process metrics: counters, latency histograms and pulled gauges, exported
+in the Prometheus text format.
+
+    from app.core import metrics
+    with metrics.timer("stockhelper_storage_op_seconds", op="load_price_data"):
+        ...
+    metrics.inc("stockhelper_provider_calls_total", provider="polygon", method="get_financials", outcome="error")
+
+Recording is a perf_counter pair plus a short critical section, cheap enough
+for every provider call, storage operation and page render. Values that
+other components already count (cache hits, HTTP retries, rate-limit waits)
+are read from them only when metrics are exported, via collectors.
+
+Export with render_prometheus(), the "metrics" config section ({"port": 9108}
+serves /metrics over HTTP, {"textfile": "data/metrics.prom"} writes a file
+for node_exporter's textfile collector), or the Diagnostics page.
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds, from cache hits up to slow provider calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "stockhelper_provider_calls_total": "Data source calls by provider, method and outcome",
+    "stockhelper_provider_latency_seconds": "Data source call latency by provider and method",
+    "stockhelper_storage_op_seconds": "StorageManager operation latency",
+    "stockhelper_storage_errors_total": "StorageManager operations that raised",
+    "stockhelper_render_seconds": "UI page render time",
+    "stockhelper_render_errors_total": "UI page renders that raised",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+# A collector returns (name, type, labels, value) samples, type is "counter" or "gauge"
+Sample = Tuple[str, str, Dict[str, Any], float]
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation within the bucket, as Prometheus' histogram_quantile does."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if cumulative + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.buckets[-1]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Sample]]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        self._observe(name, tuple(sorted(labels.items())), seconds)
+
+    def _observe(self, name: str, key: Labels, seconds: float):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, errors: Optional[str] = None, **labels) -> Iterator[None]:
+        """Observes the block's duration in histogram `name`. An exception also increments counter `errors`."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if errors:
+                self.inc(errors, **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, errors: Optional[str] = None, **labels):
+        """Decorator form of timer(), without the context manager overhead (it wraps hot storage methods)."""
+        key = tuple(sorted(labels.items()))
+
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    if errors:
+                        self.inc(errors, **labels)
+                    raise
+                finally:
+                    self._observe(name, key, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def register_collector(self, name: str, collect: Callable[[], Iterable[Sample]]):
+        """Adds (or replaces) a function that's called on export to report externally kept values."""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def counters(self) -> Dict[str, Dict[Labels, float]]:
+        with self._lock:
+            return {name: dict(series) for name, series in self._counters.items()}
+
+    def histograms(self) -> Dict[str, Dict[Labels, Histogram]]:
+        """Copies, safe to read while recording goes on."""
+        with self._lock:
+            copies = {}
+            for name, series in self._histograms.items():
+                copies[name] = {}
+                for key, h in series.items():
+                    c = Histogram(h.buckets)
+                    c.counts, c.sum, c.count = list(h.counts), h.sum, h.count
+                    copies[name][key] = c
+            return copies
+
+    def summary(self, name: str) -> List[Dict[str, Any]]:
+        """One row per series of histogram `name`: its labels, count, mean and estimated p50/p95/p99 in ms."""
+        rows = []
+        for key, h in sorted(self.histograms().get(name, {}).items()):
+            row: Dict[str, Any] = dict(key)
+            row["count"] = h.count
+            row["mean_ms"] = h.sum / h.count * 1000 if h.count else None
+            for q in (50, 95, 99):
+                value = h.quantile(q / 100)
+                row[f"p{q}_ms"] = value * 1000 if value is not None else None
+            rows.append(row)
+        return rows
+
+    def collect(self) -> List[Sample]:
+        with self._lock:
+            collectors = list(self._collectors.items())
+        samples = []
+        for name, collect in collectors:
+            try:
+                samples.extend(collect())
+            except Exception as e:
+                print(f"Warning: Metrics collector {name} failed: {e}")
+        return samples
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+
+        def header(name, kind):
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in sorted(self.counters().items()):
+            header(name, "counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+
+        for name, series in sorted(self.histograms().items()):
+            header(name, "histogram")
+            for key, h in sorted(series.items()):
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_labels(key + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {h.count}")
+                lines.append(f"{name}_sum{_labels(key)} {_number(h.sum)}")
+                lines.append(f"{name}_count{_labels(key)} {h.count}")
+
+        typed = set()
+        for name, kind, labels, value in sorted(self.collect(), key=lambda s: s[0]):
+            if name not in typed:
+                header(name, kind)
+                typed.add(name)
+            lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+def stats_samples(prefix: str, stats: Dict[str, Any], counters: Iterable[str] = ("hits", "misses", "evictions"),
+                  **labels) -> List[Sample]:
+    """Turns a component's stats() dict into samples: names in counters become {prefix}_{name}_total."""
+    counters = set(counters)
+    samples = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            samples.append((f"{prefix}_{key}_total", "counter", labels, value))
+        else:
+            samples.append((f"{prefix}_{key}", "gauge", labels, value))
+    return samples
+
+def _labels(key: Labels) -> str:
+    if not key:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in key)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + "}"
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+# Process-wide registry, used through the module level helpers below
+REGISTRY = MetricsRegistry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+register_collector = REGISTRY.register_collector
+render_prometheus = REGISTRY.render_prometheus
+summary = REGISTRY.summary
+counters = REGISTRY.counters
+collect = REGISTRY.collect
+
+def write_textfile(path: str):
+    """Writes the current metrics to path atomically (node_exporter textfile collector format)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+_settings: Dict[str, Any] = {}
+_last_write = 0.0
+_server: Optional[ThreadingHTTPServer] = None
+_state_lock = threading.Lock()
+
+def configure(settings: Dict[str, Any]):
+    """
+    Applies the "metrics" config section. "port" starts a /metrics HTTP endpoint
+    (once per process), "textfile" and "interval" (seconds, default 15) control
+    the file written by maybe_write_textfile().
+    """
+    global _settings, _server
+    with _state_lock:
+        _settings = dict(settings or {})
+        port = _settings.get("port")
+        if port is not None and _server is None:
+            try:
+                _server = ThreadingHTTPServer((_settings.get("host", "127.0.0.1"), int(port)), _MetricsHandler)
+            except OSError as e:
+                # Another process (e.g. the scheduler next to the app) already serves this port
+                print(f"Warning: Metrics endpoint not started on port {port}: {e}")
+                return
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+
+def maybe_write_textfile(force: bool = False):
+    """Writes the configured textfile at most once per interval. Does nothing if none is configured."""
+    global _last_write
+    path = _settings.get("textfile")
+    if not path:
+        return
+    now = time.monotonic()
+    with _state_lock:
+        if not force and now - _last_write < float(_settings.get("interval", 15)):
+            return
+        _last_write = now
+    try:
+        write_textfile(path)
+    except OSError as e:
+        print(f"Warning: Could not write metrics to {path}: {e}")
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
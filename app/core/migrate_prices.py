@@ -0,0 +1,61 @@
+"""
+One-shot migration of stored price histories between storage backends.
+
+    python -m app.core.migrate_prices --to parquet [--from csv] [--delete-source]
+
+Converts every {ticker} found in the source backend and switches the
+"price_storage" setting in config/config.json to the target backend.
+"""
+import argparse
+import os
+import sys
+from typing import List
+
+sys.path.append(os.getcwd())
+
+from app.core.config_manager import ConfigManager
+from app.core.price_store import PRICE_STORES, PriceStore, get_price_store
+
+def find_tickers(store: PriceStore) -> List[str]:
+    """Lists the tickers a backend currently holds data for."""
+    return store.tickers()
+
+def migrate(source: PriceStore, target: PriceStore, delete_source: bool = False) -> List[str]:
+    """Copies all histories from source to target. Returns the tickers that failed."""
+    failed = []
+    tickers = find_tickers(source)
+    for i, ticker in enumerate(tickers, 1):
+        try:
+            target.save(ticker, source.load(ticker))
+            if delete_source:
+                source.delete(ticker)
+            print(f"[{i}/{len(tickers)}] {ticker}")
+        except Exception as e:
+            print(f"[{i}/{len(tickers)}] {ticker} FAILED: {e}")
+            failed.append(ticker)
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="source", default="csv", choices=list(PRICE_STORES))
+    parser.add_argument("--to", dest="target", default="parquet", choices=list(PRICE_STORES))
+    parser.add_argument("--delete-source", action="store_true", help="Remove migrated files from the source backend")
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        parser.error("--from and --to must differ")
+
+    config = ConfigManager()
+    source = get_price_store(args.source, config.storage_path, db_path=config.db_path)
+    target = get_price_store(args.target, config.storage_path, db_path=config.db_path)
+
+    failed = migrate(source, target, delete_source=args.delete_source)
+    if failed:
+        print(f"{len(failed)} ticker(s) failed, config left unchanged: {', '.join(failed)}")
+        sys.exit(1)
+
+    config.set("price_storage", args.target)
+    print(f"Done. price_storage is now '{args.target}'.")
+
+if __name__ == "__main__":
+    main()
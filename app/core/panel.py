@@ -0,0 +1,224 @@
+"""
+Aligned close panel for any set of watchlist tickers, kept as a
+memory-mapped float64 matrix next to the price files.
+
+The matrix is ticker-major ({storage_path}/_panel/closes.npy, one row of
+closes per ticker over a shared calendar in _panel/dates.npy), so reading
+a handful of tickers only touches their rows. Both files are allocated
+with spare capacity: appending the latest bars writes them in place, and
+a new ticker takes the next free row. The file is only laid out again
+when the capacity runs out, or when a ticker has bars on days the
+calendar doesn't contain yet (e.g. another exchange's holidays).
+
+PanelCache.get() compares each ticker's price version with the one its row
+was built from. When it changed, the ticker's closes are read again and
+only the bars after the row's last day are written, as long as the ones up
+to it match the bar count and checksum recorded for the row. A backfill or
+a rewritten history (e.g. after a split adjustment) reloads the row.
+"""
+import json
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.core.analytics import DAY_NS, calendar_days
+
+# Spare room allocated whenever the matrix is laid out: about a year of dates, and tickers
+DATE_HEADROOM = 260
+TICKER_HEADROOM = 16
+
+class PanelCache:
+    CLOSES_FILE = "closes.npy"
+    DATES_FILE = "dates.npy"
+    META_FILE = "meta.json"
+
+    def __init__(self, storage, path: Optional[str] = None):
+        self.storage = storage
+        self.path = path or os.path.join(storage.storage_path, "_panel")
+        self._lock = threading.Lock()
+        self._closes: Optional[np.memmap] = None
+        self._dates: Optional[np.memmap] = None
+        # Tickers by matrix row, the price version, last calendar day and [bar count, checksum]
+        # of the closes each row was built from
+        self._rows: Dict[str, int] = {}
+        self._versions: Dict[str, Optional[int]] = {}
+        self._last: Dict[str, Optional[int]] = {}
+        self._checksums: Dict[str, List[int]] = {}
+        self._length = 0
+        self._loaded = False
+
+    def get(self, tickers: List[str], start=None, end=None) -> pd.DataFrame:
+        """
+        Closes of the tickers as a dates x tickers frame (a copy), on the dates
+        where at least one of them has a bar, optionally limited to [start, end].
+        """
+        with self._lock:
+            self._load()
+            changed = False
+            for ticker in dict.fromkeys(tickers):
+                version = self.storage.get_price_version(ticker)
+                if ticker not in self._rows or version is None or self._versions.get(ticker) != version:
+                    self._sync(ticker, version)
+                    changed = True
+            if changed:
+                self._write_meta()
+
+            calendar = self._calendar()
+            lo, hi = 0, len(calendar)
+            if start is not None:
+                lo = int(np.searchsorted(calendar, _day(start)))
+            if end is not None:
+                hi = int(np.searchsorted(calendar, _day(end), side="right"))
+            rows = [self._rows[t] for t in tickers]
+            values = self._closes[rows, lo:hi] if rows else np.empty((0, hi - lo))
+            dates = np.array(calendar[lo:hi])
+
+        keep = ~np.isnan(values).all(axis=0)
+        if not keep.all():
+            values, dates = values[:, keep], dates[keep]
+        return pd.DataFrame(values.T, index=pd.DatetimeIndex(dates.view("datetime64[ns]"), name="Date"),
+                            columns=list(tickers))
+
+    def tickers(self) -> List[str]:
+        with self._lock:
+            self._load()
+            return sorted(self._rows, key=self._rows.get)
+
+    def clear(self):
+        """Drops the cached matrix, it's rebuilt from the price store on the next get()."""
+        with self._lock:
+            self._closes = self._dates = None
+            for name in (self.META_FILE, self.CLOSES_FILE, self.DATES_FILE):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+            self._rows, self._versions, self._last, self._checksums, self._length = {}, {}, {}, {}, 0
+            self._loaded = False
+
+    # Keeping the rows up to date
+
+    def _sync(self, ticker: str, version: Optional[int]):
+        """Brings the ticker's row up to date with its stored prices."""
+        row, last = self._rows.get(ticker), self._last.get(ticker)
+        days, closes = self._read(ticker)
+        fresh = slice(0, len(days))
+        if row is not None:
+            # Only the bars after the last day are new if the ones up to it are still the ones
+            # the row was built from. A backfill or a rewritten history reloads the row.
+            known = int(np.searchsorted(days, last, side="right")) if last is not None else 0
+            if self._checksums.get(ticker) == [known, _checksum(days[:known], closes[:known])]:
+                fresh = slice(known, len(days))
+            else:
+                self._closes[row, :self._length] = np.nan
+        else:
+            row = len(self._rows)
+            if row >= self._closes.shape[0]:
+                self._layout(self._calendar(), row + TICKER_HEADROOM)
+            self._rows[ticker] = row
+            self._closes[row, :] = np.nan
+        self._write(row, days[fresh], closes[fresh])
+        self._versions[ticker] = version
+        self._last[ticker] = int(days[-1]) if len(days) else None
+        self._checksums[ticker] = [len(days), _checksum(days, closes)]
+
+    def _write(self, row: int, days: np.ndarray, closes: np.ndarray):
+        if not len(days):
+            return
+        calendar = self._calendar()
+        known = np.isin(days, calendar, assume_unique=True)
+        if not known.all():
+            new_days = np.unique(days[~known])
+            if len(calendar) and new_days[0] <= calendar[-1]:
+                # Days inside the calendar, every row shifts
+                self._layout(np.union1d(calendar, new_days), self._closes.shape[0])
+            else:
+                if len(calendar) + len(new_days) > self._closes.shape[1]:
+                    self._layout(calendar, self._closes.shape[0], len(calendar) + len(new_days))
+                self._dates[len(calendar):len(calendar) + len(new_days)] = new_days
+                self._length += len(new_days)
+            calendar = self._calendar()
+        self._closes[row, np.searchsorted(calendar, days)] = closes
+
+    def _read(self, ticker: str) -> Tuple[np.ndarray, np.ndarray]:
+        """The ticker's stored closes as (calendar day ns, close) arrays, the last bar of a day wins."""
+        df = self.storage.load_price_data(ticker, columns=["Close"])
+        if df is None or df.empty or "Close" not in df:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        days = calendar_days(df.index)
+        closes = df["Close"].to_numpy(dtype=float)
+        last = np.append(days[1:] != days[:-1], True)
+        return days[last], closes[last]
+
+    def _calendar(self) -> np.ndarray:
+        return np.asarray(self._dates[:self._length])
+
+    # Files
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        meta_path = os.path.join(self.path, self.META_FILE)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            self._closes = np.load(os.path.join(self.path, self.CLOSES_FILE), mmap_mode="r+")
+            self._dates = np.load(os.path.join(self.path, self.DATES_FILE), mmap_mode="r+")
+            self._length = meta["length"]
+            self._rows = {t: i for i, t in enumerate(meta["tickers"])}
+            self._versions = {t: meta["versions"].get(t) for t in meta["tickers"]}
+            self._last = {t: meta["last"].get(t) for t in meta["tickers"]}
+            # Rows without one are reloaded on their next change
+            self._checksums = dict(meta.get("checksums", {}))
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(meta_path):
+                print(f"Warning: Rebuilding the close panel cache in {self.path}: {e}")
+            self._rows, self._versions, self._last, self._checksums, self._length = {}, {}, {}, {}, 0
+            self._layout(np.empty(0, dtype=np.int64), TICKER_HEADROOM)
+
+    def _layout(self, calendar: np.ndarray, ticker_capacity: int, length: Optional[int] = None):
+        """Writes the matrix anew for `calendar`, with room to spare, moving the existing rows over."""
+        os.makedirs(self.path, exist_ok=True)
+        date_capacity = (length or len(calendar)) + DATE_HEADROOM
+        closes = np.lib.format.open_memmap(os.path.join(self.path, self.CLOSES_FILE + ".tmp"), mode="w+",
+                                           dtype=np.float64, shape=(ticker_capacity, date_capacity))
+        dates = np.lib.format.open_memmap(os.path.join(self.path, self.DATES_FILE + ".tmp"), mode="w+",
+                                          dtype=np.int64, shape=(date_capacity,))
+        closes[:] = np.nan
+        dates[:len(calendar)] = calendar
+        if self._rows:
+            old = self._calendar()
+            n = len(self._rows)
+            closes[:n, np.searchsorted(calendar, old)] = self._closes[:n, :len(old)]
+        closes.flush()
+        dates.flush()
+        self._closes = self._dates = None
+        os.replace(os.path.join(self.path, self.CLOSES_FILE + ".tmp"), os.path.join(self.path, self.CLOSES_FILE))
+        os.replace(os.path.join(self.path, self.DATES_FILE + ".tmp"), os.path.join(self.path, self.DATES_FILE))
+        self._closes, self._dates, self._length = closes, dates, len(calendar)
+        self._write_meta()
+
+    def _write_meta(self):
+        """Flushes the matrix and records what it holds. Written last, like the npy price store's meta."""
+        self._closes.flush()
+        self._dates.flush()
+        tickers = sorted(self._rows, key=self._rows.get)
+        meta = {"length": self._length, "tickers": tickers, "versions": self._versions, "last": self._last,
+                "checksums": self._checksums}
+        tmp_path = os.path.join(self.path, self.META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, self.META_FILE))
+
+def _checksum(days: np.ndarray, closes: np.ndarray) -> int:
+    """CRC-32 of (calendar day, close) pairs, to tell whether a row's history changed."""
+    return zlib.crc32(np.ascontiguousarray(closes).tobytes(), zlib.crc32(np.ascontiguousarray(days).tobytes()))
+
+def _day(value) -> int:
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_localize(None)
+    return ts.as_unit("ns").value // DAY_NS * DAY_NS
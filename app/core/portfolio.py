@@ -0,0 +1,307 @@
+"""
+Portfolio valuation: holdings, daily value, realized and unrealized P&L,
+weights and returns from the recorded trades and the stored closes.
+
+Trades are booked at average cost, which is a short loop over the trades.
+Everything per day is array arithmetic on a dates x tickers position
+matrix times the aligned close panel (see analytics.close_panel), so a
+500-position, 10-year portfolio is valued in milliseconds. Dividends and
+cash balances aren't tracked.
+
+PortfolioEngine keeps each portfolio's Valuation until its trades or a
+held ticker's prices change. When only new bars or trades on the latest
+dates arrived, value_portfolio() recomputes from the earlier result's last
+row onwards and continues from the state stored in the row before it.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.core.analytics import close_panel
+
+# Quantities below this are a closed position (float noise from partial sells)
+EPSILON = 1e-9
+
+FRAME_COLUMNS = ["value", "invested", "cost", "unrealized", "realized", "pnl", "flow", "return",
+                 "cumulative_return"]
+HOLDING_COLUMNS = ["quantity", "average_cost", "price", "value", "cost", "unrealized", "realized", "weight"]
+
+Position = Tuple[float, float]
+
+def book_trades(transactions: List[Dict[str, Any]],
+                positions: Optional[Dict[str, Position]] = None) -> np.ndarray:
+    """
+    Average-cost bookkeeping for trades in the order given. positions maps
+    ticker -> (quantity, cost) before the first trade and is updated in place.
+    Returns one row per trade: quantity change, cost basis change, realized
+    P&L and the cash that went into the portfolio (negative for sells).
+    Raises ValueError for a sell of more shares than are held (no shorting).
+    """
+    positions = {} if positions is None else positions
+    booked = np.empty((len(transactions), 4))
+    for i, t in enumerate(transactions):
+        ticker, quantity, price = t["ticker"], float(t["quantity"]), float(t["price"])
+        fees = float(t.get("fees") or 0.0)
+        held, cost = positions.get(ticker, (0.0, 0.0))
+        flow = quantity * price + fees
+        if quantity > 0:
+            cost_change, realized = flow, 0.0
+        else:
+            if -quantity > held + EPSILON:
+                raise ValueError(f"Selling {-quantity:g} {ticker} on {t['date']}, but only {held:g} are held")
+            average = cost / held
+            if held + quantity <= EPSILON:
+                quantity, cost_change = -held, -cost
+            else:
+                cost_change = quantity * average
+            realized = -quantity * (price - average) - fees
+        positions[ticker] = (held + quantity, cost + cost_change)
+        booked[i] = (quantity, cost_change, realized, flow)
+    return booked
+
+class Valuation:
+    """
+    A portfolio's daily state from its first trade to its last close:
+    quantity held and the close used (carried forward over gaps, the trade
+    price before a ticker's first close) as dates x tickers arrays, and the
+    market value, cash flow, cost basis, realized P&L and return growth as
+    one value per date. position_cost and position_realized are per ticker
+    on the last date.
+    """
+    def __init__(self, dates: pd.DatetimeIndex, tickers: List[str], ids: np.ndarray, quantity: np.ndarray,
+                 price: np.ndarray, value: np.ndarray, flow: np.ndarray, cost: np.ndarray, realized: np.ndarray,
+                 growth: np.ndarray, position_cost: np.ndarray, position_realized: np.ndarray,
+                 before_last: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]):
+        self.dates = dates
+        self.tickers = tickers
+        self.ids = ids
+        self.quantity = quantity
+        self.price = price
+        self.value = value
+        self.flow = flow
+        self.cost = cost
+        self.realized = realized
+        self.growth = growth
+        self.position_cost = position_cost
+        self.position_realized = position_realized
+        # Per ticker cost and realized P&L, and the raw closes, on the second to last date
+        self.before_last = before_last
+
+    @property
+    def market_value(self) -> np.ndarray:
+        return np.where(self.quantity != 0, self.quantity * self.price, 0.0)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        Per date: market value, net cash put in, cost basis, unrealized,
+        realized and total P&L, the day's cash flow, the time-weighted daily
+        return and the cumulative return since the first trade.
+        """
+        invested = np.cumsum(self.flow)
+        returns = self.growth / np.concatenate([[1.0], self.growth[:-1]]) - 1
+        columns = [self.value, invested, self.cost, self.value - self.cost, self.realized,
+                   self.value - invested, self.flow, returns, self.growth - 1]
+        return pd.DataFrame(dict(zip(FRAME_COLUMNS, columns)), index=self.dates)
+
+    @property
+    def weights(self) -> pd.DataFrame:
+        """Each position's share of the portfolio's market value per date (0 when nothing is held)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = np.where(self.value[:, None] > 0, self.market_value / self.value[:, None], 0.0)
+        return pd.DataFrame(weights, index=self.dates, columns=self.tickers)
+
+    @property
+    def positions(self) -> pd.DataFrame:
+        return pd.DataFrame(self.quantity, index=self.dates, columns=self.tickers)
+
+    def holdings(self, include_closed: bool = False) -> pd.DataFrame:
+        """The positions on the last date, indexed by ticker, largest first."""
+        quantity, price, cost = self.quantity[-1], self.price[-1], self.position_cost
+        held = quantity != 0
+        value = np.where(held, quantity * price, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average = np.where(held, cost / quantity, np.nan)
+            weight = value / self.value[-1] if self.value[-1] > 0 else np.zeros(len(value))
+        holdings = pd.DataFrame(dict(zip(HOLDING_COLUMNS, [
+            quantity, average, price, value, cost, value - cost, self.position_realized, weight])),
+            index=pd.Index(self.tickers, name="ticker"))
+        if not include_closed:
+            holdings = holdings[held]
+        return holdings.sort_values("value", ascending=False)
+
+def value_portfolio(transactions: List[Dict[str, Any]], panel: pd.DataFrame,
+                    previous: Optional[Valuation] = None) -> Valuation:
+    """
+    Values the trades (ordered by date, then id, as get_transactions returns
+    them) against panel, a dates x tickers close panel. Tickers missing from
+    the panel and days before a ticker's first close are valued at the last
+    trade price.
+
+    previous is an earlier result for the same portfolio; its rows are kept
+    up to the last one as long as the trades and closes before it are
+    unchanged.
+    """
+    if not transactions:
+        raise ValueError("A portfolio needs at least one transaction to be valued")
+    tickers = sorted({t["ticker"] for t in transactions})
+    columns = {t: j for j, t in enumerate(tickers)}
+    trade_dates = pd.DatetimeIndex([t["date"] for t in transactions]).normalize()
+    if list(panel.columns) != tickers:
+        panel = panel.reindex(columns=tickers)
+    panel = panel.iloc[panel.index.searchsorted(trade_dates.min()):]
+    # Trades on days without a bar (e.g. before the stored history starts) get their own row
+    trade_days = trade_dates.unique()
+    if trade_days.isin(panel.index).all():
+        dates, closes = panel.index, panel.to_numpy(dtype=float)
+    else:
+        dates = panel.index.union(trade_days)
+        closes = panel.reindex(dates).to_numpy(dtype=float)
+
+    ids = np.array([t.get("id", i) for i, t in enumerate(transactions)])
+    rows = dates.searchsorted(trade_dates)
+    cols = np.array([columns[t["ticker"]] for t in transactions])
+    k = _resume_row(previous, tickers, dates, closes, ids, rows)
+    n, m = len(dates) - k, len(tickers)
+
+    new = rows >= k
+    if k:
+        seed_cost, seed_realized = previous.before_last[:2]
+        positions = {t: (previous.quantity[k - 1, j], seed_cost[j]) for j, t in enumerate(tickers)}
+    else:
+        seed_cost, seed_realized = np.zeros(m), np.zeros(m)
+        positions = {}
+    trades = [t for t, keep in zip(transactions, new) if keep]
+    booked = book_trades(trades, positions)
+    r, c = rows[new] - k, cols[new]
+
+    # Quantity changes land on their trade's row, the cumulative sum gives every day's holdings
+    quantity = np.zeros((n, m), order="F")
+    np.add.at(quantity, (r, c), booked[:, 0])
+    if k:
+        quantity[0] += previous.quantity[k - 1]
+    np.cumsum(quantity, axis=0, out=quantity)
+    sold = np.unique(c[booked[:, 0] < 0])
+    if len(sold):
+        # Positions closed by partial sells can be left with float noise
+        held = quantity[:, sold]
+        held[np.abs(held) <= EPSILON] = 0.0
+        quantity[:, sold] = held
+
+    price = closes[k:]
+    missing = np.isnan(price)
+    if missing.any():
+        price = np.array(price, order="F")
+        unpriced = missing[r, c]
+        price[r[unpriced], c[unpriced]] = [float(t["price"]) for t, u in zip(trades, unpriced) if u]
+        gaps = np.flatnonzero(missing.any(axis=0))
+        price[:, gaps] = _ffill(price[:, gaps], previous.price[k - 1, gaps] if k else None)
+    market = quantity * price
+    if missing.any():
+        # Before a ticker's first close and trade nothing is held, only 0 * NaN
+        np.nan_to_num(market, copy=False)
+    value = market.sum(axis=1)
+
+    flow = np.bincount(r, weights=booked[:, 3], minlength=n)
+    cost_change = np.bincount(r, weights=booked[:, 1], minlength=n)
+    realized_change = np.bincount(r, weights=booked[:, 2], minlength=n)
+    cost = np.cumsum(cost_change) + (previous.cost[k - 1] if k else 0.0)
+    realized = np.cumsum(realized_change) + (previous.realized[k - 1] if k else 0.0)
+
+    # Time-weighted return with the day's trades settled at the close. A day starting from
+    # nothing earns the difference between the trade prices (and fees) and the close.
+    before = np.concatenate([[previous.value[k - 1] if k else 0.0], value[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(before > EPSILON, (value - flow) / before - 1,
+                           np.where(flow > EPSILON, value / flow - 1, 0.0))
+    growth = np.cumprod(1 + returns) * (previous.growth[k - 1] if k else 1.0)
+
+    position_cost = np.array([positions.get(t, (0.0, 0.0))[1] for t in tickers])
+    position_realized = seed_realized + np.bincount(c, weights=booked[:, 2], minlength=m)
+    before_last = None
+    if len(dates) > 1:
+        last = r == n - 1
+        before_last = (position_cost - np.bincount(c[last], weights=booked[last, 1], minlength=m),
+                       position_realized - np.bincount(c[last], weights=booked[last, 2], minlength=m),
+                       closes[-2].copy())
+
+    if k:
+        quantity, price = (np.concatenate([getattr(previous, name)[:k], rows_])
+                           for name, rows_ in (("quantity", quantity), ("price", price)))
+        value, flow, cost, realized, growth = (
+            np.concatenate([getattr(previous, name)[:k], rows_]) for name, rows_ in
+            (("value", value), ("flow", flow), ("cost", cost), ("realized", realized), ("growth", growth)))
+    return Valuation(dates, tickers, ids, quantity, price, value, flow, cost, realized, growth,
+                     position_cost, position_realized, before_last)
+
+def _resume_row(previous: Optional[Valuation], tickers: List[str], dates: pd.DatetimeIndex,
+                closes: np.ndarray, ids: np.ndarray, rows: np.ndarray) -> int:
+    """
+    The first row to recompute when continuing from previous, 0 for a full
+    valuation. The last earlier row is always recomputed since its close may
+    have been revised. Nothing is reused if trades were deleted or added
+    before that row, the tickers changed or the history was rewritten (e.g.
+    after a split adjustment), which the close before that row tells.
+    """
+    if previous is None or previous.tickers != tickers or previous.before_last is None:
+        return 0
+    k = len(previous.dates) - 1
+    if len(dates) <= k or not dates[:k].equals(previous.dates[:k]):
+        return 0
+    added = ~np.isin(ids, previous.ids)
+    if len(ids) - added.sum() != len(previous.ids) or (rows[added] < k).any():
+        return 0
+    if not np.allclose(closes[k - 1], previous.before_last[2], equal_nan=True):
+        return 0
+    return k
+
+def _ffill(values: np.ndarray, seed: Optional[np.ndarray] = None) -> np.ndarray:
+    """Carries each column's last non-NaN value forward, starting from seed (the row before values)."""
+    if seed is not None:
+        values = np.vstack([seed, values])
+    index = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = np.take_along_axis(values, index, axis=0)
+    return filled[1:] if seed is not None else filled
+
+class PortfolioEngine:
+    """
+    Per-portfolio valuation cache for a StorageManager. get() returns the
+    Valuation for the portfolio's stored trades and closes, reusing the
+    earlier result while nothing changed and extending it when possible.
+    """
+    def __init__(self, storage):
+        self.storage = storage
+        self._closes: Dict[str, Tuple[Optional[int], Optional[pd.Series]]] = {}
+        self._valuations: Dict[str, Tuple[Tuple, Valuation]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, portfolio: str = "default") -> Optional[Valuation]:
+        """None if the portfolio has no trades."""
+        trades = self.storage.get_transactions_version(portfolio)
+        if not trades[0]:
+            return None
+        with self._lock:
+            cached = self._valuations.get(portfolio)
+            if cached is not None and cached[0][0] == trades:
+                if cached[0][1] == self._versions(cached[1].tickers):
+                    return cached[1]
+
+            transactions = self.storage.get_transactions(portfolio)
+            tickers = sorted({t["ticker"] for t in transactions})
+            versions = self._versions(tickers)
+            panel = close_panel({t: self._close(t, v) for t, v in zip(tickers, versions)})
+            valuation = value_portfolio(transactions, panel, cached[1] if cached is not None else None)
+            self._valuations[portfolio] = ((trades, versions), valuation)
+            return valuation
+
+    def _versions(self, tickers: List[str]) -> Tuple[Optional[int], ...]:
+        return tuple(self.storage.get_price_version(t) for t in tickers)
+
+    def _close(self, ticker: str, version: Optional[int]) -> Optional[pd.Series]:
+        cached = self._closes.get(ticker)
+        if cached is None or cached[0] != version or version is None:
+            df = self.storage.load_price_data(ticker, columns=["Close"])
+            cached = (version, df["Close"] if df is not None and not df.empty and "Close" in df else None)
+            self._closes[ticker] = cached
+        return cached[1]
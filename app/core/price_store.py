@@ -0,0 +1,464 @@
+import glob
+import json
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Type
+import numpy as np
+import pandas as pd
+from app.core.db import MIGRATIONS, Database
+
+class PriceStore(ABC):
+    """
+    Storage backend for per-ticker OHLCV history.
+    All backends return a DataFrame indexed by a DatetimeIndex named "Date",
+    sliced to [start, end] and restricted to `columns` when given.
+    """
+    def __init__(self, storage_path: str):
+        self.storage_path = storage_path
+
+    @abstractmethod
+    def save(self, ticker: str, df: pd.DataFrame):
+        pass
+
+    @abstractmethod
+    def load(self, ticker: str, start: Any = None, end: Any = None,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        pass
+
+    @abstractmethod
+    def path(self, ticker: str) -> str:
+        """Location of the ticker's data on disk."""
+        pass
+
+    def exists(self, ticker: str) -> bool:
+        return os.path.exists(self.path(ticker))
+
+    def version(self, ticker: str) -> Optional[int]:
+        """A value that changes whenever the ticker's history is rewritten, None if there is none."""
+        try:
+            return os.stat(self.path(ticker)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def tickers(self) -> List[str]:
+        """Lists the tickers this backend currently holds data for."""
+        # File based backends name their files/directories {ticker}_prices[.ext]
+        found = set()
+        for path in glob.glob(os.path.join(self.storage_path, "*_prices*")):
+            name = os.path.basename(path)
+            ticker = name[:name.rindex("_prices")]
+            if self.exists(ticker) and self.path(ticker) == path:
+                found.add(ticker)
+        return sorted(found)
+
+    def delete(self, ticker: str):
+        path = self.path(ticker)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        df = self.load(ticker)
+        if df is None or df.empty:
+            return None
+        return df.index.max()
+
+    def first_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        df = self.load(ticker)
+        if df is None or df.empty:
+            return None
+        return df.index.min()
+
+def _slice(df: pd.DataFrame, start: Any, end: Any, columns: Optional[List[str]]) -> pd.DataFrame:
+    if start is not None:
+        df = df[df.index >= _as_bound(start, df.index.tz)]
+    if end is not None:
+        df = df[df.index <= _as_bound(end, df.index.tz, end=True)]
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+def _as_bound(value, tz, end: bool = False) -> pd.Timestamp:
+    """
+    Converts a date bound to a Timestamp comparable with an index in timezone tz.
+    A bare end date includes the whole day.
+    """
+    ts = pd.Timestamp(value)
+    if end and ts == ts.normalize():
+        ts = ts + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")
+    if tz is not None and ts.tz is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tz is not None:
+        return ts.tz_localize(None)
+    return ts
+
+class CsvPriceStore(PriceStore):
+    """The original format: one {ticker}_prices.csv per ticker. Slicing happens after a full read."""
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.storage_path, f"{ticker}_prices.csv")
+
+    def save(self, ticker: str, df: pd.DataFrame):
+        df.to_csv(self.path(ticker))
+
+    def load(self, ticker: str, start: Any = None, end: Any = None,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        filepath = self.path(ticker)
+        if not os.path.exists(filepath):
+            return None
+        df = pd.read_csv(filepath, index_col=0, parse_dates=True)
+        if not isinstance(df.index, pd.DatetimeIndex):
+            # Timezone-aware history spanning a DST change has mixed UTC offsets,
+            # which read_csv leaves as strings.
+            df.index = pd.to_datetime(df.index, utc=True)
+        return _slice(df, start, end, columns)
+
+class ParquetPriceStore(PriceStore):
+    """
+    Compressed, typed columnar storage: {ticker}_prices.parquet.
+    Loads only the requested columns, and date filters are pushed down to
+    row-group statistics so old row groups are skipped without being decoded.
+    """
+    ROW_GROUP_SIZE = 1024
+    COMPRESSION = "zstd"
+
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.storage_path, f"{ticker}_prices.parquet")
+
+    def save(self, ticker: str, df: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frame = df.copy()
+        frame.index.name = "Date"
+        table = pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+        tmp_path = self.path(ticker) + ".tmp"
+        pq.write_table(table, tmp_path, compression=self.COMPRESSION, row_group_size=self.ROW_GROUP_SIZE)
+        os.replace(tmp_path, self.path(ticker))
+
+    def load(self, ticker: str, start: Any = None, end: Any = None,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        import pyarrow.parquet as pq
+
+        filepath = self.path(ticker)
+        if not os.path.exists(filepath):
+            return None
+
+        pf = pq.ParquetFile(filepath)
+        schema = pf.schema_arrow
+        tz = getattr(schema.field("Date").type, "tz", None)
+
+        read_columns = None
+        if columns is not None:
+            read_columns = ["Date"] + [c for c in columns if c in schema.names and c != "Date"]
+
+        filters = []
+        if start is not None:
+            filters.append(("Date", ">=", _as_bound(start, tz)))
+        if end is not None:
+            filters.append(("Date", "<=", _as_bound(end, tz, end=True)))
+
+        table = pq.read_table(filepath, columns=read_columns, filters=filters or None)
+        df = table.to_pandas()
+        return df.set_index("Date")
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        return self._date_bound(ticker, last=True)
+
+    def first_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        return self._date_bound(ticker, last=False)
+
+    def _date_bound(self, ticker: str, last: bool) -> Optional[pd.Timestamp]:
+        import pyarrow.parquet as pq
+
+        filepath = self.path(ticker)
+        if not os.path.exists(filepath):
+            return None
+        # Answer from the footer statistics, no column data is read
+        pf = pq.ParquetFile(filepath)
+        metadata = pf.metadata
+        if metadata.num_rows == 0:
+            return None
+        date_idx = pf.schema_arrow.get_field_index("Date")
+        tz = getattr(pf.schema_arrow.field("Date").type, "tz", None)
+        bound = None
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(date_idx).statistics
+            if stats is None or not stats.has_min_max:
+                return super().last_date(ticker) if last else super().first_date(ticker)
+            value = stats.max if last else stats.min
+            if bound is None or (value > bound if last else value < bound):
+                bound = value
+        bound = pd.Timestamp(bound)
+        if tz is not None:
+            bound = (bound if bound.tz is not None else bound.tz_localize("UTC")).tz_convert(tz)
+        return bound
+
+class NpyPriceStore(PriceStore):
+    """
+    Memory-mapped NumPy layout: a {ticker}_prices/ directory holding one .npy
+    file per column plus the int64 date index. Loads map the files instead of
+    reading them, and date ranges are located with a binary search on the
+    index, so only the touched pages are ever read from disk.
+    """
+    INDEX_FILE = "_index.npy"
+    META_FILE = "_meta.json"
+
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.storage_path, f"{ticker}_prices")
+
+    def save(self, ticker: str, df: pd.DataFrame):
+        directory = self.path(ticker)
+        os.makedirs(directory, exist_ok=True)
+
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+
+        columns = []
+        for i, col in enumerate(df.columns):
+            values = df[col].to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            filename = f"{i}.npy"
+            self._write_array(directory, filename, values)
+            columns.append({"name": str(col), "file": filename})
+
+        self._write_array(directory, self.INDEX_FILE, index.as_unit("ns").asi8)
+
+        # Written last, so an interrupted first save never leaves a readable but incomplete store
+        meta = {"columns": columns, "tz": tz}
+        tmp_path = os.path.join(directory, self.META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(directory, self.META_FILE))
+
+    def _write_array(self, directory: str, filename: str, values: np.ndarray):
+        tmp_path = os.path.join(directory, filename + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, values, allow_pickle=False)
+        os.replace(tmp_path, os.path.join(directory, filename))
+
+    def _read_meta(self, ticker: str) -> Optional[Dict]:
+        meta_path = os.path.join(self.path(ticker), self.META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r") as f:
+            return json.load(f)
+
+    def exists(self, ticker: str) -> bool:
+        return os.path.exists(os.path.join(self.path(ticker), self.META_FILE))
+
+    def version(self, ticker: str) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(self.path(ticker), self.META_FILE)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _index(self, ticker: str) -> np.ndarray:
+        return np.load(os.path.join(self.path(ticker), self.INDEX_FILE), mmap_mode="r")
+
+    def load(self, ticker: str, start: Any = None, end: Any = None,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        meta = self._read_meta(ticker)
+        if meta is None:
+            return None
+
+        directory = self.path(ticker)
+        index = self._index(ticker)
+        lo, hi = 0, len(index)
+        if start is not None:
+            lo = int(np.searchsorted(index, self._to_ns(_as_bound(start, meta["tz"])), side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(index, self._to_ns(_as_bound(end, meta["tz"], end=True)), side="right"))
+
+        wanted = meta["columns"]
+        if columns is not None:
+            wanted = [c for c in wanted if c["name"] in columns]
+
+        data = {}
+        for col in wanted:
+            data[col["name"]] = np.load(os.path.join(directory, col["file"]), mmap_mode="r")[lo:hi]
+
+        dates = pd.DatetimeIndex(np.asarray(index[lo:hi]).view("datetime64[ns]"), name="Date")
+        if meta["tz"] is not None:
+            dates = dates.tz_localize("UTC").tz_convert(meta["tz"])
+        return pd.DataFrame(data, index=dates, copy=False)
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        return self._date_at(ticker, -1)
+
+    def first_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        return self._date_at(ticker, 0)
+
+    def _date_at(self, ticker: str, position: int) -> Optional[pd.Timestamp]:
+        meta = self._read_meta(ticker)
+        if meta is None:
+            return None
+        index = self._index(ticker)
+        if len(index) == 0:
+            return None
+        date = pd.Timestamp(int(index[position]))
+        if meta["tz"] is not None:
+            date = date.tz_localize("UTC").tz_convert(meta["tz"])
+        return date
+
+    @staticmethod
+    def _to_ns(ts: pd.Timestamp) -> np.int64:
+        if ts.tz is not None:
+            ts = ts.tz_convert("UTC").tz_localize(None)
+        return np.int64(ts.as_unit("ns").value)
+
+class SqlitePriceStore(PriceStore):
+    """
+    Bars as rows of the price_bars table, keyed by (ticker, date), so
+    cross-ticker questions can be answered with a single SQL query.
+    Uses the app database when db_path is given, else prices.db in storage_path.
+    Only the usual OHLCV/action columns are kept, anything else is dropped on save.
+    """
+    COLUMNS = {
+        "Open": "open",
+        "High": "high",
+        "Low": "low",
+        "Close": "close",
+        "Adj Close": "adj_close",
+        "Volume": "volume",
+        "Dividends": "dividends",
+        "Stock Splits": "splits",
+    }
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, storage_path: str, db_path: Optional[str] = None):
+        super().__init__(storage_path)
+        self.db = Database(db_path or os.path.join(storage_path, "prices.db"))
+        self.db.migrate(MIGRATIONS)
+
+    def path(self, ticker: str) -> str:
+        return self.db.path
+
+    def exists(self, ticker: str) -> bool:
+        return self._series(ticker) is not None
+
+    def tickers(self) -> List[str]:
+        return [row[0] for row in self.db.execute("SELECT ticker FROM price_series ORDER BY ticker")]
+
+    def version(self, ticker: str) -> Optional[int]:
+        row = self.db.execute("SELECT version FROM price_series WHERE ticker = ?", (ticker,)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, ticker: str):
+        with self.db.transaction() as cursor:
+            cursor.execute("DELETE FROM price_bars WHERE ticker = ?", (ticker,))
+            cursor.execute("DELETE FROM price_series WHERE ticker = ?", (ticker,))
+
+    def _series(self, ticker: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute("SELECT columns, tz FROM price_series WHERE ticker = ?", (ticker,)).fetchone()
+        if row is None:
+            return None
+        return {"columns": json.loads(row["columns"]), "tz": row["tz"]}
+
+    def save(self, ticker: str, df: pd.DataFrame):
+        self._write(ticker, df, replace=True)
+
+    def upsert(self, ticker: str, df: pd.DataFrame):
+        """Inserts the given bars, replacing stored bars with the same date, without rewriting the rest."""
+        self._write(ticker, df, replace=False)
+
+    def _write(self, ticker: str, df: pd.DataFrame, replace: bool):
+        columns = [c for c in df.columns if c in self.COLUMNS]
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        series = None if replace else self._series(ticker)
+        if series is not None:
+            columns = list(dict.fromkeys(series["columns"] + columns))
+            tz = series["tz"]
+            index = _as_wall_time(index, tz)
+        elif tz is not None:
+            index = index.tz_localize(None)
+
+        sql_columns = [self.COLUMNS[c] for c in columns if c in df.columns]
+        frame = df[[c for c in columns if c in df.columns]]
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows = zip([ticker] * len(frame), index.strftime(self.DATE_FORMAT), *(frame[c].tolist() for c in frame.columns))
+
+        placeholders = ", ".join("?" * (len(sql_columns) + 2))
+        with self.db.transaction() as cursor:
+            if replace:
+                cursor.execute("DELETE FROM price_bars WHERE ticker = ?", (ticker,))
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO price_bars (ticker, date{''.join(', ' + c for c in sql_columns)}) "
+                f"VALUES ({placeholders})", rows)
+            cursor.execute("INSERT OR REPLACE INTO price_series (ticker, columns, tz, version) VALUES (?, ?, ?, ?)",
+                           (ticker, json.dumps(columns), tz, time.time_ns()))
+
+    def load(self, ticker: str, start: Any = None, end: Any = None,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        series = self._series(ticker)
+        if series is None:
+            return None
+
+        wanted = series["columns"] if columns is None else [c for c in series["columns"] if c in columns]
+        sql = f"SELECT date{''.join(', ' + self.COLUMNS[c] for c in wanted)} FROM price_bars WHERE ticker = ?"
+        params: List[Any] = [ticker]
+        if start is not None:
+            sql += " AND date >= ?"
+            params.append(self._bound(start, series["tz"]))
+        if end is not None:
+            sql += " AND date <= ?"
+            params.append(self._bound(end, series["tz"], end=True))
+        rows = self.db.execute(sql + " ORDER BY date", params).fetchall()
+
+        df = pd.DataFrame([tuple(row)[1:] for row in rows], columns=wanted)
+        dates = pd.DatetimeIndex(pd.to_datetime([row[0] for row in rows], format=self.DATE_FORMAT), name="Date")
+        if series["tz"] is not None:
+            dates = dates.tz_localize(series["tz"])
+        df.index = dates
+        return df
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        return self._date_bound(ticker, "MAX")
+
+    def first_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        return self._date_bound(ticker, "MIN")
+
+    def _date_bound(self, ticker: str, aggregate: str) -> Optional[pd.Timestamp]:
+        series = self._series(ticker)
+        if series is None:
+            return None
+        date = self.db.execute(f"SELECT {aggregate}(date) FROM price_bars WHERE ticker = ?", (ticker,)).fetchone()[0]
+        if date is None:
+            return None
+        date = pd.Timestamp(date)
+        return date.tz_localize(series["tz"]) if series["tz"] is not None else date
+
+    def _bound(self, value: Any, tz: Optional[str], end: bool = False) -> str:
+        ts = _as_bound(value, tz, end=end)
+        if ts.tz is not None:
+            ts = ts.tz_localize(None)
+        return ts.strftime(self.DATE_FORMAT)
+
+def _as_wall_time(index: pd.DatetimeIndex, tz: Optional[str]) -> pd.DatetimeIndex:
+    """Converts index to naive wall-clock time in tz, the form SqlitePriceStore stores dates in."""
+    if index.tz is None:
+        return index
+    if tz is None:
+        return index.tz_localize(None)
+    return index.tz_convert(tz).tz_localize(None)
+
+PRICE_STORES: Dict[str, Type[PriceStore]] = {
+    "csv": CsvPriceStore,
+    "parquet": ParquetPriceStore,
+    "npy": NpyPriceStore,
+    "sqlite": SqlitePriceStore,
+}
+
+def get_price_store(name: str, storage_path: str, db_path: Optional[str] = None) -> PriceStore:
+    """db_path is the app database, used by the "sqlite" backend."""
+    if name not in PRICE_STORES:
+        raise ValueError(f"Unknown price storage backend '{name}'. Options: {', '.join(PRICE_STORES)}")
+    if name == "sqlite":
+        return SqlitePriceStore(storage_path, db_path=db_path)
+    return PRICE_STORES[name](storage_path)
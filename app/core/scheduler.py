@@ -0,0 +1,130 @@
+"""
+Background refresh daemon.
+
+    python -m app.core.scheduler           # run forever
+    python -m app.core.scheduler --once    # one pass, e.g. from cron
+
+Keeps the local data warm so the UI never has to fetch on demand: prices are
+refreshed once fresh end-of-day bars are available, fundamentals weekly.
+Job state lives in the refresh_jobs table of the stocks database.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core import metrics
+from app.core.api.factory import build_data_source
+from app.core.config_manager import ConfigManager
+from app.core.controller import StockAppController
+from app.core.market_hours import next_market_close
+
+# Rough number of provider calls one ticker costs per refresh kind, used to
+# stay inside daily quotas (Alpha Vantage fundamentals = 3 statements + overview).
+CALLS_PER_TICKER = {"prices": 1, "fundamentals": 4}
+
+class RefreshScheduler:
+    def __init__(self, controller: StockAppController, fundamentals_interval: timedelta = timedelta(days=7),
+                 retry_delay: timedelta = timedelta(hours=1), batch_size: int = 100, max_workers: int = 4):
+        self.ctrl = controller
+        self.fundamentals_interval = fundamentals_interval
+        self.retry_delay = retry_delay
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+    def run_once(self, now: Optional[pd.Timestamp] = None) -> Dict[str, Dict[str, int]]:
+        """Runs every due job once. Returns {kind: {"ok": n, "failed": n}}."""
+        now = now or pd.Timestamp.now(tz="UTC")
+        summary = {}
+        for kind in ("prices", "fundamentals"):
+            summary[kind] = self._run_kind(kind, now)
+        return summary
+
+    def _run_kind(self, kind: str, now: pd.Timestamp) -> Dict[str, int]:
+        """Works through the due tickers in batches until none are left or the daily quota is spent."""
+        result = {"ok": 0, "failed": 0}
+        attempted = set()
+        while True:
+            limit = self.batch_size
+            budget = self._quota_budget(kind)
+            if budget is not None:
+                limit = min(limit, budget)
+            if limit <= 0:
+                print(f"[scheduler] daily quota exhausted, {kind} refresh resumes tomorrow")
+                return result
+
+            # A ticker that is still due after being tried (retry_delay of 0) waits for the next pass
+            tickers = [t for t in self.ctrl.storage.get_due_jobs(kind, _iso(now), limit=limit) if t not in attempted]
+            if not tickers:
+                return result
+            attempted.update(tickers)
+
+            print(f"[scheduler] refreshing {kind} for {len(tickers)} ticker(s)")
+            for ticker, error in self.ctrl.iter_refresh(tickers, max_workers=self.max_workers,
+                                                        prices=kind == "prices", fundamentals=kind == "fundamentals"):
+                finished = pd.Timestamp.now(tz="UTC")
+                if error:
+                    result["failed"] += 1
+                    print(f"[scheduler] {kind} {ticker} failed: {error}")
+                    next_due = finished + self.retry_delay
+                else:
+                    result["ok"] += 1
+                    next_due = self._next_due(kind, finished)
+                self.ctrl.storage.record_job_result(ticker, kind, _iso(finished), _iso(next_due), error)
+
+    def _next_due(self, kind: str, now: pd.Timestamp) -> pd.Timestamp:
+        if kind == "prices":
+            return next_market_close(now).tz_convert("UTC")
+        return now + self.fundamentals_interval
+
+    def _quota_budget(self, kind: str) -> Optional[int]:
+        """How many tickers fit in what's left of the providers' daily quota, None if unlimited."""
+        remaining = self.ctrl.api.remaining_quota()
+        if remaining is None:
+            return None
+        return remaining // CALLS_PER_TICKER[kind]
+
+    def run_forever(self, interval: timedelta = timedelta(minutes=15)):
+        while True:
+            try:
+                summary = self.run_once()
+                if any(s["ok"] or s["failed"] for s in summary.values()):
+                    print(f"[scheduler] {summary}")
+            except Exception as e:
+                # Keep the daemon alive, the next pass retries
+                print(f"[scheduler] pass failed: {e}")
+            metrics.maybe_write_textfile(force=True)
+            time.sleep(interval.total_seconds())
+
+def _iso(ts: pd.Timestamp) -> str:
+    """Timestamps are stored as UTC ISO strings so they compare correctly as text."""
+    return ts.tz_convert("UTC").strftime("%Y-%m-%dT%H:%M:%S")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Run one pass and exit")
+    args = parser.parse_args(argv)
+
+    # Uncached: the response cache keeps financials until the next quarter, weekly refreshes would never reach the provider
+    ctrl = StockAppController(api=build_data_source(ConfigManager(), cached=False))
+    settings = ctrl.config.get("scheduler", {})
+    scheduler = RefreshScheduler(
+        ctrl,
+        fundamentals_interval=timedelta(days=settings.get("fundamentals_days", 7)),
+        retry_delay=timedelta(minutes=settings.get("retry_minutes", 60)),
+        batch_size=settings.get("batch_size", 100),
+        max_workers=settings.get("max_workers", 4),
+    )
+    if args.once:
+        print(scheduler.run_once())
+    else:
+        scheduler.run_forever(timedelta(minutes=settings.get("interval_minutes", 15)))
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,368 @@
-import sqlite3
-import json
 import os
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from app.core.config_manager import ConfigManager
+from app.core import metrics
+from app.core.company_store import CompanyStore
+from app.core.db import MIGRATIONS, Database
+from app.core.financials import line_items
+from app.core.memo import VersionedLRU
+from app.core.price_store import CsvPriceStore, SqlitePriceStore, get_price_store
 import pandas as pd
 
+def _instrumented(fn):
+    """Records the method's latency (and errors) in app.core.metrics, labelled op=<method name>."""
+    return metrics.timed("stockhelper_storage_op_seconds", errors="stockhelper_storage_errors_total",
+                         op=fn.__name__)(fn)
+
 class StorageManager:
-    def __init__(self):
+    def __init__(self, db_path: Optional[str] = None, storage_path: Optional[str] = None,
+                 price_storage: Optional[str] = None):
         self.config = ConfigManager()
-        self.db_path = self.config.db_path
-        self.storage_path = self.config.storage_path
+        self.db_path = db_path or self.config.db_path
+        self.storage_path = storage_path or self.config.storage_path
+        self.price_store = get_price_store(price_storage or self.config.price_storage, self.storage_path,
+                                           db_path=self.db_path)
+        self.company_store = CompanyStore(self.storage_path)
+        # Parsed company data and price frames, shared by every session using this StorageManager
+        self.memo = VersionedLRU(max_bytes=int(self.config.get("memory_cache_mb", 128)) * 1024 * 1024)
         self._initialize_db()
         self._initialize_storage()
 
     def _initialize_db(self):
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS stocks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ticker TEXT UNIQUE NOT NULL,
-                isin TEXT,
-                name TEXT,
-                sector TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        self.db = Database(self.db_path)
+        self.db.migrate(MIGRATIONS)
 
     def _initialize_storage(self):
         os.makedirs(self.storage_path, exist_ok=True)
 
     def add_stock(self, ticker: str, isin: Optional[str] = None, name: Optional[str] = None, sector: Optional[str] = None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO stocks (ticker, isin, name, sector)
-                VALUES (?, ?, ?, ?)
-            ''', (ticker, isin, name, sector))
-            conn.commit()
-        except sqlite3.IntegrityError:
-            # Update existing if needed, or just ignore
+        """Adds a stock, or fills in missing details if it is already on the watchlist."""
+        if self.get_stock(ticker):
             print(f"Stock {ticker} already exists. Updating details.")
-            cursor.execute('''
-                UPDATE stocks SET isin = COALESCE(?, isin), name = COALESCE(?, name), sector = COALESCE(?, sector)
-                WHERE ticker = ?
-            ''', (isin, name, sector, ticker))
-            conn.commit()
-        finally:
-            conn.close()
+        self.add_stocks([{"ticker": ticker, "isin": isin, "name": name, "sector": sector}])
+
+    @_instrumented
+    def add_stocks(self, stocks: List[Dict[str, Any]]):
+        """
+        Adds many stocks in a single transaction. Each entry needs a "ticker" and
+        may carry "isin", "name" and "sector". Existing stocks keep their current
+        values for any field passed as None.
+        """
+        rows = [(s["ticker"], s.get("isin"), s.get("name"), s.get("sector")) for s in stocks]
+        with self.db.transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO stocks (ticker, isin, name, sector) VALUES (?, ?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET
+                    isin = COALESCE(excluded.isin, isin),
+                    name = COALESCE(excluded.name, name),
+                    sector = COALESCE(excluded.sector, sector)
+            ''', rows)
 
+    @_instrumented
     def get_stocks(self) -> List[Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM stocks')
-        rows = cursor.fetchall()
-        conn.close()
+        rows = self.db.execute('SELECT * FROM stocks').fetchall()
         return [dict(row) for row in rows]
 
+    @_instrumented
     def get_stock(self, ticker: str) -> Optional[Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM stocks WHERE ticker = ?', (ticker,))
-        row = cursor.fetchone()
-        conn.close()
+        row = self.db.execute('SELECT * FROM stocks WHERE ticker = ?', (ticker,)).fetchone()
         return dict(row) if row else None
 
+    @_instrumented
+    def get_due_jobs(self, kind: str, now: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Watchlist tickers whose `kind` refresh ("prices" or "fundamentals") is due at
+        `now` (ISO timestamp). Never refreshed tickers come first, then the stalest.
+        """
+        rows = self.db.execute('''
+            SELECT s.ticker FROM stocks s
+            LEFT JOIN refresh_jobs j ON j.ticker = s.ticker AND j.kind = ?
+            WHERE j.next_due IS NULL OR j.next_due <= ?
+            ORDER BY j.last_success IS NOT NULL, j.last_success, s.id
+            LIMIT ?
+        ''', (kind, now, -1 if limit is None else limit)).fetchall()
+        return [row[0] for row in rows]
+
+    @_instrumented
+    def record_job_result(self, ticker: str, kind: str, now: str, next_due: str, error: Optional[str] = None):
+        """Stores the outcome of a refresh and when it should run next."""
+        with self.db.transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO refresh_jobs (ticker, kind, last_run, last_success, last_error, next_due)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker, kind) DO UPDATE SET
+                    last_run = excluded.last_run,
+                    last_success = COALESCE(excluded.last_success, last_success),
+                    last_error = excluded.last_error,
+                    next_due = excluded.next_due
+            ''', (ticker, kind, now, None if error else now, error, next_due))
+
+    @_instrumented
+    def schedule_jobs(self, tickers: List[str], kinds: List[str], due: str):
+        """Marks refreshes as due at `due`, e.g. to queue the initial fetch for newly imported stocks."""
+        with self.db.transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO refresh_jobs (ticker, kind, next_due) VALUES (?, ?, ?)
+                ON CONFLICT(ticker, kind) DO UPDATE SET next_due = excluded.next_due
+            ''', [(t, k, due) for t in tickers for k in kinds])
+
+    def get_job_status(self, ticker: str) -> Dict[str, Dict[str, Any]]:
+        """Refresh job state for a ticker, keyed by kind."""
+        rows = self.db.execute('SELECT * FROM refresh_jobs WHERE ticker = ?', (ticker,)).fetchall()
+        return {row["kind"]: dict(row) for row in rows}
+
+    @_instrumented
+    def add_transactions(self, transactions: List[Dict[str, Any]], portfolio: str = "default") -> List[int]:
+        """
+        Records trades in a single transaction and returns their ids. Each entry
+        needs "ticker", "date", "quantity" (negative for a sell) and "price", and
+        may carry "fees" and "note".
+        """
+        rows = []
+        for t in transactions:
+            quantity, price = float(t["quantity"]), float(t["price"])
+            if not quantity or price < 0:
+                raise ValueError(f"Invalid transaction for {t['ticker']}: quantity {quantity}, price {price}")
+            rows.append((portfolio, t["ticker"], pd.Timestamp(t["date"]).strftime("%Y-%m-%d"), quantity, price,
+                         float(t.get("fees") or 0.0), t.get("note")))
+        ids = []
+        with self.db.transaction() as cursor:
+            for row in rows:
+                cursor.execute('''
+                    INSERT INTO transactions (portfolio, ticker, date, quantity, price, fees, note)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', row)
+                ids.append(cursor.lastrowid)
+        return ids
+
+    @_instrumented
+    def get_transactions(self, portfolio: str = "default") -> List[Dict[str, Any]]:
+        """The portfolio's trades in the order they were made (by date, then as recorded)."""
+        rows = self.db.execute('SELECT * FROM transactions WHERE portfolio = ? ORDER BY date, id',
+                               (portfolio,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete_transaction(self, transaction_id: int):
+        with self.db.transaction() as cursor:
+            cursor.execute('DELETE FROM transactions WHERE id = ?', (transaction_id,))
+
+    def get_transactions_version(self, portfolio: str = "default") -> tuple:
+        """(count, last id) of the portfolio's trades; changes whenever one is added or deleted."""
+        row = self.db.execute('SELECT COUNT(*), MAX(id) FROM transactions WHERE portfolio = ?',
+                              (portfolio,)).fetchone()
+        return row[0], row[1]
+
+    def get_portfolios(self) -> List[str]:
+        return [row[0] for row in self.db.execute('SELECT DISTINCT portfolio FROM transactions ORDER BY portfolio')]
+
+    @property
+    def sql_mode(self) -> bool:
+        """True when prices live in the database ("sqlite" price storage), fundamentals are then stored there too."""
+        return isinstance(self.price_store, SqlitePriceStore)
+
+    @_instrumented
     def save_company_data(self, ticker: str, data: Dict[str, Any]):
-        """Saves fundamental company data to a JSON file."""
-        filepath = os.path.join(self.storage_path, f"{ticker}_data.json")
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=4)
-
-    def load_company_data(self, ticker: str) -> Optional[Dict[str, Any]]:
-        filepath = os.path.join(self.storage_path, f"{ticker}_data.json")
-        if os.path.exists(filepath):
-            with open(filepath, "r") as f:
-                return json.load(f)
-        return None
+        """
+        Saves fundamental company data (see CompanyStore for the format). In SQL
+        mode the statement line items are also written to the financial_items table.
+        """
+        self.company_store.save(ticker, data)
+        self._invalidate("company", ticker)
+        if self.sql_mode:
+            self.save_financial_items(ticker, data)
 
+    @_instrumented
+    def save_financial_items(self, ticker: str, data: Dict[str, Any]):
+        """Replaces the ticker's rows in financial_items with the line items found in data."""
+        rows = [(ticker,) + item for item in line_items(data)]
+        with self.db.transaction() as cursor:
+            cursor.execute('DELETE FROM financial_items WHERE ticker = ?', (ticker,))
+            cursor.executemany('''
+                INSERT OR REPLACE INTO financial_items (ticker, statement, period_type, period_end, item, value)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+    @_instrumented
+    def get_financial_items(self, ticker: str, statement: Optional[str] = None) -> pd.DataFrame:
+        """The ticker's stored line items in long format, newest period first."""
+        sql = 'SELECT statement, period_type, period_end, item, value FROM financial_items WHERE ticker = ?'
+        params: List[Any] = [ticker]
+        if statement is not None:
+            sql += ' AND statement = ?'
+            params.append(statement)
+        rows = self.db.execute(sql + ' ORDER BY period_end DESC, statement, item', params).fetchall()
+        return pd.DataFrame([tuple(r) for r in rows], columns=["statement", "period_type", "period_end", "item", "value"])
+
+    @_instrumented
+    def compare_financial_item(self, item: str, period_type: str = "annual",
+                               tickers: Optional[List[str]] = None) -> pd.DataFrame:
+        """Latest reported value of one line item for every ticker (or the given ones), largest first."""
+        sql = '''
+            SELECT ticker, period_end, value FROM (
+                SELECT ticker, period_end, value,
+                       ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY period_end DESC) AS rn
+                FROM financial_items
+                WHERE item = ? AND period_type = ?
+            ) WHERE rn = 1
+        '''
+        params: List[Any] = [item, period_type]
+        if tickers is not None:
+            sql += f' AND ticker IN ({", ".join("?" * len(tickers))})'
+            params.extend(tickers)
+        rows = self.db.execute(sql + ' ORDER BY value DESC', params).fetchall()
+        return pd.DataFrame([tuple(r) for r in rows], columns=["ticker", "period_end", "value"])
+
+    @_instrumented
+    def screen_price_change(self, days: int = 7, max_change: Optional[float] = None,
+                            min_change: Optional[float] = None) -> pd.DataFrame:
+        """
+        Price change of every stored ticker over the last `days` calendar days,
+        from the last bar on or before (latest bar - days) to the latest bar.
+        E.g. max_change=-0.10 lists the tickers that fell 10% or more.
+        Runs as one SQL query, so it needs the "sqlite" price storage.
+        """
+        if not self.sql_mode:
+            raise ValueError("Price screening needs price_storage 'sqlite'")
+        sql = '''
+            WITH latest AS (
+                SELECT ticker, MAX(date) AS last_date FROM price_bars GROUP BY ticker
+            ), spans AS (
+                SELECT ticker, last_date,
+                       (SELECT MAX(b.date) FROM price_bars b
+                        WHERE b.ticker = latest.ticker AND b.date <= datetime(latest.last_date, ?)) AS base_date
+                FROM latest
+            )
+            SELECT s.ticker, s.base_date, s.last_date, p0.close AS base_close, p1.close AS last_close,
+                   p1.close / p0.close - 1 AS change
+            FROM spans s
+            JOIN price_bars p0 ON p0.ticker = s.ticker AND p0.date = s.base_date
+            JOIN price_bars p1 ON p1.ticker = s.ticker AND p1.date = s.last_date
+            WHERE p0.close > 0
+        '''
+        params: List[Any] = [f"-{int(days)} days"]
+        if max_change is not None:
+            sql += ' AND change <= ?'
+            params.append(max_change)
+        if min_change is not None:
+            sql += ' AND change >= ?'
+            params.append(min_change)
+        rows = self.db.execute(sql + ' ORDER BY change', params).fetchall()
+        return pd.DataFrame([tuple(r) for r in rows],
+                            columns=["ticker", "base_date", "last_date", "base_close", "last_close", "change"])
+
+    @_instrumented
+    def load_company_data(self, ticker: str, sections: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        The saved company data, or only the given top-level sections of it (e.g.
+        ["info"] or ["income_statement"]). Repeated loads are served from memory
+        while the file is unchanged.
+        """
+        version = self.company_store.version(ticker)
+        if version is None:
+            return None
+        key = ("company", ticker, tuple(sections) if sections is not None else None)
+        data = self.memo.get(key, version)
+        if data is None:
+            data = self.company_store.load(ticker, sections)
+            if data is None:
+                return None
+            # Legacy files are converted on first load, the cached entry must carry the new version
+            version = self.company_store.version(ticker)
+            # The parsed dict takes a few times the JSON size, close enough for the bound
+            self.memo.set(key, version, data, self.company_store.raw_size(ticker, sections) * 4)
+        return data
+
+    @_instrumented
     def save_price_data(self, ticker: str, df: pd.DataFrame):
-        """Saves price history to a CSV or JSON file."""
-        # Using CSV for time series might be cleaner for viewing, but user asked for 'company data in one file... prices locally'.
-        # Let's separate prices to a different file to avoid massive JSONs.
-        # But 'fetching company performance data and save it locally... Fetching stock price data and save it locally'
-        # I'll stick to a separate file for prices: {ticker}_prices.csv
-        filepath = os.path.join(self.storage_path, f"{ticker}_prices.csv")
-        df.to_csv(filepath)
-
-    def load_price_data(self, ticker: str) -> Optional[pd.DataFrame]:
-        filepath = os.path.join(self.storage_path, f"{ticker}_prices.csv")
-        if os.path.exists(filepath):
-            return pd.read_csv(filepath, index_col=0, parse_dates=True)
-        return None
+        """Saves price history using the configured price storage backend."""
+        self.price_store.save(ticker, df)
+        self._invalidate("prices", ticker)
+
+    @_instrumented
+    def load_price_data(self, ticker: str, start=None, end=None,
+                        columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Loads price history, optionally restricted to a date range and a subset of columns.
+        Histories still stored as legacy CSV are migrated to the configured backend on first read.
+        Repeated loads are served from memory while the stored history is unchanged.
+        """
+        version = self.price_store.version(ticker)
+        key = ("prices", ticker, start, end, tuple(columns) if columns is not None else None)
+        if version is not None:
+            df = self.memo.get(key, version)
+            if df is not None:
+                return df
+
+        df = self.price_store.load(ticker, start=start, end=end, columns=columns)
+        if df is None and not isinstance(self.price_store, CsvPriceStore):
+            legacy = CsvPriceStore(self.storage_path)
+            if legacy.exists(ticker):
+                self.price_store.save(ticker, legacy.load(ticker))
+                df = self.price_store.load(ticker, start=start, end=end, columns=columns)
+                version = self.price_store.version(ticker)
+        if df is not None and version is not None:
+            self.memo.set(key, version, df, int(df.memory_usage(index=True).sum()))
+        return df
+
+    def _invalidate(self, kind: str, ticker: str):
+        """Drops memoized loads of a ticker's data, a write may land within the same mtime tick."""
+        self.memo.invalidate(lambda key: key[0] == kind and key[1] == ticker)
+
+    def get_price_version(self, ticker: str) -> Optional[int]:
+        """Changes whenever the ticker's stored price history changes, None if there is none yet."""
+        return self.price_store.version(ticker)
+
+    def get_last_price_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        """Returns the date of the most recent stored bar, or None if there is no history."""
+        last = self.price_store.last_date(ticker)
+        if last is None:
+            df = self.load_price_data(ticker)
+            if df is not None and not df.empty:
+                last = df.index.max()
+        return last
+
+    def get_price_date_range(self, ticker: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """First and last stored bar dates, None if there is no history. Reads no bars where the store allows."""
+        first = self.price_store.first_date(ticker)
+        if first is None:
+            df = self.load_price_data(ticker, columns=["Close"])
+            if df is None or df.empty:
+                return None
+            return df.index.min(), df.index.max()
+        return first, self.price_store.last_date(ticker)
+
+    @_instrumented
+    def append_price_data(self, ticker: str, df: pd.DataFrame):
+        """Merges new bars into the stored history. Bars for an existing date replace the old ones."""
+        if df is None or df.empty:
+            return
+        if isinstance(self.price_store, SqlitePriceStore):
+            # Only the new rows are written, the stored history isn't read back
+            if not self.price_store.exists(ticker):
+                self.load_price_data(ticker)  # brings over a legacy CSV first
+            self.price_store.upsert(ticker, df)
+            self._invalidate("prices", ticker)
+            return
+
+        existing = self.load_price_data(ticker)
+        if existing is None or existing.empty:
+            self.save_price_data(ticker, df)
+            return
+
+        df = _align_tz(df, existing.index.tz)
+        merged = pd.concat([existing, df])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        self.save_price_data(ticker, merged)
+
+def _align_tz(df: pd.DataFrame, tz) -> pd.DataFrame:
+    """Makes the index of df use the given timezone so it can be merged with stored data."""
+    if df.index.tz == tz:
+        return df
+    df = df.copy()
+    if tz is None:
+        df.index = df.index.tz_localize(None)
+    elif df.index.tz is None:
+        df.index = df.index.tz_localize(tz)
+    else:
+        df.index = df.index.tz_convert(tz)
+    return df
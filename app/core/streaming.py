@@ -0,0 +1,326 @@
+"""
+Live quotes from Finnhub's trade websocket (wss://ws.finnhub.io).
+
+    stream = QuoteStream(api_key).start()
+    stream.subscribe(["AAPL", "MSFT"])
+    stream.last_prices()     # {"AAPL": (189.31, Timestamp(...)), ...}
+    stream.bars("AAPL")      # 1-minute OHLCV bars, the current minute included
+
+A background thread reads the socket, reconnecting with a growing delay and
+subscribing again after a drop. Every trade goes into its ticker's
+TickBuffer, a fixed-size numpy ring buffer of the latest ticks, and into its
+MinuteBars, which folds ticks into the current 1-minute bar and keeps the
+completed bars in another ring buffer. Memory stays bounded however long the
+stream runs, and nothing is allocated per tick: DataFrames are only built
+when ticks() or bars() is called.
+
+For tests and offline runs, app.core.api.standin serves the same protocol
+locally (TradeStreamStandIn); point "streaming": {"url": ...} at it.
+"""
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+MINUTE_MS = 60_000
+
+class TickBuffer:
+    """The latest `size` trades of a ticker: times (ms since the epoch), prices and volumes."""
+    def __init__(self, size: int = 1024):
+        self.times = np.zeros(size, dtype=np.int64)
+        self.prices = np.zeros(size)
+        self.volumes = np.zeros(size)
+        # Trades ever appended, the next one goes to count % size
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, len(self.prices))
+
+    def append(self, time_ms: int, price: float, volume: float):
+        i = self.count % len(self.prices)
+        self.times[i] = time_ms
+        self.prices[i] = price
+        self.volumes[i] = volume
+        self.count += 1
+
+    def last(self) -> Optional[Tuple[int, float, float]]:
+        """(time in ms, price, volume) of the newest trade, None before the first."""
+        if not self.count:
+            return None
+        i = (self.count - 1) % len(self.prices)
+        return int(self.times[i]), float(self.prices[i]), float(self.volumes[i])
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Copies of the buffered times, prices and volumes, oldest first."""
+        n, size = len(self), len(self.prices)
+        if self.count <= size:
+            order = slice(0, n)
+            return self.times[order].copy(), self.prices[order].copy(), self.volumes[order].copy()
+        start = self.count % size
+        return (np.roll(self.times, -start), np.roll(self.prices, -start), np.roll(self.volumes, -start))
+
+class MinuteBars:
+    """
+    1-minute OHLCV bars built trade by trade. The bar in progress is kept as
+    plain floats, completed bars go to a ring buffer of the latest `size`.
+    A late trade for the last completed minute still updates that bar; older
+    ones are only counted in `late`.
+    """
+    COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+    def __init__(self, size: int = 1440):
+        self.starts = np.zeros(size, dtype=np.int64)
+        self.values = np.zeros((size, len(self.COLUMNS)))
+        self.count = 0
+        self.late = 0
+        self._minute: Optional[int] = None
+        self._bar = [0.0, 0.0, 0.0, 0.0, 0.0]
+
+    def add(self, time_ms: int, price: float, volume: float):
+        minute = time_ms - time_ms % MINUTE_MS
+        bar = self._bar
+        if minute == self._minute:
+            if price > bar[1]:
+                bar[1] = price
+            elif price < bar[2]:
+                bar[2] = price
+            bar[3] = price
+            bar[4] += volume
+        elif self._minute is None or minute > self._minute:
+            if self._minute is not None:
+                self._complete()
+            self._minute = minute
+            self._bar = [price, price, price, price, volume]
+        elif self.count and self.starts[(self.count - 1) % len(self.starts)] == minute:
+            # The close stays, it's the last trade of that minute that came in order
+            row = self.values[(self.count - 1) % len(self.starts)]
+            row[1] = max(row[1], price)
+            row[2] = min(row[2], price)
+            row[4] += volume
+        else:
+            self.late += 1
+
+    def _complete(self):
+        i = self.count % len(self.starts)
+        self.starts[i] = self._minute
+        self.values[i] = self._bar
+        self.count += 1
+
+    def frame(self, include_current: bool = True) -> pd.DataFrame:
+        """The buffered bars oldest first, indexed by minute (UTC), with the bar in progress last."""
+        n, size = min(self.count, len(self.starts)), len(self.starts)
+        order = np.arange(self.count - n, self.count) % size
+        starts, values = self.starts[order], self.values[order]
+        if include_current and self._minute is not None:
+            starts = np.append(starts, self._minute)
+            values = np.vstack([values, self._bar])
+        index = pd.DatetimeIndex(pd.to_datetime(starts, unit="ms", utc=True), name="Date")
+        return pd.DataFrame(values, index=index, columns=self.COLUMNS)
+
+class QuoteStream:
+    URL = "wss://ws.finnhub.io"
+
+    def __init__(self, api_key: str, url: Optional[str] = None, tick_buffer: int = 1024, bar_buffer: int = 1440,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0, warning_interval: float = 60.0):
+        self.api_key = api_key
+        # e.g. a local stand-in (see app.core.api.standin)
+        self.url = url or self.URL
+        self.tick_buffer = tick_buffer
+        self.bar_buffer = bar_buffer
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        # Seconds between warnings about bad messages, the errors stat counts every one
+        self.warning_interval = warning_interval
+        self._warned_at = float("-inf")
+        self._unreported = 0
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._ticks: Dict[str, TickBuffer] = {}
+        self._bars: Dict[str, MinuteBars] = {}
+        self._symbols: Dict[str, None] = {}
+        self._connection = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._stats = {"connected": 0, "connects": 0, "disconnects": 0, "messages": 0, "ticks": 0, "errors": 0}
+        # Bumped with every message that carried trades, so readers can tell whether anything changed
+        self.version = 0
+
+    # Control
+
+    def start(self) -> "QuoteStream":
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="quote-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        connection = self._connection
+        if connection is not None:
+            connection.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def subscribe(self, tickers: Iterable[str]):
+        new = [t.upper() for t in tickers if t.upper() not in self._symbols]
+        for ticker in new:
+            self._symbols[ticker] = None
+        self._send_all("subscribe", new)
+
+    def unsubscribe(self, tickers: Iterable[str]):
+        gone = [t.upper() for t in tickers if t.upper() in self._symbols]
+        for ticker in gone:
+            del self._symbols[ticker]
+        self._send_all("unsubscribe", gone)
+
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    # Reading
+
+    def last_prices(self, tickers: Optional[Iterable[str]] = None) -> Dict[str, Tuple[float, pd.Timestamp]]:
+        """(price, time) of each ticker's latest trade, tickers without one left out."""
+        with self._lock:
+            buffers = self._ticks if tickers is None else {t: self._ticks.get(t) for t in tickers}
+            last = {t: b.last() for t, b in buffers.items() if b is not None and b.count}
+        return {t: (price, pd.Timestamp(time_ms, unit="ms", tz="UTC")) for t, (time_ms, price, _) in last.items()}
+
+    def ticks(self, ticker: str) -> pd.DataFrame:
+        """The buffered trades of the ticker, Price and Volume by time (UTC)."""
+        with self._lock:
+            buffer = self._ticks.get(ticker)
+            times, prices, volumes = buffer.snapshot() if buffer is not None else (np.empty(0, np.int64),) * 3
+        index = pd.DatetimeIndex(pd.to_datetime(times, unit="ms", utc=True), name="Date")
+        return pd.DataFrame({"Price": prices, "Volume": volumes}, index=index)
+
+    def bars(self, ticker: str, include_current: bool = True) -> pd.DataFrame:
+        """1-minute OHLCV bars of the ticker (see MinuteBars.frame), empty before its first trade."""
+        with self._lock:
+            bars = self._bars.get(ticker)
+            if bars is not None:
+                return bars.frame(include_current)
+        return pd.DataFrame(columns=MinuteBars.COLUMNS, index=pd.DatetimeIndex([], tz="UTC", name="Date"),
+                            dtype=float)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["late"] = sum(b.late for b in self._bars.values())
+        stats["symbols"] = len(self._symbols)
+        return stats
+
+    # Messages
+
+    def handle_message(self, message):
+        """
+        Applies one message from the socket. Finnhub sends
+        {"type": "trade", "data": [{"s": symbol, "p": price, "t": ms, "v": volume}, ...]},
+        plus {"type": "ping"} keep-alives and {"type": "error", "msg": ...}.
+        Malformed trades are skipped and counted in the "errors" stat.
+        """
+        try:
+            data = json.loads(message)
+        except ValueError:
+            data = None
+        kind = data.get("type") if isinstance(data, dict) else None
+        if kind == "trade":
+            trades = data.get("data") or []
+            if not isinstance(trades, list):
+                trades = [trades]
+            bad = 0
+            with self._lock:
+                ticks, bars = self._ticks, self._bars
+                for trade in trades:
+                    # Checked before anything is stored, a malformed trade is skipped as a whole
+                    try:
+                        symbol = trade["s"]
+                        time_ms, price, volume = int(trade["t"]), float(trade["p"]), float(trade.get("v") or 0.0)
+                    except (KeyError, TypeError, ValueError, AttributeError):
+                        bad += 1
+                        continue
+                    if not isinstance(symbol, str):
+                        bad += 1
+                        continue
+                    buffer = ticks.get(symbol)
+                    if buffer is None:
+                        buffer = ticks[symbol] = TickBuffer(self.tick_buffer)
+                        bars[symbol] = MinuteBars(self.bar_buffer)
+                    buffer.append(time_ms, price, volume)
+                    bars[symbol].add(time_ms, price, volume)
+                self._stats["messages"] += 1
+                self._stats["ticks"] += len(trades) - bad
+                self._stats["errors"] += bad
+                self.version += 1
+            if bad:
+                self._warn(f"Skipped {bad} malformed trade(s) on the quote stream: {str(message)[:200]}")
+        elif kind == "ping":
+            with self._lock:
+                self._stats["messages"] += 1
+        else:
+            with self._lock:
+                self._stats["errors"] += 1
+            detail = data.get("msg") if isinstance(data, dict) else None
+            self._warn(f"Unexpected message on the quote stream: {detail or str(message)[:200]}")
+
+    def _warn(self, text: str):
+        """Prints a warning at most once per warning_interval, a busy stream can send thousands of bad messages."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._warned_at < self.warning_interval:
+                self._unreported += 1
+                return
+            self._warned_at, unreported, self._unreported = now, self._unreported, 0
+        more = f" ({unreported} more since the last warning)" if unreported else ""
+        print(f"Warning: {text}{more}")
+
+    # Connection
+
+    def _run(self):
+        from websockets.exceptions import WebSocketException
+        from websockets.sync.client import connect
+
+        delay = self.reconnect_delay
+        while not self._stopping.is_set():
+            try:
+                with connect(f"{self.url}?token={self.api_key}", open_timeout=10) as connection:
+                    self._connection = connection
+                    with self._lock:
+                        self._stats["connected"] = 1
+                        self._stats["connects"] += 1
+                    self._send_all("subscribe", list(self._symbols))
+                    delay = self.reconnect_delay
+                    for message in connection:
+                        self.handle_message(message)
+            except (OSError, TimeoutError, WebSocketException) as e:
+                if not self._stopping.is_set():
+                    print(f"Warning: Quote stream disconnected ({e}), reconnecting in {delay:.0f}s")
+            except Exception as e:
+                # Keep the reader alive, whatever went wrong is retried on a fresh connection
+                with self._lock:
+                    self._stats["errors"] += 1
+                print(f"Warning: Quote stream failed ({e!r}), reconnecting in {delay:.0f}s")
+            finally:
+                self._connection = None
+                with self._lock:
+                    if self._stats["connected"]:
+                        self._stats["disconnects"] += 1
+                    self._stats["connected"] = 0
+            if self._stopping.wait(delay):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _send_all(self, kind: str, tickers: List[str]):
+        """Sends (un)subscribe messages when connected. On connect, _run() subscribes everything anyway."""
+        connection = self._connection
+        if connection is None or not tickers:
+            return
+        from websockets.exceptions import WebSocketException
+        try:
+            with self._send_lock:
+                for ticker in tickers:
+                    connection.send(json.dumps({"type": kind, "symbol": ticker}))
+        except WebSocketException:
+            pass  # the reader thread reconnects and subscribes again
@@ -1,3 +1,4 @@
+import importlib
 import streamlit as st
 import sys
 import os
@@ -5,7 +6,19 @@ import os
 # Ensure project root is in path
 sys.path.append(os.getcwd())
 
-from app.ui import dashboard, add_stock, details, settings, utils
+from app.core import metrics
+from app.ui import utils
+
+# Each view's module is imported only when it is first shown
+VIEWS = {
+    "dashboard": "app.ui.dashboard",
+    "add_stock": "app.ui.add_stock",
+    "details": "app.ui.details",
+    "portfolio": "app.ui.portfolio",
+    "compare": "app.ui.compare",
+    "settings": "app.ui.settings",
+    "diagnostics": "app.ui.diagnostics",
+}
 
 st.set_page_config(page_title="StockHelper", layout="wide", page_icon="📈")
 
@@ -26,12 +39,21 @@ st.sidebar.title("📈 StockHelper")
 if st.sidebar.button("📊 Dashboard", use_container_width=True):
     navigate_to("dashboard")
 
+if st.sidebar.button("💼 Portfolio", use_container_width=True):
+    navigate_to("portfolio")
+
+if st.sidebar.button("⚖️ Compare", use_container_width=True):
+    navigate_to("compare")
+
 if st.sidebar.button("➕ Add Stock", use_container_width=True):
     navigate_to("add_stock")
 
 if st.sidebar.button("⚙️ Settings", use_container_width=True):
     navigate_to("settings")
 
+if st.sidebar.button("🩺 Diagnostics", use_container_width=True):
+    navigate_to("diagnostics")
+
 st.sidebar.markdown("---")
 # Get current source from controller config
 ctrl = utils.get_controller()
@@ -39,11 +61,12 @@ current_source = ctrl.config.get("api_source", "yfinance")
 st.sidebar.caption(f"Data Source: {current_source}")
 
 # Main Content
-if st.session_state.view == "dashboard":
-    dashboard.render(navigate_to)
-elif st.session_state.view == "add_stock":
-    add_stock.render(navigate_to)
-elif st.session_state.view == "details":
-    details.render(st.session_state.selected_ticker, navigate_to)
-elif st.session_state.view == "settings":
-    settings.render(navigate_to)
+view_name = st.session_state.view if st.session_state.view in VIEWS else "dashboard"
+view = importlib.import_module(VIEWS[view_name])
+# st.rerun() and st.stop() raise BaseExceptions, so they aren't counted as render errors
+with metrics.timer("stockhelper_render_seconds", errors="stockhelper_render_errors_total", view=view_name):
+    if view_name == "details":
+        view.render(st.session_state.selected_ticker, navigate_to)
+    else:
+        view.render(navigate_to)
+metrics.maybe_write_textfile()
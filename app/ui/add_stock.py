@@ -1,5 +1,7 @@
 import streamlit as st
 from app.ui.utils import get_controller
+import pandas as pd
+from app.core.importer import WatchlistImporter, is_background_fetch_running, read_import_file, start_background_fetch
 
 def render(navigate_to):
     st.title("Add New Stock")
@@ -9,6 +11,13 @@ def render(navigate_to):
         _reset_state()
         navigate_to("dashboard")
 
+    single, bulk = st.tabs(["Single Stock", "Bulk Import"])
+    with single:
+        _render_single(ctrl, navigate_to)
+    with bulk:
+        _render_bulk(ctrl)
+
+def _render_single(ctrl, navigate_to):
     # Initialize state variables for this page
     if "add_stage" not in st.session_state:
         st.session_state.add_stage = "input" # input, confirm_direct, manual_ticker
@@ -22,7 +31,11 @@ def render(navigate_to):
             submit = st.form_submit_button("Analyze")
 
         if submit and identifier:
-            ticker, isin = ctrl.resolve_identifier(identifier)
+            try:
+                ticker, isin = ctrl.resolve_identifier(identifier)
+            except ValueError as e:
+                st.error(str(e))
+                return
             if ticker:
                 st.session_state.resolved_data = {"ticker": ticker, "isin": isin}
                 st.session_state.add_stage = "confirm_direct"
@@ -34,7 +47,8 @@ def render(navigate_to):
 
     elif st.session_state.add_stage == "confirm_direct":
         ticker = st.session_state.resolved_data["ticker"]
-        st.info(f"Identified Ticker: **{ticker}**")
+        isin = st.session_state.resolved_data["isin"]
+        st.info(f"Identified Ticker: **{ticker}**" + (f" (ISIN `{isin}`)" if isin else ""))
 
         col1, col2 = st.columns(2)
         with col1:
@@ -61,6 +75,57 @@ def render(navigate_to):
             _reset_state()
             st.rerun()
 
+def _render_bulk(ctrl):
+    st.markdown("Upload a CSV or Excel file with a `Ticker`, `ISIN` or `Name` column "
+                "(or just one identifier per line).")
+    upload = st.file_uploader("Watchlist file", type=["csv", "txt", "xlsx", "xls"])
+    validate = st.checkbox("Validate tickers with the data provider", value=True,
+                           help="Uses one API call per new ticker, within the provider's quota.")
+
+    if upload is not None and st.button("Import", type="primary"):
+        try:
+            rows = read_import_file(upload, upload.name)
+        except Exception as e:
+            st.error(f"Could not read {upload.name}: {e}")
+            return
+
+        progress = st.progress(0.0, text="Resolving identifiers...")
+        labels = {"resolve": "Resolving identifiers", "validate": "Validating tickers", "save": "Saving"}
+
+        def report(stage, done, total):
+            progress.progress(done / total if total else 1.0, text=f"{labels[stage]}... {done}/{total}")
+
+        settings = ctrl.config.get("import", {})
+        importer = WatchlistImporter(ctrl, batch_size=settings.get("batch_size", 50),
+                                     max_workers=settings.get("max_workers", 4), validate=validate)
+        st.session_state.import_results = importer.run(rows, progress_callback=report)
+        progress.empty()
+
+    results = st.session_state.get("import_results")
+    if not results:
+        return
+
+    df = pd.DataFrame(results)
+    counts = df["status"].value_counts()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Added", int(counts.get("added", 0)))
+    c2.metric("Already on watchlist", int(counts.get("exists", 0) + counts.get("duplicate", 0)))
+    c3.metric("Errors", int(counts.get("error", 0)))
+
+    errors = df[df["status"] == "error"]
+    if not errors.empty:
+        st.dataframe(errors[["row", "identifier", "error"]], width="stretch", hide_index=True)
+    with st.expander("All rows"):
+        st.dataframe(df.drop(columns=["error"]), width="stretch", hide_index=True)
+
+    if counts.get("added", 0):
+        st.info("The initial data fetch is queued and runs with the next background refresh.")
+        if is_background_fetch_running():
+            st.caption("Fetching data in the background...")
+        elif st.button("Fetch data now"):
+            start_background_fetch(ctrl)
+            st.rerun()
+
 def _add_stock(ctrl, ticker, isin, navigate_to):
     with st.spinner(f"Fetching data for {ticker}..."):
         try:
@@ -80,3 +145,5 @@ def _reset_state():
         del st.session_state.add_stage
     if "resolved_data" in st.session_state:
         del st.session_state.resolved_data
+    if "import_results" in st.session_state:
+        del st.session_state.import_results
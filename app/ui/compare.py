@@ -0,0 +1,60 @@
+import streamlit as st
+import pandas as pd
+from app.ui.utils import get_controller
+
+PERIODS = {"6M": pd.DateOffset(months=6), "1Y": pd.DateOffset(years=1), "3Y": pd.DateOffset(years=3),
+           "5Y": pd.DateOffset(years=5), "Max": None}
+STAT_COLUMNS = {
+    "return": st.column_config.NumberColumn("Return", format="%.1f%%"),
+    "volatility": st.column_config.NumberColumn("Volatility", format="%.1f%%", help="Annualized"),
+    "beta": st.column_config.NumberColumn("Beta", format="%.2f"),
+    "correlation": st.column_config.NumberColumn("Correlation", format="%.2f"),
+}
+
+def render(navigate_to):
+    st.title("Compare")
+
+    ctrl = get_controller()
+    stocks = [s["ticker"] for s in ctrl.get_all_stocks()]
+    if len(stocks) < 2:
+        st.info("Add at least two stocks to your watchlist to compare them.")
+        return
+
+    # Opened from a details page, that stock is preselected
+    selected = st.session_state.get("selected_ticker")
+    default = [selected] if selected in stocks else stocks[:4]
+    c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
+    tickers = c1.multiselect("Stocks", stocks, default=default)
+    benchmark = c2.selectbox("Benchmark", [None] + stocks, format_func=lambda t: t or "None",
+                             index=1 + stocks.index("SPY") if "SPY" in stocks else 0)
+    period = c3.selectbox("Period", list(PERIODS), index=1)
+    window = c4.number_input("Rolling Window (days)", min_value=10, max_value=504, value=60, step=10)
+    if not tickers:
+        return
+
+    offset = PERIODS[period]
+    start = pd.Timestamp.today().normalize() - offset if offset is not None else None
+    comparison = ctrl.get_comparison(tickers, benchmark, int(window), start)
+    if comparison is None:
+        st.warning("No prices stored for these stocks in this period. Refresh them from the dashboard.")
+        return
+
+    st.subheader("Performance")
+    st.caption("Closes rebased to 100 at the start of the period.")
+    st.line_chart(comparison["performance"])
+
+    stats = comparison["stats"].copy()
+    stats[["return", "volatility"]] *= 100
+    st.dataframe(stats, width="stretch", column_config=STAT_COLUMNS)
+
+    st.subheader("Correlation of Daily Returns")
+    correlation = comparison["correlation"]
+    st.dataframe(correlation.style.format("{:.2f}").background_gradient(cmap="RdYlGn", vmin=-1, vmax=1),
+                 width="stretch")
+
+    if benchmark:
+        others = [t for t in comparison["performance"].columns if t != benchmark]
+        st.subheader(f"Rolling {int(window)}-Day Beta vs {benchmark}")
+        st.line_chart(comparison["rolling_beta"][others].dropna(how="all"))
+        st.subheader(f"Rolling {int(window)}-Day Correlation vs {benchmark}")
+        st.line_chart(comparison["rolling_correlation"][others].dropna(how="all"))
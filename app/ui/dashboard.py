@@ -2,6 +2,28 @@ import streamlit as st
 from app.ui.utils import get_controller
 import pandas as pd
 
+# Display name and format of each summary metric. Fractions are shown as percentages.
+METRIC_COLUMNS = {
+    "Last": st.column_config.NumberColumn("Last", format="%.2f"),
+    "1D": st.column_config.NumberColumn("1D", format="%.2f%%"),
+    "1W": st.column_config.NumberColumn("1W", format="%.2f%%"),
+    "1M": st.column_config.NumberColumn("1M", format="%.2f%%"),
+    "YTD": st.column_config.NumberColumn("YTD", format="%.2f%%"),
+    "1Y": st.column_config.NumberColumn("1Y", format="%.2f%%"),
+    "Vol 30D": st.column_config.NumberColumn("Vol 30D", format="%.1f%%", help="Annualized realized volatility"),
+    "vs 52W High": st.column_config.NumberColumn("vs 52W High", format="%.1f%%"),
+    "vs 52W Low": st.column_config.NumberColumn("vs 52W Low", format="%.1f%%"),
+}
+LIVE_COLUMNS = {
+    "Live": st.column_config.NumberColumn("Live", format="%.2f"),
+    "vs Close": st.column_config.NumberColumn("vs Close", format="%.2f%%", help="Against the last stored close"),
+    "Time": st.column_config.DatetimeColumn("Time (UTC)", format="HH:mm:ss"),
+}
+METRIC_SOURCES = {
+    "Last": "last_close", "1D": "ret_1d", "1W": "ret_1w", "1M": "ret_1m", "YTD": "ret_ytd", "1Y": "ret_1y",
+    "Vol 30D": "vol_30d", "vs 52W High": "from_52w_high", "vs 52W Low": "from_52w_low",
+}
+
 def render(navigate_to):
     st.title("Your Watchlist")
 
@@ -26,6 +48,14 @@ def render(navigate_to):
 
     df = pd.DataFrame(data)
 
+    if st.button("🔄 Refresh All"):
+        _refresh_all(ctrl)
+
+    tickers = [s["ticker"] for s in stocks]
+    summary = ctrl.get_watchlist_summary(tickers)
+    df = _with_metrics(df, summary)
+    _live_quotes(ctrl, tickers, summary["last_close"])
+
     st.markdown("Select a stock to view details.")
 
     event = st.dataframe(
@@ -33,7 +63,8 @@ def render(navigate_to):
         width="stretch",
         hide_index=True,
         on_select="rerun",
-        selection_mode="single-row"
+        selection_mode="single-row",
+        column_config=METRIC_COLUMNS
     )
 
     # Handle selection
@@ -41,3 +72,51 @@ def render(navigate_to):
         selected_index = event.selection.rows[0]
         selected_ticker = df.iloc[selected_index]["Ticker"]
         navigate_to("details", selected_ticker)
+
+def _with_metrics(df, metrics):
+    """Adds the summary metric columns to the watchlist table, row order unchanged."""
+    df = df.copy()
+    for label, source in METRIC_SOURCES.items():
+        values = metrics[source].to_numpy()
+        df[label] = values if source == "last_close" else values * 100
+    return df
+
+def _live_quotes(ctrl, tickers, last_close):
+    """Latest trade prices from the quote stream, refreshed on their own without rerunning the page."""
+    settings = ctrl.config.get("streaming", {})
+    if not settings.get("enabled"):
+        return
+    stream = ctrl.get_quote_stream(tickers)
+    if stream is None:
+        st.caption("Live quotes need a Finnhub API key (Settings).")
+        return
+    st.fragment(run_every=float(settings.get("refresh_seconds", 2)))(_render_live_quotes)(stream, tickers, last_close)
+
+def _render_live_quotes(stream, tickers, last_close):
+    prices = stream.last_prices(tickers)
+    stats = stream.stats()
+    state = "connected" if stats["connected"] else "reconnecting..." if stats["connects"] else "connecting..."
+    if not prices:
+        st.caption(f"Live quotes: {state}, no trades yet.")
+        return
+    rows = [{"Ticker": t, "Live": price, "vs Close": (price / last_close.get(t) - 1) * 100 if last_close.get(t) else None,
+             "Time": at.tz_convert(None)} for t, (price, at) in prices.items()]
+    st.caption(f"Live quotes ({state})")
+    st.dataframe(pd.DataFrame(rows), width="stretch", hide_index=True, column_config=LIVE_COLUMNS)
+
+def _refresh_all(ctrl):
+    progress = st.progress(0.0, text="Refreshing watchlist...")
+    errors = []
+
+    def on_progress(ticker, done, total, error):
+        if error:
+            errors.append({"Ticker": ticker, "Error": error})
+        progress.progress(done / total, text=f"Refreshed {done}/{total} ({ticker})")
+
+    ctrl.refresh_all(progress_callback=on_progress)
+
+    if errors:
+        st.warning(f"{len(errors)} ticker(s) failed to refresh.")
+        st.dataframe(pd.DataFrame(errors), width="stretch", hide_index=True)
+    else:
+        st.success("All stocks refreshed.")
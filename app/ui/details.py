@@ -2,6 +2,23 @@ import streamlit as st
 from app.ui.utils import get_controller
 import pandas as pd
 
+# Chart overlays drawn on the price axis, and indicators with their own chart
+OVERLAYS = {
+    "SMA 20": ["sma_20"],
+    "SMA 50": ["sma_50"],
+    "SMA 200": ["sma_200"],
+    "EMA 20": ["ema_20"],
+    "Bollinger Bands": ["bb_upper", "bb_mid", "bb_lower"],
+    "VWAP 20": ["vwap_20"],
+}
+PANELS = {
+    "RSI 14": ["rsi_14"],
+    "MACD": ["macd", "macd_signal", "macd_hist"],
+    "ATR 14": ["atr_14"],
+}
+RANGES = {"1M": pd.DateOffset(months=1), "6M": pd.DateOffset(months=6), "1Y": pd.DateOffset(years=1),
+          "5Y": pd.DateOffset(years=5), "Max": None}
+
 def render(ticker, navigate_to):
     if not ticker:
         st.error("No ticker selected.")
@@ -10,30 +27,37 @@ def render(ticker, navigate_to):
 
     ctrl = get_controller()
 
-    if st.button("← Back to Dashboard"):
+    c1, c2 = st.columns([1, 5])
+    if c1.button("← Back to Dashboard"):
         navigate_to("dashboard")
+    if c2.button("Compare"):
+        navigate_to("compare", ticker)
 
-    data = ctrl.get_stock_detail(ticker)
+    # Statements are loaded one at a time below, when selected
+    data = ctrl.get_stock_detail(ticker, sections=["info", "full_info"], prices=False)
     if not data:
         st.error(f"Could not load data for {ticker}.")
         return
 
     meta = data["meta"]
     company = data["company_data"] or {}
-    prices = data["prices"]
 
     # Header
     st.title(meta.get("name") or ticker)
     st.caption(f"Ticker: {meta.get('ticker')} | Sector: {meta.get('sector')} | ISIN: {meta.get('isin')}")
+    jobs = ctrl.storage.get_job_status(ticker)
+    if jobs:
+        updated = " | ".join(f"{kind.capitalize()} updated: {job['last_success'] or 'never'}" for kind, job in sorted(jobs.items()))
+        st.caption(f"{updated} (UTC, background refresh)")
 
     # Tabs
     tab1, tab2, tab3 = st.tabs(["📈 Price History", "💰 Financials", "🏢 Company Info"])
 
     with tab1:
-        st.subheader("Stock Price (1 Year)")
-        if prices is not None and not prices.empty:
-            # Streamlit line chart expects index to be x-axis
-            st.line_chart(prices["Close"])
+        st.subheader("Stock Price")
+        date_range = ctrl.storage.get_price_date_range(ticker)
+        if date_range is not None:
+            _price_chart(ctrl, ticker, date_range)
         else:
             st.warning("No price data available.")
 
@@ -53,7 +77,8 @@ def render(ticker, navigate_to):
             "Cash Flow": "cashflow"
         }
 
-        f_data = company.get(key_map[ftype], {})
+        statement = ctrl.storage.load_company_data(ticker, sections=[key_map[ftype]]) or {}
+        f_data = statement.get(key_map[ftype], {})
         if f_data:
             # Convert dict to DF
             df_fin = pd.DataFrame(f_data)
@@ -75,3 +100,35 @@ def render(ticker, navigate_to):
                 st.json(info)
         else:
             st.info("No detailed info available.")
+
+def _price_chart(ctrl, ticker, date_range):
+    first, last = (pd.Timestamp(d.date()) for d in date_range)
+    c1, c2 = st.columns([3, 2])
+    period = c1.radio("Range", list(RANGES) + ["Custom"], index=2, horizontal=True)
+    end = None
+    if period == "Custom":
+        picked = c2.date_input("Dates", value=(max(first, last - RANGES["1Y"]).date(), last.date()),
+                               min_value=first.date(), max_value=last.date())
+        if len(picked) < 2:
+            return
+        start, end = picked
+    else:
+        start = last - RANGES[period] if RANGES[period] is not None else None
+    selected = st.multiselect("Indicators", list(OVERLAYS) + list(PANELS), default=[])
+
+    # Only the chosen range is read, and long ranges are downsampled to a fixed number of points
+    columns = [c for name in selected for c in {**OVERLAYS, **PANELS}[name]]
+    chart = ctrl.get_price_chart(ticker, start, end, columns)
+    if chart is None:
+        st.info("No prices in this range.")
+        return
+    data = chart["data"]
+    overlay_cols = [c for name in selected if name in OVERLAYS for c in OVERLAYS[name]]
+    st.line_chart(data[["Close"] + overlay_cols])
+    if len(data) < chart["bars"]:
+        st.caption(f"Showing {len(data):,} of {chart['bars']:,} bars. Pick a shorter range for full resolution.")
+
+    for name in selected:
+        if name in PANELS:
+            st.caption(name)
+            st.line_chart(data[PANELS[name]], height=200)
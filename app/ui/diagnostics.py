@@ -0,0 +1,62 @@
+import streamlit as st
+import pandas as pd
+from app.core import metrics
+from app.ui.utils import get_controller
+
+def render(navigate_to):
+    st.title("Diagnostics")
+    st.caption("Timings and counters since the app process started. Latency percentiles are "
+               "estimated from histogram buckets.")
+
+    ctrl = get_controller()
+    if st.button("Reset Timings"):
+        metrics.REGISTRY.reset()
+        st.rerun()
+
+    st.subheader("Data Providers")
+    calls = _provider_calls()
+    providers = _summary_frame("stockhelper_provider_latency_seconds", ["provider", "method"])
+    if providers.empty:
+        st.info("No provider calls yet.")
+    else:
+        providers["errors"] = [calls.get((p, m, "error"), 0) for p, m in providers.index]
+        providers["error_rate"] = providers["errors"] / providers["count"]
+        st.dataframe(providers.style.format({"error_rate": "{:.1%}"}, precision=1), width="stretch")
+    if hasattr(ctrl.api, "provider_stats"):
+        states = {name: s["state"] for name, s in ctrl.api.stats().items()}
+        st.caption("Circuit breakers: " + ", ".join(f"{name} {state}" for name, state in states.items()))
+
+    st.subheader("Storage")
+    storage = _summary_frame("stockhelper_storage_op_seconds", ["op"])
+    if storage.empty:
+        st.info("No storage operations yet.")
+    else:
+        errors = metrics.counters().get("stockhelper_storage_errors_total", {})
+        storage["errors"] = [int(errors.get((("op", op),), 0)) for op in storage.index]
+        st.dataframe(storage.style.format(precision=2), width="stretch")
+
+    st.subheader("Pages")
+    renders = _summary_frame("stockhelper_render_seconds", ["view"])
+    if not renders.empty:
+        st.dataframe(renders.style.format(precision=1), width="stretch")
+
+    st.subheader("Caches, HTTP and Rate Limits")
+    gauges = pd.DataFrame([{"metric": name, "labels": ", ".join(f"{k}={v}" for k, v in labels.items()),
+                            "value": value} for name, _, labels, value in metrics.collect()])
+    if not gauges.empty:
+        st.dataframe(gauges, width="stretch", hide_index=True)
+
+    with st.expander("Prometheus Export"):
+        st.caption('Set "metrics": {"port": 9108} or {"textfile": "data/metrics.prom"} in the config to scrape these.')
+        st.code(metrics.render_prometheus(), language="text")
+
+def _summary_frame(name, labels):
+    rows = metrics.summary(name)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index(labels).sort_values("count", ascending=False)
+
+def _provider_calls():
+    """(provider, method, outcome) -> calls."""
+    series = metrics.counters().get("stockhelper_provider_calls_total", {})
+    return {(d["provider"], d["method"], d["outcome"]): int(n) for d, n in ((dict(k), n) for k, n in series.items())}
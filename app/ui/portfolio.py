@@ -0,0 +1,90 @@
+import streamlit as st
+import pandas as pd
+from app.ui.utils import get_controller
+
+HOLDING_COLUMNS = {
+    "quantity": st.column_config.NumberColumn("Quantity", format="%g"),
+    "average_cost": st.column_config.NumberColumn("Avg Cost", format="%.2f"),
+    "price": st.column_config.NumberColumn("Price", format="%.2f"),
+    "value": st.column_config.NumberColumn("Value", format="%.2f"),
+    "cost": st.column_config.NumberColumn("Cost Basis", format="%.2f"),
+    "unrealized": st.column_config.NumberColumn("Unrealized P&L", format="%.2f"),
+    "realized": st.column_config.NumberColumn("Realized P&L", format="%.2f"),
+    "weight": st.column_config.NumberColumn("Weight", format="%.1f%%"),
+}
+
+def render(navigate_to):
+    st.title("Portfolio")
+
+    ctrl = get_controller()
+    stocks = [s["ticker"] for s in ctrl.get_all_stocks()]
+    _render_trade_form(ctrl, stocks)
+
+    valuation = ctrl.get_portfolio()
+    if valuation is None:
+        st.info("No transactions yet. Record a buy above to start tracking your holdings.")
+        return
+
+    last = valuation.frame.iloc[-1]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Market Value", f"{last['value']:,.2f}")
+    c2.metric("Unrealized P&L", f"{last['unrealized']:,.2f}")
+    c3.metric("Realized P&L", f"{last['realized']:,.2f}")
+    c4.metric("Return", f"{last['cumulative_return']:.2%}", help="Time-weighted, trades excluded")
+    st.caption(f"As of {valuation.dates[-1].date()}. Positions without a recent close are valued at "
+               f"their last close or trade price.")
+
+    holdings = valuation.holdings().copy()
+    holdings["weight"] *= 100
+    event = st.dataframe(holdings, width="stretch", column_config=HOLDING_COLUMNS,
+                         on_select="rerun", selection_mode="single-row")
+    if event and len(event.selection.rows) > 0:
+        navigate_to("details", holdings.index[event.selection.rows[0]])
+
+    frame = valuation.frame
+    st.subheader("Value")
+    st.line_chart(frame[["value", "invested"]].rename(columns={"value": "Market Value", "invested": "Invested"}))
+    st.subheader("Cumulative Return")
+    st.line_chart(frame["cumulative_return"] * 100, height=250)
+
+    with st.expander("Transactions"):
+        _render_transactions(ctrl)
+
+def _render_trade_form(ctrl, stocks):
+    with st.expander("Record a Trade", expanded=not stocks):
+        if not stocks:
+            st.caption("Add the stock to your watchlist first, so its prices are kept up to date.")
+            return
+        with st.form("trade_form", clear_on_submit=True):
+            c1, c2, c3 = st.columns(3)
+            ticker = c1.selectbox("Ticker", stocks)
+            side = c2.radio("Side", ["Buy", "Sell"], horizontal=True)
+            date = c3.date_input("Date")
+            c1, c2, c3 = st.columns(3)
+            quantity = c1.number_input("Quantity", min_value=0.0, step=1.0)
+            price = c2.number_input("Price", min_value=0.0, format="%.4f")
+            fees = c3.number_input("Fees", min_value=0.0, format="%.2f")
+            note = st.text_input("Note")
+            submit = st.form_submit_button("Save Trade")
+
+        if submit:
+            if not quantity:
+                st.error("Enter a quantity.")
+                return
+            try:
+                ctrl.add_transaction(ticker, date, quantity if side == "Buy" else -quantity, price, fees,
+                                     note or None)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.success(f"Recorded {side.lower()} of {quantity:g} {ticker}.")
+
+def _render_transactions(ctrl):
+    transactions = ctrl.storage.get_transactions()
+    df = pd.DataFrame(transactions)[["id", "date", "ticker", "quantity", "price", "fees", "note"]]
+    st.dataframe(df.iloc[::-1], width="stretch", hide_index=True)
+    c1, c2 = st.columns([1, 3])
+    transaction_id = c1.selectbox("Transaction", df["id"].iloc[::-1], label_visibility="collapsed")
+    if c2.button("Delete Transaction"):
+        ctrl.storage.delete_transaction(int(transaction_id))
+        st.rerun()
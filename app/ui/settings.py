@@ -1,9 +1,10 @@
 import streamlit as st
 from app.ui.utils import get_controller
-from app.core.api.alpha_vantage import AlphaVantageSource
-from app.core.api.polygon import PolygonSource
-from app.core.api.finnhub import FinnhubSource
-from app.core.api.yfinance_source import YFinanceSource
+import pandas as pd
+from app.core.api.registry import available_providers, create_provider, get_provider_spec
+from app.core.api.http import get_http_client
+from app.core.api.rate_limit import get_rate_limiter
+from app.core.api.factory import get_response_cache_for
 
 def render(navigate_to):
     st.title("Settings")
@@ -17,20 +18,37 @@ def render(navigate_to):
 
     st.subheader("Data Source Configuration")
 
-    source_options = ["yfinance", "alpha_vantage", "polygon", "finnhub"]
+    source_options = available_providers()
     selected_source = st.selectbox(
         "Select Data Source",
         source_options,
-        index=source_options.index(current_source) if current_source in source_options else 0
+        index=source_options.index(current_source) if current_source in source_options else 0,
+        format_func=lambda name: get_provider_spec(name).label
+    )
+
+    current_fallbacks = [n for n in config.get("api_sources") or [] if n != selected_source and n in source_options]
+    fallbacks = st.multiselect(
+        "Fallback Sources",
+        [n for n in source_options if n != selected_source],
+        default=current_fallbacks,
+        format_func=lambda name: get_provider_spec(name).label,
+        help="Tried in this order when the selected source fails or is rate limited. "
+             "A source that keeps failing is skipped for a minute."
     )
 
     st.markdown("---")
     st.subheader("API Keys")
     st.caption("Enter keys for the services you wish to use.")
 
-    av_key = st.text_input("Alpha Vantage Key", value=api_keys.get("alpha_vantage", ""), type="password")
-    poly_key = st.text_input("Polygon.io Key", value=api_keys.get("polygon", ""), type="password")
-    finn_key = st.text_input("Finnhub Key", value=api_keys.get("finnhub", ""), type="password")
+    new_keys = dict(api_keys)
+    for name in source_options:
+        spec = get_provider_spec(name)
+        if spec.needs_key:
+            new_keys[name] = st.text_input(f"{spec.label} Key", value=api_keys.get(name, ""), type="password")
+
+    streaming = config.get("streaming", {})
+    live = st.checkbox("Stream live trades to the dashboard", value=bool(streaming.get("enabled")),
+                       help="Uses the Finnhub trade websocket, with the Finnhub key above.")
 
     # Test Connection Section
     st.markdown("---")
@@ -43,26 +61,13 @@ def render(navigate_to):
                 try:
                     # Instantiate source based on current inputs (not saved config)
                     source = None
-                    if selected_source == "yfinance":
-                        source = YFinanceSource()
-                    elif selected_source == "alpha_vantage":
-                        if not av_key:
-                            st.error("Please enter an Alpha Vantage API Key.")
-                        else:
-                            source = AlphaVantageSource(av_key)
-                    elif selected_source == "polygon":
-                        if not poly_key:
-                            st.error("Please enter a Polygon.io API Key.")
-                        else:
-                            source = PolygonSource(poly_key)
-                    elif selected_source == "finnhub":
-                        if not finn_key:
-                            st.error("Please enter a Finnhub API Key.")
-                        else:
-                            source = FinnhubSource(finn_key)
+                    try:
+                        source = create_provider(selected_source, new_keys.get(selected_source))
+                    except ValueError:
+                        st.error(f"Please enter an API key for {get_provider_spec(selected_source).label}.")
 
                     if source:
-                        # Test with a standard ticker
+                        # Test with a standard ticker, uncached: cached answers don't depend on the key or URL
                         info = source.get_ticker_info("AAPL")
                         st.success(f"Connection Successful! Fetched info for: {info.get('name')}")
                         st.json(info)
@@ -70,20 +75,55 @@ def render(navigate_to):
                 except Exception as e:
                     st.error(f"Connection Failed: {e}")
 
+    st.markdown("---")
+    st.subheader("API Quota")
+    st.caption("Requests are delayed to stay within each provider's free-tier limits. Daily counts reset at 00:00 UTC.")
+    limiter = get_rate_limiter()
+    quota_cols = st.columns(len(limiter.limits))
+    for col, provider in zip(quota_cols, limiter.limits):
+        quota = limiter.remaining(provider)
+        with col:
+            st.markdown(f"**{provider}**")
+            if quota["minute_limit"] is not None:
+                st.caption(f"This minute: {quota['minute']}/{quota['minute_limit']}")
+            if quota["day_limit"] is not None:
+                st.progress(quota["day"] / quota["day_limit"], text=f"Today: {quota['day']}/{quota['day_limit']} left")
+
+    with st.expander("Connection Statistics"):
+        stats = get_http_client().stats()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Requests", stats["requests"])
+        c2.metric("Retries", stats["retries"])
+        c3.metric("Connections Opened", stats["connections_opened"])
+        c4.metric("Connection Reuse", f"{stats['connection_reuse']:.0%}")
+
+    if hasattr(ctrl.api, "provider_stats"):
+        with st.expander("Provider Health"):
+            st.dataframe(pd.DataFrame.from_dict(ctrl.api.stats(), orient="index"), width="stretch")
+
+    with st.expander("Response Cache"):
+        cache = get_response_cache_for(config)
+        stats = cache.stats()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Hits", stats["hits"])
+        c2.metric("Misses", stats["misses"])
+        c3.metric("Entries", stats["entries"])
+        c4.metric("Size", f"{stats['size_bytes'] / 1024 / 1024:.1f} MB")
+        if st.button("Clear Cache"):
+            cache.clear()
+            st.success("Cache cleared.")
+
     # Save Section
     st.markdown("---")
     if st.button("Save Settings", type="primary"):
-        new_keys = {
-            "alpha_vantage": av_key,
-            "polygon": poly_key,
-            "finnhub": finn_key
-        }
-
         # Save to config
         config.set("api_source", selected_source)
         config.set("api_keys", new_keys)
+        config.set("api_sources", [selected_source] + fallbacks)
+        config.set("streaming", dict(streaming, enabled=live))
 
         # Reload controller
         ctrl.reload_api_source()
+        ctrl.reset_quote_stream()
 
         st.success("Settings saved successfully and API source reloaded.")
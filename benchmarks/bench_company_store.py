@@ -0,0 +1,83 @@
+"""
+Benchmark: company data storage.
+
+Writes synthetic but realistically shaped fundamentals (yfinance, Alpha
+Vantage and Finnhub style payloads) in the legacy indented JSON format and
+in CompanyStore's sectioned zip format, and compares disk usage and load
+times for the full data, the profile only and a single statement.
+
+    python -m benchmarks.bench_company_store --tickers 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from app.core.company_store import CompanyStore, orjson
+from benchmarks.data import COMPANY_MAKERS
+
+MAKERS = COMPANY_MAKERS
+
+
+def timed(fn, tickers):
+    start = time.perf_counter()
+    for t in tickers:
+        fn(t)
+    return (time.perf_counter() - start) * 1000 / len(tickers)
+
+
+def dir_size(path: str, suffix: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path) if f.endswith(suffix))
+
+
+def run(tickers: int, provider: str):
+    rng = np.random.default_rng(0)
+    names = [f"T{i:04d}" for i in range(tickers)]
+    payloads = {t: MAKERS[provider](rng, t) for t in names}
+    statement = next(k for k in payloads[names[0]] if k != "info")
+
+    with tempfile.TemporaryDirectory() as legacy_dir, tempfile.TemporaryDirectory() as new_dir:
+        legacy = CompanyStore(legacy_dir)
+        store = CompanyStore(new_dir)
+
+        def save_legacy(t):
+            with open(legacy.legacy_path(t), "w") as f:
+                json.dump(payloads[t], f, indent=4)
+
+        def load_legacy(t):
+            with open(legacy.legacy_path(t)) as f:
+                json.load(f)
+
+        save_legacy_ms = timed(save_legacy, names)
+        save_ms = timed(lambda t: store.save(t, payloads[t]), names)
+        legacy_size = dir_size(legacy_dir, ".json")
+        size = dir_size(new_dir, ".zip")
+
+        results = [
+            ("save", save_legacy_ms, save_ms),
+            ("load all", timed(load_legacy, names), timed(store.load, names)),
+            ("load profile", None, timed(lambda t: store.load(t, ["info"]), names)),
+            (f"load {statement}", None, timed(lambda t: store.load(t, [statement]), names)),
+        ]
+
+    print(f"{tickers} tickers, {provider} payloads, codec: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'size per ticker:':27} legacy {legacy_size / tickers / 1024:8.1f}KB  "
+          f"sectioned {size / tickers / 1024:8.1f}KB  ({legacy_size / size:.1f}x smaller)")
+    for name, old, new in results:
+        old_text = f"{old:8.2f}ms" if old is not None else "       -  "
+        print(f"{name + ':':27} legacy {old_text}  sectioned {new:8.2f}ms per ticker")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--provider", choices=list(MAKERS), default=None, help="Payload shape (all by default)")
+    args = parser.parse_args()
+    for provider in [args.provider] if args.provider else list(MAKERS):
+        run(args.tickers, provider)
@@ -0,0 +1,64 @@
+"""
+Benchmark: watchlist summary metrics for the dashboard.
+
+Times building the aligned close panel plus computing all metrics, and the
+controller's cold (every ticker read from disk), warm (nothing changed)
+and one-ticker-changed summary.
+
+    python -m benchmarks.bench_dashboard --tickers 1000 --years 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.analytics import close_panel, watchlist_metrics
+from app.core.controller import StockAppController
+from app.core.storage_manager import StorageManager
+from benchmarks.data import make_closes
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(tickers: int, years: int, price_storage: str):
+    closes = make_closes(tickers, years)
+    _, panel_ms = timed(lambda: watchlist_metrics(close_panel(closes)))
+    print(f"{tickers} tickers x {years}y")
+    print(f"panel + metrics (in memory): {panel_ms:8.1f}ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = StorageManager(db_path=os.path.join(tmp, "stocks.db"), storage_path=tmp,
+                                 price_storage=price_storage)
+        storage.add_stocks([{"ticker": t} for t in closes])
+        for ticker, series in closes.items():
+            storage.save_price_data(ticker, series.to_frame("Close"))
+        ctrl = StockAppController(storage=storage, api=MagicMock())
+
+        _, cold = timed(ctrl.get_watchlist_summary)
+        _, warm = timed(ctrl.get_watchlist_summary)
+        first = next(iter(closes))
+        storage.append_price_data(first, pd.DataFrame({"Close": [1.0]}, index=pd.to_datetime(["2025-01-02"])))
+        _, changed = timed(ctrl.get_watchlist_summary)
+
+    print(f"controller ({price_storage}) cold:      {cold:8.1f}ms")
+    print(f"controller ({price_storage}) unchanged: {warm:8.1f}ms")
+    print(f"controller ({price_storage}) 1 changed: {changed:8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--price-storage", default="parquet")
+    args = parser.parse_args()
+    run(args.tickers, args.years, args.price_storage)
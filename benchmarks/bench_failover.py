@@ -0,0 +1,112 @@
+"""
+Benchmark: provider failover.
+
+Three simulated providers sleep for a lognormal latency with an occasional
+slow outlier. Halfway through the run the primary goes down (every call
+fails after a short timeout). Compares the primary alone, FailoverDataSource
+and FailoverDataSource with hedged requests: successful calls per second and
+p50/p95/p99 latency of the calls.
+
+    python -m benchmarks.bench_failover --calls 400 --workers 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from app.core.api.base import StockDataSource
+from app.core.api.failover import FailoverDataSource
+
+
+class SimulatedSource(StockDataSource):
+    def __init__(self, name: str, median_ms: float, outlier_rate: float = 0.03, outlier_ms: float = 400,
+                 down_after=None, timeout_ms: float = 100, seed: int = 0):
+        self.name = name
+        self.median = median_ms / 1000
+        self.outlier_rate = outlier_rate
+        self.outlier = outlier_ms / 1000
+        self.down_after = down_after
+        self.timeout = timeout_ms / 1000
+        self.calls = 0
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def _latency(self) -> float:
+        with self._lock:
+            self.calls += 1
+            down = self.down_after is not None and self.down_after.is_set()
+            outlier = self._rng.random() < self.outlier_rate
+            latency = self.median * float(self._rng.lognormal(0, 0.3))
+        if down:
+            time.sleep(self.timeout)
+            raise ValueError(f"{self.name}: 503 Service Unavailable")
+        time.sleep(self.outlier if outlier else latency)
+
+    def get_ticker_info(self, ticker):
+        self._latency()
+        return {"name": ticker}
+
+    def get_price_history(self, ticker, period="1y", start=None):
+        self._latency()
+        return pd.DataFrame()
+
+    def get_financials(self, ticker):
+        self._latency()
+        return {}
+
+
+def run_case(label: str, make_source, calls: int, workers: int):
+    outage = threading.Event()
+    source = make_source(outage)
+    latencies, failures = [], 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal failures
+        if i == calls // 2:
+            outage.set()
+        start = time.perf_counter()
+        try:
+            source.get_ticker_info(f"T{i}")
+            ok = True
+        except ValueError:
+            ok = False
+        with lock:
+            latencies.append(time.perf_counter() - start)
+            failures += not ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, range(calls)))
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    print(f"{label:22} {(calls - failures) / elapsed:8.1f} ok/s  failed {failures:4d}  "
+          f"p50 {np.percentile(ms, 50):7.1f}ms  p95 {np.percentile(ms, 95):7.1f}ms  p99 {np.percentile(ms, 99):7.1f}ms")
+
+
+def run(calls: int, workers: int):
+    def providers(outage):
+        return [("primary", SimulatedSource("primary", 20, down_after=outage, seed=1)),
+                ("backup", SimulatedSource("backup", 35, seed=2)),
+                ("last_resort", SimulatedSource("last_resort", 60, seed=3))]
+
+    print(f"{calls} calls on {workers} threads, primary down after {calls // 2}")
+    run_case("primary only", lambda outage: providers(outage)[0][1], calls, workers)
+    run_case("failover", lambda outage: FailoverDataSource(providers(outage), reset_timeout=1.0), calls, workers)
+    run_case("failover + hedging", lambda outage: FailoverDataSource(providers(outage), reset_timeout=1.0,
+                                                                       hedge=True), calls, workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    run(args.calls, args.workers)
@@ -0,0 +1,90 @@
+"""
+Benchmark: bulk watchlist import.
+
+Imports a synthetic book of ISINs (resolved through a generated mapping
+file) against a simulated provider that takes --latency-ms per
+get_ticker_info call, and compares it with validating and inserting the
+same tickers one at a time, the way the single-stock form does (without
+its initial data fetch, which the importer queues instead).
+
+    python -m benchmarks.bench_import --rows 1500 --latency-ms 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.api.base import StockDataSource
+from app.core.api.resolver import DataResolver, isin_checksum_ok
+from app.core.controller import StockAppController
+from app.core.importer import WatchlistImporter
+from app.core.storage_manager import StorageManager
+
+
+class SlowSource(StockDataSource):
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def get_ticker_info(self, ticker):
+        time.sleep(self.latency)
+        return {"name": f"{ticker} Corp", "sector": "Technology"}
+
+    def get_price_history(self, ticker, period="1y", start=None):
+        return pd.DataFrame()
+
+    def get_financials(self, ticker):
+        return {}
+
+
+def make_isin(i: int) -> str:
+    body = f"US{i:09d}"
+    return next(body + str(d) for d in range(10) if isin_checksum_ok(body + str(d)))
+
+
+def make_controller(tmp: str, name: str, latency: float, mapping: str) -> StockAppController:
+    storage = StorageManager(db_path=os.path.join(tmp, f"{name}.db"), storage_path=os.path.join(tmp, name))
+    ctrl = StockAppController(storage=storage, api=SlowSource(latency))
+    ctrl.resolver = DataResolver(mapping)
+    return ctrl
+
+
+def run(rows: int, latency_ms: float, max_workers: int):
+    isins = [make_isin(i) for i in range(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        mapping = os.path.join(tmp, "isin_mapping.csv")
+        with open(mapping, "w") as f:
+            f.write("ISIN,Ticker\n")
+            f.writelines(f"{isin},T{i:05d}\n" for i, isin in enumerate(isins))
+
+        ctrl = make_controller(tmp, "one_by_one", latency_ms / 1000, mapping)
+        start = time.perf_counter()
+        for isin in isins:
+            ticker, isin = ctrl.resolve_identifier(isin)
+            info = ctrl.api.get_ticker_info(ticker)
+            ctrl.storage.add_stock(ticker, isin, info.get("name"), info.get("sector"))
+        one_by_one = time.perf_counter() - start
+
+        ctrl = make_controller(tmp, "bulk", latency_ms / 1000, mapping)
+        start = time.perf_counter()
+        results = WatchlistImporter(ctrl, max_workers=max_workers).run(
+            [{"row": i + 2, "identifier": isin, "ticker": None, "isin": None} for i, isin in enumerate(isins)])
+        bulk = time.perf_counter() - start
+        added = sum(r["status"] == "added" for r in results)
+
+    print(f"{rows} ISINs, {latency_ms:.0f}ms per provider call, {max_workers} workers")
+    print(f"one at a time: {one_by_one:8.2f}s")
+    print(f"bulk import:   {bulk:8.2f}s ({added} added, {one_by_one / bulk:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--max-workers", type=int, default=8)
+    args = parser.parse_args()
+    run(args.rows, args.latency_ms, args.max_workers)
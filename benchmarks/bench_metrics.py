@@ -0,0 +1,77 @@
+"""
+Benchmark: instrumentation overhead.
+
+Times a no-op call bare, through metrics.timer, metrics.timed (as on the
+StorageManager methods) and through InstrumentedDataSource, plus render_prometheus() with a realistic number of
+series (providers x methods, storage ops, views).
+
+    python -m benchmarks.bench_metrics --calls 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core import metrics
+from app.core.api.base import StockDataSource
+from app.core.api.instrumented import InstrumentedDataSource
+
+
+class NoopSource(StockDataSource):
+    provider_name = "noop"
+
+    def get_ticker_info(self, ticker):
+        return {}
+
+    def get_price_history(self, ticker, period="1y", start=None):
+        return pd.DataFrame()
+
+    def get_financials(self, ticker):
+        return {}
+
+
+def per_call(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(calls: int):
+    source = NoopSource()
+    wrapped = InstrumentedDataSource(source)
+
+    def timed():
+        with metrics.timer("stockhelper_storage_op_seconds", op="bench"):
+            pass
+
+    @metrics.timed("stockhelper_storage_op_seconds", op="bench")
+    def decorated():
+        pass
+
+    bare = per_call(lambda: source.get_ticker_info("AAPL"), calls)
+    print(f"bare call              {bare:6.2f} us")
+    print(f"metrics.timer          {per_call(timed, calls):6.2f} us")
+    print(f"metrics.timed          {per_call(decorated, calls):6.2f} us")
+    print(f"InstrumentedDataSource {per_call(lambda: wrapped.get_ticker_info('AAPL'), calls) - bare:6.2f} us overhead")
+
+    for provider in ("yfinance", "alpha_vantage", "polygon", "finnhub"):
+        for method in ("get_ticker_info", "get_price_history", "get_financials", "get_price_history_batch"):
+            metrics.observe("stockhelper_provider_latency_seconds", 0.1, provider=provider, method=method)
+            metrics.inc("stockhelper_provider_calls_total", provider=provider, method=method, outcome="ok")
+    for op in range(15):
+        metrics.observe("stockhelper_storage_op_seconds", 0.001, op=f"op{op}")
+    start = time.perf_counter()
+    text = metrics.render_prometheus()
+    print(f"render_prometheus      {(time.perf_counter() - start) * 1000:6.2f} ms ({len(text.splitlines())} lines)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+    run(args.calls)
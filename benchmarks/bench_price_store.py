@@ -0,0 +1,49 @@
+"""
+Benchmark: price storage backends (CSV vs Parquet vs memory-mapped NumPy).
+
+Measures write, full read, a one-month window read, a single-column read,
+last-date lookup and on-disk size for a synthetic daily OHLCV history.
+
+    python -m benchmarks.bench_price_store --years 30 --repeat 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+from app.core.price_store import PRICE_STORES, get_price_store
+from benchmarks.data import make_history, timeit
+
+
+def disk_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def run(years: int, repeat: int):
+    df = make_history(years)
+    window_start, window_end = df.index[-21], df.index[-1]
+    print(f"{len(df)} bars ({years}y), best of {repeat}")
+    print(f"{'backend':<10}{'write':>10}{'read':>10}{'window':>10}{'column':>10}{'last':>10}{'size':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in PRICE_STORES:
+            store = get_price_store(name, tmp)
+            write = timeit(lambda: store.save("BENCH", df), repeat)
+            read = timeit(lambda: store.load("BENCH"), repeat)
+            window = timeit(lambda: store.load("BENCH", start=window_start, end=window_end), repeat)
+            column = timeit(lambda: store.load("BENCH", columns=["Close"]), repeat)
+            last = timeit(lambda: store.last_date("BENCH"), repeat)
+            size = disk_size(store.path("BENCH")) / 1024
+            print(f"{name:<10}{write:>8.2f}ms{read:>8.2f}ms{window:>8.2f}ms{column:>8.2f}ms{last:>8.2f}ms{size:>9.0f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.years, args.repeat)
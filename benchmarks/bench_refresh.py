@@ -0,0 +1,74 @@
+"""
+Benchmark: sequential vs concurrent watchlist refresh.
+
+Uses a fake StockDataSource that sleeps to simulate network latency, so the
+numbers only reflect how well the controller overlaps I/O.
+
+    python -m benchmarks.bench_refresh --tickers 100 --latency 0.05 --workers 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Dict, Any, Optional
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.api.base import StockDataSource
+from app.core.controller import StockAppController
+from app.core.storage_manager import StorageManager
+
+
+class LatencySource(StockDataSource):
+    """Returns canned data after sleeping for `latency` seconds per call."""
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def get_ticker_info(self, ticker: str) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return {"name": f"{ticker} Corp", "sector": "Technology", "full_info": {}}
+
+    def get_price_history(self, ticker: str, period: str = "1y", start: Optional[date] = None) -> pd.DataFrame:
+        time.sleep(self.latency)
+        end = pd.Timestamp.today().normalize()
+        index = pd.bdate_range(start=start, end=end) if start else pd.bdate_range(end=end, periods=252)
+        return pd.DataFrame({"Close": range(len(index))}, index=index, dtype=float)
+
+    def get_financials(self, ticker: str) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return {"income_statement": {}, "balance_sheet": {}, "cashflow": {}}
+
+
+def run(n_tickers: int, latency: float, workers: int):
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = StorageManager(db_path=os.path.join(tmp, "stocks.db"), storage_path=os.path.join(tmp, "companies"))
+        ctrl = StockAppController(storage=storage, api=LatencySource(latency))
+
+        start = time.perf_counter()
+        for t in tickers:
+            ctrl.update_stock_data(t, full=True)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = ctrl.refresh_all(tickers, max_workers=workers, full=True)
+        concurrent = time.perf_counter() - start
+
+    failed = sum(1 for e in results.values() if e)
+    print(f"tickers={n_tickers} latency={latency * 1000:.0f}ms workers={workers}")
+    print(f"  sequential: {sequential:8.2f}s")
+    print(f"  concurrent: {concurrent:8.2f}s  ({failed} failed)")
+    print(f"  speedup:    {sequential / concurrent:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per simulated API call")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+    run(args.tickers, args.latency, args.workers)
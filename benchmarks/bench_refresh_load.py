@@ -0,0 +1,135 @@
+"""
+Load test: full-watchlist refresh against the provider stand-in server.
+
+Serves synthetic responses for one provider from app.core.api.standin with
+lognormal latency, slow outliers, injected 5xx errors and optionally the
+provider's per-minute quota, then refreshes a watchlist through the real
+source class, HttpClient retries, RateLimiter and StockAppController.
+Reports refresh throughput, failed tickers, per-call latency percentiles
+(from app.core.metrics) and what the server answered.
+
+    python -m benchmarks.bench_refresh_load --provider polygon --tickers 200 --workers 8
+    python -m benchmarks.bench_refresh_load --provider finnhub --per-minute 300 --error-rate 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from app.core import metrics
+from app.core.api.http import HttpClient
+from app.core.api.instrumented import InstrumentedDataSource
+from app.core.api.rate_limit import RateLimiter
+from app.core.api.registry import create_provider
+from app.core.api.standin import Behavior, Recordings, StandInServer, write_recording
+from app.core.controller import StockAppController
+from app.core.storage_manager import StorageManager
+from benchmarks import data
+
+TEMPLATE = "BENCH"
+
+
+def write_recordings(directory: str, provider: str, tickers, years: int):
+    """Responses for the TEMPLATE symbol, replayed for every ticker. Polygon also gets grouped daily bars."""
+    rng = np.random.default_rng(0)
+    if provider == "alpha_vantage":
+        write_recording(directory, provider, "", {"function": "OVERVIEW", "symbol": TEMPLATE},
+                        data.alpha_vantage_overview(rng, TEMPLATE))
+        write_recording(directory, provider, "", {"function": "TIME_SERIES_DAILY", "symbol": TEMPLATE,
+                                                  "outputsize": "full"}, data.alpha_vantage_daily(TEMPLATE, years))
+        for function in ("INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW"):
+            write_recording(directory, provider, "", {"function": function, "symbol": TEMPLATE},
+                            data.alpha_vantage_statement(rng, TEMPLATE, 5))
+    elif provider == "polygon":
+        write_recording(directory, provider, f"/v3/reference/tickers/{TEMPLATE}", {},
+                        {"results": {"ticker": TEMPLATE, "name": "Bench Corp", "locale": "us",
+                                     "sic_description": "SERVICES-PREPACKAGED SOFTWARE", "currency_name": "usd"}})
+        write_recording(directory, provider, f"/v2/aggs/ticker/{TEMPLATE}/range/1/day/2024-01-01/2024-12-31",
+                        {"sort": "asc", "limit": 50000}, data.polygon_aggs(TEMPLATE, years))
+        write_recording(directory, provider, "/vX/reference/financials", {"ticker": TEMPLATE, "limit": 5},
+                        {"results": [{"fiscal_period": f"Q{q}", "financials": {"income_statement": {
+                            f"item{i}": {"value": float(rng.normal(1e9, 1e8))} for i in range(40)}}}
+                            for q in range(1, 5)]})
+        bar = {"o": 100.0, "h": 101.0, "l": 99.0, "c": 100.5, "v": 1e6, "vw": 100.2, "n": 5000}
+        write_recording(directory, provider, "/v2/aggs/grouped/locale/us/market/stocks/2024-12-31",
+                        {"adjusted": "true"}, {"results": [dict(bar, T=t) for t in tickers]})
+    elif provider == "finnhub":
+        write_recording(directory, provider, "/stock/profile2", {"symbol": TEMPLATE},
+                        {"ticker": TEMPLATE, "name": "Bench Corp", "finnhubIndustry": "Technology",
+                         "country": "US", "currency": "USD", "weburl": "https://bench.example"})
+        write_recording(directory, provider, "/stock/candle", {"symbol": TEMPLATE, "resolution": "D"},
+                        data.finnhub_candles(years))
+        financials = data.make_finnhub(rng, TEMPLATE, years=5)
+        write_recording(directory, provider, "/stock/financials-reported", {"symbol": TEMPLATE},
+                        {"symbol": TEMPLATE, "data": financials["financials_reported"]})
+        write_recording(directory, provider, "/stock/metric", {"symbol": TEMPLATE, "metric": "all"},
+                        {"symbol": TEMPLATE, "metric": financials["basic_financials"]})
+    else:
+        raise ValueError(f"No stand-in for provider '{provider}'")
+
+
+def run(args):
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    behavior = Behavior(median_ms=args.latency_ms, sigma=args.sigma, outlier_rate=args.outlier_rate,
+                        outlier_ms=args.outlier_ms, error_rate=args.error_rate, per_minute=args.per_minute)
+    client_limits = {"per_minute": args.per_minute if args.client_limit else None, "per_day": None}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_recordings(os.path.join(tmp, "recordings"), args.provider, tickers, args.years)
+        recordings = Recordings.load(os.path.join(tmp, "recordings"))
+
+        with StandInServer(recordings, {args.provider: behavior}, seed=args.seed) as server:
+            source = create_provider(args.provider, "bench", base_url=server.base_urls()[args.provider])
+            source.http = HttpClient(max_retries=args.retries, backoff_factor=0.2, pool_size=args.workers)
+            source.rate_limiter = RateLimiter(limits={args.provider: client_limits})
+
+            storage = StorageManager(db_path=os.path.join(tmp, "stocks.db"), storage_path=os.path.join(tmp, "companies"))
+            storage.add_stocks([{"ticker": t} for t in tickers])
+            ctrl = StockAppController(storage=storage, api=InstrumentedDataSource(source))
+
+            metrics.REGISTRY.reset()
+            start = time.perf_counter()
+            results = ctrl.refresh_all(tickers, max_workers=args.workers)
+            elapsed = time.perf_counter() - start
+            served = server.stats().get(args.provider, {})
+
+    failed = sum(1 for e in results.values() if e)
+    print(f"{args.provider}: {len(tickers)} tickers, {args.workers} workers, median {args.latency_ms:.0f}ms, "
+          f"errors {args.error_rate:.0%}, per-minute quota {args.per_minute or 'none'}"
+          f"{'' if args.client_limit or not args.per_minute else ' (client unaware)'}")
+    print(f"refresh: {elapsed:7.2f}s  {len(tickers) / elapsed:7.1f} tickers/s  failed {failed}")
+    for row in metrics.summary("stockhelper_provider_latency_seconds"):
+        print(f"  {row['method']:26} calls {row['count']:5d}  p50 {row['p50_ms']:7.1f}ms  "
+              f"p95 {row['p95_ms']:7.1f}ms  p99 {row['p99_ms']:7.1f}ms")
+    http = source.http.stats()
+    print(f"client:  {http['requests']} requests, {http['retries']} retries, {http['failures']} failures, "
+          f"rate limit waits {source.rate_limiter.total_wait:.1f}s")
+    print("server:  " + ", ".join(f"{k} {v}" for k, v in sorted(served.items())))
+    if failed and args.verbose:
+        for ticker, error in list((t, e) for t, e in results.items() if e)[:10]:
+            print(f"  {ticker}: {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", choices=["alpha_vantage", "polygon", "finnhub"], default="polygon")
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--outlier-rate", type=float, default=0.01)
+    parser.add_argument("--outlier-ms", type=float, default=1500)
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Share of calls answered with a 5xx")
+    parser.add_argument("--per-minute", type=int, default=None, help="Emulated per-minute quota")
+    parser.add_argument("--no-client-limit", dest="client_limit", action="store_false",
+                        help="Don't let the client's RateLimiter know about the quota")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print some of the errors")
+    run(parser.parse_args())
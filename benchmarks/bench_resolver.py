@@ -0,0 +1,71 @@
+"""
+Benchmark: offline identifier resolution.
+
+Writes a synthetic mapping file (ISIN;Symbol;Security Name) and times
+building the IdentifierIndex from it, plus DataResolver.resolve_many (first
+and repeated call) over a mix of known ISINs, known tickers, company names,
+unknown valid ISINs and unknown tickers.
+
+    python -m benchmarks.bench_resolver --rows 100000 --lookups 50000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from app.core.api.resolver import DataResolver, get_identifier_index, isin_checksum_ok
+
+ALPHABET = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"))
+
+
+def make_isins(n: int, rng) -> list:
+    bodies = ["US" + "".join(chars) for chars in ALPHABET[rng.integers(0, 36, (n, 9))]]
+    return [next(b + str(d) for d in range(10) if isin_checksum_ok(b + str(d))) for b in bodies]
+
+
+def run(rows: int, lookups: int):
+    rng = np.random.default_rng(0)
+    isins = make_isins(rows + lookups // 5, rng)
+    known, unknown = isins[:rows], isins[rows:]
+    tickers = [f"T{i:06d}" for i in range(rows)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "isin_mapping.csv")
+        with open(path, "w") as f:
+            f.write("ISIN;Symbol;Security Name\n")
+            f.writelines(f"{isin};{ticker};{ticker} Holdings Inc.\n" for isin, ticker in zip(known, tickers))
+
+        start = time.perf_counter()
+        get_identifier_index(path)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        picks = rng.integers(0, rows, lookups)
+        identifiers = []
+        for i, p in enumerate(picks):
+            kind = i % 5
+            identifiers.append([known[p], tickers[p], f"{tickers[p]} holdings", unknown[i // 5], f"X{p}"][kind])
+        resolver = DataResolver(path)
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            results = resolver.resolve_many(identifiers)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    resolved = sum(1 for ticker, isin in results if ticker and isin)
+    print(f"mapping with {rows} rows, {lookups} identifiers ({resolved} resolved to ticker and ISIN)")
+    print(f"build index:  {build_ms:8.1f}ms")
+    print(f"resolve_many: {timings[0]:8.1f}ms first call (builds the name index), "
+          f"{timings[1]:.1f}ms after ({timings[1] * 1000 / lookups:.2f}us per identifier)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=50000)
+    args = parser.parse_args()
+    run(args.rows, args.lookups)
@@ -0,0 +1,82 @@
+"""
+Benchmark: app startup.
+
+Runs each measurement in a fresh interpreter:
+  - import time of the core (controller + configured data source)
+  - time to first render of app/main.py (the dashboard) through Streamlit's AppTest
+and lists which heavy provider libraries ended up imported.
+
+    python -m benchmarks.bench_startup --source polygon --repeat 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from app.core.controller import StockAppController
+ctrl = StockAppController()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "yfinance": "yfinance" in sys.modules, "requests": "requests" in sys.modules}))
+"""
+
+RENDER_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "errors": [str(e.value) for e in at.exception],
+                  "yfinance": "yfinance" in sys.modules}))
+"""
+
+
+def run_snippet(snippet: str, workdir: str, *args: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-c", snippet, *args], cwd=workdir, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def make_workdir(tmp: str, source: str) -> str:
+    """A throwaway working directory with its own config and empty data, so runs don't touch data/."""
+    os.makedirs(os.path.join(tmp, "config"))
+    config = {
+        "api_source": source,
+        "api_keys": {source: "benchmark"},
+        "storage_path": os.path.join(tmp, "data", "companies"),
+        "db_path": os.path.join(tmp, "data", "stocks.db"),
+    }
+    with open(os.path.join(tmp, "config", "config.json"), "w") as f:
+        json.dump(config, f)
+    return tmp
+
+
+def run(source: str, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = make_workdir(tmp, source)
+        imports = [run_snippet(IMPORT_SNIPPET, workdir) for _ in range(repeat)]
+        renders = [run_snippet(RENDER_SNIPPET, workdir, os.path.join(ROOT, "app", "main.py")) for _ in range(repeat)]
+
+    print(f"source={source}, best of {repeat}")
+    print(f"import core + create source: {min(r['seconds'] for r in imports) * 1000:8.1f}ms "
+          f"(yfinance imported: {imports[0]['yfinance']})")
+    print(f"first render (dashboard):    {min(r['seconds'] for r in renders) * 1000:8.1f}ms "
+          f"(yfinance imported: {renders[0]['yfinance']})")
+    errors = [e for r in renders for e in r["errors"]]
+    if errors:
+        print(f"render errors: {errors[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="polygon", help="Configured provider (a key is filled in)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.source, args.repeat)
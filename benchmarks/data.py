@@ -0,0 +1,191 @@
+"""
+Synthetic data shared by the benchmarks: price histories, company
+fundamentals and provider HTTP payloads shaped like the real responses.
+Everything is generated from fixed seeds, so runs are comparable.
+"""
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+STATEMENTS = ["income_statement", "balance_sheet", "cashflow"]
+
+
+def make_history(years: int, seed: int = 0) -> pd.DataFrame:
+    """Daily OHLCV bars ending 2024-12-31."""
+    index = pd.bdate_range(end="2024-12-31", periods=252 * years, name="Date")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, len(index))),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, len(index)),
+    }, index=index)
+
+
+def make_closes(tickers: int, years: int, seed: int = 0) -> Dict[str, pd.Series]:
+    index = pd.bdate_range(end="2024-12-31", periods=252 * years, name="Date")
+    rng = np.random.default_rng(seed)
+    paths = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(index), tickers)), axis=0))
+    return {f"T{i:04d}": pd.Series(paths[:, i], index=index) for i in range(tickers)}
+
+
+def make_trades(closes: Dict[str, pd.Series], per_ticker: int = 4, seed: int = 0) -> List[Dict[str, Any]]:
+    """An opening buy per ticker, then per_ticker - 1 buys and partial sells at the day's close, by date."""
+    rng = np.random.default_rng(seed)
+    trades = []
+    for ticker, series in closes.items():
+        rows = np.sort(rng.choice(len(series), per_ticker, replace=False))
+        held = 0.0
+        for i, row in enumerate(rows):
+            quantity = float(rng.integers(10, 100)) if i == 0 or rng.random() < 0.6 else -held / 2
+            held += quantity
+            trades.append({"ticker": ticker, "date": series.index[row].strftime("%Y-%m-%d"), "quantity": quantity,
+                           "price": float(series.iloc[row]), "fees": 1.0})
+    trades.sort(key=lambda t: t["date"])
+    for i, t in enumerate(trades):
+        t["id"] = i + 1
+    return trades
+
+
+def timeit(fn: Callable[[], Any], repeat: int) -> float:
+    """Best-of-n wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+# Company data as StorageManager.save_company_data receives it, per provider
+
+def make_info(rng, ticker: str) -> dict:
+    raw = {f"field{i}": float(rng.normal(100, 30)) for i in range(110)}
+    raw.update({"longName": f"{ticker} Corporation", "sector": "Technology", "industry": "Software",
+                "longBusinessSummary": " ".join(["The company designs and sells products and services."] * 25),
+                "companyOfficers": [{"name": f"Officer {i}", "title": "VP", "totalPay": 1_000_000 + i}
+                                    for i in range(10)]})
+    return {"name": raw["longName"], "sector": "Technology", "industry": "Software", "country": "United States",
+            "currency": "USD", "website": f"https://{ticker.lower()}.example", "summary": raw["longBusinessSummary"],
+            "full_info": raw}
+
+
+def make_yfinance(rng, ticker: str, years: int = 4) -> dict:
+    periods = [f"{y}-09-30 00:00:00" for y in range(2025 - years, 2025)]
+    data = {s: {p: {f"{s} item {i}": float(rng.normal(1e9, 1e8)) for i in range(60)} for p in periods}
+            for s in STATEMENTS}
+    data["info"] = make_info(rng, ticker)
+    return data
+
+
+def make_alpha_vantage(rng, ticker: str, years: int = 20) -> dict:
+    data = {s: alpha_vantage_statement(rng, ticker, years) for s in STATEMENTS}
+    data["info"] = make_info(rng, ticker)
+    return data
+
+
+def make_finnhub(rng, ticker: str, years: int = 10) -> dict:
+    def concepts(n):
+        return [{"concept": f"us-gaap_Concept{i}", "label": f"Concept {i}", "unit": "usd",
+                 "value": float(rng.normal(1e9, 1e8))} for i in range(n)]
+    reported = [{"endDate": f"{2024 - i // 4}-{12 - 3 * (i % 4):02d}-31 00:00:00", "quarter": i % 4, "year": 2024,
+                 "report": {"bs": concepts(80), "ic": concepts(40), "cf": concepts(50)}} for i in range(4 * years)]
+    data = {"financials_reported": reported,
+            "basic_financials": {f"metric{i}": float(rng.normal()) for i in range(130)},
+            "info": make_info(rng, ticker)}
+    return data
+
+
+COMPANY_MAKERS = {"yfinance": make_yfinance, "alpha_vantage": make_alpha_vantage, "finnhub": make_finnhub}
+
+
+# Provider responses, as the JSON bodies the REST endpoints return
+
+def alpha_vantage_statement(rng, ticker: str, years: int) -> dict:
+    def reports(n, step):
+        return [dict({"fiscalDateEnding": f"{2024 - i // step}-{12 - 3 * (i % step):02d}-31",
+                      "reportedCurrency": "USD"},
+                     **{f"item{j}": str(int(rng.normal(1e9, 1e8))) for j in range(30)}) for i in range(n)]
+    return {"symbol": ticker, "annualReports": reports(years, 1), "quarterlyReports": reports(4 * years, 4)}
+
+
+def alpha_vantage_daily(ticker: str, years: int) -> dict:
+    """TIME_SERIES_DAILY: bars keyed by date, newest first, values as strings."""
+    df = make_history(years)
+    series = {}
+    for ts, row in zip(df.index[::-1], df.iloc[::-1].itertuples(index=False)):
+        series[ts.strftime("%Y-%m-%d")] = {"1. open": f"{row.Open:.4f}", "2. high": f"{row.High:.4f}",
+                                           "3. low": f"{row.Low:.4f}", "4. close": f"{row.Close:.4f}",
+                                           "5. volume": str(int(row.Volume))}
+    return {"Meta Data": {"1. Information": "Daily Prices (open, high, low, close) and Volumes",
+                          "2. Symbol": ticker, "3. Last Refreshed": df.index[-1].strftime("%Y-%m-%d"),
+                          "4. Output Size": "Full size", "5. Time Zone": "US/Eastern"},
+            "Time Series (Daily)": series}
+
+
+def polygon_aggs(ticker: str, years: int) -> dict:
+    """/v2/aggs/ticker/.../range/1/day: a list of bars with millisecond timestamps."""
+    df = make_history(years)
+    ms = (df.index.asi8 // 1_000_000).tolist()
+    results = [{"v": float(row.Volume), "vw": round(row.Close, 4), "o": round(row.Open, 4), "c": round(row.Close, 4),
+                "h": round(row.High, 4), "l": round(row.Low, 4), "t": t, "n": 50_000}
+               for t, row in zip(ms, df.itertuples(index=False))]
+    return {"ticker": ticker, "queryCount": len(results), "resultsCount": len(results), "adjusted": True,
+            "results": results, "status": "OK", "request_id": "bench", "count": len(results)}
+
+
+def finnhub_candles(years: int) -> dict:
+    """/stock/candle: parallel arrays with second timestamps."""
+    df = make_history(years)
+    return {"c": df["Close"].round(4).tolist(), "h": df["High"].round(4).tolist(), "l": df["Low"].round(4).tolist(),
+            "o": df["Open"].round(4).tolist(), "s": "ok", "t": (df.index.asi8 // 1_000_000_000).tolist(),
+            "v": df["Volume"].tolist()}
+
+
+def alpha_vantage_overview(rng, ticker: str) -> dict:
+    data = {f"Field{i}": str(round(float(rng.normal(100, 30)), 4)) for i in range(50)}
+    data.update({"Symbol": ticker, "Name": f"{ticker} Corporation", "Sector": "TECHNOLOGY",
+                 "Industry": "SERVICES-PREPACKAGED SOFTWARE", "Country": "USA", "Currency": "USD",
+                 "Description": " ".join(["The company designs and sells products and services."] * 25)})
+    return data
+
+
+class ReplayResponse:
+    """The parts of requests.Response the providers use, for a recorded body."""
+    def __init__(self, body: str, status_code: int = 200):
+        self.text = body
+        self.status_code = status_code
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ValueError(f"HTTP {self.status_code}")
+
+
+class ReplayHttp:
+    """
+    Stands in for HttpClient: answers each GET with the recorded body whose
+    route is a substring of the URL (plus the "function" parameter for Alpha
+    Vantage). The body is serialized once, the provider parses it on every call
+    like it would a network response.
+    """
+    def __init__(self, routes: Dict[str, Any]):
+        self.routes = {route: json.dumps(body) for route, body in routes.items()}
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            before_request: Optional[Callable[[], None]] = None) -> ReplayResponse:
+        keys: List[str] = [url]
+        if params and "function" in params:
+            keys.insert(0, f"{url}?function={params['function']}")
+        for key in keys:
+            for route, body in self.routes.items():
+                if route in key:
+                    return ReplayResponse(body)
+        return ReplayResponse("{}", status_code=404)
@@ -0,0 +1,523 @@
+"""
+Benchmark suite: storage, watchlist queries, provider parsing and dashboard
+data preparation, stock comparisons, price chart downsampling, portfolio
+valuation and live quote handling at several data sizes, with machine-readable
+results.
+
+    python -m benchmarks.suite list
+    python -m benchmarks.suite run                        # writes benchmarks/results/<commit>.json
+    python -m benchmarks.suite run -k storage --quick
+    python -m benchmarks.suite compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+
+Every case is timed like timeit does it: one warm-up call, then enough calls
+per sample to last --min-time, --repeat samples. Results are seconds per call.
+compare matches cases by name and parameters and exits with status 1 when a
+median got slower than --threshold times the baseline, so it can gate CI.
+
+Provider cases parse synthetic responses shaped like the real Alpha Vantage,
+Polygon and Finnhub bodies (see benchmarks/data.py), served by a stand-in
+HTTP client: they measure JSON decoding and DataFrame construction, not the
+network. yfinance does its own HTTP and parsing internally, so it has no case.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from app.core.analytics import close_panel, daily_returns, rolling_beta, rolling_correlation, watchlist_metrics
+from app.core.api.alpha_vantage import AlphaVantageSource
+from app.core.api.finnhub import FinnhubSource
+from app.core.api.polygon import PolygonSource
+from app.core.api.rate_limit import RateLimiter
+from app.core.downsample import CHART_POINTS, downsample
+from app.core.panel import PanelCache
+from app.core.portfolio import value_portfolio
+from app.core.storage_manager import StorageManager
+from app.core.streaming import QuoteStream
+from benchmarks import data
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+FORMAT_VERSION = 1
+
+YEARS = [1, 10, 30]
+ROWS = [10, 1000, 10000]
+BACKENDS = ["parquet", "npy", "sqlite"]
+
+
+class Benchmark:
+    """A named case. setup(tmp, **params) prepares the data and returns the function to time."""
+    def __init__(self, name: str, params: Dict[str, List[Any]], setup: Callable[..., Callable[[], Any]]):
+        self.name = name
+        self.params = params
+        self.setup = setup
+
+    def variants(self) -> List[Dict[str, Any]]:
+        keys = list(self.params)
+        return [dict(zip(keys, values)) for values in itertools.product(*(self.params[k] for k in keys))]
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, **params: List[Any]):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, params, setup))
+        return setup
+    return register
+
+
+def case_id(name: str, params: Dict[str, Any]) -> str:
+    if not params:
+        return name
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def _storage(tmp: str, backend: str = "parquet") -> StorageManager:
+    return StorageManager(db_path=os.path.join(tmp, "stocks.db"), storage_path=os.path.join(tmp, "companies"),
+                          price_storage=backend)
+
+
+def _unlimited(source):
+    """No quota waits: the cases measure parsing."""
+    source.rate_limiter = RateLimiter(limits={source.PROVIDER: {}})
+    return source
+
+
+# Storage
+
+@benchmark("storage.save_prices", backend=BACKENDS, years=YEARS)
+def _save_prices(tmp, backend, years):
+    storage = _storage(tmp, backend)
+    df = data.make_history(years)
+    return lambda: storage.save_price_data("BENCH", df)
+
+
+@benchmark("storage.load_prices", backend=BACKENDS, years=YEARS)
+def _load_prices(tmp, backend, years):
+    storage = _storage(tmp, backend)
+    storage.save_price_data("BENCH", data.make_history(years))
+
+    def load():
+        # From disk, not from the in-memory cache
+        storage.memo.clear()
+        return storage.load_price_data("BENCH")
+    return load
+
+
+@benchmark("storage.load_prices_cached", years=YEARS)
+def _load_prices_cached(tmp, years):
+    storage = _storage(tmp)
+    storage.save_price_data("BENCH", data.make_history(years))
+    return lambda: storage.load_price_data("BENCH")
+
+
+@benchmark("storage.save_company", years=YEARS)
+def _save_company(tmp, years):
+    storage = _storage(tmp)
+    payload = data.make_alpha_vantage(np.random.default_rng(0), "BENCH", years=years)
+    return lambda: storage.save_company_data("BENCH", payload)
+
+
+@benchmark("storage.load_company", sections=["all", "info"], years=YEARS)
+def _load_company(tmp, sections, years):
+    storage = _storage(tmp)
+    storage.save_company_data("BENCH", data.make_alpha_vantage(np.random.default_rng(0), "BENCH", years=years))
+    wanted = None if sections == "all" else [sections]
+
+    def load():
+        storage.memo.clear()
+        return storage.load_company_data("BENCH", wanted)
+    return load
+
+
+# Watchlist queries
+
+def _watchlist(tmp, rows) -> StorageManager:
+    storage = _storage(tmp)
+    storage.add_stocks([{"ticker": f"T{i:05d}", "isin": None, "name": f"Company {i}", "sector": "Technology"}
+                        for i in range(rows)])
+    return storage
+
+
+@benchmark("watchlist.get_stocks", rows=ROWS)
+def _get_stocks(tmp, rows):
+    return _watchlist(tmp, rows).get_stocks
+
+
+@benchmark("watchlist.get_stock", rows=ROWS)
+def _get_stock(tmp, rows):
+    storage = _watchlist(tmp, rows)
+    ticker = f"T{rows // 2:05d}"
+    return lambda: storage.get_stock(ticker)
+
+
+@benchmark("watchlist.add_stocks", rows=ROWS)
+def _add_stocks(tmp, rows):
+    storage = _watchlist(tmp, rows)
+    # Re-adding the whole list, as a bulk import of a known watchlist does
+    stocks = [{"ticker": f"T{i:05d}", "isin": None, "name": f"Company {i}", "sector": "Technology"}
+              for i in range(rows)]
+    return lambda: storage.add_stocks(stocks)
+
+
+@benchmark("watchlist.get_due_jobs", rows=ROWS)
+def _get_due_jobs(tmp, rows):
+    storage = _watchlist(tmp, rows)
+    tickers = [s["ticker"] for s in storage.get_stocks()]
+    storage.schedule_jobs(tickers[::2], ["prices"], "2024-01-01T00:00:00")
+    return lambda: storage.get_due_jobs("prices", "2024-06-01T00:00:00", limit=100)
+
+
+# Provider parsing
+
+@benchmark("providers.alpha_vantage.price_history", years=YEARS)
+def _alpha_vantage_prices(tmp, years):
+    http = data.ReplayHttp({"function=TIME_SERIES_DAILY": data.alpha_vantage_daily("BENCH", years)})
+    source = _unlimited(AlphaVantageSource("bench", http=http))
+    start = (pd.Timestamp("2024-12-31") - pd.DateOffset(years=years + 1)).date()
+    return lambda: source.get_price_history("BENCH", start=start)
+
+
+@benchmark("providers.alpha_vantage.ticker_info")
+def _alpha_vantage_info(tmp):
+    http = data.ReplayHttp({"function=OVERVIEW": data.alpha_vantage_overview(np.random.default_rng(0), "BENCH")})
+    source = _unlimited(AlphaVantageSource("bench", http=http))
+    return lambda: source.get_ticker_info("BENCH")
+
+
+@benchmark("providers.alpha_vantage.financials", years=YEARS)
+def _alpha_vantage_financials(tmp, years):
+    rng = np.random.default_rng(0)
+    http = data.ReplayHttp({f"function={f}": data.alpha_vantage_statement(rng, "BENCH", years)
+                            for f in ("INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW")})
+    source = _unlimited(AlphaVantageSource("bench", http=http))
+    return lambda: source.get_financials("BENCH")
+
+
+@benchmark("providers.polygon.price_history", years=YEARS)
+def _polygon_prices(tmp, years):
+    http = data.ReplayHttp({"/v2/aggs/ticker/BENCH/": data.polygon_aggs("BENCH", years)})
+    source = _unlimited(PolygonSource("bench", http=http))
+    return lambda: source.get_price_history("BENCH", period="max")
+
+
+@benchmark("providers.finnhub.price_history", years=YEARS)
+def _finnhub_prices(tmp, years):
+    http = data.ReplayHttp({"/stock/candle": data.finnhub_candles(years)})
+    source = _unlimited(FinnhubSource("bench", http=http))
+    return lambda: source.get_price_history("BENCH", period="max")
+
+
+# Dashboard data preparation
+
+@benchmark("dashboard.metrics", tickers=[10, 1000])
+def _dashboard_metrics(tmp, tickers):
+    closes = data.make_closes(tickers, 2)
+    return lambda: watchlist_metrics(close_panel(closes))
+
+
+@benchmark("dashboard.table", tickers=[10, 1000])
+def _dashboard_table(tmp, tickers):
+    # Imported here, the dashboard module pulls in streamlit
+    from app.ui.dashboard import _with_metrics
+    summary = watchlist_metrics(close_panel(data.make_closes(tickers, 2)))
+    stocks = [{"ticker": t, "name": f"{t} Corporation", "sector": "Technology", "isin": None} for t in summary.index]
+
+    def assemble():
+        df = pd.DataFrame([{"Ticker": s["ticker"], "Name": s["name"], "Sector": s["sector"], "ISIN": s["isin"]}
+                           for s in stocks])
+        return _with_metrics(df, summary)
+    return assemble
+
+
+@benchmark("dashboard.summary_cold", tickers=[10, 1000])
+def _dashboard_summary_cold(tmp, tickers):
+    from unittest.mock import MagicMock
+    from app.core.controller import StockAppController
+    storage = _storage(tmp)
+    closes = data.make_closes(tickers, 2)
+    storage.add_stocks([{"ticker": t} for t in closes])
+    for ticker, series in closes.items():
+        storage.save_price_data(ticker, series.to_frame("Close"))
+    ctrl = StockAppController(storage=storage, api=MagicMock())
+
+    def summary():
+        # Every close read from disk again, as after a restart
+        storage.memo.clear()
+        ctrl._closes, ctrl._summary = {}, None
+        return ctrl.get_watchlist_summary()
+    return summary
+
+
+@benchmark("portfolio.valuation", positions=[50, 500], years=[1, 10])
+def _portfolio_valuation(tmp, positions, years):
+    closes = data.make_closes(positions, years)
+    trades = data.make_trades(closes)
+    panel = close_panel(closes)
+    return lambda: value_portfolio(trades, panel)
+
+
+@benchmark("portfolio.valuation_new_bar", positions=[50, 500], years=[1, 10])
+def _portfolio_new_bar(tmp, positions, years):
+    # The cached valuation stops a bar short, as after a daily price refresh
+    closes = data.make_closes(positions, years)
+    trades = data.make_trades(closes)
+    panel = close_panel(closes)
+    previous = value_portfolio(trades, panel.iloc[:-1])
+    return lambda: value_portfolio(trades, panel, previous)
+
+
+def _panel_storage(tmp, tickers, years) -> StorageManager:
+    storage = _storage(tmp)
+    for ticker, series in data.make_closes(tickers, years).items():
+        storage.save_price_data(ticker, series.to_frame("Close"))
+    return storage
+
+
+@benchmark("compare.panel", tickers=[10, 500], years=[1, 10])
+def _compare_panel(tmp, tickers, years):
+    # Ten of the watchlist's tickers from the warm memory-mapped panel
+    storage = _panel_storage(tmp, tickers, years)
+    cache = PanelCache(storage)
+    names = [f"T{i:04d}" for i in range(tickers)]
+    cache.get(names)
+    return lambda: cache.get(names[:10])
+
+
+@benchmark("compare.panel_new_bar", tickers=[10, 500])
+def _compare_panel_new_bar(tmp, tickers):
+    # Every ticker gained a bar since the panel was built, as after the daily refresh
+    storage = _panel_storage(tmp, tickers, 1)
+    names = [f"T{i:04d}" for i in range(tickers)]
+    PanelCache(storage).get(names)
+    day = pd.Timestamp("2025-01-01")
+    for ticker in names:
+        storage.append_price_data(ticker, pd.DataFrame({"Close": [100.0]}, index=pd.DatetimeIndex([day], name="Date")))
+    snapshot = os.path.join(tmp, "_panel_snapshot")
+    shutil.copytree(os.path.join(storage.storage_path, "_panel"), snapshot)
+
+    def extend():
+        shutil.rmtree(os.path.join(storage.storage_path, "_panel"))
+        shutil.copytree(snapshot, os.path.join(storage.storage_path, "_panel"))
+        return PanelCache(storage).get(names)
+    return extend
+
+
+@benchmark("compare.rolling_correlation", tickers=[10, 50], years=[1, 10])
+def _compare_rolling_correlation(tmp, tickers, years):
+    returns = daily_returns(close_panel(data.make_closes(tickers, years)))
+    return lambda: rolling_correlation(returns, 60)
+
+
+@benchmark("compare.rolling_beta", tickers=[10, 500], years=[1, 10])
+def _compare_rolling_beta(tmp, tickers, years):
+    returns = daily_returns(close_panel(data.make_closes(tickers, years)))
+    return lambda: rolling_beta(returns, "T0000", 60)
+
+
+# Price chart
+
+@benchmark("chart.downsample", years=YEARS)
+def _chart_downsample(tmp, years):
+    history = data.make_history(years)[["Close"]]
+    return lambda: downsample(history, CHART_POINTS)
+
+
+@benchmark("chart.price_window", window=["1y", "max"], years=YEARS)
+def _chart_price_window(tmp, window, years):
+    from unittest.mock import MagicMock
+    from app.core.controller import StockAppController
+    storage = _storage(tmp, "npy")
+    storage.save_price_data("AAA", data.make_history(years))
+    ctrl = StockAppController(storage=storage, api=MagicMock())
+    start = "2024-01-01" if window == "1y" else None
+
+    def chart():
+        # The window is read from disk again, as on a new range selection
+        storage.memo.clear()
+        return ctrl.get_price_chart("AAA", start=start)
+    return chart
+
+
+# Live quotes
+
+@benchmark("streaming.handle_messages", trades_per_message=[1, 50], tickers=[10, 1000])
+def _streaming_messages(tmp, trades_per_message, tickers):
+    # The first 10,000 trades off the socket, spread over a few minutes: buffers are allocated per new ticker
+    rng = np.random.default_rng(0)
+    start = 1_735_000_000_000
+    messages = []
+    for first in range(0, 10_000, trades_per_message):
+        trades = [{"s": f"T{rng.integers(tickers):04d}", "p": round(100 + rng.normal(), 4), "t": start + i * 20,
+                   "v": int(rng.integers(1, 500))} for i in range(first, first + trades_per_message)]
+        messages.append(json.dumps({"type": "trade", "data": trades}))
+
+    def handle():
+        stream = QuoteStream("key")
+        for message in messages:
+            stream.handle_message(message)
+        return stream
+    return handle
+
+
+# Running and comparing
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    number = max(1, int(min_time / first) if first > 0 else 1000)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {"min": min(samples), "median": statistics.median(samples), "mean": statistics.fmean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0, "number": number, "repeat": repeat}
+
+
+def select(pattern: Optional[str]) -> List[Benchmark]:
+    return [b for b in BENCHMARKS if not pattern or pattern in b.name]
+
+
+def run(pattern: Optional[str] = None, repeat: int = 5, min_time: float = 0.05, quick: bool = False) -> Dict[str, Any]:
+    results = {}
+    for bench in select(pattern):
+        variants = bench.variants()
+        if quick:
+            # Smallest size of every parameter
+            variants = [v for v in variants if all(v[k] == bench.params[k][0] for k in v if k != "backend")]
+        for params in variants:
+            key = case_id(bench.name, params)
+            with tempfile.TemporaryDirectory() as tmp:
+                fn = bench.setup(tmp, **params)
+                stats = measure(fn, repeat, min_time)
+            results[key] = dict(name=bench.name, params=params, **stats)
+            print(f"{key:60} {_format(stats['median']):>10}  ±{_format(stats['stdev']):>9}", flush=True)
+    return {
+        "format": FORMAT_VERSION,
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+                    "numpy": np.__version__, "pandas": pd.__version__},
+        "settings": {"repeat": repeat, "min_time": min_time, "quick": quick},
+        "results": results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 1.2) -> List[Dict[str, Any]]:
+    """Rows for the cases in both runs: median ratio new/old and "slower", "faster" or "same" beyond threshold."""
+    rows = []
+    for key, result in new["results"].items():
+        base = old["results"].get(key)
+        if base is None:
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else float("inf")
+        change = "slower" if ratio > threshold else "faster" if ratio < 1 / threshold else "same"
+        rows.append({"case": key, "old": base["median"], "new": result["median"], "ratio": ratio, "change": change})
+    return sorted(rows, key=lambda r: r["ratio"], reverse=True)
+
+
+def print_comparison(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> bool:
+    """Prints the comparison. Returns True if something got slower."""
+    rows = compare(old, new, threshold)
+    print(f"{_label(old)} -> {_label(new)}, threshold {threshold:.2f}x")
+    for r in rows:
+        marker = {"slower": "!!", "faster": "++", "same": "  "}[r["change"]]
+        print(f"{marker} {r['case']:60} {_format(r['old']):>10} {_format(r['new']):>10} {r['ratio']:7.2f}x")
+    missing = sorted(set(old["results"]) ^ set(new["results"]))
+    if missing:
+        print(f"{len(missing)} case(s) only in one of the runs")
+    slower = [r for r in rows if r["change"] == "slower"]
+    print(f"{len(slower)} slower, {sum(r['change'] == 'faster' for r in rows)} faster, {len(rows)} compared")
+    return bool(slower)
+
+
+def _label(result: Dict[str, Any]) -> str:
+    commit = (result.get("commit") or "unknown")[:10]
+    return commit + ("+dirty" if result.get("dirty") else "")
+
+
+def _format(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g}{unit}"
+    return f"{seconds / 1e-9:.3g}ns"
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(RESULTS_DIR))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_cmd = commands.add_parser("list", help="List the cases")
+    list_cmd.add_argument("-k", dest="pattern", help="Only cases whose name contains this")
+
+    run_cmd = commands.add_parser("run", help="Run the cases and write a JSON result file")
+    run_cmd.add_argument("-k", dest="pattern", help="Only cases whose name contains this")
+    run_cmd.add_argument("--repeat", type=int, default=5)
+    run_cmd.add_argument("--min-time", type=float, default=0.05, help="Seconds per sample (default 0.05)")
+    run_cmd.add_argument("--quick", action="store_true", help="Smallest sizes only, 3 samples")
+    run_cmd.add_argument("-o", "--output", help="Result file (default benchmarks/results/<commit>.json)")
+    run_cmd.add_argument("--compare", metavar="BASELINE", help="Compare with an earlier result file afterwards")
+    run_cmd.add_argument("--threshold", type=float, default=1.2)
+
+    compare_cmd = commands.add_parser("compare", help="Compare two result files")
+    compare_cmd.add_argument("old")
+    compare_cmd.add_argument("new")
+    compare_cmd.add_argument("--threshold", type=float, default=1.2,
+                             help="Median ratio that counts as slower (default 1.2)")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for bench in select(args.pattern):
+            for params in bench.variants():
+                print(case_id(bench.name, params))
+        return 0
+
+    if args.command == "compare":
+        return int(print_comparison(_load(args.old), _load(args.new), args.threshold))
+
+    result = run(args.pattern, repeat=3 if args.quick else args.repeat, min_time=args.min_time, quick=args.quick)
+    output = args.output or os.path.join(RESULTS_DIR, f"{_label(result).replace('+', '-')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+    if args.compare:
+        return int(print_comparison(_load(args.compare), result, args.threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
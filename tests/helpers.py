@@ -0,0 +1,13 @@
+"""Helpers shared by the tests."""
+
+
+class FakeClock:
+    """Stands in for time.time/time.monotonic (and time.sleep) where code takes a clock argument."""
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
@@ -0,0 +1,128 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from app.core.analytics import (close_panel, correlation_matrix, daily_returns, normalized_performance,
+                                rolling_beta, rolling_correlation, rolling_covariance, watchlist_metrics)
+from app.core.controller import StockAppController
+from app.core.storage_manager import StorageManager
+
+
+class TestWatchlistMetrics(unittest.TestCase):
+    def test_returns_and_ranges(self):
+        index = pd.bdate_range("2023-06-01", "2024-06-28")
+        closes = pd.Series(np.linspace(100.0, 200.0, len(index)), index=index)
+        metrics = watchlist_metrics(close_panel({"AAA": closes})).loc["AAA"]
+
+        self.assertEqual(metrics["last_close"], 200.0)
+        self.assertAlmostEqual(metrics["ret_1d"], 200.0 / closes.iloc[-2] - 1)
+        self.assertAlmostEqual(metrics["ret_1w"], 200.0 / closes.loc["2024-06-21"] - 1)
+        self.assertAlmostEqual(metrics["ret_1m"], 200.0 / closes.loc["2024-05-28"] - 1)
+        self.assertAlmostEqual(metrics["ret_ytd"], 200.0 / closes.loc["2023-12-29"] - 1)
+        # No bar on the exact anniversary (a Wednesday), the previous close is used
+        self.assertAlmostEqual(metrics["ret_1y"], 200.0 / closes.loc["2023-06-28"] - 1)
+        self.assertAlmostEqual(metrics["from_52w_high"], 0.0)
+        self.assertGreater(metrics["from_52w_low"], 0.0)
+        self.assertGreater(metrics["vol_30d"], 0.0)
+
+    def test_volatility_matches_pandas(self):
+        index = pd.bdate_range("2024-01-01", periods=60)
+        rng = np.random.default_rng(1)
+        closes = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 60))), index=index)
+        expected = np.log(closes).diff().iloc[-30:].std() * np.sqrt(252)
+        self.assertAlmostEqual(watchlist_metrics(close_panel({"AAA": closes})).loc["AAA", "vol_30d"], expected)
+
+    def test_misaligned_and_short_histories(self):
+        ny = pd.Series([10.0, 11.0, 12.0],
+                       index=pd.date_range("2024-01-02", periods=3, tz="America/New_York"))
+        utc = pd.Series([5.0, 4.0], index=pd.DatetimeIndex(["2024-01-03 05:00", "2024-01-04 05:00"]))
+        panel = close_panel({"NY": ny, "UTC": utc, "NONE": None})
+        self.assertEqual(list(panel.columns), ["NY", "UTC"])
+        self.assertEqual(len(panel), 3)
+
+        metrics = watchlist_metrics(panel)
+        self.assertAlmostEqual(metrics.loc["UTC", "ret_1d"], -0.2)
+        self.assertTrue(np.isnan(metrics.loc["UTC", "ret_1y"]))
+        self.assertTrue(np.isnan(metrics.loc["UTC", "vol_30d"]))
+
+    def test_empty_panel(self):
+        self.assertTrue(watchlist_metrics(close_panel({})).empty)
+
+
+class TestComparisons(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.returns = pd.DataFrame(rng.normal(0, 0.01, (300, 4)), columns=["AAA", "BBB", "CCC", "SPY"])
+        self.returns.iloc[:40, 1] = np.nan  # a shorter history
+        self.returns.iloc[100:110, 2] = np.nan
+
+    def test_rolling_matrices_match_pandas(self):
+        shape = (300, 4, 4)
+        for window in (20, 60):
+            with self.subTest(window=window):
+                expected = self.returns.rolling(window).cov().to_numpy().reshape(shape)
+                np.testing.assert_allclose(rolling_covariance(self.returns, window), expected, atol=1e-15)
+                expected = self.returns.rolling(window).corr().to_numpy().reshape(shape)
+                np.testing.assert_allclose(rolling_correlation(self.returns, window), expected, atol=1e-12)
+        np.testing.assert_allclose(correlation_matrix(self.returns), self.returns.corr(), atol=1e-12)
+
+    def test_beta(self):
+        betas = rolling_beta(self.returns, "SPY", 60)
+        for ticker in self.returns:
+            expected = self.returns[ticker].rolling(60).cov(self.returns["SPY"]) / self.returns["SPY"].rolling(60).var()
+            np.testing.assert_allclose(betas[ticker], expected, atol=1e-12)
+
+        scaled = self.returns.assign(AAA=2 * self.returns["SPY"])
+        self.assertAlmostEqual(rolling_beta(scaled, "SPY")["AAA"].iloc[-1], 2.0)
+
+    def test_performance_and_returns(self):
+        index = pd.bdate_range("2024-01-01", periods=4)
+        panel = pd.DataFrame({"AAA": [10.0, 11.0, np.nan, 12.1], "BBB": [np.nan, 50.0, 25.0, 50.0]}, index=index)
+        performance = normalized_performance(panel)
+        np.testing.assert_allclose(performance["AAA"], [100.0, 110.0, 110.0, 121.0])
+        np.testing.assert_allclose(performance["BBB"], [np.nan, 100.0, 50.0, 100.0])
+        returns = daily_returns(panel)
+        np.testing.assert_allclose(returns["AAA"], [np.nan, 0.1, 0.0, 0.1])
+        np.testing.assert_allclose(returns["BBB"], [np.nan, np.nan, -0.5, 1.0])
+
+
+class TestWatchlistSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"),
+                                      storage_path=self.tmp.name, price_storage="sqlite")
+        for ticker in ["AAA", "BBB", "CCC"]:
+            self.storage.add_stock(ticker)
+        for ticker in ["AAA", "BBB"]:
+            self.storage.save_price_data(ticker, pd.DataFrame(
+                {"Close": [1.0, 2.0]}, index=pd.to_datetime(["2024-01-02", "2024-01-03"])))
+        self.ctrl = StockAppController(storage=self.storage, api=MagicMock())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reuses_result_until_prices_change(self):
+        first = self.ctrl.get_watchlist_summary()
+        self.assertEqual(list(first.index), ["AAA", "BBB", "CCC"])
+        self.assertTrue(np.isnan(first.loc["CCC", "last_close"]))
+
+        with patch.object(self.storage, "load_price_data", wraps=self.storage.load_price_data) as load:
+            self.assertIs(self.ctrl.get_watchlist_summary(), first)
+            self.storage.append_price_data("AAA", pd.DataFrame({"Close": [4.0]},
+                                                               index=pd.to_datetime(["2024-01-04"])))
+            second = self.ctrl.get_watchlist_summary()
+
+        # Only the changed ticker (and CCC, which has no history yet) are read again
+        self.assertEqual(sorted(c.args[0] for c in load.call_args_list), ["AAA", "CCC"])
+        self.assertEqual(second.loc["AAA", "last_close"], 4.0)
+        self.assertEqual(second.loc["BBB", "last_close"], 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.api.cache import CachedDataSource, ResponseCache
+from app.core.api.instrumented import InstrumentedDataSource
+from app.core.market_hours import next_market_close, next_quarter_start
+from tests.helpers import FakeClock
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Tuesday 10:00 in New York
+        self.clock = FakeClock(pd.Timestamp("2024-03-05 15:00:00+00:00").timestamp())
+        self.cache = ResponseCache(os.path.join(self.tmp.name, "cache.db"), clock=self.clock)
+        self.source = MagicMock()
+        self.source.get_ticker_info.return_value = {"name": "Apple"}
+        self.source.get_price_history.return_value = pd.DataFrame({"Close": [1.0]})
+        self.cached = CachedDataSource(self.source, self.cache)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeated_calls_hit_cache(self):
+        self.assertEqual(self.cached.get_ticker_info("AAPL"), {"name": "Apple"})
+        self.assertEqual(self.cached.get_ticker_info("AAPL"), {"name": "Apple"})
+        self.assertEqual(self.source.get_ticker_info.call_count, 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_prices_expire_after_market_close(self):
+        self.cached.get_price_history("AAPL", start=None)
+        self.clock.now = pd.Timestamp("2024-03-05 21:00:00+00:00").timestamp()  # 16:00 NY, not ready yet
+        self.cached.get_price_history("AAPL", start=None)
+        self.assertEqual(self.source.get_price_history.call_count, 1)
+
+        self.clock.now = pd.Timestamp("2024-03-05 22:00:00+00:00").timestamp()  # 17:00 NY
+        self.cached.get_price_history("AAPL", start=None)
+        self.assertEqual(self.source.get_price_history.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        self.source.get_financials.side_effect = [ValueError("429"), {"income_statement": {}}]
+        with self.assertRaises(ValueError):
+            self.cached.get_financials("AAPL")
+        self.assertEqual(self.cached.get_financials("AAPL"), {"income_statement": {}})
+
+    def test_lru_eviction_by_size(self):
+        self.cache.max_bytes = 3500
+        blob = "x" * 1000
+        for key in ["a", "b", "c"]:
+            self.cache.set(key, blob, self.clock.now + 60)
+            self.clock.now += 1
+        self.cache.get("a")  # a becomes most recently used, b is now the oldest
+        self.clock.now += 1
+        self.cache.set("d", blob, self.clock.now + 60)
+
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("d"))
+        self.assertGreaterEqual(self.cache.evictions, 1)
+
+    def test_batch_only_requests_misses(self):
+        self.source.get_ticker_info_batch.side_effect = lambda tickers, max_workers=4: {t: {"name": t} for t in tickers}
+        self.cached.get_ticker_info("AAPL")
+
+        results = self.cached.get_ticker_info_batch(["AAPL", "MSFT"])
+        self.assertEqual(results, {"AAPL": {"name": "Apple"}, "MSFT": {"name": "MSFT"}})
+        self.assertEqual(self.source.get_ticker_info_batch.call_args.args[0], ["MSFT"])
+
+    def test_providers_do_not_share_entries(self):
+        other = MagicMock()
+        other.get_ticker_info.return_value = {"name": "Apple Inc"}
+        self.source.provider_name, other.provider_name = "finnhub", "polygon"
+        first = CachedDataSource(InstrumentedDataSource(self.source), self.cache)
+        second = CachedDataSource(InstrumentedDataSource(other), self.cache)
+        self.assertEqual(first.get_ticker_info("AAPL"), {"name": "Apple"})
+        self.assertEqual(second.get_ticker_info("AAPL"), {"name": "Apple Inc"})
+        self.assertEqual(other.get_ticker_info.call_count, 1)
+
+    def test_forwards_other_attributes(self):
+        self.source.api_key = "secret"
+        self.assertEqual(self.cached.api_key, "secret")
+
+
+class TestExpiryCalendar(unittest.TestCase):
+    def test_next_market_close_skips_weekend(self):
+        friday_evening = pd.Timestamp("2024-03-08 23:00:00+00:00")
+        close = next_market_close(friday_evening)
+        self.assertEqual(close.weekday(), 0)
+        self.assertEqual((close.hour, close.minute), (16, 30))
+
+    def test_next_quarter_start(self):
+        self.assertEqual(next_quarter_start(pd.Timestamp("2024-11-15", tz="UTC")), pd.Timestamp("2025-01-01", tz="UTC"))
+        self.assertEqual(next_quarter_start(pd.Timestamp("2024-04-01", tz="UTC")), pd.Timestamp("2024-07-01", tz="UTC"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import zipfile
+
+sys.path.append(os.getcwd())
+
+from app.core.company_store import CompanyStore
+from app.core.storage_manager import StorageManager
+
+
+PAYLOAD = {
+    "income_statement": {"2023-09-30 00:00:00": {"Total Revenue": 5000.0, "Net Income": 700.0}},
+    "balance_sheet": {"2023-09-30 00:00:00": {"Total Assets": 9000.0}},
+    "financials_raw": [{"end_date": "2023-12-31", "revenue": 1}],
+    "full_report": [{"end_date": "2023-12-31", "revenue": 1}],
+    "info": {"name": "A Corp", "sector": "Technology", "full_info": {"longName": "A Corp", "employees": 10}},
+}
+
+
+class TestCompanyStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CompanyStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.store.save("AAA", PAYLOAD)
+        self.assertEqual(self.store.load("AAA"), PAYLOAD)
+        self.assertIsNone(self.store.load("BBB"))
+
+    def test_sections_are_loaded_separately(self):
+        self.store.save("AAA", PAYLOAD)
+        self.assertEqual(self.store.load("AAA", sections=["balance_sheet"]),
+                         {"balance_sheet": PAYLOAD["balance_sheet"]})
+        self.assertEqual(self.store.load("AAA", sections=["info"]),
+                         {"info": {"name": "A Corp", "sector": "Technology"}})
+        self.assertEqual(self.store.load("AAA", sections=["info", "full_info"])["info"], PAYLOAD["info"])
+        self.assertEqual(self.store.load("AAA", sections=["missing"]), {})
+        self.assertIn("full_info", self.store.sections("AAA"))
+
+    def test_duplicate_payloads_are_stored_once(self):
+        self.store.save("AAA", PAYLOAD)
+        with zipfile.ZipFile(self.store.path("AAA")) as zf:
+            # 6 sections, the Polygon style duplicate shares a member, plus the manifest
+            self.assertEqual(len(zf.namelist()), 6)
+        loaded = self.store.load("AAA")
+        self.assertEqual(loaded["financials_raw"], loaded["full_report"])
+        self.assertIsNot(loaded["financials_raw"], loaded["full_report"])
+
+    def test_nan_values_load_as_missing(self):
+        self.store.save("AAA", {"income_statement": {"2023": {"Net Income": float("nan")}}})
+        value = self.store.load("AAA")["income_statement"]["2023"]["Net Income"]
+        self.assertTrue(value is None or value != value)
+
+    def test_legacy_json_is_read_and_converted(self):
+        with open(self.store.legacy_path("AAA"), "w") as f:
+            json.dump(PAYLOAD, f, indent=4)
+        self.assertEqual(self.store.load("AAA", sections=["income_statement"]),
+                         {"income_statement": PAYLOAD["income_statement"]})
+        self.assertTrue(os.path.exists(self.store.path("AAA")))
+        self.assertFalse(os.path.exists(self.store.legacy_path("AAA")))
+        self.assertEqual(self.store.load("AAA"), PAYLOAD)
+
+
+class TestStorageSections(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"), storage_path=self.tmp.name,
+                                      price_storage="parquet")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sections_are_memoized_separately(self):
+        self.storage.save_company_data("AAA", PAYLOAD)
+        info = self.storage.load_company_data("AAA", sections=["info"])
+        full = self.storage.load_company_data("AAA")
+        self.assertEqual(set(info), {"info"})
+        self.assertEqual(full, PAYLOAD)
+        self.assertIs(self.storage.load_company_data("AAA", sections=["info"]), info)
+
+        self.storage.save_company_data("AAA", {"info": {"name": "Renamed"}})
+        self.assertEqual(self.storage.load_company_data("AAA", sections=["info"]), {"info": {"name": "Renamed"}})
+
+if __name__ == '__main__':
+    unittest.main()
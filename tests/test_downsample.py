@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from app.core.controller import StockAppController
+from app.core.downsample import downsample, lttb
+from app.core.storage_manager import StorageManager
+
+
+def reference_lttb(x, y, points):
+    """The textbook loop, bucket by bucket."""
+    n = len(y)
+    every = (n - 2) / (points - 2)
+    a, selected = 0, [0]
+    for i in range(points - 2):
+        next_lo, next_hi = int(np.floor((i + 1) * every) + 1), min(int(np.floor((i + 2) * every) + 1), n)
+        x_mean, y_mean = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        lo, hi = int(np.floor(i * every) + 1), int(np.floor((i + 1) * every) + 1)
+        areas = np.abs((x[a] - x_mean) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (y_mean - y[a]))
+        a = lo + int(areas.argmax())
+        selected.append(a)
+    return np.array(selected + [n - 1])
+
+
+class TestLttb(unittest.TestCase):
+    def test_matches_reference(self):
+        rng = np.random.default_rng(0)
+        # Daily bars over decades (small buckets) and a long intraday series (large buckets)
+        for n in (5000, 100_000):
+            with self.subTest(n=n):
+                x = np.arange(n, dtype=float)
+                y = 100 + np.cumsum(rng.normal(size=n))
+                np.testing.assert_array_equal(lttb(x, y, 500), reference_lttb(x, y, 500))
+
+    def test_keeps_ends_and_spikes(self):
+        y = np.zeros(10_000)
+        y[4321] = 50.0
+        picked = lttb(np.arange(len(y)), y, 100)
+        self.assertEqual(len(picked), 100)
+        self.assertEqual((picked[0], picked[-1]), (0, len(y) - 1))
+        self.assertIn(4321, picked)
+        self.assertTrue((np.diff(picked) > 0).all())
+
+    def test_short_series_are_kept(self):
+        np.testing.assert_array_equal(lttb(np.arange(5), np.ones(5), 10), np.arange(5))
+
+    def test_downsample_frame(self):
+        index = pd.date_range("2000-01-01", periods=3000, freq="D")
+        df = pd.DataFrame({"Close": np.linspace(1, 2, 3000), "sma": np.arange(3000.0)}, index=index)
+        df.iloc[:10, 0] = np.nan
+        out = downsample(df, 200, "Close")
+        self.assertEqual(len(out), 200)
+        self.assertEqual(out.index[0], index[10])
+        self.assertEqual(out.index[-1], index[-1])
+        # Overlays come along with the picked rows
+        np.testing.assert_array_equal(out["sma"], df.loc[out.index, "sma"])
+        self.assertIs(downsample(df, 5000), df)
+
+
+class TestPriceChart(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"), storage_path=self.tmp.name,
+                                      price_storage="npy")
+        index = pd.bdate_range("2000-01-03", periods=6000, name="Date")
+        self.prices = pd.DataFrame({"Close": 100 + np.cumsum(np.random.default_rng(1).normal(size=6000)),
+                                    "Volume": 1000.0}, index=index)
+        self.storage.save_price_data("AAA", self.prices)
+        self.ctrl = StockAppController(storage=self.storage, api=MagicMock())
+
+    def tearDown(self):
+        self.storage.db.close()
+        self.tmp.cleanup()
+
+    def test_long_ranges_are_downsampled(self):
+        self.assertEqual(self.storage.get_price_date_range("AAA"), (self.prices.index[0], self.prices.index[-1]))
+        chart = self.ctrl.get_price_chart("AAA", points=500)
+        self.assertEqual(chart["bars"], 6000)
+        self.assertEqual(len(chart["data"]), 500)
+        self.assertEqual(list(chart["data"].columns), ["Close"])
+
+    def test_window_is_read_at_full_resolution(self):
+        with patch.object(self.storage.price_store, "load", wraps=self.storage.price_store.load) as load:
+            chart = self.ctrl.get_price_chart("AAA", start="2020-01-01", end="2020-03-31", points=500)
+        load.assert_called_once_with("AAA", start="2020-01-01", end="2020-03-31", columns=["Close"])
+        expected = self.prices.loc["2020-01-01":"2020-03-31", ["Close"]]
+        pd.testing.assert_frame_equal(chart["data"], expected, check_freq=False, check_index_type=False)
+
+    def test_indicators_are_warmed_up_before_the_window(self):
+        chart = self.ctrl.get_price_chart("AAA", start="2020-01-01", indicators=["sma_200"], points=500)
+        self.assertFalse(chart["data"]["sma_200"].isna().any())
+        self.assertIsNone(self.ctrl.get_price_chart("AAA", start="2030-01-01"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import unittest
+import os
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+from app.core.api.base import DataNotFound, ProviderUnavailable, StockDataSource
+from app.core.api.failover import CircuitBreaker, FailoverDataSource
+from app.core.api.factory import get_stock_data_source
+from app.core.api.polygon import PolygonSource
+from app.core.api.yfinance_source import YFinanceSource
+from tests.helpers import FakeClock
+
+
+class FakeSource(StockDataSource):
+    def __init__(self, name, fail=False, release=None):
+        self.name = name
+        self.fail = fail
+        self.release = release
+        self.calls = 0
+
+    def get_ticker_info(self, ticker):
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        if self.fail:
+            raise ProviderUnavailable(f"{self.name} is down")
+        return {"name": ticker, "source": self.name}
+
+    def get_price_history(self, ticker, period="1y", start=None):
+        self.calls += 1
+        if self.fail:
+            raise ProviderUnavailable(f"{self.name} is down")
+        return pd.DataFrame({"Close": [1.0]}, index=pd.to_datetime(["2024-01-02"]))
+
+    def get_financials(self, ticker):
+        return {}
+
+    def get_price_history_batch(self, tickers, period="1y", start=None, max_workers=4):
+        self.calls += 1
+        if self.fail:
+            return {t: ProviderUnavailable(f"{self.name} is down") for t in tickers}
+        return {t: ValueError("unknown ticker") if t == "BAD" else self.get_price_history(t) for t in tickers}
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures_and_half_opens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        clock.now += 30
+        self.assertTrue(breaker.allow())
+        # Only one trial call while half open
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        clock.now += 30
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestFailoverDataSource(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_fails_over_in_order_and_skips_open_circuits(self):
+        down, backup = FakeSource("down", fail=True), FakeSource("backup")
+        source = FailoverDataSource([("down", down), ("backup", backup)], failure_threshold=2, clock=self.clock)
+        for _ in range(5):
+            self.assertEqual(source.get_ticker_info("AAA")["source"], "backup")
+        # Two failures open the circuit, later calls don't touch the provider
+        self.assertEqual(down.calls, 2)
+        stats = source.stats()
+        self.assertEqual(stats["down"]["state"], CircuitBreaker.OPEN)
+        self.assertEqual(stats["down"]["error_rate"], 1.0)
+        self.assertEqual(stats["backup"]["calls"], 5)
+
+    def test_raises_when_every_provider_fails(self):
+        source = FailoverDataSource([("a", FakeSource("a", fail=True)), ("b", FakeSource("b", fail=True))],
+                                    failure_threshold=1, clock=self.clock)
+        with self.assertRaisesRegex(ValueError, "a is down.*b is down"):
+            source.get_price_history("AAA")
+        with self.assertRaisesRegex(ValueError, "circuit open"):
+            source.get_price_history("AAA")
+
+    def test_not_found_is_raised_without_tripping_the_breaker(self):
+        primary, backup = FakeSource("primary"), FakeSource("backup")
+        primary.get_price_history = MagicMock(side_effect=DataNotFound("No price data found for BAD"))
+        source = FailoverDataSource([("primary", primary), ("backup", backup)], failure_threshold=1, clock=self.clock)
+        for _ in range(3):
+            with self.assertRaises(DataNotFound):
+                source.get_price_history("BAD")
+        self.assertEqual(backup.calls, 0)
+        self.assertEqual(source.stats()["primary"]["state"], CircuitBreaker.CLOSED)
+
+    def test_other_errors_fail_over_without_tripping_the_breaker(self):
+        primary, backup = FakeSource("primary"), FakeSource("backup")
+        primary.get_ticker_info = MagicMock(side_effect=ValueError("Unauthorized/Forbidden"))
+        source = FailoverDataSource([("primary", primary), ("backup", backup)], failure_threshold=1, clock=self.clock)
+        for _ in range(3):
+            self.assertEqual(source.get_ticker_info("AAA")["source"], "backup")
+        self.assertEqual(primary.get_ticker_info.call_count, 3)
+        self.assertEqual(source.stats()["primary"]["state"], CircuitBreaker.CLOSED)
+
+    def test_remaining_quota_skips_open_circuits(self):
+        a, b = FakeSource("a"), FakeSource("b")
+        a.remaining_quota = MagicMock(return_value=10)
+        b.remaining_quota = MagicMock(return_value=5)
+        source = FailoverDataSource([("a", a), ("b", b)], failure_threshold=1, clock=self.clock)
+        self.assertEqual(source.remaining_quota(), 15)
+        source.breakers["a"].record_failure()
+        self.assertEqual(source.remaining_quota(), 5)
+        b.remaining_quota.return_value = None  # e.g. yfinance, no quota
+        self.assertIsNone(source.remaining_quota())
+
+    def test_batch_retries_only_failed_tickers(self):
+        primary, backup = FakeSource("primary"), FakeSource("backup")
+        backup.get_price_history_batch = MagicMock(return_value={"BAD": ValueError("unknown ticker")})
+        source = FailoverDataSource([("primary", primary), ("backup", backup)], clock=self.clock)
+        results = source.get_price_history_batch(["AAA", "BAD"])
+        self.assertIsInstance(results["AAA"], pd.DataFrame)
+        self.assertIsInstance(results["BAD"], ValueError)
+        backup.get_price_history_batch.assert_called_once()
+        self.assertEqual(backup.get_price_history_batch.call_args[0][0], ["BAD"])
+        # Some tickers succeeded, so this isn't counted against the primary
+        self.assertEqual(source.stats()["primary"]["errors"], 0)
+
+    def test_batch_does_not_retry_unknown_tickers(self):
+        primary, backup = FakeSource("primary"), FakeSource("backup")
+        primary.get_price_history_batch = MagicMock(return_value={"BAD": DataNotFound("No price data found for BAD")})
+        source = FailoverDataSource([("primary", primary), ("backup", backup)], clock=self.clock)
+        self.assertIsInstance(source.get_price_history_batch(["BAD"])["BAD"], DataNotFound)
+        self.assertEqual(backup.calls, 0)
+
+    def test_batch_outage_fails_over(self):
+        down, backup = FakeSource("down", fail=True), FakeSource("backup")
+        source = FailoverDataSource([("down", down), ("backup", backup)], clock=self.clock)
+        results = source.get_price_history_batch(["AAA", "BBB"])
+        self.assertEqual(sorted(results), ["AAA", "BBB"])
+        self.assertTrue(all(isinstance(df, pd.DataFrame) for df in results.values()))
+        self.assertEqual(source.stats()["down"]["errors"], 1)
+
+    def test_hedges_after_p95(self):
+        release = threading.Event()
+        slow, fast = FakeSource("slow"), FakeSource("fast")
+        source = FailoverDataSource([("slow", slow), ("fast", fast)], hedge=True, hedge_min_samples=3)
+        for _ in range(3):
+            source.get_ticker_info("AAA")
+        self.assertEqual(fast.calls, 0)
+
+        slow.release = release
+        try:
+            self.assertEqual(source.get_ticker_info("AAA")["source"], "fast")
+        finally:
+            release.set()
+        self.assertEqual(source.stats()["slow"]["hedged"], 1)
+
+
+class TestFailoverFactory(unittest.TestCase):
+    def make_config(self, values):
+        config = MagicMock()
+        config.get.side_effect = lambda key, default=None: values.get(key, default)
+        return config
+
+    def test_api_sources_build_a_failover_source(self):
+        config = self.make_config({"api_sources": ["polygon", "alpha_vantage", "yfinance"],
+                                   "api_keys": {"polygon": "k"}, "failover": {"failure_threshold": 2}})
+        source = get_stock_data_source(config)
+        self.assertIsInstance(source, FailoverDataSource)
+        # alpha_vantage has no key and is skipped
+        self.assertEqual([name for name, _ in source.sources], ["polygon", "yfinance"])
+        self.assertIsInstance(source.sources[0][1], PolygonSource)
+        self.assertEqual(source.breakers["polygon"].failure_threshold, 2)
+
+    def test_single_usable_source_is_returned_as_is(self):
+        config = self.make_config({"api_sources": ["finnhub", "yfinance"]})
+        self.assertIsInstance(get_stock_data_source(config), YFinanceSource)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+import requests
+
+from app.core.api.http import HttpClient
+
+
+def response(status, headers=None):
+    r = MagicMock()
+    r.status_code = status
+    r.headers = headers or {}
+    return r
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.client = HttpClient(max_retries=3, backoff_factor=0.1, max_backoff=5)
+        self.client.session = MagicMock()
+
+    @patch("app.core.api.http.time.sleep")
+    def test_retries_server_errors_then_succeeds(self, sleep):
+        self.client.session.get.side_effect = [response(503), response(500), response(200)]
+        r = self.client.get("https://example.com")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(self.client.session.get.call_count, 3)
+        self.assertEqual(self.client.stats()["retries"], 2)
+        for call in sleep.call_args_list:
+            self.assertLessEqual(call.args[0], 0.4)
+
+    @patch("app.core.api.http.time.sleep")
+    def test_honors_retry_after(self, sleep):
+        self.client.session.get.side_effect = [response(429, {"Retry-After": "2"}), response(200)]
+        self.client.get("https://example.com")
+        sleep.assert_called_once_with(2.0)
+
+    @patch("app.core.api.http.time.sleep")
+    def test_long_retry_after_is_not_waited_for(self, sleep):
+        self.client.session.get.return_value = response(429, {"Retry-After": "3600"})
+        r = self.client.get("https://example.com")
+        self.assertEqual(r.status_code, 429)
+        sleep.assert_not_called()
+
+    @patch("app.core.api.http.time.sleep")
+    def test_gives_up_after_max_retries(self, sleep):
+        self.client.session.get.side_effect = requests.ConnectionError("down")
+        with self.assertRaises(requests.ConnectionError):
+            self.client.get("https://example.com")
+        self.assertEqual(self.client.session.get.call_count, 4)
+        self.assertEqual(self.client.stats()["failures"], 1)
+
+    def test_client_errors_are_not_retried(self):
+        self.client.session.get.return_value = response(404)
+        before = MagicMock()
+        self.assertEqual(self.client.get("https://example.com", before_request=before).status_code, 404)
+        self.assertEqual(self.client.session.get.call_count, 1)
+        before.assert_called_once()
+
+    def test_timeout_is_applied(self):
+        self.client.session.get.return_value = response(200)
+        self.client.get("https://example.com", params={"a": 1})
+        self.assertEqual(self.client.session.get.call_args.kwargs["timeout"], self.client.timeout)
+
+
+if __name__ == "__main__":
+    unittest.main()
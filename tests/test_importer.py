@@ -0,0 +1,95 @@
+import unittest
+import io
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from app.core.api.resolver import DataResolver
+from app.core.controller import StockAppController
+from app.core.importer import WatchlistImporter, read_import_file
+from app.core.storage_manager import StorageManager
+
+
+def make_api(invalid=()):
+    api = MagicMock()
+    api.PROVIDER = None
+    api.remaining_quota.return_value = None
+    api.get_ticker_info_batch.side_effect = lambda tickers, max_workers=4: {
+        t: ValueError("not found") if t in invalid else {"name": f"{t} Corp", "sector": "Tech"} for t in tickers}
+    return api
+
+
+class TestReadImportFile(unittest.TestCase):
+    def test_columns_are_recognised(self):
+        f = io.BytesIO(b"Symbol;ISIN;Qty\nAAPL;US0378331005;10\n;US67066G1040;5\n\n")
+        rows = read_import_file(f, "book.csv")
+        self.assertEqual(rows, [
+            {"row": 2, "identifier": "AAPL", "ticker": "AAPL", "isin": "US0378331005"},
+            {"row": 3, "identifier": "US67066G1040", "ticker": None, "isin": "US67066G1040"},
+        ])
+
+    def test_plain_list(self):
+        rows = read_import_file(io.BytesIO(b"AAPL\nMSFT\n"), "list.txt")
+        self.assertEqual([(r["row"], r["identifier"]) for r in rows], [(1, "AAPL"), (2, "MSFT")])
+
+
+class TestWatchlistImporter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"),
+                                      storage_path=os.path.join(self.tmp.name, "companies"))
+        self.storage.add_stock("MSFT", name="Microsoft")
+        mapping = os.path.join(self.tmp.name, "isin_mapping.csv")
+        with open(mapping, "w") as f:
+            f.write("ISIN,Ticker\nUS0378331005,AAPL\nUS67066G1040,NVDA\n")
+        self.ctrl = StockAppController(storage=self.storage, api=make_api(invalid={"NOPE"}))
+        self.ctrl.resolver = DataResolver(mapping)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rows(self, *identifiers):
+        return [{"row": i + 2, "identifier": x, "ticker": None, "isin": None} for i, x in enumerate(identifiers)]
+
+    def test_pipeline(self):
+        progress = []
+        rows = WatchlistImporter(self.ctrl, batch_size=2).run(
+            self.rows("US0378331005", "nvda", "MSFT", "AAPL", "NOPE", "US0378331006", "GB0002634946"),
+            progress_callback=lambda stage, done, total: progress.append((stage, done, total)))
+
+        self.assertEqual([r["status"] for r in rows],
+                         ["added", "added", "exists", "duplicate", "error", "error", "error"])
+        self.assertIn("not found", rows[4]["error"])
+        self.assertIn("not a valid ISIN", rows[5]["error"])
+        self.assertIn("mapping file", rows[6]["error"])
+
+        stocks = {s["ticker"]: s for s in self.storage.get_stocks()}
+        self.assertEqual(stocks["NVDA"]["isin"], "US67066G1040")
+        self.assertEqual(stocks["AAPL"]["name"], "AAPL Corp")
+        self.assertNotIn("NOPE", stocks)
+        # Three new tickers validated in batches of two
+        self.assertEqual(self.ctrl.api.get_ticker_info_batch.call_count, 2)
+        self.assertIn(("validate", 3, 3), progress)
+        self.assertEqual(progress[-1], ("save", 2, 2))
+
+        # The initial fetch is queued for the scheduler
+        self.assertEqual(set(self.storage.get_job_status("NVDA")), {"prices", "fundamentals"})
+        self.assertIn("NVDA", self.storage.get_due_jobs("prices", "2100-01-01T00:00:00"))
+
+    def test_validation_stays_within_daily_quota(self):
+        self.ctrl.api.remaining_quota.return_value = 1
+        rows = WatchlistImporter(self.ctrl).run(self.rows("AAPL", "NVDA"))
+        self.assertEqual([r["status"] for r in rows], ["added", "error"])
+        self.assertIn("quota", rows[1]["error"])
+        self.assertEqual(self.ctrl.api.get_ticker_info_batch.call_args[0][0], ["AAPL"])
+
+    def test_without_validation(self):
+        rows = WatchlistImporter(self.ctrl, validate=False).run(self.rows("NOPE"))
+        self.assertEqual(rows[0]["status"], "added")
+        self.ctrl.api.get_ticker_info_batch.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from app.core import indicators
+from app.core.indicators import INDICATOR_COLUMNS, IndicatorEngine, compute_indicators
+from app.core.storage_manager import StorageManager
+
+
+def make_prices(n=400, seed=0):
+    index = pd.bdate_range("2022-01-03", periods=n, tz="America/New_York", name="Date")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({"High": close * 1.01, "Low": close * 0.98, "Close": close,
+                         "Volume": rng.integers(1_000, 10_000, n)}, index=index)
+
+
+class TestComputeIndicators(unittest.TestCase):
+    def test_values(self):
+        prices = make_prices()
+        result = compute_indicators(prices)
+        close = prices["Close"]
+
+        self.assertEqual(list(result.index), list(prices.index))
+        self.assertTrue(np.isnan(result["sma_200"].iloc[198]))
+        self.assertAlmostEqual(result["sma_20"].iloc[-1], close.iloc[-20:].mean())
+        self.assertAlmostEqual(result["ema_20"].iloc[-1], close.ewm(span=20, adjust=False).mean().iloc[-1])
+        self.assertAlmostEqual(result["bb_upper"].iloc[-1] - result["bb_mid"].iloc[-1],
+                               2 * close.iloc[-20:].std(ddof=0))
+        rsi = result["rsi_14"].dropna()
+        self.assertTrue(((rsi >= 0) & (rsi <= 100)).all())
+        self.assertGreater(result["atr_14"].iloc[-1], 0)
+        self.assertAlmostEqual(result["macd_hist"].iloc[-1],
+                               result["macd"].iloc[-1] - result["macd_signal"].iloc[-1])
+
+    def test_incremental_matches_full_recompute(self):
+        prices = make_prices()
+        full = compute_indicators(prices)
+        for cut in [1, 25, 250, 399]:
+            with self.subTest(cut=cut):
+                continued = compute_indicators(prices, compute_indicators(prices.iloc[:cut]))
+                np.testing.assert_allclose(continued.to_numpy(), full.to_numpy(), rtol=1e-9, equal_nan=True)
+
+    def test_close_only_history(self):
+        result = compute_indicators(make_prices()[["Close"]])
+        self.assertTrue(result["vwap_20"].isna().all())
+        self.assertFalse(np.isnan(result["atr_14"].iloc[-1]))
+
+
+class TestIndicatorEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"), storage_path=self.tmp.name,
+                                      price_storage="parquet")
+        self.prices = make_prices()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_persists_and_only_computes_new_bars(self):
+        self.storage.save_price_data("AAA", self.prices.iloc[:300])
+        first = IndicatorEngine(self.storage).get("AAA")
+        self.assertEqual(list(first.columns), INDICATOR_COLUMNS)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "AAA_indicators.parquet")))
+
+        self.storage.append_price_data("AAA", self.prices.iloc[300:])
+        engine = IndicatorEngine(self.storage)  # a fresh process, starts from the file
+        with patch.object(indicators, "compute_indicators", wraps=compute_indicators) as compute:
+            result = engine.get("AAA")
+            self.assertEqual(len(compute.call_args.args[1]), 299)  # the last cached bar is redone
+
+            # Unchanged prices are served from memory
+            engine.get("AAA")
+            self.assertEqual(compute.call_count, 1)
+
+        np.testing.assert_allclose(result.to_numpy(), compute_indicators(self.prices)[INDICATOR_COLUMNS].to_numpy(),
+                                   rtol=1e-9, equal_nan=True)
+
+    def test_rewritten_history_is_recomputed(self):
+        self.storage.save_price_data("AAA", self.prices)
+        engine = IndicatorEngine(self.storage)
+        engine.get("AAA")
+
+        adjusted = self.prices.copy()
+        adjusted[["High", "Low", "Close"]] /= 2  # e.g. a 2:1 split adjustment
+        self.storage.save_price_data("AAA", adjusted)
+        with patch.object(indicators, "compute_indicators", wraps=compute_indicators) as compute:
+            result = engine.get("AAA")
+        self.assertIsNone(compute.call_args.args[1])
+        self.assertAlmostEqual(result["sma_20"].iloc[-1], adjusted["Close"].iloc[-20:].mean())
+
+    def test_memory_is_bounded(self):
+        for ticker in ("AAA", "BBB", "CCC"):
+            self.storage.save_price_data(ticker, self.prices)
+        one = IndicatorEngine(self.storage)
+        one.get("AAA")
+        size = one.memo.stats()["size_bytes"]
+
+        engine = IndicatorEngine(self.storage, max_bytes=2 * size)
+        for ticker in ("AAA", "BBB", "CCC"):
+            engine.get(ticker)
+        stats = engine.memo.stats()
+        self.assertEqual((stats["entries"], stats["evictions"]), (2, 1))
+        self.assertLessEqual(stats["size_bytes"], 2 * size)
+
+if __name__ == '__main__':
+    unittest.main()
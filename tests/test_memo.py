@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.controller import StockAppController
+from app.core.memo import VersionedLRU
+from app.core.storage_manager import StorageManager
+
+
+class TestVersionedLRU(unittest.TestCase):
+    def test_version_mismatch_is_a_miss(self):
+        cache = VersionedLRU()
+        cache.set("a", 1, "value", 10)
+        self.assertEqual(cache.get("a", 1), "value")
+        self.assertIsNone(cache.get("a", 2))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_evicts_least_recently_used_beyond_size(self):
+        cache = VersionedLRU(max_bytes=25)
+        cache.set("a", 1, "A", 10)
+        cache.set("b", 1, "B", 10)
+        cache.get("a", 1)
+        cache.set("c", 1, "C", 10)
+        self.assertIsNone(cache.get("b", 1))
+        self.assertEqual(cache.get("a", 1), "A")
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["size_bytes"], 20)
+
+        cache.set("huge", 1, "X", 100)
+        self.assertIsNone(cache.get("huge", 1))
+
+    def test_invalidate(self):
+        cache = VersionedLRU()
+        cache.set(("prices", "AAA"), 1, "x", 1)
+        cache.set(("prices", "BBB"), 1, "y", 1)
+        self.assertEqual(cache.invalidate(lambda k: k[1] == "AAA"), 1)
+        self.assertIsNone(cache.get(("prices", "AAA"), 1))
+        self.assertEqual(cache.get(("prices", "BBB"), 1), "y")
+
+
+class TestStorageMemo(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"), storage_path=self.tmp.name,
+                                      price_storage="parquet")
+        self.storage.add_stock("AAA", name="A Corp")
+        self.storage.save_company_data("AAA", {"info": {"name": "A Corp"}})
+        self.storage.save_price_data("AAA", pd.DataFrame({"Close": [1.0, 2.0]},
+                                                         index=pd.to_datetime(["2024-01-02", "2024-01-03"])))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stock_detail_reruns_skip_file_reads(self):
+        ctrl = StockAppController(storage=self.storage, api=MagicMock())
+        first = ctrl.get_stock_detail("AAA")
+        with patch("builtins.open") as opened, patch.object(self.storage.price_store, "load") as load:
+            second = ctrl.get_stock_detail("AAA")
+        opened.assert_not_called()
+        load.assert_not_called()
+        self.assertIs(second["company_data"], first["company_data"])
+        self.assertIs(second["prices"], first["prices"])
+
+    def test_saves_invalidate(self):
+        self.storage.load_company_data("AAA")
+        self.storage.load_price_data("AAA")
+        self.storage.save_company_data("AAA", {"info": {"name": "Renamed"}})
+        self.storage.save_price_data("AAA", pd.DataFrame({"Close": [3.0]}, index=pd.to_datetime(["2024-01-04"])))
+        self.assertEqual(self.storage.load_company_data("AAA")["info"]["name"], "Renamed")
+        self.assertEqual(list(self.storage.load_price_data("AAA")["Close"]), [3.0])
+
+    def test_changes_by_other_processes_are_seen(self):
+        self.storage.load_company_data("AAA")
+        other = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"), storage_path=self.tmp.name,
+                               price_storage="parquet")
+        other.save_company_data("AAA", {"info": {"name": "Changed elsewhere, longer"}})
+        self.assertEqual(self.storage.load_company_data("AAA")["info"]["name"], "Changed elsewhere, longer")
+
+    def test_ranges_are_cached_separately(self):
+        full = self.storage.load_price_data("AAA")
+        window = self.storage.load_price_data("AAA", start="2024-01-03")
+        self.assertEqual(len(full), 2)
+        self.assertEqual(len(window), 1)
+
+if __name__ == '__main__':
+    unittest.main()
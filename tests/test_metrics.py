@@ -0,0 +1,136 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import urllib.request
+
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+from app.core import metrics
+from app.core.api.base import StockDataSource
+from app.core.api.instrumented import InstrumentedDataSource
+from app.core.metrics import Histogram, MetricsRegistry
+from app.core.storage_manager import StorageManager
+
+
+class FlakySource(StockDataSource):
+    PROVIDER = "flaky"
+    provider_name = "flaky"
+
+    def get_ticker_info(self, ticker):
+        if ticker == "BAD":
+            raise ValueError("unknown ticker")
+        return {"name": ticker}
+
+    def get_price_history(self, ticker, period="1y", start=None):
+        return pd.DataFrame()
+
+    def get_financials(self, ticker):
+        return {}
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_histogram_quantile(self):
+        h = Histogram((0.01, 0.1, 1.0))
+        for _ in range(90):
+            h.observe(0.005)
+        for _ in range(10):
+            h.observe(0.5)
+        self.assertLessEqual(h.quantile(0.5), 0.01)
+        self.assertGreater(h.quantile(0.95), 0.1)
+        self.assertLessEqual(h.quantile(0.95), 1.0)
+        self.assertIsNone(Histogram().quantile(0.5))
+
+    def test_timer_counts_errors(self):
+        with self.registry.timer("op_seconds", errors="op_errors_total", op="save"):
+            pass
+        with self.assertRaises(ValueError):
+            with self.registry.timer("op_seconds", errors="op_errors_total", op="save"):
+                raise ValueError("boom")
+
+        rows = self.registry.summary("op_seconds")
+        self.assertEqual(rows[0]["op"], "save")
+        self.assertEqual(rows[0]["count"], 2)
+        self.assertEqual(self.registry.counters()["op_errors_total"][(("op", "save"),)], 1)
+
+    def test_render_prometheus(self):
+        self.registry.inc("calls_total", provider='a"b', outcome="ok")
+        self.registry.observe("latency_seconds", 0.003, provider="a")
+        self.registry.register_collector("cache", lambda: metrics.stats_samples(
+            "cache", {"hits": 3, "hit_rate": 0.75, "label": "x"}))
+        self.registry.register_collector("broken", lambda: 1 / 0)
+
+        text = self.registry.render_prometheus()
+        self.assertIn('calls_total{outcome="ok",provider="a\\"b"} 1', text)
+        self.assertIn('latency_seconds_bucket{provider="a",le="0.0025"} 0', text)
+        self.assertIn('latency_seconds_bucket{provider="a",le="0.005"} 1', text)
+        self.assertIn('latency_seconds_bucket{provider="a",le="+Inf"} 1', text)
+        self.assertIn('latency_seconds_count{provider="a"} 1', text)
+        self.assertIn("# TYPE cache_hits_total counter", text)
+        self.assertIn("cache_hit_rate 0.75", text)
+        self.assertNotIn("label", text)
+
+    def test_instrumented_source(self):
+        metrics.REGISTRY.reset()
+        source = InstrumentedDataSource(FlakySource())
+        source.get_ticker_info("AAPL")
+        with self.assertRaises(ValueError):
+            source.get_ticker_info("BAD")
+        # Unknown attributes reach the wrapped source
+        self.assertEqual(source.provider_name, "flaky")
+
+        calls = metrics.counters()["stockhelper_provider_calls_total"]
+        key = lambda outcome: (("method", "get_ticker_info"), ("outcome", outcome), ("provider", "flaky"))
+        self.assertEqual(calls[key("ok")], 1)
+        self.assertEqual(calls[key("error")], 1)
+        rows = metrics.summary("stockhelper_provider_latency_seconds")
+        self.assertEqual(rows[0]["count"], 2)
+
+    def test_storage_ops_are_timed(self):
+        metrics.REGISTRY.reset()
+        tmp = tempfile.mkdtemp()
+        try:
+            storage = StorageManager(db_path=os.path.join(tmp, "stocks.db"),
+                                     storage_path=os.path.join(tmp, "companies"))
+            storage.add_stock("AAPL", None, "Apple", "Tech")
+            storage.get_stocks()
+            storage.get_stocks()
+        finally:
+            shutil.rmtree(tmp)
+
+        ops = {row["op"]: row["count"] for row in metrics.summary("stockhelper_storage_op_seconds")}
+        self.assertEqual(ops["get_stocks"], 2)
+        self.assertIn("add_stocks", ops)
+
+    def test_textfile_and_endpoint(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "metrics.prom")
+            metrics.write_textfile(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), metrics.render_prometheus())
+        finally:
+            shutil.rmtree(tmp)
+
+        metrics.inc("stockhelper_test_total")
+        metrics.configure({"port": 0})
+        try:
+            port = metrics._server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                self.assertIn("text/plain", response.headers["Content-Type"])
+                self.assertIn("stockhelper_test_total 1", response.read().decode())
+        finally:
+            metrics._server.shutdown()
+            metrics._server.server_close()
+            metrics._server = None
+            metrics.configure({})
+
+
+if __name__ == "__main__":
+    unittest.main()
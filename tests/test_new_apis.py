@@ -3,6 +3,8 @@ import os
 import sys
 from unittest.mock import MagicMock, patch
 
+import pandas as pd
+
 sys.path.append(os.getcwd())
 
 from app.core.api.alpha_vantage import AlphaVantageSource
@@ -55,5 +57,68 @@ class TestNewAPIs(unittest.TestCase):
         source = get_stock_data_source(mock_config)
         self.assertIsInstance(source, YFinanceSource)
 
+    def test_alpha_vantage_incremental_uses_compact(self):
+        http = MagicMock()
+        mock_get = http.get
+        mock_get.return_value.json.return_value = {"Time Series (Daily)": {
+            "2024-01-02": {"1. open": "1", "2. high": "1", "3. low": "1", "4. close": "1", "5. volume": "10"},
+            "2024-01-05": {"1. open": "2", "2. high": "2", "3. low": "2", "4. close": "2", "5. volume": "20"},
+        }}
+        av = AlphaVantageSource("dummy_key", http=http)
+
+        start = pd.Timestamp.now().normalize() - pd.Timedelta(days=5)
+        av.get_price_history("IBM", start=start.date())
+        self.assertEqual(mock_get.call_args.kwargs["params"]["outputsize"], "compact")
+
+        df = av.get_price_history("IBM", period="max")
+        self.assertEqual(mock_get.call_args.kwargs["params"]["outputsize"], "full")
+        self.assertEqual(len(df), 2)
+
+    def test_polygon_incremental_range(self):
+        http = MagicMock()
+        mock_get = http.get
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {"results": []}
+        poly = PolygonSource("dummy_key", http=http)
+
+        df = poly.get_price_history("AAPL", start=pd.Timestamp("2024-03-01").date())
+        self.assertTrue(df.empty)
+        self.assertIn("/range/1/day/2024-03-01/", mock_get.call_args.args[0])
+
+    def test_polygon_batch_uses_grouped_daily(self):
+        http = MagicMock()
+        http.get.return_value.status_code = 200
+        http.get.return_value.json.return_value = {"results": [
+            {"T": "AAPL", "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 100, "t": 0},
+            {"T": "MSFT", "o": 3, "h": 4, "l": 2.5, "c": 3.5, "v": 200, "t": 0},
+            {"T": "IBM", "o": 5, "h": 6, "l": 4.5, "c": 5.5, "v": 300, "t": 0},
+        ]}
+        poly = PolygonSource("dummy_key", http=http)
+        tickers = ["AAPL", "MSFT", "GOOG"] + [f"T{i}" for i in range(10)]
+
+        with patch.object(PolygonSource, "_last_completed_session", return_value=pd.Timestamp("2024-03-05").date()):
+            results = poly.get_price_history_batch(tickers, start=pd.Timestamp("2024-03-04").date())
+
+        # Two trading days -> two grouped calls instead of one per ticker
+        self.assertEqual(http.get.call_count, 2)
+        self.assertIn("/grouped/locale/us/market/stocks/2024-03-04", http.get.call_args_list[0].args[0])
+        self.assertEqual(list(results["AAPL"]["Close"]), [1.5, 1.5])
+        self.assertEqual(results["AAPL"].index[0], pd.Timestamp("2024-03-04 05:00"))
+        self.assertTrue(results["GOOG"].empty)
+        self.assertNotIn("IBM", results)
+
+    def test_batch_fallback_runs_single_calls(self):
+        poly = PolygonSource("dummy_key")
+
+        def history(ticker, period="1y", start=None):
+            if ticker == "BAD":
+                raise ValueError("bad")
+            return pd.DataFrame({"Close": [1.0]})
+
+        with patch.object(PolygonSource, "get_price_history", side_effect=history):
+            results = poly.get_price_history_batch(["AAPL", "BAD"], period="1y")
+        self.assertEqual(list(results["AAPL"]["Close"]), [1.0])
+        self.assertIsInstance(results["BAD"], ValueError)
+
 if __name__ == "__main__":
     unittest.main()
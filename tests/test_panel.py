@@ -0,0 +1,120 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from app.core.analytics import close_panel
+from app.core.panel import PanelCache
+from app.core.price_store import PRICE_STORES
+from app.core.storage_manager import StorageManager
+
+
+def make_closes(tickers=("AAA", "BBB", "CCC"), n=300, seed=0):
+    index = pd.bdate_range("2023-01-02", periods=n, tz="America/New_York", name="Date")
+    rng = np.random.default_rng(seed)
+    paths = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, len(tickers))), axis=0))
+    return {t: pd.DataFrame({"Close": paths[:, i]}, index=index) for i, t in enumerate(tickers)}
+
+
+class TestPanelCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"), storage_path=self.tmp.name,
+                                      price_storage="parquet")
+        self.closes = make_closes()
+
+    def tearDown(self):
+        self.storage.db.close()
+        self.tmp.cleanup()
+
+    def expected(self, closes):
+        return close_panel({t: df["Close"] for t, df in closes.items()})
+
+    def test_matches_close_panel_and_persists(self):
+        for ticker, df in self.closes.items():
+            self.storage.save_price_data(ticker, df)
+        panel = PanelCache(self.storage).get(["CCC", "AAA", "BBB"])
+        pd.testing.assert_frame_equal(panel, self.expected(self.closes)[["CCC", "AAA", "BBB"]], check_names=False)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "_panel", "closes.npy")))
+
+        # A new instance reads the memory-mapped file instead of the price store
+        cache = PanelCache(self.storage)
+        with patch.object(self.storage, "load_price_data", wraps=self.storage.load_price_data) as load:
+            panel = cache.get(["AAA", "BBB"], start="2023-06-01")
+        self.assertEqual(load.call_count, 0)
+        self.assertEqual(panel.index[0], pd.Timestamp("2023-06-01"))
+        self.assertEqual(cache.tickers(), ["CCC", "AAA", "BBB"])
+
+    def test_appends_new_bars_in_place(self):
+        for ticker, df in self.closes.items():
+            self.storage.save_price_data(ticker, df.iloc[:-5])
+        cache = PanelCache(self.storage)
+        cache.get(list(self.closes))
+
+        self.storage.append_price_data("AAA", self.closes["AAA"].iloc[-5:])
+        with patch.object(self.storage, "load_price_data", wraps=self.storage.load_price_data) as load, \
+                patch.object(cache, "_write", wraps=cache._write) as write:
+            panel = cache.get(["AAA", "BBB"])
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(len(write.call_args.args[1]), 5)  # only the new bars were written
+        expected = self.expected({"AAA": self.closes["AAA"], "BBB": self.closes["BBB"].iloc[:-5]})
+        pd.testing.assert_frame_equal(panel, expected, check_names=False)
+
+    def test_rewritten_history_and_new_calendar_days(self):
+        for ticker, df in self.closes.items():
+            self.storage.save_price_data(ticker, df)
+        cache = PanelCache(self.storage)
+        cache.get(list(self.closes))
+
+        adjusted = dict(self.closes, AAA=self.closes["AAA"] / 2)  # e.g. a 2:1 split adjustment
+        self.storage.save_price_data("AAA", adjusted["AAA"])
+        # Another exchange, trading on a Saturday and with more bars than the capacity left
+        other = pd.DataFrame({"Close": np.arange(600.0)},
+                             index=pd.date_range("2023-01-07", periods=600, freq="D", tz="Europe/Berlin"))
+        self.storage.save_price_data("DDD", other)
+        panel = cache.get(["AAA", "BBB", "DDD"])
+
+        expected = self.expected({"AAA": adjusted["AAA"], "BBB": self.closes["BBB"], "DDD": other})
+        pd.testing.assert_frame_equal(panel, expected, check_names=False)
+        pd.testing.assert_frame_equal(PanelCache(self.storage).get(["CCC"]), self.expected(self.closes)[["CCC"]],
+                                      check_names=False)
+
+    def test_backfilled_and_revised_bars_reload_the_row(self):
+        for name in PRICE_STORES:
+            with self.subTest(store=name):
+                storage = StorageManager(db_path=os.path.join(self.tmp.name, f"{name}.db"),
+                                         storage_path=os.path.join(self.tmp.name, name), price_storage=name)
+                closes = make_closes(("AAA", "BBB"), n=302)
+                storage.save_price_data("AAA", closes["AAA"])
+                storage.save_price_data("BBB", closes["BBB"].iloc[2:])
+                cache = PanelCache(storage)
+                cache.get(["AAA", "BBB"])
+
+                # Two earlier bars, e.g. after switching to a provider with a longer history
+                storage.append_price_data("BBB", closes["BBB"].iloc[:2])
+                panel = cache.get(["AAA", "BBB"])
+                pd.testing.assert_frame_equal(panel, self.expected(closes), check_names=False)
+
+                # A re-fetch that revises an earlier close but not the last one
+                revised = closes["BBB"].copy()
+                revised.iloc[100, 0] += 1.0
+                storage.save_price_data("BBB", revised)
+                panel = cache.get(["BBB"])
+                self.assertEqual(panel["BBB"].iloc[100], revised["Close"].iloc[100])
+                storage.db.close()
+
+    def test_unknown_ticker(self):
+        self.storage.save_price_data("AAA", self.closes["AAA"])
+        panel = PanelCache(self.storage).get(["AAA", "ZZZ"])
+        self.assertTrue(panel["ZZZ"].isna().all())
+        self.assertEqual(len(panel), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
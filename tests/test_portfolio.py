@@ -0,0 +1,144 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from app.core.portfolio import PortfolioEngine, book_trades, value_portfolio
+from app.core.storage_manager import StorageManager
+
+
+def make_panel(tickers=("AAA", "BBB"), n=60, seed=0):
+    index = pd.bdate_range("2024-01-01", periods=n)
+    rng = np.random.default_rng(seed)
+    paths = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, len(tickers))), axis=0))
+    return pd.DataFrame(paths, index=index, columns=list(tickers))
+
+
+def trade(id, ticker, date, quantity, price, fees=0.0):
+    return {"id": id, "ticker": ticker, "date": date, "quantity": quantity, "price": price, "fees": fees}
+
+
+class TestBookTrades(unittest.TestCase):
+    def test_average_cost(self):
+        positions = {}
+        booked = book_trades([trade(1, "AAA", "2024-01-01", 10, 100, fees=5),
+                              trade(2, "AAA", "2024-01-02", 10, 110),
+                              trade(3, "AAA", "2024-01-03", -5, 120, fees=1)], positions)
+        # Average cost (1005 + 1100) / 20 = 105.25, realized 5 * (120 - 105.25) - 1
+        self.assertAlmostEqual(booked[2, 2], 72.75)
+        self.assertAlmostEqual(booked[2, 3], -599)
+        self.assertAlmostEqual(positions["AAA"][0], 15)
+        self.assertAlmostEqual(positions["AAA"][1], 15 * 105.25)
+
+        book_trades([trade(4, "AAA", "2024-01-04", -15, 90)], positions)
+        self.assertEqual(positions["AAA"], (0.0, 0.0))
+
+    def test_overselling_raises(self):
+        with self.assertRaises(ValueError):
+            book_trades([trade(1, "AAA", "2024-01-01", 10, 100), trade(2, "AAA", "2024-01-02", -11, 100)])
+
+
+class TestValuePortfolio(unittest.TestCase):
+    def setUp(self):
+        self.panel = make_panel()
+        self.trades = [trade(1, "AAA", "2024-01-02", 10, 100, fees=1),
+                       trade(2, "BBB", "2024-01-10", 20, 95),
+                       trade(3, "AAA", "2024-02-01", -4, 105, fees=1),
+                       trade(4, "BBB", "2024-03-01", 5, 98)]
+
+    def test_matches_position_by_position(self):
+        valuation = value_portfolio(self.trades, self.panel)
+        frame = valuation.frame
+        self.assertEqual(frame.index[0], pd.Timestamp("2024-01-02"))
+
+        day = pd.Timestamp("2024-02-15")
+        expected = 6 * self.panel.loc[day, "AAA"] + 20 * self.panel.loc[day, "BBB"]
+        self.assertAlmostEqual(frame.loc[day, "value"], expected)
+        self.assertAlmostEqual(frame.loc[day, "realized"], 4 * (105 - 100.1) - 1)
+        self.assertAlmostEqual(frame.loc[day, "cost"], 6 * 100.1 + 20 * 95)
+        # Total P&L is both value minus net cash put in and unrealized plus realized
+        np.testing.assert_allclose(frame["pnl"], frame["unrealized"] + frame["realized"])
+
+        weights = valuation.weights.loc[day]
+        self.assertAlmostEqual(weights.sum(), 1.0)
+        self.assertAlmostEqual(weights["AAA"], 6 * self.panel.loc[day, "AAA"] / expected)
+
+        holdings = valuation.holdings()
+        self.assertEqual(holdings.loc["BBB", "quantity"], 25)
+        self.assertAlmostEqual(holdings.loc["BBB", "average_cost"], (20 * 95 + 5 * 98) / 25)
+
+    def test_returns_exclude_cash_flows(self):
+        # Buying more doesn't count as a gain, so the cumulative return tracks the prices
+        panel = make_panel(("AAA",))
+        valuation = value_portfolio([trade(1, "AAA", panel.index[0], 10, panel["AAA"].iloc[0]),
+                                     trade(2, "AAA", panel.index[30], 50, panel["AAA"].iloc[30])], panel)
+        np.testing.assert_allclose(valuation.frame["cumulative_return"],
+                                   panel["AAA"] / panel["AAA"].iloc[0] - 1, rtol=1e-9)
+
+    def test_missing_closes_use_trade_price(self):
+        panel = self.panel.copy()
+        panel.loc[:"2024-01-15", "BBB"] = np.nan
+        valuation = value_portfolio(self.trades + [trade(5, "CCC", "2024-01-06", 3, 50)], panel)
+        frame = valuation.frame
+        self.assertIn(pd.Timestamp("2024-01-06"), frame.index)  # a Saturday trade gets its own row
+        self.assertAlmostEqual(valuation.price[valuation.dates.get_loc(pd.Timestamp("2024-01-12")), 1], 95)
+        self.assertAlmostEqual(valuation.holdings().loc["CCC", "value"], 150)
+
+    def test_incremental_matches_full(self):
+        full = value_portfolio(self.trades, self.panel)
+        earlier = value_portfolio(self.trades[:3], self.panel.iloc[:40])
+        continued = value_portfolio(self.trades, self.panel, earlier)
+        for name in ("quantity", "cost", "realized", "price", "value", "flow", "growth"):
+            np.testing.assert_allclose(getattr(continued, name), getattr(full, name), rtol=1e-9)
+        self.assertTrue(continued.dates.equals(full.dates))
+
+    def test_rewritten_history_is_recomputed(self):
+        earlier = value_portfolio(self.trades, self.panel.iloc[:40])
+        adjusted = self.panel.copy()
+        adjusted["AAA"] /= 2
+        continued = value_portfolio(self.trades, adjusted, earlier)
+        np.testing.assert_allclose(continued.value, value_portfolio(self.trades, adjusted).value)
+
+
+class TestPortfolioEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"), storage_path=self.tmp.name,
+                                      price_storage="sqlite")
+        self.panel = make_panel()
+        for ticker in self.panel:
+            self.storage.save_price_data(ticker, self.panel[[ticker]].rename(columns={ticker: "Close"}))
+
+    def tearDown(self):
+        self.storage.db.close()
+        self.tmp.cleanup()
+
+    def test_cached_until_trades_or_prices_change(self):
+        engine = PortfolioEngine(self.storage)
+        self.assertIsNone(engine.get())
+        self.storage.add_transactions([{"ticker": "AAA", "date": "2024-01-02", "quantity": 10, "price": 100},
+                                       {"ticker": "BBB", "date": "2024-01-03", "quantity": 5, "price": 90}])
+        first = engine.get()
+        self.assertIs(engine.get(), first)
+
+        ids = self.storage.add_transactions([{"ticker": "AAA", "date": "2024-03-20", "quantity": -5, "price": 110}])
+        second = engine.get()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.holdings().loc["AAA", "quantity"], 5)
+
+        self.storage.delete_transaction(ids[0])
+        self.assertEqual(engine.get().holdings().loc["AAA", "quantity"], 10)
+        self.assertEqual(self.storage.get_transactions_version(), (2, ids[0] - 1))
+
+        new_bar = pd.DataFrame({"Close": [123.0]}, index=[self.panel.index[-1] + pd.offsets.BDay()])
+        self.storage.append_price_data("AAA", new_bar)
+        self.assertAlmostEqual(engine.get().holdings().loc["AAA", "price"], 123.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
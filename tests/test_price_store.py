@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.price_store import PRICE_STORES, CsvPriceStore, get_price_store
+from app.core.storage_manager import StorageManager
+from app.core.migrate_prices import find_tickers, migrate
+
+
+def make_prices(tz=None):
+    index = pd.date_range("2023-01-01", periods=400, freq="D", tz=tz, name="Date")
+    return pd.DataFrame({"Close": [float(i) for i in range(400)], "Volume": range(400)}, index=index)
+
+
+class TestPriceStores(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_slicing(self):
+        for tz in [None, "America/New_York"]:
+            df = make_prices(tz)
+            for name in PRICE_STORES:
+                with self.subTest(backend=name, tz=tz):
+                    store = get_price_store(name, self.tmp.name)
+                    store.save("AAA", df)
+
+                    loaded = store.load("AAA")
+                    self.assertEqual(len(loaded), len(df))
+                    self.assertEqual(list(loaded["Close"]), list(df["Close"]))
+
+                    window = store.load("AAA", start="2023-03-01", end="2023-03-10", columns=["Close"])
+                    self.assertEqual(list(window.columns), ["Close"])
+                    self.assertEqual(len(window), 10)
+                    self.assertEqual(window["Close"].iloc[0], 59.0)
+
+                    self.assertEqual(store.last_date("AAA"), df.index[-1])
+                    self.assertEqual(store.first_date("AAA"), df.index[0])
+
+    def test_missing_ticker(self):
+        for name in PRICE_STORES:
+            store = get_price_store(name, self.tmp.name)
+            self.assertIsNone(store.load("NOPE"))
+            self.assertIsNone(store.last_date("NOPE"))
+            self.assertIsNone(store.first_date("NOPE"))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_price_store("xls", self.tmp.name)
+
+    def test_legacy_csv_is_migrated_on_read(self):
+        CsvPriceStore(self.tmp.name).save("AAA", make_prices())
+        sm = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"), storage_path=self.tmp.name,
+                            price_storage="parquet")
+
+        self.assertEqual(len(sm.load_price_data("AAA")), 400)
+        self.assertTrue(sm.price_store.exists("AAA"))
+
+    def test_append_nothing_without_history(self):
+        for name in PRICE_STORES:
+            with self.subTest(backend=name):
+                sm = StorageManager(db_path=os.path.join(self.tmp.name, f"{name}.db"), storage_path=self.tmp.name,
+                                    price_storage=name)
+                sm.append_price_data("NEW", None)
+                sm.append_price_data("NEW", pd.DataFrame())
+                self.assertFalse(sm.price_store.exists("NEW"))
+
+    def test_migrate_all(self):
+        csv = CsvPriceStore(self.tmp.name)
+        csv.save("AAA", make_prices())
+        csv.save("BRK.B", make_prices())
+        npy = get_price_store("npy", self.tmp.name)
+
+        self.assertEqual(migrate(csv, npy, delete_source=True), [])
+        self.assertEqual(find_tickers(npy), ["AAA", "BRK.B"])
+        self.assertEqual(find_tickers(csv), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
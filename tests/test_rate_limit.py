@@ -0,0 +1,91 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+from app.core.api.rate_limit import RateLimiter, RateLimitExceeded
+from tests.helpers import FakeClock
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make(self, limits, state_path=None):
+        return RateLimiter(limits, state_path=state_path, safety_margin=0.0, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_never_exceeds_per_minute_budget(self):
+        limiter = self.make({"polygon": {"per_minute": 5, "per_day": None}})
+        starts = []
+        for _ in range(12):
+            limiter.acquire("polygon")
+            starts.append(self.clock.now)
+
+        for i, t in enumerate(starts):
+            in_window = [s for s in starts if t <= s < t + 60]
+            self.assertLessEqual(len(in_window), 5, f"call {i}")
+        # First five go out immediately, the rest are delayed not dropped
+        self.assertEqual(starts[:5], [1000.0] * 5)
+        self.assertEqual(starts[5], 1060.0)
+        self.assertEqual(starts[10], 1120.0)
+
+    def test_daily_quota_raises_and_persists(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rate_limits.db")
+            limits = {"alpha_vantage": {"per_minute": None, "per_day": 3}}
+
+            limiter = self.make(limits, path)
+            limiter.acquire("alpha_vantage")
+            limiter.acquire("alpha_vantage")
+
+            restarted = self.make(limits, path)
+            self.assertEqual(restarted.remaining("alpha_vantage")["day"], 1)
+            restarted.acquire("alpha_vantage")
+            with self.assertRaises(RateLimitExceeded):
+                restarted.acquire("alpha_vantage")
+
+    def test_limiters_sharing_a_store_share_the_budget(self):
+        # e.g. the Streamlit app and the background refresher
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rate_limits.db")
+            limits = {"polygon": {"per_minute": 5, "per_day": 8}}
+            app, refresher = self.make(limits, path), self.make(limits, path)
+            starts = []
+            for i in range(8):
+                (app if i % 2 else refresher).acquire("polygon")
+                starts.append(self.clock.now)
+
+            self.assertEqual(starts[:5], [1000.0] * 5)
+            self.assertEqual(starts[5], 1060.0)
+            self.assertEqual(app.remaining("polygon")["day"], 0)
+            with self.assertRaises(RateLimitExceeded):
+                refresher.acquire("polygon")
+
+    def test_remaining_does_not_wait_for_writers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rate_limits.db")
+            limiter = self.make({"polygon": {"per_minute": 5, "per_day": 10}}, path)
+            limiter.acquire("polygon")
+            # e.g. another process in the middle of acquire()
+            writer = sqlite3.connect(path, isolation_level=None)
+            writer.execute("BEGIN IMMEDIATE")
+            try:
+                self.assertEqual(limiter.remaining("polygon")["day"], 9)
+            finally:
+                writer.execute("ROLLBACK")
+                writer.close()
+
+    def test_remaining_and_unknown_provider(self):
+        limiter = self.make({"finnhub": {"per_minute": 60, "per_day": None}})
+        limiter.acquire("finnhub")
+        self.assertEqual(limiter.remaining("finnhub"), {"minute": 59, "minute_limit": 60, "day": None, "day_limit": None})
+        self.clock.now += 61
+        self.assertEqual(limiter.remaining("finnhub")["minute"], 60)
+        limiter.acquire("yfinance")  # no limits configured, must not block or raise
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.controller import StockAppController
+from app.core.storage_manager import StorageManager
+
+
+def make_api(fail_on=None):
+    api = MagicMock()
+
+    def info(ticker):
+        if ticker == fail_on:
+            raise ValueError("boom")
+        return {"name": ticker}
+
+    api.get_ticker_info.side_effect = info
+    api.get_financials.side_effect = lambda ticker: {"income_statement": {}}
+    api.get_price_history.side_effect = lambda ticker, period="1y", start=None: pd.DataFrame(
+        {"Close": [1.0, 2.0]}, index=pd.to_datetime(["2024-01-02", "2024-01-03"]))
+    api.get_price_history_batch.side_effect = lambda tickers, period="1y", start=None: {
+        t: api.get_price_history(t, period=period, start=start) for t in tickers}
+    return api
+
+
+class TestRefreshAll(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"),
+                                      storage_path=os.path.join(self.tmp.name, "companies"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_refresh_all_reports_progress_and_errors(self):
+        ctrl = StockAppController(storage=self.storage, api=make_api(fail_on="BAD"))
+        tickers = ["AAA", "BBB", "BAD", "CCC"]
+        progress = []
+
+        results = ctrl.refresh_all(tickers, max_workers=4,
+                                   progress_callback=lambda t, done, total, err: progress.append((t, done, total, err)))
+
+        self.assertEqual(set(results), set(tickers))
+        self.assertIsNone(results["AAA"])
+        self.assertIn("boom", results["BAD"])
+        self.assertEqual([p[1] for p in progress], [1, 2, 3, 4])
+        self.assertTrue(all(p[2] == 4 for p in progress))
+        self.assertIsNotNone(self.storage.load_price_data("CCC"))
+        self.assertIsNone(self.storage.load_company_data("BAD"))
+
+    def test_writes_happen_on_calling_thread(self):
+        ctrl = StockAppController(storage=self.storage, api=make_api())
+        writer_threads = set()
+        original = self.storage.save_price_data
+
+        def recording_save(ticker, df):
+            writer_threads.add(threading.get_ident())
+            original(ticker, df)
+
+        self.storage.save_price_data = recording_save
+        ctrl.refresh_all(["AAA", "BBB", "CCC"], max_workers=3)
+        self.assertEqual(writer_threads, {threading.get_ident()})
+
+    def test_refresh_all_defaults_to_watchlist(self):
+        self.storage.add_stock("AAA")
+        self.storage.add_stock("BBB")
+        ctrl = StockAppController(storage=self.storage, api=make_api())
+        results = ctrl.refresh_all()
+        self.assertEqual(set(results), {"AAA", "BBB"})
+
+
+class TestIncrementalPrices(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"),
+                                      storage_path=os.path.join(self.tmp.name, "companies"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_update_requests_only_missing_range_and_merges(self):
+        history = pd.DataFrame({"Close": [1.0, 2.0, 3.0]},
+                               index=pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]))
+        self.storage.save_price_data("AAA", history)
+
+        api = make_api()
+        api.get_price_history.side_effect = lambda ticker, period="1y", start=None: pd.DataFrame(
+            {"Close": [3.5, 4.0]}, index=pd.to_datetime(["2024-01-04", "2024-01-05"]))
+        ctrl = StockAppController(storage=self.storage, api=api)
+        ctrl.update_stock_data("AAA")
+
+        _, kwargs = api.get_price_history.call_args
+        self.assertEqual(str(kwargs["start"]), "2024-01-04")
+        merged = self.storage.load_price_data("AAA")
+        self.assertEqual(list(merged["Close"]), [1.0, 2.0, 3.5, 4.0])
+
+    def test_full_refresh_overwrites(self):
+        history = pd.DataFrame({"Close": [7.0]}, index=pd.to_datetime(["2020-01-02"]))
+        self.storage.save_price_data("AAA", history)
+
+        api = make_api()
+        ctrl = StockAppController(storage=self.storage, api=api)
+        ctrl.update_stock_data("AAA", full=True)
+
+        _, kwargs = api.get_price_history.call_args
+        self.assertEqual(kwargs, {"period": "1y"})
+        self.assertEqual(list(self.storage.load_price_data("AAA")["Close"]), [1.0, 2.0])
+
+    def test_append_nothing_without_history(self):
+        self.storage.append_price_data("NEW", None)
+        self.storage.append_price_data("NEW", pd.DataFrame())
+        self.assertIsNone(self.storage.load_price_data("NEW"))
+
+    def test_refresh_all_batches_prices_by_start_date(self):
+        stored = pd.DataFrame({"Close": [1.0]}, index=pd.to_datetime(["2024-01-02"]))
+        self.storage.save_price_data("AAA", stored)
+        self.storage.save_price_data("BBB", stored)
+
+        api = make_api()
+        ctrl = StockAppController(storage=self.storage, api=api)
+        results = ctrl.refresh_all(["AAA", "BBB", "NEW"])
+
+        self.assertEqual(results, {"AAA": None, "BBB": None, "NEW": None})
+        batches = sorted((sorted(c.args[0]), str(c.kwargs.get("start"))) for c in api.get_price_history_batch.call_args_list)
+        self.assertEqual(batches, [(["AAA", "BBB"], "2024-01-02"), (["NEW"], "None")])
+
+
+if __name__ == "__main__":
+    unittest.main()
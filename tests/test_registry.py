@@ -0,0 +1,80 @@
+import unittest
+import os
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+from app.core.api import registry
+from app.core.api.registry import (available_providers, create_provider, get_provider_spec, load_provider,
+                                   register_provider)
+from app.core.api.base import StockDataSource
+
+
+class DummySource(StockDataSource):
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+
+    def get_ticker_info(self, ticker):
+        return {"name": ticker}
+
+    def get_price_history(self, ticker, period="1y", start=None):
+        return None
+
+    def get_financials(self, ticker):
+        return {}
+
+
+class TestProviderRegistry(unittest.TestCase):
+    def tearDown(self):
+        registry._providers.pop("dummy", None)
+        registry._providers.pop("plugin", None)
+        registry._classes.pop("dummy", None)
+        registry._classes.pop("plugin", None)
+
+    def test_builtin_providers(self):
+        self.assertEqual(available_providers()[:4], ["yfinance", "alpha_vantage", "polygon", "finnhub"])
+        self.assertTrue(get_provider_spec("polygon").needs_key)
+        with self.assertRaises(ValueError):
+            create_provider("polygon")
+        with self.assertRaises(ValueError):
+            get_provider_spec("nope")
+
+    def test_module_is_imported_on_first_use(self):
+        register_provider("dummy", f"{__name__}:DummySource", needs_key=True)
+        with patch("importlib.import_module", wraps=__import__("importlib").import_module) as imp:
+            self.assertIn("dummy", available_providers())
+            imp.assert_not_called()
+            source = create_provider("dummy", "k")
+            create_provider("dummy", "k")
+        self.assertEqual(imp.call_count, 1)
+        self.assertIsInstance(source, DummySource)
+        self.assertEqual(source.api_key, "k")
+
+    def test_entry_points(self):
+        ep = EntryPoint(name="plugin", value=f"{__name__}:DummySource", group=registry.ENTRY_POINT_GROUP)
+        with patch.object(registry, "_entry_points_loaded", False), \
+             patch.object(registry, "entry_points", return_value=[ep]):
+            self.assertIn("plugin", available_providers())
+            self.assertIs(load_provider("plugin"), DummySource)
+            self.assertEqual(create_provider("plugin", "secret").api_key, "secret")
+            self.assertIsNone(create_provider("plugin").api_key)
+
+    def test_invalid_target(self):
+        with self.assertRaises(ValueError):
+            register_provider("dummy", f"{__name__}.DummySource")
+
+    def test_factory_imports_only_the_configured_provider(self):
+        code = ("import sys; from unittest.mock import MagicMock; "
+                "from app.core.api.factory import get_stock_data_source; "
+                "c = MagicMock(); c.get.side_effect = lambda k, d=None: "
+                "{'api_source': 'polygon', 'api_keys': {'polygon': 'k'}}.get(k, d); "
+                "get_stock_data_source(c); print('yfinance' in sys.modules, 'app.core.api.finnhub' in sys.modules)")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                             env=dict(os.environ, PYTHONPATH=os.getcwd()))
+        self.assertEqual(out.stdout.split()[-2:], ["False", "False"])
+
+if __name__ == '__main__':
+    unittest.main()
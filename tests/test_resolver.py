@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+from app.core.api.resolver import DataResolver, IdentifierIndex, isin_checksum_ok, normalize_name
+
+
+MAPPING = """ISIN;Symbol;Security Name;Exchange
+US0378331005;AAPL;Apple Inc.;XNAS
+US0378331005;APC.DE;Apple Inc.;XETR
+US67066G1040;NVDA;NVIDIA Corporation;XNAS
+DE0007164600;SAP.DE;SAP SE;XETR
+US0000000000;BAD;Broken Row;XNAS
+"""
+
+
+class TestIsinChecksum(unittest.TestCase):
+    def test_checksum(self):
+        for isin in ["US0378331005", "US67066G1040", "DE0007164600", "GB0002634946", "AU0000XVGZA3"]:
+            self.assertTrue(isin_checksum_ok(isin), isin)
+        for isin in ["US0378331006", "US67066G1041", "DE0007164601"]:
+            self.assertFalse(isin_checksum_ok(isin), isin)
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("Apple Inc."), normalize_name("APPLE INC"))
+        self.assertEqual(normalize_name("The Coca-Cola Company"), "COCA COLA")
+
+
+class TestDataResolver(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "isin_mapping.csv")
+        with open(self.path, "w") as f:
+            f.write(MAPPING)
+        self.resolver = DataResolver(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_index_from_csv(self):
+        index = IdentifierIndex.from_csv(self.path)
+        # First listing of an ISIN wins, rows with an invalid ISIN keep their ticker only
+        self.assertEqual(index.lookup_isin("US0378331005"), "AAPL")
+        self.assertEqual(index.lookup_ticker("APC.DE"), "US0378331005")
+        self.assertIsNone(index.lookup_ticker("BAD"))
+        self.assertIsNone(index.lookup_isin("US0000000000"))
+        self.assertEqual(index.lookup_name("nvidia corp"), ("NVDA", "US67066G1040"))
+
+    def test_resolve_with_mapping(self):
+        self.assertEqual(self.resolver.resolve("us0378331005 "), ("AAPL", "US0378331005"))
+        self.assertEqual(self.resolver.resolve("SAP.DE"), ("SAP.DE", "DE0007164600"))
+        self.assertEqual(self.resolver.resolve("Nvidia Corporation"), ("NVDA", "US67066G1040"))
+        # Unknown but valid ISINs and unknown tickers behave as without a mapping
+        self.assertEqual(self.resolver.resolve("GB0002634946"), (None, "GB0002634946"))
+        self.assertEqual(self.resolver.resolve("MSFT"), ("MSFT", None))
+        with self.assertRaises(ValueError):
+            self.resolver.resolve("US0378331006")
+
+    def test_resolve_without_mapping(self):
+        resolver = DataResolver(os.path.join(self.tmp.name, "missing.csv"))
+        self.assertEqual(resolver.resolve("US0378331005"), (None, "US0378331005"))
+        self.assertEqual(resolver.resolve("AAPL"), ("AAPL", None))
+
+    def test_resolve_many(self):
+        results = self.resolver.resolve_many(["AAPL", "US67066G1040", "US0378331006", "XYZ"])
+        self.assertEqual(results, [("AAPL", "US0378331005"), ("NVDA", "US67066G1040"), (None, None), ("XYZ", None)])
+
+    def test_index_is_reloaded_when_the_file_changes(self):
+        self.assertEqual(self.resolver.resolve("MSFT"), ("MSFT", None))
+        with open(self.path, "a") as f:
+            f.write("US5949181045;MSFT;Microsoft Corporation;XNAS\n")
+        self.assertEqual(self.resolver.resolve("MSFT"), ("MSFT", "US5949181045"))
+
+    def test_missing_columns(self):
+        with open(self.path, "w") as f:
+            f.write("Code,Name\nAAPL,Apple\n")
+        with self.assertRaises(ValueError):
+            IdentifierIndex.from_csv(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.controller import StockAppController
+from app.core.scheduler import RefreshScheduler
+from app.core.storage_manager import StorageManager
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"),
+                                      storage_path=os.path.join(self.tmp.name, "companies"))
+        for t in ["AAA", "BBB", "CCC"]:
+            self.storage.add_stock(t)
+
+        self.api = MagicMock()
+        self.api.PROVIDER = None
+        self.api.remaining_quota.return_value = None
+        self.api.get_ticker_info.side_effect = lambda t: {"name": t}
+        self.api.get_financials.side_effect = lambda t: {}
+        self.api.get_price_history_batch.side_effect = lambda tickers, period="1y", start=None: {
+            t: ValueError("no data") if t == "CCC" else
+            pd.DataFrame({"Close": [1.0]}, index=pd.to_datetime(["2024-01-02"])) for t in tickers}
+        self.ctrl = StockAppController(storage=self.storage, api=self.api)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_run_once_records_jobs_and_skips_fresh_tickers(self):
+        scheduler = RefreshScheduler(self.ctrl)
+        summary = scheduler.run_once()
+        self.assertEqual(summary["prices"], {"ok": 2, "failed": 1})
+        self.assertEqual(summary["fundamentals"], {"ok": 3, "failed": 0})
+
+        status = self.storage.get_job_status("CCC")
+        self.assertEqual(status["prices"]["last_error"], "no data")
+        self.assertIsNone(status["prices"]["last_success"])
+        self.assertIsNotNone(status["fundamentals"]["last_success"])
+
+        # Nothing is due right after a successful pass (CCC waits for its retry delay)
+        self.api.reset_mock()
+        self.assertEqual(scheduler.run_once(), {"prices": {"ok": 0, "failed": 0}, "fundamentals": {"ok": 0, "failed": 0}})
+        self.api.get_price_history_batch.assert_not_called()
+
+    def test_never_refreshed_and_stalest_first(self):
+        self.storage.record_job_result("AAA", "prices", "2024-01-01T00:00:00", "2024-01-01T00:00:00")
+        self.storage.record_job_result("BBB", "prices", "2023-01-01T00:00:00", "2024-01-01T00:00:00")
+        self.storage.add_stock("DDD")
+        due = self.storage.get_due_jobs("prices", "2024-06-01T00:00:00")
+        self.assertEqual(due, ["CCC", "DDD", "BBB", "AAA"])
+
+    def test_respects_daily_quota(self):
+        def remaining():
+            used = sum(len(c.args[0]) for c in self.api.get_price_history_batch.call_args_list)
+            used += 4 * self.api.get_financials.call_count
+            return max(0, 7 - used)
+
+        self.api.remaining_quota.side_effect = remaining
+        summary = RefreshScheduler(self.ctrl).run_once()
+        # 7 calls left: 3 go to price refreshes (1 each), the remaining 4 cover one fundamentals refresh
+        self.assertEqual(sum(summary["prices"].values()), 3)
+        self.assertEqual(sum(summary["fundamentals"].values()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+import pandas as pd
+
+from app.core.financials import line_items
+from app.core.price_store import CsvPriceStore
+from app.core.storage_manager import StorageManager
+
+
+def make_bars(start, closes, tz="America/New_York"):
+    index = pd.date_range(start, periods=len(closes), freq="D", tz=tz, name="Date")
+    return pd.DataFrame({"Open": closes, "Close": closes, "Volume": [100] * len(closes)}, index=index)
+
+
+class TestSqlStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = StorageManager(db_path=os.path.join(self.tmp.name, "stocks.db"),
+                                      storage_path=self.tmp.name, price_storage="sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_bars_live_in_the_app_database(self):
+        self.storage.save_price_data("AAA", make_bars("2024-01-01", [10.0, 11.0, 12.0]))
+        count = self.storage.db.execute("SELECT COUNT(*) FROM price_bars WHERE ticker = 'AAA'").fetchone()[0]
+        self.assertEqual(count, 3)
+
+        loaded = self.storage.load_price_data("AAA")
+        self.assertEqual(list(loaded.columns), ["Open", "Close", "Volume"])
+        self.assertEqual(str(loaded.index.tz), "America/New_York")
+        self.assertEqual(self.storage.get_last_price_date("AAA"), pd.Timestamp("2024-01-03", tz="America/New_York"))
+
+    def test_append_upserts_only_new_bars(self):
+        self.storage.save_price_data("AAA", make_bars("2024-01-01", [10.0, 11.0, 12.0]))
+        self.storage.append_price_data("AAA", make_bars("2024-01-03", [12.5, 13.0]))
+        loaded = self.storage.load_price_data("AAA")
+        self.assertEqual(list(loaded["Close"]), [10.0, 11.0, 12.5, 13.0])
+
+    def test_append_migrates_legacy_csv_first(self):
+        CsvPriceStore(self.tmp.name).save("AAA", make_bars("2024-01-01", [10.0, 11.0]))
+        self.storage.append_price_data("AAA", make_bars("2024-01-03", [12.0]))
+        self.assertEqual(len(self.storage.load_price_data("AAA")), 3)
+
+    def test_screen_price_change(self):
+        self.storage.save_price_data("DOWN", make_bars("2024-01-01", [100.0] * 8 + [85.0]))
+        self.storage.save_price_data("FLAT", make_bars("2024-01-01", [50.0] * 9))
+        self.storage.save_price_data("UP", make_bars("2024-01-01", [10.0] * 8 + [12.0]))
+
+        down = self.storage.screen_price_change(days=7, max_change=-0.10)
+        self.assertEqual(list(down["ticker"]), ["DOWN"])
+        self.assertAlmostEqual(down["change"].iloc[0], -0.15)
+        self.assertEqual(down["base_date"].iloc[0], "2024-01-02 00:00:00")
+
+        self.assertEqual(list(self.storage.screen_price_change(days=7)["ticker"]), ["DOWN", "FLAT", "UP"])
+
+    def test_screening_needs_sqlite_storage(self):
+        storage = StorageManager(db_path=os.path.join(self.tmp.name, "other.db"), storage_path=self.tmp.name,
+                                 price_storage="csv")
+        with self.assertRaises(ValueError):
+            storage.screen_price_change()
+
+    def test_financial_items_are_normalized(self):
+        av = {"income_statement": {"symbol": "AAA", "annualReports": [
+            {"fiscalDateEnding": "2023-12-31", "reportedCurrency": "USD", "totalRevenue": "1000", "ebit": "None"},
+            {"fiscalDateEnding": "2022-12-31", "reportedCurrency": "USD", "totalRevenue": "900"},
+        ]}}
+        yf = {"income_statement": {"2023-09-30 00:00:00": {"totalRevenue": 5000.0, "Net Income": float("nan")}},
+              "cashflow": {}}
+        self.storage.save_company_data("AAA", av)
+        self.storage.save_company_data("BBB", yf)
+
+        items = self.storage.get_financial_items("AAA")
+        self.assertEqual(list(items["period_end"]), ["2023-12-31", "2022-12-31"])
+        self.assertEqual(list(items["value"]), [1000.0, 900.0])
+
+        latest = self.storage.compare_financial_item("totalRevenue")
+        self.assertEqual(list(latest["ticker"]), ["BBB", "AAA"])
+        self.assertEqual(list(latest["value"]), [5000.0, 1000.0])
+
+        # Saving again replaces the ticker's items
+        self.storage.save_company_data("AAA", {})
+        self.assertTrue(self.storage.get_financial_items("AAA").empty)
+
+    def test_line_items_from_polygon_and_finnhub(self):
+        polygon = {"full_report": [{"end_date": "2023-12-31", "timeframe": "quarterly", "financials": {
+            "income_statement": {"revenues": {"value": 10.0, "unit": "USD"}},
+            "cash_flow_statement": {"net_cash_flow": {"value": -2.0}}}}]}
+        finnhub = {"financials_reported": [{"endDate": "2023-09-30 00:00:00", "quarter": 0, "report": {
+            "bs": [{"concept": "us-gaap_Assets", "value": 42}]}}]}
+        self.assertEqual(sorted(line_items(polygon)), [
+            ("cashflow", "quarterly", "2023-12-31", "net_cash_flow", -2.0),
+            ("income_statement", "quarterly", "2023-12-31", "revenues", 10.0),
+        ])
+        self.assertEqual(line_items(finnhub), [("balance_sheet", "annual", "2023-09-30", "us-gaap_Assets", 42.0)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.getcwd())
+
+from app.core.api.alpha_vantage import AlphaVantageSource
+from app.core.api.finnhub import FinnhubSource
+from app.core.api.http import HttpClient
+from app.core.api.polygon import PolygonSource
+from app.core.api.rate_limit import RateLimiter
+from app.core.api.registry import create_provider
+from app.core.api.standin import Behavior, Recordings, StandInServer, request_key, write_recording
+
+DAILY = {"Time Series (Daily)": {
+    "2024-12-30": {"1. open": "10", "2. high": "11", "3. low": "9", "4. close": "10.5", "5. volume": "100"},
+    "2024-12-31": {"1. open": "10.5", "2. high": "12", "3. low": "10", "4. close": "11.5", "5. volume": "200"},
+}}
+CANDLES = {"c": [10.5, 11.5], "h": [11, 12], "l": [9, 10], "o": [10, 10.5], "s": "ok",
+           "t": [1735516800, 1735603200], "v": [100, 200]}
+
+
+def unlimited(source):
+    source.rate_limiter = RateLimiter(limits={source.PROVIDER: {}})
+    source.http = HttpClient(max_retries=2, backoff_factor=0.01)
+    return source
+
+
+class TestStandIn(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        write_recording(self.tmp, "alpha_vantage", "", {"function": "TIME_SERIES_DAILY", "symbol": "IBM",
+                                                        "outputsize": "full", "apikey": "secret"}, DAILY)
+        write_recording(self.tmp, "alpha_vantage", "", {"function": "OVERVIEW", "symbol": "IBM", "apikey": "secret"},
+                        {"Symbol": "IBM", "Name": "International Business Machines", "Sector": "TECHNOLOGY"})
+        write_recording(self.tmp, "polygon", "/v3/reference/tickers/AAPL", {"apiKey": "secret"},
+                        {"results": {"ticker": "AAPL", "name": "Apple Inc.", "locale": "us"}})
+        write_recording(self.tmp, "finnhub", "/stock/candle",
+                        {"symbol": "MSFT", "resolution": "D", "from": 1, "to": 2, "token": "secret"}, CANDLES)
+        self.recordings = Recordings.load(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_recordings_strip_keys(self):
+        with open(os.path.join(self.tmp, "alpha_vantage.jsonl")) as f:
+            self.assertNotIn("secret", f.read())
+        self.assertEqual(len(self.recordings), 4)
+
+    def test_request_key_ignores_dates_and_symbol(self):
+        a = request_key("/v2/aggs/ticker/AAPL/range/1/day/2020-01-01/2024-12-31", {"sort": "asc", "apiKey": "k"})
+        b = request_key("/v2/aggs/ticker/AAPL/range/1/day/2021-05-01/2025-01-02", {"sort": "asc"})
+        self.assertEqual(a, b)
+        self.assertEqual(request_key("/stock/candle", {"symbol": "MSFT", "from": "1"}, generic=True),
+                         request_key("/stock/candle", {"symbol": "NVDA", "from": "9"}, generic=True))
+
+    def test_sources_against_standin(self):
+        with StandInServer(self.recordings, default=Behavior(median_ms=1, sigma=0)) as server:
+            urls = server.base_urls()
+            av = unlimited(AlphaVantageSource("key", base_url=urls["alpha_vantage"]))
+            df = av.get_price_history("IBM", period="max")
+            self.assertEqual(list(df["Close"]), [10.5, 11.5])
+            self.assertEqual(av.get_ticker_info("IBM")["name"], "International Business Machines")
+
+            # Recorded for another symbol: replayed with the symbol swapped
+            polygon = unlimited(PolygonSource("key", base_url=urls["polygon"]))
+            info = polygon.get_ticker_info("NVDA")
+            self.assertEqual(info["full_info"]["ticker"], "NVDA")
+
+            finnhub = unlimited(FinnhubSource("key", base_url=urls["finnhub"]))
+            self.assertEqual(len(finnhub.get_price_history("GOOG", period="1y")), 2)
+
+            with self.assertRaises(ValueError):
+                av._get_json("INCOME_STATEMENT", "IBM")
+            self.assertEqual(server.stats()["alpha_vantage"]["missing"], 1)
+
+    def test_create_provider_base_url(self):
+        source = create_provider("polygon", "key", base_url="http://127.0.0.1:9/polygon/")
+        self.assertEqual(source.base_url, "http://127.0.0.1:9/polygon")
+        self.assertEqual(create_provider("polygon", "key").base_url, PolygonSource.BASE_URL)
+
+    def test_error_injection_is_retried(self):
+        behaviors = {"polygon": Behavior(median_ms=1, sigma=0, error_rate=0.5, error_statuses=(503,))}
+        with StandInServer(self.recordings, behaviors, seed=1) as server:
+            polygon = unlimited(PolygonSource("key", base_url=server.base_urls()["polygon"]))
+            polygon.http = HttpClient(max_retries=10, backoff_factor=0.001)
+            for _ in range(10):
+                self.assertEqual(polygon.get_ticker_info("AAPL")["name"], "Apple Inc.")
+            stats = server.stats()["polygon"]
+            self.assertGreater(stats.get("503", 0), 0)
+            self.assertEqual(stats["200"], 10)
+            self.assertEqual(polygon.http.stats()["retries"], stats["503"])
+
+    def test_per_minute_quota(self):
+        behaviors = {"polygon": Behavior(median_ms=1, sigma=0, per_minute=3),
+                     "alpha_vantage": Behavior(median_ms=1, sigma=0, per_minute=1)}
+        with StandInServer(self.recordings, behaviors) as server:
+            urls = server.base_urls()
+            polygon = unlimited(PolygonSource("key", base_url=urls["polygon"]))
+            polygon.http = HttpClient(max_retries=0)
+            for _ in range(3):
+                polygon.get_ticker_info("AAPL")
+            with self.assertRaisesRegex(ValueError, "Rate Limit"):
+                polygon.get_ticker_info("AAPL")
+
+            av = unlimited(AlphaVantageSource("key", base_url=urls["alpha_vantage"]))
+            av.get_ticker_info("IBM")
+            with self.assertRaisesRegex(ValueError, "limit reached"):
+                av.get_ticker_info("IBM")
+            self.assertEqual(server.stats()["polygon"]["429"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
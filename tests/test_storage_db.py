@@ -0,0 +1,75 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.getcwd())
+
+from app.core.db import MIGRATIONS, Database
+from app.core.storage_manager import StorageManager
+
+
+class TestStorageDatabase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "stocks.db")
+        self.storage = StorageManager(db_path=self.db_path, storage_path=os.path.join(self.tmp.name, "companies"))
+
+    def tearDown(self):
+        self.storage.db.close()
+        self.tmp.cleanup()
+
+    def test_connection_is_tuned_and_reused_per_thread(self):
+        conn = self.storage.db.connection()
+        self.assertIs(conn, self.storage.db.connection())
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.storage.db.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+    def test_migrations_create_indexes_and_set_version(self):
+        self.assertEqual(self.storage.db.schema_version(), max(v for v, _ in MIGRATIONS))
+        indexes = {row[0] for row in self.storage.db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_stocks_isin", indexes)
+        self.assertIn("idx_stocks_sector", indexes)
+
+    def test_upgrades_database_created_before_migrations(self):
+        path = os.path.join(self.tmp.name, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE stocks (id INTEGER PRIMARY KEY AUTOINCREMENT, ticker TEXT UNIQUE NOT NULL, "
+                     "isin TEXT, name TEXT, sector TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO stocks (ticker) VALUES ('AAPL')")
+        conn.commit()
+        conn.close()
+
+        db = Database(path)
+        db.migrate(MIGRATIONS)
+        self.assertEqual(db.schema_version(), max(v for v, _ in MIGRATIONS))
+        self.assertEqual(db.execute("SELECT ticker FROM stocks").fetchone()[0], "AAPL")
+        db.close()
+
+    def test_add_stocks_inserts_and_merges_in_one_call(self):
+        self.storage.add_stock("AAPL", name="Apple Inc.")
+        self.storage.add_stocks([
+            {"ticker": "AAPL", "isin": "US0378331005"},
+            {"ticker": "MSFT", "name": "Microsoft", "sector": "Technology"},
+        ])
+        stocks = {s["ticker"]: s for s in self.storage.get_stocks()}
+        self.assertEqual(set(stocks), {"AAPL", "MSFT"})
+        self.assertEqual(stocks["AAPL"]["name"], "Apple Inc.")
+        self.assertEqual(stocks["AAPL"]["isin"], "US0378331005")
+        self.assertEqual(stocks["MSFT"]["sector"], "Technology")
+
+    def test_add_stocks_rolls_back_on_error(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.storage.add_stocks([{"ticker": "AAPL"}, {"ticker": None}])
+        self.assertEqual(self.storage.get_stocks(), [])
+
+if __name__ == '__main__':
+    unittest.main()
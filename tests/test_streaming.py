@@ -0,0 +1,118 @@
+import unittest
+import os
+import sys
+import json
+import time
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from app.core.api.standin import TradeStreamStandIn
+from app.core.streaming import MinuteBars, QuoteStream, TickBuffer
+
+T0 = 1_735_000_000_000 - 1_735_000_000_000 % 60_000  # a minute boundary, in ms
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def trades_message(*trades):
+    return json.dumps({"type": "trade", "data": [{"s": s, "p": p, "t": t, "v": v} for s, p, t, v in trades]})
+
+
+class TestBuffers(unittest.TestCase):
+    def test_tick_buffer_keeps_the_latest(self):
+        buffer = TickBuffer(size=4)
+        self.assertIsNone(buffer.last())
+        for i in range(10):
+            buffer.append(T0 + i, 100.0 + i, 1.0)
+        times, prices, _ = buffer.snapshot()
+        np.testing.assert_array_equal(prices, [106, 107, 108, 109])
+        np.testing.assert_array_equal(times, T0 + np.arange(6, 10))
+        self.assertEqual(buffer.last(), (T0 + 9, 109.0, 1.0))
+        self.assertEqual(len(buffer), 4)
+
+    def test_minute_bars(self):
+        bars = MinuteBars(size=2)
+        for offset, price, volume in [(0, 10, 1), (20_000, 12, 2), (50_000, 9, 3), (61_000, 11, 4),
+                                      (59_000, 13, 5),   # late, for the completed first minute
+                                      (125_000, 10, 1), (181_000, 10, 1), (10_000, 50, 1)]:
+            bars.add(T0 + offset, float(price), float(volume))
+        frame = bars.frame()
+        # Two completed bars fit in the ring buffer, the one in progress comes last
+        self.assertEqual(list(frame.index), list(pd.to_datetime([T0 + 60_000, T0 + 120_000, T0 + 180_000],
+                                                                unit="ms", utc=True)))
+        self.assertEqual(list(frame.iloc[0]), [11, 11, 11, 11, 4])
+        self.assertEqual(bars.late, 1)
+
+        bars = MinuteBars()
+        for offset, price, volume in [(0, 10, 1), (20_000, 12, 2), (50_000, 9, 3), (61_000, 11, 4), (59_000, 13, 5)]:
+            bars.add(T0 + offset, float(price), float(volume))
+        self.assertEqual(list(bars.frame(include_current=False).iloc[0]), [10, 13, 9, 9, 11])
+
+
+class TestQuoteStream(unittest.TestCase):
+    def test_handle_message(self):
+        stream = QuoteStream("key")
+        stream.handle_message(trades_message(("AAA", 10.0, T0, 5), ("BBB", 20.0, T0 + 1, 1), ("AAA", 11.0, T0 + 2, 5)))
+        stream.handle_message(json.dumps({"type": "ping"}))
+        prices = stream.last_prices()
+        self.assertEqual(prices["AAA"], (11.0, pd.Timestamp(T0 + 2, unit="ms", tz="UTC")))
+        self.assertEqual(list(stream.ticks("AAA")["Price"]), [10.0, 11.0])
+        self.assertEqual(stream.bars("AAA")["Volume"].iloc[-1], 10)
+        self.assertTrue(stream.bars("ZZZ").empty)
+        self.assertEqual(stream.stats()["ticks"], 3)
+        self.assertEqual(stream.version, 1)
+
+    def test_malformed_trades_are_skipped(self):
+        stream = QuoteStream("key")
+        trades = [{"s": "AAA", "p": 10.0, "t": T0, "v": 1}, {"s": "AAA", "t": T0 + 1}, {"p": 1.0, "t": T0},
+                  "junk", {"s": "AAA", "p": 11.0, "t": T0 + 2}]
+        stream.handle_message(json.dumps({"type": "trade", "data": trades}))
+        stream.handle_message(json.dumps({"type": "trade", "data": 42}))
+        self.assertEqual(list(stream.ticks("AAA")["Price"]), [10.0, 11.0])
+        stats = stream.stats()
+        self.assertEqual((stats["ticks"], stats["errors"]), (2, 4))
+
+    def test_warnings_are_rate_limited(self):
+        stream = QuoteStream("key", warning_interval=60.0)
+        with patch("builtins.print") as printed:
+            for _ in range(1000):
+                stream.handle_message("not json")
+        self.assertEqual(printed.call_count, 1)
+        self.assertEqual(stream.stats()["errors"], 1000)
+
+    def test_against_standin(self):
+        with TradeStreamStandIn() as server:
+            stream = QuoteStream("key", url=server.url, reconnect_delay=0.05).start()
+            try:
+                stream.subscribe(["aaa"])
+                self.assertTrue(wait_for(lambda: server.subscriptions() == {"AAA"}))
+                server.publish([{"s": "AAA", "p": 10.5, "t": T0, "v": 3}, {"s": "BBB", "p": 1.0, "t": T0, "v": 1}])
+                self.assertTrue(wait_for(lambda: "AAA" in stream.last_prices()))
+                self.assertNotIn("BBB", stream.last_prices())
+
+                # Dropped: the stream reconnects and subscribes again
+                server.drop_connections()
+                self.assertTrue(wait_for(lambda: stream.stats()["connects"] == 2 and server.subscriptions() == {"AAA"}))
+                server.publish([{"s": "AAA", "p": 11.0, "t": T0 + 1000, "v": 1}])
+                self.assertTrue(wait_for(lambda: stream.last_prices()["AAA"][0] == 11.0))
+
+                stream.unsubscribe(["AAA"])
+                self.assertTrue(wait_for(lambda: server.subscriptions() == set()))
+            finally:
+                stream.stop()
+            self.assertEqual(stream.stats()["connected"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()